@@ -1,24 +1,285 @@
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
+from dataclasses import replace
 from io import BytesIO
 from urllib.parse import quote as url_quote
-from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Tuple
+import asyncio
+import json
 import os
+import re
 import threading
 
 from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request
-from fastapi.responses import HTMLResponse, StreamingResponse
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, Response, StreamingResponse
 from fastapi.templating import Jinja2Templates
-from pypdf import PdfReader, PdfWriter
-from zipfile import ZipFile, ZIP_DEFLATED
+from starlette.concurrency import run_in_threadpool
+
+from pdf_tool.images import ImageOptions
+from pdf_tool.optimize import OptimizeOptions
+from pdf_tool.utils import validate_page_selection, validate_ranges
+from pdf_web.admission import (
+	LIMITS,
+	REJECTED,
+	AdmissionMiddleware,
+	HeavySlots,
+	LimitExceededError,
+	check_inputs,
+	request_cpu_budget,
+	run_with_budget,
+)
+from pdf_web.executor import BoundedExecutor, ExecutorBusyError
+from pdf_web.jobs import DONE, TERMINAL_STATUSES, JobManager, JobStore, format_sse
+from pdf_web.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY, MetricsMiddleware, timed_stage
+from pdf_web.operations import (
+	PdfInputError,
+	build_split_part,
+	compose_documents,
+	default_images,
+	default_linearize,
+	default_optimize,
+	inspect_document,
+	merge_documents,
+	parse_cache_stats,
+	plan_split,
+)
+from pdf_web.results import CachedResult, ResultCache, etag_matches, result_key
+from pdf_web.spool import SpooledUpload, SpoolingRoute, spool_upload
+from pdf_web.uploads import UploadError, UploadStore
+from pdf_web.zipstream import ZipCompressionPolicy, ZipReport, default_policy, stream_zip
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+	"""비동기 작업 관리자(작업자/만료 정리)를 서버 수명에 맞춰 시작/중지합니다."""
+	await job_manager.start()
+	try:
+		yield
+	finally:
+		await job_manager.stop()
 
-from pdf_tool.utils import parse_ranges_to_groups
 
-app = FastAPI(title="PDF 병합/분할 웹")
+app = FastAPI(title="PDF 병합/분할 웹", lifespan=lifespan)
+# 업로드 파일 파트는 받으면서 스풀 파일에 한 번만 쓰고 해시를 계산합니다(라우트를 등록하기 전에 지정).
+app.router.route_class = SpoolingRoute
 
 templates = Jinja2Templates(directory="templates")
 
+# 무거운 PDF 작업은 이벤트 루프가 아닌 제한된 실행기에서 처리합니다.
+executor = BoundedExecutor.from_env()
+
+# 무거운 요청은 실행기가 받을 수 있는 만큼(기본: 작업자 수 + 대기열 한도)만 본문을 받기 전에 들입니다.
+heavy_slots = HeavySlots(LIMITS.max_heavy or executor.max_workers + executor.max_queue)
+
+# 동시 처리 수를 넘는 무거운 요청은 업로드를 받기 전에 429로, 입력 바이트 한도(PDF_WEB_MAX_INPUT_BYTES)를 넘는
+# 본문은 경로와 관계없이(청크 업로드 포함) 받는 도중 413으로 거절합니다.
+app.add_middleware(AdmissionMiddleware, slots=heavy_slots)
+# 요청 수/시간/바이트와 단계별 시간을 /metrics와 Server-Timing 헤더로 내보냅니다(413/429 거절도 세도록 가장 바깥에 둠).
+app.add_middleware(MetricsMiddleware)
+
+# 같은 입력/옵션의 결과는 디스크 캐시에서 바로 내보냅니다(PDF_WEB_RESULT_CACHE_BYTES=0이면 끔).
+result_cache = ResultCache.from_env()
+
+# 큰 파일은 /uploads로 청크 단위로 올려 두고(재개 가능), upload_ids로 병합/분할/작업에 씁니다.
+upload_store = UploadStore.from_env()
+
+# 오래 걸리는 작업은 /jobs API로 받아 SQLite 큐에 넣고 백그라운드에서 처리합니다.
+job_manager = JobManager(JobStore.from_env(), executor)
+
+REGISTRY.gauge("pdf_web_executor_in_flight", "실행기에서 실행 중인 작업 수", function=lambda: executor.pending - executor.queue_depth)
+REGISTRY.gauge("pdf_web_executor_queue_depth", "실행기 대기열에서 기다리는 작업 수", function=lambda: executor.queue_depth)
+REGISTRY.gauge("pdf_web_jobs_running", "실행 중인 비동기 작업(/jobs) 수", function=lambda: job_manager.running)
+REGISTRY.gauge("pdf_web_heavy_requests_in_flight", "처리 중인 무거운 요청(/merge, /split, /compose, /inspect) 수", function=lambda: heavy_slots.active)
+
+# SSE 진행 상황 폴링 간격과 연결 유지용 주석 간격(초)
+JOB_EVENT_INTERVAL = 0.5
+JOB_EVENT_KEEPALIVE = 15.0
+
+
+def reject(error: LimitExceededError) -> HTTPException:
+	"""자원 한도 초과를 HTTP 응답(413, 또는 Retry-After를 붙인 429)으로 바꾸고 거절 지표를 셉니다."""
+	REJECTED.inc(reason=error.reason)
+	headers = {"Retry-After": str(LIMITS.retry_after)} if error.status == 429 else None
+	return HTTPException(status_code=error.status, detail=str(error), headers=headers)
+
+
+async def run_pdf_job(fn, *args, check_queue: bool = True):
+	"""PDF 작업을 실행기에서 수행하고, 예외를 HTTP 응답으로 변환합니다.
+
+	- PDF_WEB_CPU_SECONDS가 있으면 요청이 지금까지 쓴 CPU 시간을 뺀 나머지 예산 안에서 실행합니다.
+	"""
+	budget = request_cpu_budget()
+	try:
+		if budget is None:
+			return await executor.run(fn, *args, check_queue=check_queue)
+		return await executor.run(run_with_budget, budget, fn, *args, check_queue=check_queue)
+	except ExecutorBusyError as e:
+		raise reject(LimitExceededError(str(e), "busy", 429))
+	except LimitExceededError as e:
+		raise reject(e)
+	except PdfInputError as e:
+		raise HTTPException(status_code=400, detail=str(e))
+
+
+def check_pdf_filenames(files: List[UploadFile]) -> None:
+	"""업로드 파일명이 모두 .pdf인지 확인합니다(정보용 검증)."""
+	for upload in files:
+		if not upload.filename or not upload.filename.lower().endswith(".pdf"):
+			raise HTTPException(status_code=400, detail=f"PDF 파일만 업로드하세요: {upload.filename}")
+
+
+def normalize_output_name(output_name: str) -> str:
+	"""출력 이름을 보정합니다(비어 있으면 기본값, 확장자가 없으면 .pdf)."""
+	safe_name = output_name.strip() or "merged.pdf"
+	if not safe_name.lower().endswith(".pdf"):
+		safe_name += ".pdf"
+	return safe_name
+
+
+def check_ranges(ranges: Optional[str]) -> None:
+	"""분할 범위의 문법을 업로드를 받기 전에 검사합니다(페이지 수 초과는 문서를 연 뒤 확인)."""
+	if ranges is None or ranges.strip() == "":
+		return
+	try:
+		validate_ranges(ranges)
+	except ValueError as e:
+		raise HTTPException(status_code=400, detail=str(e))
+
+
+def parse_compression(compression: Optional[str]) -> ZipCompressionPolicy:
+	"""ZIP 압축 정책 폼 값을 해석합니다(비어 있으면 서버 기본값)."""
+	try:
+		return ZipCompressionPolicy.parse(compression) if compression and compression.strip() else default_policy()
+	except ValueError as e:
+		raise HTTPException(status_code=400, detail=str(e))
+
+
+def parse_optimize(optimize: Optional[str]) -> OptimizeOptions:
+	"""출력 최적화 수준 폼 값을 해석합니다(비어 있으면 서버 기본값)."""
+	try:
+		return OptimizeOptions.parse(optimize) if optimize and optimize.strip() else default_optimize()
+	except ValueError as e:
+		raise HTTPException(status_code=400, detail=str(e))
+
+
+def parse_images(downsample: Optional[int], jpeg_quality: Optional[int]) -> ImageOptions:
+	"""이미지 다시 샘플링 폼 값을 해석합니다(비어 있는 값은 서버 기본값)."""
+	defaults = default_images()
+	try:
+		return replace(
+			defaults,
+			dpi=defaults.dpi if downsample is None else downsample,
+			quality=defaults.quality if jpeg_quality is None else jpeg_quality,
+		)
+	except ValueError as e:
+		raise HTTPException(status_code=400, detail=str(e))
+
+
+def parse_linearize(linearize: Optional[bool]) -> bool:
+	"""선형화 폼 값을 해석합니다(비어 있으면 서버 기본값)."""
+	return default_linearize() if linearize is None else linearize
+
+
+async def spool_uploads(files: List[UploadFile]) -> List[SpooledUpload]:
+	"""업로드들을 스풀합니다. 빈 파일이 있으면 이미 스풀한 것을 정리하고 400으로 응답합니다."""
+	items: List[SpooledUpload] = []
+	try:
+		for upload in files:
+			# 받으면서 쓴 스풀 파일을 그대로 넘김 (메모리에 통째로 올리지 않음)
+			item = await spool_upload(upload)
+			items.append(item)
+			if item.size == 0:
+				raise HTTPException(status_code=400, detail=f"빈 파일입니다: {upload.filename}")
+	except BaseException:
+		for item in items:
+			item.cleanup()
+		raise
+	return items
+
+
+def parse_compose_specs(text: Optional[str], input_count: int) -> List[Tuple[int, Optional[str]]]:
+	"""
+	`/compose`의 `specs` 폼 값(JSON 배열)을 (입력 번호, 페이지 선택) 목록으로 만듭니다.
+
+	- 각 항목은 `{"source": 입력 번호, "pages": "3-7"}` 형식이며 `pages`를 생략하면 전체 페이지입니다.
+	- 비어 있으면 모든 입력의 전체 페이지를 순서대로 씁니다.
+	"""
+	if text is None or text.strip() == "":
+		return [(index, None) for index in range(input_count)]
+	try:
+		raw = json.loads(text)
+	except ValueError:
+		raise HTTPException(status_code=400, detail="specs는 JSON 배열이어야 합니다.")
+	if not isinstance(raw, list) or len(raw) == 0:
+		raise HTTPException(status_code=400, detail="specs는 비어 있지 않은 JSON 배열이어야 합니다.")
+	specs: List[Tuple[int, Optional[str]]] = []
+	for position, spec in enumerate(raw, start=1):
+		source = spec.get("source") if isinstance(spec, dict) else None
+		pages = spec.get("pages") if isinstance(spec, dict) else None
+		if isinstance(source, bool) or not isinstance(source, int) or not 0 <= source < input_count:
+			raise HTTPException(
+				status_code=400,
+				detail=f"specs {position}번째 항목의 source가 잘못되었습니다 (0~{input_count - 1}의 입력 번호).",
+			)
+		if pages is not None and not isinstance(pages, str):
+			raise HTTPException(status_code=400, detail=f"specs {position}번째 항목의 pages는 문자열이어야 합니다.")
+		try:
+			validate_page_selection(pages)
+		except ValueError as e:
+			raise HTTPException(status_code=400, detail=f"specs {position}번째 항목: {e}")
+		specs.append((source, pages))
+	return specs
+
+
+def parse_upload_ids(values: Optional[List[str]]) -> List[str]:
+	"""`upload_ids` 폼 값(반복 필드 또는 쉼표 구분)을 목록으로 만듭니다."""
+	ids: List[str] = []
+	for value in values or []:
+		ids.extend(part.strip() for part in value.split(",") if part.strip())
+	return ids
+
+
+async def run_upload(fn, *args):
+	"""업로드 저장소 작업을 스레드에서 수행하고, UploadError를 HTTP 응답으로 변환합니다."""
+	try:
+		return await run_in_threadpool(fn, *args)
+	except UploadError as e:
+		raise HTTPException(status_code=e.status, detail=str(e))
+
+
+def check_input_limits(count: int, total_bytes: int) -> None:
+	"""입력 파일 수/바이트 합계가 요청별 한도(PDF_WEB_MAX_FILES/PDF_WEB_MAX_INPUT_BYTES)를 넘으면 413으로 응답합니다."""
+	try:
+		check_inputs(count, total_bytes)
+	except LimitExceededError as e:
+		raise reject(e)
+
+
+async def collect_inputs(files: Optional[List[UploadFile]], upload_ids: List[str]) -> List[SpooledUpload]:
+	"""업로드 파일을 스풀하고, 그 뒤에 완료된 청크 업로드(upload_ids)를 순서대로 이어 붙인 입력 목록을 만듭니다.
+
+	- 입력 파일 수와 (청크 업로드를 더한) 바이트 합계 한도는 스풀하기 전에 확인합니다. 업로드 본문 크기는
+	  AdmissionMiddleware가 받는 동안 이미 제한합니다.
+	"""
+	files = files or []
+	check_pdf_filenames(files)
+	upload_bytes = sum(upload.size or 0 for upload in files)
+	check_input_limits(len(files) + len(upload_ids), upload_bytes)
+	# 청크 업로드는 세션 파일을 그대로 쓰므로(owned=False) 먼저 열어도 정리할 것이 없습니다.
+	uploaded = [await run_upload(upload_store.open_source, upload_id) for upload_id in upload_ids]
+	check_input_limits(len(files) + len(uploaded), upload_bytes + sum(item.size for item in uploaded))
+	with timed_stage("spool"):
+		items = await spool_uploads(files)
+	return items + uploaded
+
+
+async def collect_single_input(file: Optional[UploadFile], upload_id: Optional[str]) -> SpooledUpload:
+	"""입력 PDF 하나(`file` 또는 `upload_id` 중 하나)를 준비합니다(분할/정보 보기)."""
+	upload_ids = parse_upload_ids([upload_id] if upload_id else None)
+	if (file is None) == (not upload_ids) or len(upload_ids) > 1:
+		raise HTTPException(status_code=400, detail="PDF를 `file` 또는 `upload_id` 중 하나로 지정하세요.")
+	return (await collect_inputs([file] if file is not None else None, upload_ids))[0]
+
 
 def build_content_disposition(filename: str) -> str:
 	"""다운로드 파일명을 위한 Content-Disposition 생성 (RFC 5987 지원).
@@ -34,6 +295,41 @@ def build_content_disposition(filename: str) -> str:
 	return f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{utf8_star}"
 
 
+class CachedFileResponse(FileResponse):
+	"""고정된 캐시 항목의 파일을 보내고, 다 보내거나 중간에 끊기면 고정을 풉니다."""
+
+	def __init__(self, entry: CachedResult, **kwargs) -> None:
+		super().__init__(entry.path, **kwargs)
+		self.entry = entry
+
+	async def __call__(self, scope, receive, send) -> None:
+		try:
+			await super().__call__(scope, receive, send)
+		finally:
+			result_cache.release(self.entry)
+
+
+def cached_result_response(request: Request, entry: CachedResult, filename: Optional[str] = None) -> Response:
+	"""캐시된 결과를 내보냅니다.
+
+	- 강한 `ETag`(결과 바이트의 SHA-256)를 붙이고, `If-None-Match`가 일치하면 304로 응답합니다.
+	- `Range`/`If-Range` 요청에는 요청한 구간만 206으로 보내 끊긴 다운로드를 이어받을 수 있습니다.
+	- `Content-Location`의 `/results/{key}`로 같은 결과를 GET으로 다시 받을 수 있습니다.
+	- entry는 acquire/put(pin=True)로 고정된 항목이어야 하며, 응답을 보내고 나면 고정을 풉니다.
+	"""
+	headers = {
+		"ETag": entry.etag,
+		"Content-Location": f"/results/{entry.key}",
+		"Cache-Control": "private, no-cache",
+	}
+	if etag_matches(request.headers.get("if-none-match"), entry.etag):
+		result_cache.release(entry)
+		return Response(status_code=304, headers=headers)
+	headers.update(entry.headers)
+	headers["Content-Disposition"] = build_content_disposition(filename or entry.filename)
+	return CachedFileResponse(entry, media_type=entry.media_type, headers=headers)
+
+
 @app.get("/", response_class=HTMLResponse)
 async def index(request: Request):
 	"""간단한 업로드 UI를 렌더링합니다."""
@@ -44,63 +340,386 @@ async def index(request: Request):
 @app.get("/health")
 async def health():
 	"""헬스 체크 엔드포인트."""
-	return {"status": "ok"}
+	if executor.kind == "thread":
+		# 스레드 실행기는 이 프로세스의 파싱 캐시를 쓰므로 적중률을 함께 보여 줍니다.
+		return {"status": "ok", "parse_cache": parse_cache_stats(), "result_cache": result_cache.stats()}
+	return {"status": "ok", "result_cache": result_cache.stats()}
+
+
+@app.get("/metrics")
+async def metrics_endpoint():
+	"""Prometheus 텍스트 형식의 지표를 반환합니다.
+
+	- 엔드포인트별 요청 수/처리 시간, 단계별(upload/spool/parse/copy/serialize/zip 등) 시간 히스토그램,
+	  입출력 바이트, 처리한 페이지 수, 실행기 실행/대기 작업 수, 실행 중인 비동기 작업 수, 서버 프로세스 RSS.
+	- 프로세스 실행기에서도 단계 시간은 작업 결과와 함께 이 프로세스로 돌아와 기록됩니다.
+	"""
+	return Response(REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+@app.get("/results/{key}")
+async def result_endpoint(request: Request, key: str):
+	"""캐시된 병합/분할 결과를 다시 내려받습니다(`If-None-Match`, `Range` 지원)."""
+	entry = result_cache.acquire(key) if re.fullmatch(r"[0-9a-f]{64}", key) else None
+	if entry is None:
+		raise HTTPException(status_code=404, detail="결과가 없거나 캐시에서 만료되었습니다.")
+	return cached_result_response(request, entry)
 
 
 @app.post("/merge")
 async def merge_endpoint(
-	files: List[UploadFile] = File(..., description="병합할 PDF 파일들 (2개 이상)"),
+	request: Request,
+	files: Optional[List[UploadFile]] = File(default=None, description="병합할 PDF 파일들 (upload_ids와 합쳐 2개 이상)"),
+	upload_ids: Optional[List[str]] = Form(default=None, description="완료된 청크 업로드 id들 (files 뒤에 이어 붙임)"),
 	output_name: str = Form(default="merged.pdf"),
+	dedupe: bool = Form(default=False, description="입력 간 중복 객체(글꼴/이미지 등) 합치기"),
+	optimize: Optional[str] = Form(default=None, description="출력 최적화 수준: off | basic[:0-9] | max[:0-9] (비우면 서버 기본값)"),
+	downsample: Optional[int] = Form(default=None, description="이미지 목표 DPI (이보다 높은 이미지를 줄임, 0 = 끔, 비우면 서버 기본값)"),
+	jpeg_quality: Optional[int] = Form(default=None, description="다시 샘플링한 이미지의 JPEG 품질 1-95"),
+	linearize: Optional[bool] = Form(default=None, description="빠른 웹 보기(선형화): 첫 페이지를 먼저 그릴 수 있게 씀 (비우면 서버 기본값)"),
 ):
 	"""여러 PDF 파일을 병합하여 하나의 PDF로 스트리밍 반환합니다.
 
-	- 파일 수가 2개 이상이어야 합니다.
+	- 파일 수가 2개 이상이어야 합니다. 청크로 올린 파일은 `upload_ids`로 지정합니다(`files` 뒤에 이어 붙음).
 	- 암호화된 PDF는 거부됩니다.
 	- `output_name`은 비어 있으면 기본값으로 대체되며 확장자가 없으면 `.pdf`를 붙입니다.
+	- `dedupe`가 참이면 중복 객체를 합치고, 절약한 객체 수/바이트를 응답 헤더로 알려 줍니다.
+	- `optimize`가 off가 아니면 출력을 최적화하고 크기/시간을 `X-Optimize-*` 응답 헤더로 알려 줍니다.
+	- `downsample`(DPI)을 주면 그보다 해상도가 높은 이미지를 줄이고(`jpeg_quality`), 결과를 `X-Downsample-*` 헤더로 알려 줍니다.
+	- `linearize`가 참이면 선형화(빠른 웹 보기)해, 브라우저가 파일 전체를 받기 전에 첫 페이지를 그리고 나머지를
+	  `Range` 요청으로 가져오게 합니다(`X-Linearize-*` 헤더).
+	- 같은 입력(내용)/순서/옵션의 결과는 결과 캐시에서 내보냅니다(`ETag`/`If-None-Match`/`Range` 지원).
 	"""
 	# 입력 검증: 최소 2개 파일
-	if files is None or len(files) < 2:
+	ids = parse_upload_ids(upload_ids)
+	if len(files or []) + len(ids) < 2:
 		raise HTTPException(status_code=400, detail="병합에는 최소 2개의 PDF가 필요합니다.")
 
-	writer = PdfWriter()
+	safe_name = normalize_output_name(output_name)
+	options = parse_optimize(optimize)
+	images = parse_images(downsample, jpeg_quality)
+	linearized = parse_linearize(linearize)
 
-	for upload in files:
-		# 파일명 검증 (정보용)
-		if not upload.filename or not upload.filename.lower().endswith(".pdf"):
-			raise HTTPException(status_code=400, detail=f"PDF 파일만 업로드하세요: {upload.filename}")
-		data = await upload.read()
-		if not data:
-			raise HTTPException(status_code=400, detail=f"빈 파일입니다: {upload.filename}")
-		try:
-			reader = PdfReader(BytesIO(data))
-		except Exception:
-			raise HTTPException(status_code=400, detail=f"유효하지 않은 PDF입니다: {upload.filename}")
+	items = await collect_inputs(files, ids)
+	try:
+		key = result_key(
+			"merge",
+			[item.digest for item in items],
+			dedupe=dedupe,
+			optimize=str(options),
+			images=str(images),
+			linearize=linearized,
+		)
+		cached = result_cache.acquire(key)
+		if cached is None:
+			# 파싱/페이지 복사/직렬화는 실행기에서 수행
+			merged, stats, output_headers = await run_pdf_job(merge_documents, items, dedupe, str(options), images, linearized)
+	finally:
+		for item in items:
+			item.cleanup()
+
+	if cached is None:
+		headers = {}
+		if stats is not None:
+			headers["X-Dedupe-Objects"] = str(stats.objects_removed)
+			headers["X-Dedupe-Saved-Bytes"] = str(stats.bytes_saved)
+		headers.update(output_headers)
+		cached = await run_in_threadpool(result_cache.put, key, merged, "application/pdf", safe_name, headers, True)
+		if cached is None:
+			# 캐시를 쓰지 않거나 결과가 한도보다 크면 바로 보냅니다.
+			headers["Content-Disposition"] = build_content_disposition(safe_name)
+			return StreamingResponse(
+				BytesIO(merged),
+				media_type="application/pdf",
+				headers=headers,
+			)
+
+	return cached_result_response(request, cached, safe_name)
+
+
+@app.post("/inspect")
+async def inspect_endpoint(
+	file: Optional[UploadFile] = File(default=None, description="살펴볼 PDF 파일"),
+	upload_id: Optional[str] = Form(default=None, description="완료된 청크 업로드 id (file 대신)"),
+	pages: bool = Form(default=True, description="페이지별 MediaBox/회전과 목차 포함 (끄면 페이지 수만)"),
+):
+	"""PDF의 페이지 수, 페이지별 MediaBox/회전, 목차, 암호화 여부, 크기를 JSON으로 반환합니다.
 
-		if getattr(reader, "is_encrypted", False):
-			raise HTTPException(status_code=400, detail=f"암호화된 PDF는 병합할 수 없습니다: {upload.filename}")
+	- 트레일러/교차 참조와 페이지 트리만 읽고 콘텐츠 스트림은 읽지 않습니다.
+	- `pages`는 크기/회전이 같은 연속 페이지를 구간(`first_page`~`last_page`)으로 묶어 보냅니다.
+	- 파싱 결과는 캐시에 남아, 같은 파일로 이어지는 분할/병합이 다시 파싱하지 않습니다.
+	"""
+	source = await collect_single_input(file, upload_id)
+	try:
+		info = await run_pdf_job(inspect_document, source, pages)
+	finally:
+		source.cleanup()
+	info["filename"] = source.filename
+	return info
+
+
+@app.post("/compose")
+async def compose_endpoint(
+	request: Request,
+	files: Optional[List[UploadFile]] = File(default=None, description="합성에 쓸 PDF 파일들"),
+	upload_ids: Optional[List[str]] = Form(default=None, description="완료된 청크 업로드 id들 (files 뒤에 이어 붙임)"),
+	specs: Optional[str] = Form(
+		default=None,
+		description='JSON 배열. 예: [{"source": 0, "pages": "3-7"}, {"source": 1}, {"source": 2, "pages": "10-1"}]',
+	),
+	output_name: str = Form(default="composed.pdf"),
+	optimize: Optional[str] = Form(default=None, description="출력 최적화 수준: off | basic[:0-9] | max[:0-9] (비우면 서버 기본값)"),
+	downsample: Optional[int] = Form(default=None, description="이미지 목표 DPI (이보다 높은 이미지를 줄임, 0 = 끔, 비우면 서버 기본값)"),
+	jpeg_quality: Optional[int] = Form(default=None, description="다시 샘플링한 이미지의 JPEG 품질 1-95"),
+	linearize: Optional[bool] = Form(default=None, description="빠른 웹 보기(선형화): 첫 페이지를 먼저 그릴 수 있게 씀 (비우면 서버 기본값)"),
+):
+	"""여러 PDF에서 페이지를 골라(순서 변경/역순/홀짝) 한 번에 하나의 PDF로 합성합니다.
 
-		for page in reader.pages:
-			writer.add_page(page)
+	- `source`는 입력 번호(0부터, `files` 다음에 `upload_ids` 순서)입니다. 같은 입력을 여러 번 써도 됩니다.
+	- `pages`는 `1-3,5`, `7-`, `10-1`(역순), `end-1`, `all`, `odd`, `even`, `1-10:odd` 등을 쓸 수 있습니다.
+	- 분할 후 다시 병합하지 않고 출력 하나를 한 번에 씁니다. 결과 캐시/`optimize`/`downsample`/`linearize`는 /merge와 같습니다.
+	"""
+	ids = parse_upload_ids(upload_ids)
+	input_count = len(files or []) + len(ids)
+	if input_count == 0:
+		raise HTTPException(status_code=400, detail="합성할 PDF가 없습니다.")
+	# 업로드를 스풀하기 전에 값싼 검증부터 합니다.
+	compose_specs = parse_compose_specs(specs, input_count)
+	options = parse_optimize(optimize)
+	images = parse_images(downsample, jpeg_quality)
+	linearized = parse_linearize(linearize)
+
+	safe_name = normalize_output_name(output_name)
+
+	items = await collect_inputs(files, ids)
+	try:
+		key = result_key(
+			"compose",
+			[item.digest for item in items],
+			specs=[[index, pages] for index, pages in compose_specs],
+			optimize=str(options),
+			images=str(images),
+			linearize=linearized,
+		)
+		cached = result_cache.acquire(key)
+		if cached is None:
+			composed, headers = await run_pdf_job(compose_documents, items, compose_specs, str(options), images, linearized)
+	finally:
+		for item in items:
+			item.cleanup()
+
+	if cached is None:
+		cached = await run_in_threadpool(result_cache.put, key, composed, "application/pdf", safe_name, headers, True)
+		if cached is None:
+			headers["Content-Disposition"] = build_content_disposition(safe_name)
+			return StreamingResponse(
+				BytesIO(composed),
+				media_type="application/pdf",
+				headers=headers,
+			)
+
+	return cached_result_response(request, cached, safe_name)
+
+
+@app.post("/jobs/merge", status_code=202)
+async def create_merge_job(
+	files: Optional[List[UploadFile]] = File(default=None, description="병합할 PDF 파일들 (upload_ids와 합쳐 2개 이상)"),
+	upload_ids: Optional[List[str]] = Form(default=None, description="완료된 청크 업로드 id들 (files 뒤에 이어 붙임)"),
+	output_name: str = Form(default="merged.pdf"),
+	dedupe: bool = Form(default=False, description="입력 간 중복 객체(글꼴/이미지 등) 합치기"),
+	optimize: Optional[str] = Form(default=None, description="출력 최적화 수준: off | basic[:0-9] | max[:0-9] (비우면 서버 기본값)"),
+	downsample: Optional[int] = Form(default=None, description="이미지 목표 DPI (이보다 높은 이미지를 줄임, 0 = 끔, 비우면 서버 기본값)"),
+	jpeg_quality: Optional[int] = Form(default=None, description="다시 샘플링한 이미지의 JPEG 품질 1-95"),
+	linearize: Optional[bool] = Form(default=None, description="빠른 웹 보기(선형화): 첫 페이지를 먼저 그릴 수 있게 씀 (비우면 서버 기본값)"),
+):
+	"""병합 작업을 대기열에 넣고 작업 id를 바로 반환합니다(필드는 /merge와 같음).
 
-	# 출력 이름 보정
-	safe_name = output_name.strip() or "merged.pdf"
-	if not safe_name.lower().endswith(".pdf"):
-		safe_name += ".pdf"
+	- 진행 상황은 `/jobs/{id}/events`(SSE), 결과는 `/jobs/{id}/result`에서 받습니다.
+	"""
+	ids = parse_upload_ids(upload_ids)
+	if len(files or []) + len(ids) < 2:
+		raise HTTPException(status_code=400, detail="병합에는 최소 2개의 PDF가 필요합니다.")
+	params = {
+		"output_name": normalize_output_name(output_name),
+		"dedupe": dedupe,
+		"optimize": str(parse_optimize(optimize)),
+		**image_params(parse_images(downsample, jpeg_quality)),
+		"linearize": parse_linearize(linearize),
+	}
+	return await submit_job("merge", params, await collect_inputs(files, ids))
+
+
+@app.post("/jobs/split", status_code=202)
+async def create_split_job(
+	file: Optional[UploadFile] = File(default=None, description="분할할 PDF 파일"),
+	upload_id: Optional[str] = Form(default=None, description="완료된 청크 업로드 id (file 대신)"),
+	ranges: Optional[str] = Form(default=None, description="예: 1-3,5,7-"),
+	compression: Optional[str] = Form(default=None, description="ZIP 압축 정책: stored | deflate[:N] | auto[:N]"),
+	optimize: Optional[str] = Form(default=None, description="출력 최적화 수준: off | basic[:0-9] | max[:0-9] (비우면 서버 기본값)"),
+	downsample: Optional[int] = Form(default=None, description="이미지 목표 DPI (이보다 높은 이미지를 줄임, 0 = 끔, 비우면 서버 기본값)"),
+	jpeg_quality: Optional[int] = Form(default=None, description="다시 샘플링한 이미지의 JPEG 품질 1-95"),
+	linearize: Optional[bool] = Form(default=None, description="빠른 웹 보기(선형화): 첫 페이지를 먼저 그릴 수 있게 씀 (비우면 서버 기본값)"),
+):
+	"""분할 작업을 대기열에 넣고 작업 id를 바로 반환합니다(필드는 /split과 같음)."""
+	check_ranges(ranges)
+	params = {
+		"ranges": ranges,
+		"compression": str(parse_compression(compression)),
+		"optimize": str(parse_optimize(optimize)),
+		**image_params(parse_images(downsample, jpeg_quality)),
+		"linearize": parse_linearize(linearize),
+	}
+	return await submit_job("split", params, [await collect_single_input(file, upload_id)])
+
+
+def image_params(images: ImageOptions) -> dict:
+	"""작업 매개변수(JSON)로 저장할 이미지 설정."""
+	return {"downsample": images.dpi, "jpeg_quality": images.quality}
+
+
+async def submit_job(kind: str, params: dict, items: List[SpooledUpload]):
+	"""준비된 입력을 작업으로 넘기고 202 응답 본문을 만듭니다."""
+	try:
+		job = await job_manager.submit(kind, params, items)
+	finally:
+		# 작업 디렉터리로 옮겨진 스풀 파일은 이미 없고, 업로드 세션 파일은 지우지 않습니다.
+		for item in items:
+			item.cleanup()
+	body = job.public()
+	return JSONResponse(body, status_code=202, headers={"Location": f"/jobs/{job.id}"})
+
+
+async def get_job_or_404(job_id: str):
+	# lifespan 없이 실행된 서버에서도 남은 작업이 처리되도록 작업자를 시작합니다.
+	await job_manager.start()
+	job = await run_in_threadpool(job_manager.store.get, job_id) if re.fullmatch(r"[0-9a-f]{32}", job_id) else None
+	if job is None:
+		raise HTTPException(status_code=404, detail="작업이 없거나 만료되었습니다.")
+	return job
 
 
-	out_buf = BytesIO()
-	writer.write(out_buf)
-	out_buf.seek(0)
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+	"""작업 상태와 진행 상황을 반환합니다."""
+	job = await get_job_or_404(job_id)
+	return job.public()
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(request: Request, job_id: str):
+	"""작업 진행 상황을 Server-Sent Events로 보냅니다.
+
+	- 상태/진행이 바뀔 때마다 `progress` 이벤트를 보내고, 끝나면 `done`/`failed`/`cancelled` 이벤트 후 닫습니다.
+	"""
+	await get_job_or_404(job_id)
+
+	async def events():
+		last = None
+		idle = 0.0
+		while not await request.is_disconnected():
+			job = await run_in_threadpool(job_manager.store.get, job_id)
+			if job is None:
+				yield format_sse("failed", {"id": job_id, "error": "작업이 없거나 만료되었습니다."})
+				return
+			data = job.public()
+			if data != last:
+				event = job.status if job.status in TERMINAL_STATUSES else "progress"
+				yield format_sse(event, data)
+				last = data
+				idle = 0.0
+			elif idle >= JOB_EVENT_KEEPALIVE:
+				yield ": keep-alive\n\n"
+				idle = 0.0
+			if job.status in TERMINAL_STATUSES:
+				return
+			await asyncio.sleep(JOB_EVENT_INTERVAL)
+			idle += JOB_EVENT_INTERVAL
 
 	return StreamingResponse(
-		out_buf,
-		media_type="application/pdf",
-		headers={
-			"Content-Disposition": build_content_disposition(safe_name)
-		},
+		events(),
+		media_type="text/event-stream",
+		headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
 	)
 
 
+@app.get("/jobs/{job_id}/result")
+async def job_result(job_id: str):
+	"""끝난 작업의 결과 파일을 내려받습니다(`Range` 지원)."""
+	job = await get_job_or_404(job_id)
+	if job.status != DONE or not job.result:
+		raise HTTPException(status_code=409, detail=f"작업이 끝나지 않았습니다: {job.status}")
+	headers = dict(job.result.get("headers", {}))
+	headers["Content-Disposition"] = build_content_disposition(job.result["filename"])
+	return FileResponse(job.result["path"], media_type=job.result["media_type"], headers=headers)
+
+
+@app.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+	"""작업을 취소합니다. 실행 중인 작업은 다음 진행 보고 시점에 멈춥니다."""
+	await get_job_or_404(job_id)
+	job = await run_in_threadpool(job_manager.store.request_cancel, job_id)
+	if job is None:
+		raise HTTPException(status_code=404, detail="작업이 없거나 만료되었습니다.")
+	return job.public()
+
+
+@app.post("/uploads", status_code=201)
+async def create_upload(
+	filename: str = Form(..., description="원본 파일명 (.pdf)"),
+	size: int = Form(..., description="전체 크기 (bytes)"),
+	chunk_size: Optional[int] = Form(default=None, description="청크 크기 (기본: 서버 설정)"),
+):
+	"""재개 가능한 청크 업로드 세션을 만듭니다.
+
+	- 응답의 `chunk_size`/`total_chunks`에 맞춰 `PUT /uploads/{id}/chunks/{n}`으로 청크를 보냅니다.
+	"""
+	session = await run_upload(upload_store.create, filename, size, chunk_size)
+	status = await run_upload(upload_store.status, session)
+	return JSONResponse(status, status_code=201, headers={"Location": f"/uploads/{session.id}"})
+
+
+@app.get("/uploads/{upload_id}")
+async def get_upload(upload_id: str):
+	"""업로드 세션 상태(받은/빠진 청크 번호, 완료 여부)를 반환합니다. 끊긴 업로드를 이어 갈 때 사용합니다."""
+	session = await run_upload(upload_store.get, upload_id)
+	return await run_upload(upload_store.status, session)
+
+
+@app.put("/uploads/{upload_id}/chunks/{index}")
+async def put_upload_chunk(request: Request, upload_id: str, index: int):
+	"""청크 하나(0부터 번호)를 받습니다. 본문은 청크 바이트 그대로입니다.
+
+	- `X-Chunk-Sha256` 헤더(16진수)가 있으면 체크섬을 검증하고, 맞지 않으면 422로 응답합니다.
+	- 같은 청크를 다시 보내도 됩니다(덮어씀). 여러 청크를 병렬로 보낼 수 있습니다.
+	"""
+	session = await run_upload(upload_store.get, upload_id)
+	limit = session.chunk_size
+	body = bytearray()
+	async for part in request.stream():
+		body += part
+		if len(body) > limit:
+			raise HTTPException(status_code=413, detail=f"청크가 청크 크기({limit} bytes)보다 큽니다.")
+	await run_upload(upload_store.write_chunk, upload_id, index, bytes(body), request.headers.get("x-chunk-sha256"))
+	return {"id": upload_id, "index": index, "size": len(body)}
+
+
+@app.post("/uploads/{upload_id}/finalize")
+async def finalize_upload(
+	upload_id: str,
+	sha256: Optional[str] = Form(default=None, description="전체 파일 SHA-256 (선택, 검증용)"),
+):
+	"""모든 청크를 받았는지 확인하고 업로드를 완료합니다. 빠진 청크가 있으면 409로 응답합니다."""
+	session = await run_upload(upload_store.finalize, upload_id, sha256)
+	return await run_upload(upload_store.status, session)
+
+
+@app.delete("/uploads/{upload_id}", status_code=204)
+async def delete_upload(upload_id: str):
+	"""업로드 세션과 파일을 지웁니다."""
+	await run_upload(upload_store.delete, upload_id)
+	return Response(status_code=204)
+
+
 @app.post("/admin/shutdown")
 async def admin_shutdown(token: str = Form(...)):
 	"""서버를 안전하게 종료합니다(개발용). 토큰이 일치해야 합니다.
@@ -117,84 +736,107 @@ async def admin_shutdown(token: str = Form(...)):
 
 @app.post("/split")
 async def split_endpoint(
-	file: UploadFile = File(..., description="분할할 PDF 파일"),
+	request: Request,
+	file: Optional[UploadFile] = File(default=None, description="분할할 PDF 파일"),
+	upload_id: Optional[str] = Form(default=None, description="완료된 청크 업로드 id (file 대신)"),
 	ranges: Optional[str] = Form(default=None, description="예: 1-3,5,7-"),
+	compression: Optional[str] = Form(default=None, description="ZIP 압축 정책: stored | deflate[:N] | auto[:N]"),
+	optimize: Optional[str] = Form(default=None, description="출력 최적화 수준: off | basic[:0-9] | max[:0-9] (비우면 서버 기본값)"),
+	downsample: Optional[int] = Form(default=None, description="이미지 목표 DPI (이보다 높은 이미지를 줄임, 0 = 끔, 비우면 서버 기본값)"),
+	jpeg_quality: Optional[int] = Form(default=None, description="다시 샘플링한 이미지의 JPEG 품질 1-95"),
+	linearize: Optional[bool] = Form(default=None, description="빠른 웹 보기(선형화): 첫 페이지를 먼저 그릴 수 있게 씀 (비우면 서버 기본값)"),
 ):
 	"""PDF를 페이지별 또는 범위별로 분할하여 PDF/ZIP으로 반환합니다.
 
+	- 입력은 `file` 또는 완료된 청크 업로드의 `upload_id` 중 하나로 지정합니다.
 	- `ranges`가 비어 있으면 각 페이지를 개별 PDF로 생성합니다.
 	- `ranges`가 지정되면 각 토큰별 그룹으로 파일을 생성합니다.
+	- `compression`이 비어 있으면 서버 기본 정책(PDF_WEB_ZIP_COMPRESSION)을 사용합니다.
+	- `optimize`가 off가 아니면 파트마다 최적화합니다(비어 있으면 서버 기본값 PDF_WEB_OPTIMIZE).
+	- `downsample`/`jpeg_quality`가 있으면 파트마다 고해상도 이미지를 줄입니다(비어 있으면 PDF_WEB_DOWNSAMPLE_DPI).
+	- `linearize`가 참이면 파트마다 선형화합니다(비어 있으면 PDF_WEB_LINEARIZE).
 	- 암호화된 PDF는 거부됩니다.
+	- 같은 입력(내용)/파일명/범위/압축 정책/최적화/이미지/선형화 설정의 결과는 결과 캐시에서 내보냅니다(`ETag`/`If-None-Match`/`Range` 지원).
 	"""
-	# 입력 파일 검증
-	if not file.filename or not file.filename.lower().endswith(".pdf"):
-		raise HTTPException(status_code=400, detail=f"PDF 파일만 업로드하세요: {file.filename}")
-
-	data = await file.read()
-	if not data:
-		raise HTTPException(status_code=400, detail="빈 파일입니다.")
+	policy = parse_compression(compression)
+	options = parse_optimize(optimize)
+	images = parse_images(downsample, jpeg_quality)
+	linearized = parse_linearize(linearize)
+	check_ranges(ranges)
+
+	# 입력 파일 검증/스풀 (또는 청크로 올린 업로드 사용)
+	source = await collect_single_input(file, upload_id)
+	streaming = False
 	try:
-		reader = PdfReader(BytesIO(data))
-	except Exception:
-		raise HTTPException(status_code=400, detail="유효하지 않은 PDF입니다.")
-
-	if getattr(reader, "is_encrypted", False):
-		raise HTTPException(status_code=400, detail="암호화된 PDF는 분할할 수 없습니다.")
-
-	total_pages = len(reader.pages)
-	base_name = (Path(file.filename).stem or "document").replace("\"", "_")
-
-	# ranges가 없으면 각 페이지별 파일 생성
-	def build_single_pdf(pages: List[int]) -> bytes:
-		writer = PdfWriter()
-		for idx in pages:
-			writer.add_page(reader.pages[idx])
-		buf = BytesIO()
-		writer.write(buf)
-		return buf.getvalue()
-
-	outputs: List[tuple[str, bytes]] = []
-
-	if ranges is None or ranges.strip() == "":
-		for i in range(total_pages):
-			pdf_bytes = build_single_pdf([i])
-			outputs.append((f"{base_name}_page_{i + 1}.pdf", pdf_bytes))
-	else:
-		# 범위 파싱 (1-기반 입력을 0-기반 인덱스로 변환)
-		try:
-			groups = parse_ranges_to_groups(ranges.strip(), total_pages)
-		except Exception as e:
-			raise HTTPException(status_code=400, detail=str(e))
-
-		for gi, group in enumerate(groups, start=1):
-			pdf_bytes = build_single_pdf(group)
-			outputs.append((f"{base_name}_part_{gi}.pdf", pdf_bytes))
-
-	# 응답: 1개면 PDF 그대로, 여러 개면 ZIP
-	if len(outputs) == 0:
-		# 요청이 유효하나 결과가 비어있는 경우 400으로 응답
-		raise HTTPException(status_code=400, detail="생성된 파일이 없습니다. 범위를 확인하세요.")
-
-	if len(outputs) == 1:
-		name, data_bytes = outputs[0]
+		# 파일명은 출력 파일/ZIP 항목 이름에 들어가므로 키에 포함합니다.
+		key = result_key(
+			"split",
+			[source.digest],
+			filename=source.filename,
+			ranges=(ranges or "").strip(),
+			compression=str(policy),
+			optimize=str(options),
+			images=str(images),
+			linearize=linearized,
+		)
+		cached = result_cache.acquire(key)
+		if cached is not None:
+			return cached_result_response(request, cached)
+
+		# 파싱/검증/범위 해석은 실행기에서 수행
+		base_name, parts = await run_pdf_job(plan_split, source, ranges)
+
+		# 응답: 1개면 PDF 그대로
+		if len(parts) == 1:
+			name, pages = parts[0]
+			body, headers = await run_pdf_job(build_split_part, source, pages, str(options), images, linearized)
+			cached = await run_in_threadpool(result_cache.put, key, body, "application/pdf", name, headers, True)
+			if cached is not None:
+				return cached_result_response(request, cached)
+			headers["Content-Disposition"] = build_content_disposition(name)
+			return StreamingResponse(
+				BytesIO(body),
+				media_type="application/pdf",
+				headers=headers,
+			)
+
+		# 여러 개면 ZIP: 파트를 하나씩 만들어 곧바로 ZIP 항목으로 내보냅니다.
+		async def split_parts():
+			for name, pages in parts:
+				# 파트별 보고는 로그에만 남깁니다(ZIP 응답 헤더는 하나뿐).
+				data, _ = await run_pdf_job(build_split_part, source, pages, str(options), images, linearized, check_queue=False)
+				yield name, data
+
+		zip_name = f"{base_name}_split.zip"
+		# 항목별 선택 결과/압축률은 ZIP 항목 주석과 아카이브 주석(JSON)에 기록됩니다.
+		zip_headers = {"X-Zip-Compression": str(policy)}
+
+		async def zip_body():
+			# 내보내는 ZIP을 결과 캐시에도 함께 기록하고, 끝까지 보낸 경우에만 등록합니다.
+			tee = await run_in_threadpool(result_cache.open_writer, key, "application/zip", zip_name, zip_headers)
+			try:
+				report = ZipReport(policy=str(policy), source_bytes=source.size)
+				async for chunk in stream_zip(split_parts(), policy, report):
+					if tee is not None:
+						await run_in_threadpool(tee.write, chunk)
+					yield chunk
+				if tee is not None:
+					await run_in_threadpool(tee.commit)
+			finally:
+				if tee is not None:
+					tee.discard()
+				source.cleanup()
+
+		streaming = True
 		return StreamingResponse(
-			BytesIO(data_bytes),
-			media_type="application/pdf",
-			headers={"Content-Disposition": build_content_disposition(name)},
+			zip_body(),
+			media_type="application/zip",
+			headers={"Content-Disposition": build_content_disposition(zip_name), **zip_headers},
 		)
-
-	zip_buf = BytesIO()
-	with ZipFile(zip_buf, mode="w", compression=ZIP_DEFLATED) as zf:
-		for name, data_bytes in outputs:
-			zf.writestr(name, data_bytes)
-	zip_buf.seek(0)
-
-	zip_name = f"{base_name}_split.zip"
-	return StreamingResponse(
-		zip_buf,
-		media_type="application/zip",
-		headers={"Content-Disposition": build_content_disposition(zip_name)},
-	)
+	finally:
+		# 스트리밍 응답은 본문 생성이 끝난 뒤 정리합니다.
+		if not streaming:
+			source.cleanup()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pdf_tool.utils import (  # noqa: E402
+	parse_page_selection,
+	parse_ranges_to_groups,
+	validate_ranges,
+)
+
+
+# 범위/페이지 선택 파싱의 마이크로벤치마크입니다. 병적인 명세에서 지연 구간(range) 표현과
+# 기존처럼 인덱스 목록을 펼치는 방식의 시간/최대 메모리를 비교합니다.
+# 사용법: python bench/bench_page_ranges.py [--pages 100000] [--repeat 5]
+
+
+def build_cases(pages: int) -> List[Tuple[str, str]]:
+	"""(이름, 명세) 목록을 만듭니다."""
+	return [
+		("open-ended", "1-"),
+		("many-overlapping", ",".join(["1-"] * 200)),
+		("single-pages", ",".join(str(i) for i in range(1, min(pages, 20000) + 1))),
+		("reverse-odd", f"{pages}-1:odd"),
+	]
+
+
+def measure(fn: Callable[[], object], repeat: int) -> Tuple[float, int]:
+	"""가장 빠른 실행 시간(초)과 최대 할당 바이트를 반환합니다."""
+	best = float("inf")
+	for _ in range(repeat):
+		started = time.perf_counter()
+		fn()
+		best = min(best, time.perf_counter() - started)
+	tracemalloc.start()
+	try:
+		fn()
+		_, peak = tracemalloc.get_traced_memory()
+	finally:
+		tracemalloc.stop()
+	return best, peak
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description="범위/페이지 선택 파싱 마이크로벤치마크")
+	parser.add_argument("--pages", type=int, default=100000, help="문서 페이지 수")
+	parser.add_argument("--repeat", type=int, default=5, help="반복 횟수(가장 빠른 값 사용)")
+	args = parser.parse_args()
+
+	print(f"pages={args.pages}")
+	print(f"{'case':<18} {'mode':<10} {'time':>10} {'peak':>12}")
+	for name, spec in build_cases(args.pages):
+		if ":" in spec:
+			lazy = lambda: parse_page_selection(spec, args.pages)  # noqa: E731
+			expanded = lambda: list(parse_page_selection(spec, args.pages))  # noqa: E731
+			validate = None
+		else:
+			lazy = lambda: parse_ranges_to_groups(spec, args.pages)  # noqa: E731
+			expanded = lambda: [list(group) for group in parse_ranges_to_groups(spec, args.pages)]  # noqa: E731
+			validate = lambda: validate_ranges(spec)  # noqa: E731
+
+		modes = [("lazy", lazy), ("expanded", expanded)]
+		if validate is not None:
+			modes.append(("validate", validate))
+		for mode, fn in modes:
+			elapsed, peak = measure(fn, args.repeat)
+			print(f"{name:<18} {mode:<10} {elapsed * 1000:8.2f}ms {peak / 1024:10.1f}KB")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pypdf import PdfReader, PdfWriter  # noqa: E402
+
+from pdf_tool.split import split_pdf_by_ranges  # noqa: E402
+
+
+# 분할 병렬화(--jobs)의 확장성을 측정하는 간단한 벤치마크입니다.
+# 사용법: python bench/bench_split_jobs.py <PDF 경로> [--pages 2000] [--jobs 1 2 4]
+
+
+def build_input(source: Path, pages: int, output_path: Path) -> None:
+	"""원본 페이지를 반복해 지정한 페이지 수의 입력 PDF를 만듭니다."""
+	reader = PdfReader(str(source))
+	writer = PdfWriter()
+	for i in range(pages):
+		writer.add_page(reader.pages[i % len(reader.pages)])
+	with output_path.open("wb") as f_out:
+		writer.write(f_out)
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description="split_pdf_by_ranges 병렬 확장성 벤치마크")
+	parser.add_argument("source", help="페이지를 복제할 원본 PDF")
+	parser.add_argument("--pages", type=int, default=2000, help="입력 페이지 수")
+	parser.add_argument("--jobs", type=int, nargs="+", default=[1, 2, 4], help="측정할 작업자 수")
+	args = parser.parse_args()
+
+	with tempfile.TemporaryDirectory() as tmp:
+		input_path = Path(tmp) / "bench_input.pdf"
+		build_input(Path(args.source), args.pages, input_path)
+
+		baseline = None
+		for jobs in args.jobs:
+			out_dir = Path(tmp) / f"out_{jobs}"
+			started = time.perf_counter()
+			outputs = split_pdf_by_ranges(input_path, out_dir, None, workers=jobs)
+			elapsed = time.perf_counter() - started
+			baseline = baseline or elapsed
+			print(f"jobs={jobs:<3} files={len(outputs):<6} {elapsed:8.2f}s  speedup={baseline / elapsed:5.2f}x")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,414 @@
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench.corpus import build_corpus  # noqa: E402
+
+
+# 성능 회귀를 잡기 위한 벤치마크 모음입니다. 합성 말뭉치(bench/corpus.py)로 병합/분할/범위 파싱과
+# HTTP 엔드포인트(TestClient)를 재고, 경우마다 벽시계 시간/최대 RSS/출력 바이트를 JSON으로 남깁니다.
+# 각 경우는 새 프로세스에서 돌리므로 최대 RSS가 앞 경우의 영향을 받지 않습니다.
+#
+# 사용법:
+#   python bench/bench_suite.py run [--scale 1.0] [--cases 'merge-*'] [--repeat 3] [-o result.json] [--baseline base.json]
+#   python bench/bench_suite.py compare base.json result.json [--threshold 0.1]
+#   python bench/bench_suite.py list
+
+RESULT_VERSION = 1
+
+# 비교할 지표. seconds는 반복 중 가장 빠른 값입니다.
+METRICS = ("seconds", "peak_rss", "output_bytes")
+
+Corpus = Dict[str, List[Path]]
+
+
+@dataclass(frozen=True)
+class BenchCase:
+	"""
+	벤치마크 경우 하나. run(말뭉치, 작업 디렉터리, HTTP 클라이언트 또는 None)은 출력 바이트 수를 반환합니다.
+	"""
+
+	name: str
+	description: str
+	run: Callable[[Corpus, Path, Any], int]
+	http: bool = False
+
+
+def peak_rss() -> Optional[int]:
+	"""이 프로세스의 최대 RSS(바이트). 잴 수 없으면 None입니다."""
+	# Linux의 ru_maxrss는 exec 전 부모 프로세스의 최댓값을 물려받으므로 /proc의 VmHWM을 먼저 씁니다.
+	try:
+		with open("/proc/self/status", "r", encoding="ascii") as f_in:
+			for line in f_in:
+				if line.startswith("VmHWM:"):
+					return int(line.split()[1]) * 1024
+	except OSError:
+		pass
+	try:
+		import resource
+	except ImportError:
+		return _windows_peak_rss()
+	peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	# Linux는 KB, macOS는 바이트 단위입니다.
+	return int(peak) if sys.platform == "darwin" else int(peak) * 1024
+
+
+def _windows_peak_rss() -> Optional[int]:
+	try:
+		import ctypes
+		from ctypes import wintypes
+	except ImportError:
+		return None
+
+	class ProcessMemoryCounters(ctypes.Structure):
+		_fields_ = [
+			("cb", wintypes.DWORD),
+			("PageFaultCount", wintypes.DWORD),
+			("PeakWorkingSetSize", ctypes.c_size_t),
+			("WorkingSetSize", ctypes.c_size_t),
+			("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+			("QuotaPagedPoolUsage", ctypes.c_size_t),
+			("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+			("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+			("PagefileUsage", ctypes.c_size_t),
+			("PeakPagefileUsage", ctypes.c_size_t),
+		]
+
+	try:
+		counters = ProcessMemoryCounters()
+		counters.cb = ctypes.sizeof(counters)
+		handle = ctypes.windll.kernel32.GetCurrentProcess()  # type: ignore[attr-defined]
+		if not ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):  # type: ignore[attr-defined]
+			return None
+		return int(counters.PeakWorkingSetSize)
+	except (AttributeError, OSError):
+		return None
+
+
+# ---- 경우 정의 ----
+
+def _total_bytes(paths: List[Path]) -> int:
+	return sum(path.stat().st_size for path in paths)
+
+
+def _merge(names: List[str], **kwargs: Any) -> Callable[[Corpus, Path, Any], int]:
+	def run(corpus: Corpus, workdir: Path, client: Any) -> int:
+		from pdf_tool.merge import merge_pdfs
+
+		output = workdir / "merged.pdf"
+		merge_pdfs([path for name in names for path in corpus[name]], output, **kwargs)
+		return output.stat().st_size
+
+	return run
+
+
+def _merge_streaming(name: str) -> Callable[[Corpus, Path, Any], int]:
+	def run(corpus: Corpus, workdir: Path, client: Any) -> int:
+		from pdf_tool.merge import merge_pdfs_streaming
+
+		return merge_pdfs_streaming(corpus[name], workdir / "merged.pdf").bytes_written
+
+	return run
+
+
+def _split(name: str, parts: int, workers: int = 1) -> Callable[[Corpus, Path, Any], int]:
+	# parts가 0이면 페이지마다 한 파일, 아니면 페이지를 parts개 구간으로 나눕니다(말뭉치 크기와 무관하게 같은 모양).
+	def run(corpus: Corpus, workdir: Path, client: Any) -> int:
+		from pdf_tool.split import split_pdf_by_ranges
+
+		source = corpus[name][0]
+		ranges = _even_ranges(_page_count(source), parts) if parts else None
+		return _total_bytes(split_pdf_by_ranges(source, workdir / "parts", ranges, workers=workers))
+
+	return run
+
+
+def _parse_ranges(spec: str, pages: int, times: int) -> Callable[[Corpus, Path, Any], int]:
+	def run(corpus: Corpus, workdir: Path, client: Any) -> int:
+		from pdf_tool.utils import parse_ranges_to_groups
+
+		for _ in range(times):
+			parse_ranges_to_groups(spec, pages)
+		return 0
+
+	return run
+
+
+def _page_count(path: Path) -> int:
+	from pdf_tool.info import read_pdf_info
+
+	return read_pdf_info(path, detail=False).page_count or 0
+
+
+def _even_ranges(pages: int, parts: int) -> str:
+	size = max(1, -(-pages // parts))
+	return ",".join(f"{start}-{min(start + size - 1, pages)}" for start in range(1, pages + 1, size))
+
+
+def _upload(path: Path, field: str = "files") -> tuple:
+	return (field, (path.name, path.read_bytes(), "application/pdf"))
+
+
+def _checked(resp: Any, endpoint: str) -> int:
+	if resp.status_code != 200:
+		raise RuntimeError(f"{endpoint} 실패: status={resp.status_code}, body={resp.text[:200]}")
+	return len(resp.content)
+
+
+def _http_merge(names: List[str]) -> Callable[[Corpus, Path, Any], int]:
+	def run(corpus: Corpus, workdir: Path, client: Any) -> int:
+		files = [_upload(path) for name in names for path in corpus[name]]
+		return _checked(client.post("/merge", files=files), "/merge")
+
+	return run
+
+
+def _http_split(name: str, parts: int) -> Callable[[Corpus, Path, Any], int]:
+	def run(corpus: Corpus, workdir: Path, client: Any) -> int:
+		source = corpus[name][0]
+		data = {"ranges": _even_ranges(_page_count(source), parts)}
+		return _checked(client.post("/split", files=[_upload(source, "file")], data=data), "/split")
+
+	return run
+
+
+def _http_inspect(name: str) -> Callable[[Corpus, Path, Any], int]:
+	def run(corpus: Corpus, workdir: Path, client: Any) -> int:
+		return _checked(client.post("/inspect", files=[_upload(corpus[name][0], "file")]), "/inspect")
+
+	return run
+
+
+def _http_compose(names: List[str]) -> Callable[[Corpus, Path, Any], int]:
+	def run(corpus: Corpus, workdir: Path, client: Any) -> int:
+		files = [_upload(corpus[name][0]) for name in names]
+		specs = [{"source": index, "pages": "odd"} for index in range(len(names))]
+		specs.append({"source": 0, "pages": "end-1"})
+		return _checked(client.post("/compose", files=files, data={"specs": json.dumps(specs)}), "/compose")
+
+	return run
+
+
+CASES: List[BenchCase] = [
+	BenchCase("merge-thousands", "수천 페이지 + 이미지 사본 문서 병합", _merge(["thousands", "duplicates"])),
+	BenchCase("merge-dedupe", "이미지 사본 문서 두 번 병합(--dedupe)", _merge(["duplicates", "duplicates"], dedupe=True)),
+	BenchCase("merge-many-small", "작은 파일 수백 개 병합", _merge(["many-small"])),
+	BenchCase("merge-streaming-many-small", "작은 파일 수백 개 스트리밍 병합", _merge_streaming("many-small")),
+	BenchCase("merge-deep", "깊은 페이지 트리 문서 병합", _merge(["deep", "thousands"])),
+	BenchCase("merge-scanned", "고해상도 스캔 문서 병합", _merge(["scanned", "scanned"])),
+	BenchCase("split-per-page", "이미지 사본 문서를 페이지마다 분할", _split("duplicates", 0)),
+	BenchCase("split-ranges", "수천 페이지 문서를 10개 구간으로 분할", _split("thousands", 10)),
+	BenchCase("split-deep", "깊은 페이지 트리 문서를 64개 구간으로 분할", _split("deep", 64)),
+	BenchCase("split-scanned", "스캔 문서를 페이지마다 분할", _split("scanned", 0)),
+	BenchCase("ranges-open-ended", "범위 파싱 '1-' x200 (10만 페이지, 100회)", _parse_ranges(",".join(["1-"] * 200), 100000, 100)),
+	BenchCase("ranges-single-pages", "범위 파싱 단일 페이지 2만 개 (10회)", _parse_ranges(",".join(str(i) for i in range(1, 20001)), 100000, 10)),
+	BenchCase("http-merge", "POST /merge 수천 페이지 + 이미지 사본", _http_merge(["thousands", "duplicates"]), http=True),
+	BenchCase("http-merge-many-small", "POST /merge 작은 파일 수백 개", _http_merge(["many-small"]), http=True),
+	BenchCase("http-split", "POST /split 수천 페이지 10개 구간(ZIP)", _http_split("thousands", 10), http=True),
+	BenchCase("http-inspect", "POST /inspect 깊은 페이지 트리", _http_inspect("deep"), http=True),
+	BenchCase("http-compose", "POST /compose 두 문서 홀수 페이지 + 역순", _http_compose(["thousands", "deep"]), http=True),
+]
+
+
+def select_cases(patterns: Optional[List[str]]) -> List[BenchCase]:
+	if not patterns:
+		return list(CASES)
+	selected = [case for case in CASES if any(fnmatch.fnmatch(case.name, p) for p in patterns)]
+	if not selected:
+		raise SystemExit(f"일치하는 경우가 없습니다: {' '.join(patterns)} (list로 목록 확인)")
+	return selected
+
+
+# ---- 실행 ----
+
+def _run_case(name: str, corpus: Corpus, repeat: int) -> Dict[str, Any]:
+	# 새 프로세스에서 실행됩니다. 결과 캐시가 두 번째 반복부터 응답하지 않도록 끕니다.
+	os.environ["PDF_WEB_RESULT_CACHE_BYTES"] = "0"
+	case = next(c for c in CASES if c.name == name)
+	seconds: List[float] = []
+	output_bytes = 0
+
+	def measure(client: Any) -> None:
+		nonlocal output_bytes
+		for _ in range(repeat):
+			with tempfile.TemporaryDirectory(prefix="pdf-bench-") as tmp:
+				started = time.perf_counter()
+				output_bytes = case.run(corpus, Path(tmp), client)
+				seconds.append(time.perf_counter() - started)
+
+	if case.http:
+		from starlette.testclient import TestClient
+
+		from app import app
+
+		with TestClient(app) as client:
+			measure(client)
+	else:
+		measure(None)
+
+	return {
+		"seconds": min(seconds),
+		"seconds_all": [round(s, 6) for s in seconds],
+		"peak_rss": peak_rss(),
+		"output_bytes": output_bytes,
+	}
+
+
+def run_suite(cases: List[BenchCase], corpus: Corpus, repeat: int) -> Dict[str, Dict[str, Any]]:
+	results: Dict[str, Dict[str, Any]] = {}
+	spawn = get_context("spawn")
+	for case in cases:
+		with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+			result = pool.submit(_run_case, case.name, corpus, repeat).result()
+		results[case.name] = result
+		print(
+			f"{case.name:<28} {result['seconds'] * 1000:10.1f}ms  rss={_format_bytes(result['peak_rss']):>9}  "
+			f"out={_format_bytes(result['output_bytes']):>9}",
+			flush=True,
+		)
+	return results
+
+
+def _format_bytes(value: Optional[int]) -> str:
+	if value is None:
+		return "-"
+	if value >= 1024 * 1024:
+		return f"{value / (1024 * 1024):.1f}MB"
+	if value >= 1024:
+		return f"{value / 1024:.1f}KB"
+	return f"{value}B"
+
+
+# ---- 비교 ----
+
+def compare_results(
+	baseline: Dict[str, Any],
+	current: Dict[str, Any],
+	threshold: float,
+	min_seconds: float,
+) -> List[str]:
+	"""
+	두 결과 JSON을 비교해 표를 출력하고, 기준보다 threshold(비율) 넘게 나빠진 항목 목록을 반환합니다.
+
+	- 시간은 차이가 min_seconds보다 작으면 잡음으로 보고 회귀로 치지 않습니다.
+	- 한쪽에만 있는 경우나 값이 없는 지표(RSS를 잴 수 없는 환경 등)는 건너뜁니다.
+	"""
+	regressions: List[str] = []
+	old_results = baseline.get("results", {})
+	new_results = current.get("results", {})
+	if baseline.get("scale") != current.get("scale"):
+		print(f"주의: 말뭉치 배율이 다릅니다 (기준 {baseline.get('scale')}, 현재 {current.get('scale')})")
+
+	print(f"{'case':<28} {'metric':<13} {'baseline':>12} {'current':>12} {'change':>8}")
+	for name, new in new_results.items():
+		old = old_results.get(name)
+		if old is None:
+			print(f"{name:<28} (기준 없음)")
+			continue
+		for metric in METRICS:
+			before, after = old.get(metric), new.get(metric)
+			if before is None or after is None:
+				continue
+			change = (after - before) / before if before else 0.0
+			regressed = change > threshold
+			if metric == "seconds":
+				regressed = regressed and after - before >= min_seconds
+				shown = (f"{before * 1000:.1f}ms", f"{after * 1000:.1f}ms")
+			else:
+				shown = (_format_bytes(before), _format_bytes(after))
+			flag = "  REGRESSION" if regressed else ""
+			print(f"{name:<28} {metric:<13} {shown[0]:>12} {shown[1]:>12} {change * 100:+7.1f}%{flag}")
+			if regressed:
+				regressions.append(f"{name} {metric} {change * 100:+.1f}%")
+	return regressions
+
+
+def _load(path: Path) -> Dict[str, Any]:
+	with path.open("r", encoding="utf-8") as f_in:
+		return json.load(f_in)
+
+
+def _report_regressions(regressions: List[str], threshold: float) -> int:
+	if regressions:
+		print(f"회귀 {len(regressions)}건 (기준 대비 +{threshold * 100:.0f}% 초과):")
+		for line in regressions:
+			print(f"  {line}")
+		return 1
+	print("회귀 없음")
+	return 0
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description="PDF 도구 성능 벤치마크 모음")
+	subparsers = parser.add_subparsers(dest="command", required=True)
+
+	run_parser = subparsers.add_parser("run", help="말뭉치를 만들고(없으면) 경우들을 측정")
+	run_parser.add_argument("--scale", type=float, default=1.0, help="말뭉치 크기 배율 (기본: 1.0)")
+	run_parser.add_argument(
+		"--corpus-dir",
+		default=str(Path(tempfile.gettempdir()) / "pdf-bench-corpus"),
+		help="말뭉치 디렉터리 (기본: 시스템 임시 디렉터리의 pdf-bench-corpus, 있으면 재사용)",
+	)
+	run_parser.add_argument("--cases", nargs="+", help="측정할 경우 이름/글롭 패턴 (기본: 전부)")
+	run_parser.add_argument("--repeat", type=int, default=3, help="경우마다 반복 횟수 (가장 빠른 시간 사용, 기본: 3)")
+	run_parser.add_argument("-o", "--output", help="결과 JSON 경로")
+	run_parser.add_argument("--baseline", help="비교할 기준 결과 JSON (회귀가 있으면 종료 코드 1)")
+	run_parser.add_argument("--threshold", type=float, default=0.1, help="회귀로 볼 악화 비율 (기본: 0.1 = 10%%)")
+	run_parser.add_argument("--min-seconds", type=float, default=0.01, help="이보다 작은 시간 차이는 무시 (기본: 0.01)")
+
+	compare_parser = subparsers.add_parser("compare", help="두 결과 JSON 비교")
+	compare_parser.add_argument("baseline", help="기준 결과 JSON")
+	compare_parser.add_argument("current", help="비교할 결과 JSON")
+	compare_parser.add_argument("--threshold", type=float, default=0.1, help="회귀로 볼 악화 비율 (기본: 0.1 = 10%%)")
+	compare_parser.add_argument("--min-seconds", type=float, default=0.01, help="이보다 작은 시간 차이는 무시 (기본: 0.01)")
+
+	subparsers.add_parser("list", help="경우 목록 보기")
+	args = parser.parse_args()
+
+	if args.command == "list":
+		for case in CASES:
+			print(f"{case.name:<28} {case.description}")
+		return
+
+	if args.command == "compare":
+		regressions = compare_results(_load(Path(args.baseline)), _load(Path(args.current)), args.threshold, args.min_seconds)
+		sys.exit(_report_regressions(regressions, args.threshold))
+
+	cases = select_cases(args.cases)
+	corpus = build_corpus(Path(args.corpus_dir), args.scale)
+	print(f"scale={args.scale} repeat={args.repeat} cases={len(cases)}")
+	current = {
+		"version": RESULT_VERSION,
+		"created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+		"python": platform.python_version(),
+		"platform": platform.platform(),
+		"scale": args.scale,
+		"repeat": args.repeat,
+		"results": run_suite(cases, corpus, args.repeat),
+	}
+	if args.output:
+		with Path(args.output).open("w", encoding="utf-8") as f_out:
+			json.dump(current, f_out, ensure_ascii=False, indent=2)
+		print(f"결과 저장: {args.output}")
+	if args.baseline:
+		regressions = compare_results(_load(Path(args.baseline)), current, args.threshold, args.min_seconds)
+		sys.exit(_report_regressions(regressions, args.threshold))
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List
+
+from make_test_pdf import create_many_pdfs, create_scanned_pdf, create_text_pdf
+
+
+# 벤치마크용 합성 말뭉치. make_test_pdf.py의 생성기로 만들고, 이름에 매개변수를 담아
+# 같은 말뭉치는 다시 만들지 않습니다(기본 위치는 시스템 임시 디렉터리의 pdf-bench-corpus).
+
+
+@dataclass(frozen=True)
+class CorpusSpec:
+	"""
+	말뭉치 항목 하나.
+
+	- kind: "text"(텍스트 페이지), "scanned"(페이지 전체 JPEG), "many"(작은 파일 여러 개)
+	- files는 "many"에서만 씁니다. fanout/image_pixels/shared는 create_text_pdf와 같습니다.
+	"""
+
+	name: str
+	kind: str
+	pages: int
+	files: int = 1
+	fanout: int = 0
+	image_pixels: int = 0
+	shared: bool = True
+	dpi: int = 600
+
+	@property
+	def key(self) -> str:
+		# 매개변수가 바뀌면 다른 파일이 되도록 이름에 모두 담습니다.
+		return (
+			f"{self.name}-{self.kind}-p{self.pages}-f{self.files}-t{self.fanout}"
+			f"-i{self.image_pixels}-{'s' if self.shared else 'u'}-d{self.dpi}"
+		)
+
+
+def corpus_specs(scale: float = 1.0) -> List[CorpusSpec]:
+	"""scale 배의 말뭉치 목록. 1.0이면 수천 페이지 문서, 수백 개의 작은 파일, 600 DPI 스캔 등입니다."""
+
+	def n(value: int) -> int:
+		return max(1, round(value * scale))
+
+	return [
+		# 수천 페이지, 글꼴과 로고 이미지를 모든 페이지가 공유
+		CorpusSpec("thousands", "text", n(3000), image_pixels=256),
+		# 페이지마다 내용이 같은 이미지 사본(중복 제거/리소스 정리 대상)
+		CorpusSpec("duplicates", "text", n(500), image_pixels=128, shared=False),
+		# 작은 파일 여러 개
+		CorpusSpec("many-small", "many", 2, files=n(300)),
+		# 페이지 전체를 덮는 고해상도 스캔 이미지
+		CorpusSpec("scanned", "scanned", n(4), dpi=600),
+		# 자식 2개씩 묶은 깊은 페이지 트리(깊이 약 log2(페이지 수))
+		CorpusSpec("deep", "text", n(4096), fanout=2, image_pixels=32),
+	]
+
+
+def build_corpus(directory: Path, scale: float = 1.0, verbose: bool = True) -> Dict[str, List[Path]]:
+	"""
+	말뭉치를 directory에 만들고(이미 있으면 재사용) 이름 -> 파일 경로 목록을 반환합니다.
+	"""
+	directory.mkdir(parents=True, exist_ok=True)
+	corpus: Dict[str, List[Path]] = {}
+	for spec in corpus_specs(scale):
+		if spec.kind == "many":
+			target = directory / spec.key
+			marker = target / ".complete"
+			if not marker.exists():
+				if verbose:
+					print(f"말뭉치 생성: {spec.key}", flush=True)
+				create_many_pdfs(target, spec.files, spec.pages)
+				marker.touch()
+			corpus[spec.name] = sorted(target.glob("doc_*.pdf"))
+			continue
+
+		target = directory / f"{spec.key}.pdf"
+		if not target.exists():
+			if verbose:
+				print(f"말뭉치 생성: {spec.key}", flush=True)
+			# 중간에 끊겨도 반쯤 쓴 파일을 재사용하지 않도록 임시 이름으로 쓴 뒤 바꿉니다.
+			partial = target.with_name(target.name + ".partial")
+			if spec.kind == "scanned":
+				create_scanned_pdf(partial, spec.pages, dpi=spec.dpi)
+			else:
+				create_text_pdf(
+					partial,
+					spec.pages,
+					fanout=spec.fanout,
+					image_pixels=spec.image_pixels,
+					shared=spec.shared,
+				)
+			os.replace(partial, target)
+		corpus[spec.name] = [target]
+	return corpus
@@ -0,0 +1,512 @@
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from bench.corpus import build_corpus  # noqa: E402
+from launch import wait_for_health  # noqa: E402
+
+
+# /merge·/split 동시 요청 부하 테스트입니다. 시나리오 파일(JSON)에 요청 종류와 비율, 단계별 동시성을 적고,
+# 서버를 이 프로세스 안(uvicorn 스레드) 또는 launch.py처럼 띄운 로컬 uvicorn 프로세스로 실행해
+# 127.0.0.1에만 요청합니다(네트워크 불필요). 단계마다 처리량, p50/p95/p99 지연, 오류율을, 실행 내내
+# 서버 RSS(작업자 프로세스 포함)를 기록합니다.
+#
+# 사용법:
+#   python bench/loadtest.py bench/scenarios/mixed.json [--mode process|inprocess] [-o result.json]
+#   python bench/loadtest.py bench/scenarios/mixed.json --url http://127.0.0.1:8000   (이미 떠 있는 서버)
+#
+# 시나리오 형식:
+#   {
+#     "name": "mixed",
+#     "corpus": {"scale": 0.1},                   # "corpus:이름[/번호]" 입력에 쓸 합성 말뭉치(bench/corpus.py)
+#     "server_env": {"PDF_WEB_WORKERS": "2"},      # 띄우는 서버의 환경 변수(기본으로 결과 캐시는 끔)
+#     "requests": [
+#       {"name": "merge-small", "endpoint": "/merge", "weight": 4,
+#        "inputs": ["corpus:many-small/0", "corpus:many-small/1"], "form": {"optimize": "off"}},
+#       {"name": "split", "endpoint": "/split", "weight": 1, "inputs": ["docs/big.pdf"], "form": {"ranges": "1-10,11-"}}
+#     ],
+#     "stages": [{"concurrency": 1, "duration": 10}, {"concurrency": 8, "requests": 200}]
+#   }
+#   - inputs의 일반 경로는 시나리오 파일 기준 상대 경로입니다. 파일 필드는 /merge가 files, /split·/inspect가 file입니다.
+#   - 단계는 duration(초) 또는 requests(총 요청 수)로 끝나며, think_time(초)을 주면 요청 사이에 쉽니다.
+
+# 단일 파일을 받는 엔드포인트. 나머지는 "files" 필드로 여러 파일을 보냅니다.
+SINGLE_FILE_ENDPOINTS = {"/split", "/inspect"}
+
+# 결과에 남길 지연 백분위수
+PERCENTILES = (50, 95, 99)
+
+
+@dataclass
+class RequestTemplate:
+	"""미리 인코딩해 둔 요청 하나(매번 같은 본문을 보냅니다)."""
+
+	name: str
+	endpoint: str
+	weight: float
+	body: bytes
+	content_type: str
+
+
+@dataclass
+class Sample:
+	"""요청 하나의 결과."""
+
+	name: str
+	stage: int
+	started: float
+	seconds: float
+	status: int
+	response_bytes: int
+	error: Optional[str] = None
+
+
+@dataclass
+class Stage:
+	concurrency: int
+	duration: Optional[float] = None
+	requests: Optional[int] = None
+	think_time: float = 0.0
+
+
+@dataclass
+class RssSampler:
+	"""pid(와 그 자식 프로세스)의 RSS를 주기적으로 기록합니다."""
+
+	pid: int
+	interval: float
+	samples: List[Tuple[float, Optional[int]]] = field(default_factory=list)
+
+	def __post_init__(self) -> None:
+		self._stop = threading.Event()
+		self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+		self._origin = time.perf_counter()
+
+	def start(self) -> None:
+		self._thread.start()
+
+	def stop(self) -> None:
+		self._stop.set()
+		self._thread.join()
+
+	def _run(self) -> None:
+		while not self._stop.is_set():
+			self.samples.append((round(time.perf_counter() - self._origin, 3), process_tree_rss(self.pid)))
+			self._stop.wait(self.interval)
+
+
+def process_tree_rss(pid: int) -> Optional[int]:
+	"""
+	pid와 모든 자손 프로세스의 RSS 합(바이트). /proc가 있는 환경(Linux)에서만 잴 수 있고, 그 밖에는 None입니다.
+	"""
+	proc = Path("/proc")
+	if not proc.is_dir():
+		return None
+	children: Dict[int, List[int]] = {}
+	for entry in proc.iterdir():
+		if not entry.name.isdigit():
+			continue
+		try:
+			# comm에 공백/괄호가 있을 수 있으므로 마지막 ')' 뒤에서 필드를 자릅니다.
+			stat = (entry / "stat").read_text()
+			ppid = int(stat[stat.rindex(")") + 2:].split()[1])
+		except (OSError, ValueError, IndexError):
+			continue
+		children.setdefault(ppid, []).append(int(entry.name))
+
+	total = 0
+	found = False
+	stack = [pid]
+	while stack:
+		current = stack.pop()
+		stack.extend(children.get(current, []))
+		try:
+			with open(f"/proc/{current}/status", "r", encoding="ascii", errors="replace") as f_in:
+				for line in f_in:
+					if line.startswith("VmRSS:"):
+						total += int(line.split()[1]) * 1024
+						found = True
+						break
+		except OSError:
+			continue
+	return total if found else None
+
+
+# ---- 시나리오 ----
+
+def _encode_multipart(fields: Dict[str, str], files: List[Tuple[str, Path]]) -> Tuple[bytes, str]:
+	boundary = uuid.uuid4().hex
+	parts: List[bytes] = []
+	for name, value in fields.items():
+		parts.append(
+			f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode("utf-8")
+		)
+	for name, path in files:
+		parts.append(
+			f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{path.name}"\r\n'
+			f"Content-Type: application/pdf\r\n\r\n".encode("utf-8")
+		)
+		parts.append(path.read_bytes())
+		parts.append(b"\r\n")
+	parts.append(f"--{boundary}--\r\n".encode("ascii"))
+	return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def _resolve_input(text: str, base_dir: Path, corpus: Optional[Dict[str, List[Path]]]) -> Path:
+	if not text.startswith("corpus:"):
+		path = Path(text)
+		return path if path.is_absolute() else base_dir / path
+	if corpus is None:
+		raise ValueError(f"시나리오에 corpus 설정이 없어 '{text}'를 찾을 수 없습니다.")
+	name, _, index = text[len("corpus:"):].partition("/")
+	if name not in corpus:
+		raise ValueError(f"말뭉치에 '{name}'이(가) 없습니다: {', '.join(corpus)}")
+	return corpus[name][int(index or 0)]
+
+
+def load_scenario(path: Path, corpus_dir: Path) -> Tuple[Dict[str, Any], List[RequestTemplate], List[Stage]]:
+	"""
+	시나리오 파일을 읽어 요청 본문을 미리 만들고 (원본 설정, 요청 목록, 단계 목록)을 반환합니다.
+	"""
+	with path.open("r", encoding="utf-8") as f_in:
+		scenario = json.load(f_in)
+
+	corpus = None
+	if "corpus" in scenario:
+		corpus = build_corpus(corpus_dir, float(scenario["corpus"].get("scale", 1.0)))
+
+	templates: List[RequestTemplate] = []
+	for item in scenario.get("requests", []):
+		endpoint = item["endpoint"]
+		field_name = "file" if endpoint in SINGLE_FILE_ENDPOINTS else "files"
+		inputs = [_resolve_input(text, path.parent, corpus) for text in item.get("inputs", [])]
+		form = {name: str(value) for name, value in item.get("form", {}).items()}
+		body, content_type = _encode_multipart(form, [(field_name, p) for p in inputs])
+		templates.append(RequestTemplate(
+			name=item.get("name", endpoint),
+			endpoint=endpoint,
+			weight=float(item.get("weight", 1)),
+			body=body,
+			content_type=content_type,
+		))
+	if not templates:
+		raise ValueError("시나리오에 requests가 없습니다.")
+
+	stages = []
+	for item in scenario.get("stages", []):
+		stage = Stage(
+			concurrency=int(item["concurrency"]),
+			duration=float(item["duration"]) if "duration" in item else None,
+			requests=int(item["requests"]) if "requests" in item else None,
+			think_time=float(item.get("think_time", 0.0)),
+		)
+		if stage.concurrency < 1 or (stage.duration is None and stage.requests is None):
+			raise ValueError(f"단계에는 1 이상의 concurrency와 duration 또는 requests가 필요합니다: {item}")
+		stages.append(stage)
+	if not stages:
+		raise ValueError("시나리오에 stages가 없습니다.")
+	return scenario, templates, stages
+
+
+# ---- 서버 ----
+
+def _free_port() -> int:
+	with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+		s.bind(("127.0.0.1", 0))
+		return s.getsockname()[1]
+
+
+class ProcessServer:
+	"""launch.py처럼 uvicorn을 별도 프로세스로 띄웁니다(127.0.0.1에만 바인딩)."""
+
+	def __init__(self, env: Dict[str, str]) -> None:
+		self.port = _free_port()
+		self._proc = subprocess.Popen(
+			[
+				sys.executable, "-m", "uvicorn", "app:app",
+				"--host", "127.0.0.1", "--port", str(self.port),
+				"--log-level", "warning",
+			],
+			cwd=str(ROOT),
+			env={**os.environ, **env},
+			shell=False,
+		)
+		if not wait_for_health(self.port, timeout_sec=30):
+			self.stop()
+			raise RuntimeError("서버가 30초 안에 응답하지 않습니다.")
+
+	@property
+	def pid(self) -> int:
+		return self._proc.pid
+
+	def stop(self) -> None:
+		self._proc.terminate()
+		try:
+			self._proc.wait(timeout=10)
+		except subprocess.TimeoutExpired:
+			self._proc.kill()
+			self._proc.wait()
+
+
+class InProcessServer:
+	"""이 프로세스 안의 스레드에서 uvicorn을 돌립니다. RSS에는 부하 생성기 자신도 포함됩니다."""
+
+	def __init__(self, env: Dict[str, str]) -> None:
+		# 앱 모듈은 임포트할 때 환경 변수를 읽으므로 먼저 설정합니다.
+		os.environ.update(env)
+		import uvicorn
+
+		from app import app
+
+		self.port = _free_port()
+		self._server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning"))
+		self._thread = threading.Thread(target=self._server.run, name="uvicorn", daemon=True)
+		self._thread.start()
+		if not wait_for_health(self.port, timeout_sec=30):
+			raise RuntimeError("서버가 30초 안에 응답하지 않습니다.")
+
+	@property
+	def pid(self) -> int:
+		return os.getpid()
+
+	def stop(self) -> None:
+		self._server.should_exit = True
+		self._thread.join(timeout=10)
+
+
+# ---- 부하 ----
+
+def _send(conn: http.client.HTTPConnection, template: RequestTemplate) -> Tuple[int, int]:
+	conn.request(
+		"POST",
+		template.endpoint,
+		body=template.body,
+		headers={"Content-Type": template.content_type, "Content-Length": str(len(template.body))},
+	)
+	resp = conn.getresponse()
+	received = 0
+	while True:
+		chunk = resp.read(1024 * 1024)
+		if not chunk:
+			break
+		received += len(chunk)
+	return resp.status, received
+
+
+def run_stage(
+	host: str,
+	port: int,
+	index: int,
+	stage: Stage,
+	templates: List[RequestTemplate],
+	seed: int,
+) -> List[Sample]:
+	"""
+	한 단계를 실행합니다. concurrency개의 작업자가 각자 연결 하나를 유지하며 요청을 보냅니다(닫힌 루프).
+	"""
+	samples: List[Sample] = []
+	lock = threading.Lock()
+	remaining = [stage.requests if stage.requests is not None else -1]
+	deadline = time.perf_counter() + stage.duration if stage.duration is not None else None
+	weights = [t.weight for t in templates]
+
+	def take() -> bool:
+		if deadline is not None and time.perf_counter() >= deadline:
+			return False
+		with lock:
+			if remaining[0] == 0:
+				return False
+			remaining[0] -= 1
+			return True
+
+	def worker(number: int) -> None:
+		rng = random.Random(seed * 1000 + index * 100 + number)
+		conn: Optional[http.client.HTTPConnection] = None
+		while take():
+			template = rng.choices(templates, weights)[0]
+			if conn is None:
+				conn = http.client.HTTPConnection(host, port, timeout=600)
+			started = time.perf_counter()
+			error = None
+			try:
+				status, received = _send(conn, template)
+			except (OSError, http.client.HTTPException) as e:
+				status, received, error = 0, 0, f"{type(e).__name__}: {e}"
+				conn.close()
+				conn = None
+			sample = Sample(template.name, index, started, time.perf_counter() - started, status, received, error)
+			with lock:
+				samples.append(sample)
+			if stage.think_time:
+				time.sleep(stage.think_time)
+		if conn is not None:
+			conn.close()
+
+	threads = [threading.Thread(target=worker, args=(n,), daemon=True) for n in range(stage.concurrency)]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+	return samples
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+	"""최근접 순위 백분위수. 값이 없으면 None입니다."""
+	if not values:
+		return None
+	ordered = sorted(values)
+	rank = max(1, -(-len(ordered) * pct // 100))
+	return ordered[int(rank) - 1]
+
+
+def summarize(samples: List[Sample], elapsed: float) -> Dict[str, Any]:
+	"""요청 결과 묶음의 처리량/지연 백분위수/오류율."""
+	ok = [s for s in samples if s.error is None and 200 <= s.status < 400]
+	statuses: Dict[str, int] = {}
+	for s in samples:
+		key = str(s.status) if s.error is None else "error"
+		statuses[key] = statuses.get(key, 0) + 1
+	latencies = [s.seconds for s in ok]
+	summary: Dict[str, Any] = {
+		"requests": len(samples),
+		"ok": len(ok),
+		"error_rate": round(1 - len(ok) / len(samples), 4) if samples else 0.0,
+		"throughput": round(len(ok) / elapsed, 3) if elapsed > 0 else 0.0,
+		"response_bytes_per_second": round(sum(s.response_bytes for s in ok) / elapsed) if elapsed > 0 else 0,
+		"statuses": statuses,
+	}
+	for pct in PERCENTILES:
+		value = percentile(latencies, pct)
+		summary[f"p{pct}"] = round(value, 4) if value is not None else None
+	errors = sorted({s.error for s in samples if s.error})
+	if errors:
+		summary["errors"] = errors[:5]
+	return summary
+
+
+def _rss_range(samples: List[Tuple[float, Optional[int]]], start: float, end: float) -> Dict[str, Optional[int]]:
+	values = [rss for t, rss in samples if start <= t <= end and rss is not None]
+	return {"rss_min": min(values) if values else None, "rss_max": max(values) if values else None}
+
+
+def _format_ms(value: Optional[float]) -> str:
+	return "-" if value is None else f"{value * 1000:.0f}ms"
+
+
+def _format_mb(value: Optional[int]) -> str:
+	return "-" if value is None else f"{value / (1024 * 1024):.0f}MB"
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description="/merge·/split 동시 요청 부하 테스트 (127.0.0.1 전용)")
+	parser.add_argument("scenario", help="시나리오 JSON 경로")
+	parser.add_argument(
+		"--mode",
+		choices=("process", "inprocess"),
+		default="process",
+		help="서버 실행 방식: process = launch.py처럼 uvicorn 프로세스 (기본), inprocess = 이 프로세스 안의 스레드",
+	)
+	parser.add_argument("--url", help="이미 떠 있는 로컬 서버 주소 (예: http://127.0.0.1:8000). 주면 서버를 띄우지 않음")
+	parser.add_argument("--pid", type=int, help="--url 서버의 프로세스 ID (RSS 기록용)")
+	parser.add_argument(
+		"--corpus-dir",
+		default=str(Path(tempfile.gettempdir()) / "pdf-bench-corpus"),
+		help="corpus: 입력용 말뭉치 디렉터리 (bench_suite.py와 공유)",
+	)
+	parser.add_argument("--rss-interval", type=float, default=0.5, help="서버 RSS 기록 간격(초, 기본: 0.5)")
+	parser.add_argument("--seed", type=int, default=1, help="요청 종류 선택 난수 시드 (기본: 1)")
+	parser.add_argument("-o", "--output", help="결과 JSON 경로 (요청별 지연과 RSS 시계열 포함)")
+	args = parser.parse_args()
+
+	scenario, templates, stages = load_scenario(Path(args.scenario), Path(args.corpus_dir))
+	# 같은 본문을 반복해 보내므로 결과 캐시가 켜져 있으면 캐시 적중만 재게 됩니다.
+	env = {"PDF_WEB_RESULT_CACHE_BYTES": "0", **{k: str(v) for k, v in scenario.get("server_env", {}).items()}}
+
+	server: Any = None
+	if args.url:
+		if not args.url.startswith(("http://127.0.0.1", "http://localhost")):
+			parser.error("--url은 로컬 서버(http://127.0.0.1:포트)만 지원합니다.")
+		host, _, port_text = args.url[len("http://"):].rstrip("/").partition(":")
+		port = int(port_text or 80)
+		pid = args.pid
+	else:
+		server = ProcessServer(env) if args.mode == "process" else InProcessServer(env)
+		host, port, pid = "127.0.0.1", server.port, server.pid
+
+	sampler = RssSampler(pid, args.rss_interval) if pid else None
+	if sampler is not None:
+		sampler.start()
+	origin = time.perf_counter()
+	stage_results = []
+	all_samples: List[Sample] = []
+	print(f"시나리오 {scenario.get('name', Path(args.scenario).stem)}: 요청 {len(templates)}종, 단계 {len(stages)}개 → {host}:{port}")
+	print(f"{'stage':<6} {'conc':>4} {'reqs':>6} {'err%':>6} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'rss max':>8}")
+	try:
+		for index, stage in enumerate(stages):
+			started = time.perf_counter()
+			samples = run_stage(host, port, index, stage, templates, args.seed)
+			elapsed = time.perf_counter() - started
+			all_samples.extend(samples)
+			summary = summarize(samples, elapsed)
+			summary.update(concurrency=stage.concurrency, seconds=round(elapsed, 3))
+			summary["by_request"] = {
+				t.name: summarize([s for s in samples if s.name == t.name], elapsed) for t in templates
+			}
+			if sampler is not None:
+				summary.update(_rss_range(sampler.samples, started - origin, time.perf_counter() - origin))
+			stage_results.append(summary)
+			print(
+				f"{index:<6} {stage.concurrency:>4} {summary['requests']:>6} {summary['error_rate'] * 100:>5.1f}% "
+				f"{summary['throughput']:>8.2f} {_format_ms(summary['p50']):>8} {_format_ms(summary['p95']):>8} "
+				f"{_format_ms(summary['p99']):>8} {_format_mb(summary.get('rss_max')):>8}",
+				flush=True,
+			)
+	finally:
+		if sampler is not None:
+			sampler.stop()
+		if server is not None:
+			server.stop()
+
+	if args.output:
+		result = {
+			"scenario": scenario.get("name", Path(args.scenario).stem),
+			"mode": "url" if args.url else args.mode,
+			"server_env": env,
+			"stages": stage_results,
+			"rss": sampler.samples if sampler is not None else [],
+			"samples": [
+				{
+					"name": s.name,
+					"stage": s.stage,
+					"start": round(s.started - origin, 4),
+					"seconds": round(s.seconds, 4),
+					"status": s.status,
+					"bytes": s.response_bytes,
+				}
+				for s in all_samples
+			],
+		}
+		with Path(args.output).open("w", encoding="utf-8") as f_out:
+			json.dump(result, f_out, ensure_ascii=False, indent=2)
+		print(f"결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+	main()
@@ -1,15 +1,61 @@
 from __future__ import annotations
 
 import argparse
+import cProfile
+import json
+import os
+import sys
 from pathlib import Path
 from typing import List
 
-from pdf_tool.merge import merge_pdfs
+from pdf_tool.compose import compose_pdfs
+from pdf_tool.images import ImageOptions, downsample_files
+from pdf_tool.info import PdfInfo, read_pdf_info
+from pdf_tool.linearize import linearize_files
+from pdf_tool.merge import append_pdfs, merge_pdfs, merge_pdfs_streaming
+from pdf_tool.optimize import OptimizeOptions, optimize_files
+from pdf_tool.profiling import SpanRecorder, observing
 from pdf_tool.split import split_pdf_by_ranges
+from pdf_tool.utils import iter_input_pdfs
 
 
 # 한글 도움말과 명확한 옵션명을 제공합니다.
 
+def add_output_options(subparser: argparse.ArgumentParser) -> None:
+	"""
+	출력 PDF를 만드는 서브커맨드(merge/split/compose)에 공통 후처리 옵션을 붙입니다.
+	"""
+	subparser.add_argument(
+		"--downsample",
+		type=int,
+		default=0,
+		metavar="DPI",
+		help="표시 크기 기준 유효 DPI가 이보다 높은 이미지를 이 DPI로 줄이기 (기본: 0 = 끔, 예: 150)",
+	)
+	subparser.add_argument(
+		"--jpeg-quality",
+		type=int,
+		default=75,
+		help="--downsample로 JPEG 인코딩할 때의 품질 1-95 (기본: 75)",
+	)
+	subparser.add_argument(
+		"--image-workers",
+		type=int,
+		default=0,
+		help="--downsample에서 이미지를 나눠 처리할 프로세스 수 (기본: CPU 수)",
+	)
+	subparser.add_argument(
+		"--optimize",
+		default="off",
+		help="출력 크기 최적화 수준: off | basic[:0-9] | max[:0-9] (기본: off, 숫자는 Flate 압축 레벨)",
+	)
+	subparser.add_argument(
+		"--linearize",
+		action="store_true",
+		help="빠른 웹 보기(선형화): 첫 페이지 객체와 힌트 표를 앞에 두어 브라우저가 첫 페이지부터 그리게 하기",
+	)
+
+
 def build_parser() -> argparse.ArgumentParser:
 	"""
 	최상위 인자 파서를 구성합니다.
@@ -19,6 +65,13 @@ def build_parser() -> argparse.ArgumentParser:
 		description="PDF 병합/분할 도구",
 	)
 
+	parser.add_argument(
+		"--profile",
+		metavar="PATH",
+		help="명령을 프로파일링해 PATH에 저장 (.json이면 구간 타임라인(Chrome Trace 형식), 그 밖은 cProfile 덤프). "
+		"서브커맨드 앞에 씁니다. 예: --profile split.json split -i big.pdf -o out",
+	)
+
 	subparsers = parser.add_subparsers(dest="command", required=True)
 
 	# merge 서브커맨드
@@ -28,7 +81,7 @@ def build_parser() -> argparse.ArgumentParser:
 		"--inputs",
 		nargs='+',
 		required=True,
-		help="병합할 PDF 경로들 (2개 이상)",
+		help="병합할 PDF 경로들 (2개 이상). 디렉터리나 글롭 패턴(예: 'invoices/*.pdf')도 가능",
 	)
 	merge_parser.add_argument(
 		"-o",
@@ -41,6 +94,23 @@ def build_parser() -> argparse.ArgumentParser:
 		action="store_true",
 		help="출력 파일이 이미 있어도 덮어쓰기",
 	)
+	merge_parser.add_argument(
+		"--dedupe",
+		action="store_true",
+		help="입력 간에 내용이 같은 객체(글꼴/이미지 등)를 하나로 합치기",
+	)
+	merge_parser.add_argument(
+		"--streaming",
+		action="store_true",
+		help="입력을 하나씩 열고 닫으며 바로 출력에 쓰기 (수천 개 입력용, --dedupe와 함께 쓸 수 없음)",
+	)
+	merge_parser.add_argument(
+		"--break-links",
+		action="store_true",
+		help="--streaming에서 페이지 트리 밖을 가리키는 링크 등을 null로 끊고 계속 쓰기 (기본은 실패)",
+	)
+
+	add_output_options(merge_parser)
 
 	# split 서브커맨드
 	split_parser = subparsers.add_parser("split", help="PDF를 페이지/범위로 분할")
@@ -67,19 +137,236 @@ def build_parser() -> argparse.ArgumentParser:
 		action="store_true",
 		help="출력 파일이 이미 있어도 덮어쓰기",
 	)
+	split_parser.add_argument(
+		"-j",
+		"--jobs",
+		type=int,
+		default=1,
+		help="병렬로 출력 파일을 만들 프로세스 수 (기본: 1)",
+	)
+	split_parser.add_argument(
+		"--no-prune",
+		action="store_true",
+		help="페이지가 쓰지 않는 리소스(글꼴/이미지 등)도 모두 복사",
+	)
+
+	add_output_options(split_parser)
+
+	# compose 서브커맨드
+	compose_parser = subparsers.add_parser("compose", help="여러 PDF에서 페이지를 골라 한 번에 하나로 합성")
+	compose_parser.add_argument(
+		"-s",
+		"--source",
+		nargs='+',
+		action="append",
+		required=True,
+		metavar=("PATH", "PAGES"),
+		help=(
+			"입력 PDF와 페이지 선택 (여러 번 지정, 순서대로 합성). 선택 생략 시 전체 페이지. "
+			"예) -s a.pdf 3-7 -s b.pdf -s c.pdf 10-1 / 'odd', 'even', 'end-1', '1-10:odd'"
+		),
+	)
+	compose_parser.add_argument(
+		"-o",
+		"--output",
+		required=True,
+		help="출력 PDF 경로",
+	)
+	compose_parser.add_argument(
+		"--overwrite",
+		action="store_true",
+		help="출력 파일이 이미 있어도 덮어쓰기",
+	)
+	compose_parser.add_argument(
+		"--no-prune",
+		action="store_true",
+		help="페이지가 쓰지 않는 리소스(글꼴/이미지 등)도 모두 복사",
+	)
+
+	add_output_options(compose_parser)
+
+	# append 서브커맨드
+	append_parser = subparsers.add_parser(
+		"append",
+		help="기존 PDF 끝에 다른 PDF의 페이지를 증분 업데이트로 덧붙이기 (원본 바이트는 그대로, 제자리 수정)",
+	)
+	append_parser.add_argument(
+		"-b",
+		"--base",
+		required=True,
+		help="페이지를 덧붙일 기존 PDF 경로 (이 파일이 수정됨)",
+	)
+	append_parser.add_argument(
+		"-i",
+		"--inputs",
+		nargs='+',
+		required=True,
+		help="덧붙일 PDF 경로들. 디렉터리나 글롭 패턴도 가능",
+	)
+
+	# info 서브커맨드
+	info_parser = subparsers.add_parser("info", help="페이지 수/크기/목차 등 PDF 정보 보기 (콘텐츠는 읽지 않음)")
+	info_parser.add_argument(
+		"-i",
+		"--input",
+		required=True,
+		help="입력 PDF 경로",
+	)
+	info_parser.add_argument(
+		"--json",
+		action="store_true",
+		help="JSON으로 출력",
+	)
+	info_parser.add_argument(
+		"--no-pages",
+		action="store_true",
+		help="페이지별 크기/회전과 목차를 생략하고 페이지 트리를 읽지 않기 (아주 큰 파일용)",
+	)
 
 	return parser
 
 
+def print_info(input_path: Path, info: PdfInfo) -> None:
+	"""
+	PDF 정보를 사람이 읽기 좋은 형태로 출력합니다.
+	"""
+	print(f"파일: {input_path} ({info.size} bytes, PDF {info.version})")
+	print(f"암호화: {'예' if info.encrypted else '아니오'}")
+	if info.page_count is None:
+		print("페이지: 알 수 없음 (암호가 필요합니다)")
+		return
+	print(f"페이지: {info.page_count}")
+	for run in info.pages or []:
+		x0, y0, x1, y1 = run.media_box
+		width, height = x1 - x0, y1 - y0
+		pages = f"{run.first_page}" if run.first_page == run.last_page else f"{run.first_page}-{run.last_page}"
+		print(
+			f"  {pages}: {width:g} x {height:g} pt "
+			f"({width * 25.4 / 72:.0f} x {height * 25.4 / 72:.0f} mm), 회전 {run.rotation}"
+		)
+	if info.outline is not None:
+		print(f"목차: {len(info.outline)}개")
+		for entry in info.outline:
+			page = f" (p.{entry.page})" if entry.page is not None else ""
+			print(f"  {'  ' * entry.level}- {entry.title}{page}")
+
+
+def report_downsample(paths: List[Path], options: ImageOptions) -> None:
+	"""
+	출력 파일들의 고해상도 이미지를 제자리에서 줄이고 파일/이미지마다 보고를 출력합니다.
+	"""
+	if not options.enabled:
+		return
+	for path, report in zip(paths, downsample_files(paths, options)):
+		print(f"  {path.name}: {report.summary()}")
+		for image in report.images:
+			print(f"    {image.summary()}")
+
+
+def report_optimize(paths: List[Path], options: OptimizeOptions, workers: int = 1) -> None:
+	"""
+	출력 파일들을 제자리에서 최적화하고 파일마다 크기/시간 보고를 출력합니다.
+	"""
+	if not options.enabled:
+		return
+	for path, report in zip(paths, optimize_files(paths, options, workers=workers)):
+		print(f"  {path.name}: {report.summary()}")
+
+
+def report_linearize(paths: List[Path], enabled: bool) -> None:
+	"""
+	출력 파일들을 제자리에서 선형화하고 파일마다 보고를 출력합니다.
+	"""
+	if not enabled:
+		return
+	for path, report in zip(paths, linearize_files(paths)):
+		print(f"  {path.name}: {report.summary()}")
+
+
+def report_outputs(
+	paths: List[Path],
+	images: ImageOptions,
+	optimize: OptimizeOptions,
+	workers: int = 1,
+	linearize: bool = False,
+) -> None:
+	"""
+	출력 파일 후처리: 이미지 다시 샘플링, 크기 최적화, 선형화 순(켜져 있는 단계만).
+	"""
+	report_downsample(paths, images)
+	report_optimize(paths, optimize, workers=workers)
+	report_linearize(paths, linearize)
+
+
+def run_profiled(parser: argparse.ArgumentParser, args: argparse.Namespace, profile_path: Path) -> None:
+	"""
+	--profile: 명령을 실행하며 프로파일을 profile_path에 씁니다(명령이 실패해도 그때까지의 결과를 씀).
+
+	- .json: pdf_tool의 구간(리더 열기, 페이지 추가, 쓰기 등) 타임라인. chrome://tracing 또는 Perfetto에서 열 수 있고,
+	  구간 이름별 합계를 표준 오류로 출력합니다.
+	- 그 밖: cProfile 덤프(python -m pstats PATH 또는 snakeviz 등으로 봄).
+	"""
+	if profile_path.suffix.lower() == ".json":
+		recorder = SpanRecorder()
+		try:
+			with observing(recorder):
+				run_command(parser, args)
+		finally:
+			recorder.write_json(profile_path)
+			for name, count, seconds in recorder.summary():
+				print(f"  {name:<12} {count:>7}회 {seconds:9.3f}s", file=sys.stderr)
+			print(f"프로파일 저장: {profile_path} (구간 {len(recorder.spans)}개)", file=sys.stderr)
+		return
+
+	profiler = cProfile.Profile()
+	try:
+		profiler.runcall(run_command, parser, args)
+	finally:
+		profiler.dump_stats(str(profile_path))
+		print(f"프로파일 저장: {profile_path} (cProfile)", file=sys.stderr)
+
+
 def main() -> None:
 	parser = build_parser()
 	args = parser.parse_args()
+	if args.profile:
+		run_profiled(parser, args, Path(args.profile))
+	else:
+		run_command(parser, args)
+
+
+def run_command(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+	"""파싱한 인자로 서브커맨드를 실행합니다."""
+	optimize = OptimizeOptions()
+	images = ImageOptions()
+	if args.command in ("merge", "split", "compose"):
+		try:
+			optimize = OptimizeOptions.parse(args.optimize)
+			images = ImageOptions(
+				dpi=args.downsample,
+				quality=args.jpeg_quality,
+				workers=args.image_workers or os.cpu_count() or 1,
+			)
+		except ValueError as e:
+			parser.error(str(e))
 
 	if args.command == "merge":
-		input_paths: List[Path] = [Path(p) for p in args.inputs]
+		input_paths: List[Path] = list(iter_input_pdfs(args.inputs))
 		output_path = Path(args.output)
-		merge_pdfs(input_paths, output_path, overwrite=args.overwrite)
+		if args.streaming:
+			if args.dedupe:
+				parser.error("--streaming과 --dedupe는 함께 사용할 수 없습니다.")
+			result = merge_pdfs_streaming(input_paths, output_path, overwrite=args.overwrite, strict=not args.break_links)
+			print(f"병합 완료: {output_path} (입력 {len(input_paths)}개, {result.pages}페이지, {result.bytes_written} bytes)")
+			if result.nulled_refs:
+				print(f"끊은 참조: 페이지 트리 밖 객체 {result.nulled_refs}개를 null로 바꿈")
+			report_outputs([output_path], images, optimize, linearize=args.linearize)
+			return
+		stats = merge_pdfs(input_paths, output_path, overwrite=args.overwrite, dedupe=args.dedupe)
 		print(f"병합 완료: {output_path}")
+		if stats is not None:
+			print(f"중복 제거: 객체 {stats.objects_removed}개, {stats.bytes_saved} bytes 절약")
+		report_outputs([output_path], images, optimize, linearize=args.linearize)
 		return
 
 	if args.command == "split":
@@ -90,11 +377,56 @@ def main() -> None:
 			output_dir,
 			ranges_text=args.ranges,
 			overwrite=args.overwrite,
+			workers=args.jobs,
+			prune_resources=not args.no_prune,
 		)
 		if len(outputs) == 0:
 			print("생성된 파일이 없습니다.")
 		else:
 			print(f"분할 완료: {len(outputs)}개 파일 생성 → {output_dir}")
+			report_outputs(outputs, images, optimize, workers=args.jobs, linearize=args.linearize)
+			source_bytes = input_path.stat().st_size
+			written_bytes = sum(p.stat().st_size for p in outputs)
+			print(
+				f"출력 합계: {written_bytes} bytes / 원본 {source_bytes} bytes "
+				f"({written_bytes / max(source_bytes, 1):.2f}배)"
+			)
+		return
+
+	if args.command == "compose":
+		specs = []
+		for source in args.source:
+			if len(source) > 2:
+				parser.error(f"-s에는 경로와 페이지 선택 하나만 지정하세요: {' '.join(source)}")
+			specs.append((Path(source[0]), source[1] if len(source) == 2 else None))
+		output_path = Path(args.output)
+		pages = compose_pdfs(
+			specs,
+			output_path,
+			overwrite=args.overwrite,
+			prune_resources=not args.no_prune,
+		)
+		print(f"합성 완료: {output_path} (입력 {len(specs)}개, {pages}페이지)")
+		report_outputs([output_path], images, optimize, linearize=args.linearize)
+		return
+
+	if args.command == "append":
+		base_path = Path(args.base)
+		input_paths = list(iter_input_pdfs(args.inputs))
+		result = append_pdfs(base_path, input_paths)
+		print(
+			f"덧붙이기 완료: {base_path} (입력 {len(input_paths)}개, +{result.pages}페이지 → 총 {result.total_pages}페이지, "
+			f"+{result.bytes_appended} bytes)"
+		)
+		return
+
+	if args.command == "info":
+		input_path = Path(args.input)
+		info = read_pdf_info(input_path, detail=not args.no_pages)
+		if args.json:
+			print(json.dumps(info.to_dict(), ensure_ascii=False, indent=2))
+		else:
+			print_info(input_path, info)
 		return
 
 
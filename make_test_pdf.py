@@ -1,17 +1,229 @@
 from __future__ import annotations
 
+import random
+import zlib
+from io import BytesIO
 from pathlib import Path
+from typing import List, Optional
+
 from pypdf import PdfWriter
 
 
+# A4 크기 (단위: pt)
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+
+
 def create_simple_pdf(output_path: Path) -> None:
 	writer = PdfWriter()
 	# A4 크기의 빈 페이지 추가 (단위: pt)
-	writer.add_blank_page(width=595, height=842)
+	writer.add_blank_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
 	with output_path.open("wb") as f_out:
 		writer.write(f_out)
 
 
+class PdfBuilder:
+	"""
+	객체를 직접 써서 합성 PDF를 만드는 작은 작성기(벤치마크 말뭉치용).
+
+	- pypdf PdfWriter는 페이지 트리를 한 단계로만 쓰므로, 깊은 페이지 트리나 여러 페이지가 함께 쓰는
+	  리소스처럼 구조를 정확히 정해야 하는 입력은 이 작성기로 만듭니다.
+	"""
+
+	def __init__(self) -> None:
+		self._objects: List[bytes] = []
+
+	def reserve(self) -> int:
+		"""본문은 나중에 채울 객체 번호를 받습니다."""
+		self._objects.append(b"null")
+		return len(self._objects)
+
+	def set(self, number: int, body: bytes) -> None:
+		self._objects[number - 1] = body
+
+	def add(self, body: bytes) -> int:
+		number = self.reserve()
+		self.set(number, body)
+		return number
+
+	def add_stream(self, entries: bytes, data: bytes) -> int:
+		"""entries는 사전 안쪽 항목(예: b"/Filter /FlateDecode"), data는 필터가 적용된 바이트입니다."""
+		return self.add(b"<< %s /Length %d >>\nstream\n%s\nendstream" % (entries, len(data), data))
+
+	def add_page_tree(self, pages: List[int], fanout: int = 0) -> int:
+		"""
+		페이지 사전 번호들로 페이지 트리를 만들고 루트 번호를 반환합니다.
+
+		- fanout이 0이면 한 단계(모든 페이지가 루트의 자식), 2 이상이면 그 수로 묶은 균형 트리입니다
+		  (fanout=2면 깊이가 log2(페이지 수)).
+		- 페이지 사전 본문에는 부모 번호 자리에 "{parent}"를 적어 둡니다(예: b"/Parent {parent} 0 R"). 여기서 채웁니다.
+		"""
+		level = [(number, 1) for number in pages]
+		parents = {}
+		while len(level) > 1 or not parents:
+			size = len(level) if fanout < 2 else fanout
+			grouped = []
+			for start in range(0, len(level), max(size, 1)):
+				kids = level[start:start + size]
+				node = self.reserve()
+				for kid, _ in kids:
+					parents[kid] = node
+				grouped.append((node, sum(count for _, count in kids), kids))
+			for node, count, kids in grouped:
+				refs = b" ".join(b"%d 0 R" % kid for kid, _ in kids)
+				parent = b"" if len(grouped) == 1 else b"/Parent {parent} 0 R "
+				self.set(node, b"<< /Type /Pages " + parent + b"/Kids [ %s ] /Count %d >>" % (refs, count))
+			level = [(node, count) for node, count, _ in grouped]
+		for child, parent in parents.items():
+			self.set(child, self._objects[child - 1].replace(b"{parent}", b"%d" % parent))
+		return level[0][0]
+
+	def write(self, output_path: Path, pages_root: int) -> None:
+		catalog = self.add(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_root)
+		offsets = []
+		with output_path.open("wb") as f_out:
+			position = f_out.write(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+			for number, body in enumerate(self._objects, start=1):
+				offsets.append(position)
+				position += f_out.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+			rows = b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+			f_out.write(b"xref\n0 %d\n0000000000 65535 f \n%s" % (len(offsets) + 1, rows))
+			f_out.write(
+				b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+				% (len(offsets) + 1, catalog, position)
+			)
+
+
+def _text_content(page_number: int, lines: int, with_image: bool) -> bytes:
+	rows = [b"BT /F1 11 Tf 14 TL 56 790 Td"]
+	rows.append(b"/F2 16 Tf (Page %d) Tj T* /F1 11 Tf" % page_number)
+	for line in range(lines):
+		rows.append(b"(Line %d of page %d: the quick brown fox jumps over the lazy dog.) ' " % (line + 1, page_number))
+	rows.append(b"ET")
+	if with_image:
+		rows.append(b"q 96 0 0 96 470 720 cm /Im1 Do Q")
+	return b"\n".join(rows)
+
+
+def create_text_pdf(
+	output_path: Path,
+	pages: int,
+	fanout: int = 0,
+	image_pixels: int = 0,
+	shared: bool = True,
+	lines: int = 40,
+) -> None:
+	"""
+	텍스트 페이지 PDF를 만듭니다(콘텐츠는 Flate 압축, 내용은 페이지 번호로 결정됨).
+
+	- 글꼴(표준 Type1 두 개)은 모든 페이지가 함께 씁니다.
+	- image_pixels가 있으면 그 크기의 RGB 이미지를 페이지마다 그립니다. shared=True면 이미지 객체 하나를
+	  모든 페이지가 함께 쓰고, False면 페이지마다 내용이 같은 사본을 따로 둡니다(중복 제거 대상).
+	- fanout은 PdfBuilder.add_page_tree와 같습니다.
+	"""
+	builder = PdfBuilder()
+	font = builder.add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+	title_font = builder.add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Times-Bold /Encoding /WinAnsiEncoding >>")
+	fonts = b"/Font << /F1 %d 0 R /F2 %d 0 R >>" % (font, title_font)
+
+	image_data: Optional[bytes] = None
+	if image_pixels:
+		rng = random.Random(image_pixels)
+		image_data = zlib.compress(rng.randbytes(image_pixels * image_pixels * 3))
+	image_entries = (
+		b"/Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceRGB "
+		b"/BitsPerComponent 8 /Filter /FlateDecode" % (image_pixels, image_pixels)
+	)
+	shared_image = builder.add_stream(image_entries, image_data) if image_data and shared else 0
+
+	page_numbers = []
+	for index in range(pages):
+		content = builder.add_stream(
+			b"/Filter /FlateDecode",
+			zlib.compress(_text_content(index + 1, lines, image_data is not None)),
+		)
+		resources = fonts
+		if image_data is not None:
+			image = shared_image or builder.add_stream(image_entries, image_data)
+			resources += b" /XObject << /Im1 %d 0 R >>" % image
+		page = builder.reserve()
+		builder.set(
+			page,
+			b"<< /Type /Page /Parent {parent} 0 R /MediaBox [ 0 0 %d %d ] /Resources << %s >> /Contents %d 0 R >>"
+			% (PAGE_WIDTH, PAGE_HEIGHT, resources, content),
+		)
+		page_numbers.append(page)
+	builder.write(output_path, builder.add_page_tree(page_numbers, fanout))
+
+
+def create_scanned_pdf(
+	output_path: Path,
+	pages: int,
+	dpi: int = 600,
+	quality: int = 80,
+	indirect: bool = False,
+) -> None:
+	"""
+	페이지마다 A4 전체를 덮는 회색조 JPEG(스캔 이미지 흉내)를 하나씩 둔 PDF를 만듭니다. Pillow가 필요합니다.
+
+	- 600 DPI면 페이지당 약 4960x7016 픽셀, JPEG 약 7MB입니다.
+	- indirect=True이면 /Resources, /XObject, /ColorSpace를 모두 간접 객체로 두고, 이미지는 ICC 프로파일
+	  색 공간([/ICCBased <sRGB 프로파일>])의 RGB JPEG로 만듭니다(스캐너/편집기가 흔히 쓰는 구조).
+	"""
+	from PIL import Image
+
+	width = round(PAGE_WIDTH * dpi / 72)
+	height = round(PAGE_HEIGHT * dpi / 72)
+	gradient = Image.linear_gradient("L").resize((width, height))
+	builder = PdfBuilder()
+	color_space = b"/DeviceGray"
+	if indirect:
+		from PIL import ImageCms
+
+		profile = ImageCms.ImageCmsProfile(ImageCms.createProfile("sRGB")).tobytes()
+		icc = builder.add_stream(b"/N 3", profile)
+		color_space = b"%d 0 R" % builder.add(b"[ /ICCBased %d 0 R ]" % icc)
+	page_numbers = []
+	for index in range(pages):
+		noise = Image.effect_noise((width, height), 24 + index)
+		scan = Image.blend(gradient, noise, 0.35)
+		if indirect:
+			scan = Image.merge("RGB", (scan, gradient, noise))
+		buf = BytesIO()
+		scan.save(buf, format="JPEG", quality=quality)
+		image = builder.add_stream(
+			b"/Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace %s "
+			b"/BitsPerComponent 8 /Filter /DCTDecode" % (width, height, color_space),
+			buf.getvalue(),
+		)
+		content = builder.add_stream(b"", b"q %d 0 0 %d 0 0 cm /Im1 Do Q" % (PAGE_WIDTH, PAGE_HEIGHT))
+		if indirect:
+			xobjects = builder.add(b"<< /Im1 %d 0 R >>" % image)
+			resources = b"%d 0 R" % builder.add(b"<< /XObject %d 0 R >>" % xobjects)
+		else:
+			resources = b"<< /XObject << /Im1 %d 0 R >> >>" % image
+		page = builder.reserve()
+		builder.set(
+			page,
+			b"<< /Type /Page /Parent {parent} 0 R /MediaBox [ 0 0 %d %d ] "
+			b"/Resources %s /Contents %d 0 R >>"
+			% (PAGE_WIDTH, PAGE_HEIGHT, resources, content),
+		)
+		page_numbers.append(page)
+	builder.write(output_path, builder.add_page_tree(page_numbers))
+
+
+def create_many_pdfs(output_dir: Path, files: int, pages: int = 2) -> List[Path]:
+	"""작은 텍스트 PDF 여러 개를 output_dir에 만듭니다(doc_0001.pdf, ...)."""
+	output_dir.mkdir(parents=True, exist_ok=True)
+	paths = []
+	for index in range(files):
+		path = output_dir / f"doc_{index + 1:04d}.pdf"
+		create_text_pdf(path, pages, lines=10)
+		paths.append(path)
+	return paths
+
+
 def main() -> None:
 	out_path = Path("test.pdf")
 	create_simple_pdf(out_path)
@@ -20,5 +232,3 @@ def main() -> None:
 
 if __name__ == "__main__":
 	main()
-
-
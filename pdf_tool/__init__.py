@@ -1,4 +1,15 @@
 __all__ = [
+	"compose",
+	"dedupe",
+	"images",
+	"incremental",
+	"info",
+	"linearize",
 	"merge",
+	"optimize",
+	"passthrough",
+	"profiling",
+	"prune",
+	"serialize",
 	"split",
 ]
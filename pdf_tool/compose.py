@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from contextlib import ExitStack
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from pypdf import PdfReader, PdfWriter
+
+from .passthrough import PassthroughUnsupported, write_pages_passthrough
+from .profiling import span
+from .prune import add_page_pruned
+from .utils import (
+	ensure_file_exists,
+	ensure_output_directory_exists,
+	assert_can_write,
+	open_pdf_reader,
+	PageSelection,
+	parse_page_selection,
+)
+
+
+# (입력 경로, 페이지 선택 문자열). 선택이 None이면 전체 페이지입니다.
+ComposeSpec = Tuple[Path, Optional[str]]
+
+
+def compose_pdfs(
+	specs: Iterable[ComposeSpec],
+	output_file: Path,
+	overwrite: bool = False,
+	prune_resources: bool = True,
+) -> int:
+	"""
+	여러 PDF에서 페이지를 골라(순서 변경/역순/홀짝 포함) 한 번에 하나의 PDF로 씁니다.
+
+	- 분할 후 병합처럼 중간 파일을 만들지 않고, 모든 선택을 출력 하나에 한 번만 씁니다.
+	- 같은 파일이 여러 번 나와도 한 번만 엽니다.
+	- 선택 문법은 parse_page_selection을 따릅니다. 예) ("a.pdf", "3-7"), ("b.pdf", None), ("c.pdf", "10-1")
+	- prune_resources가 참이면 각 페이지가 실제로 쓰는 리소스만 복사합니다.
+	- 반환값: 출력 페이지 수
+	"""
+	spec_list: List[ComposeSpec] = [(Path(path), selection) for path, selection in specs]
+	if len(spec_list) == 0:
+		raise ValueError("합성할 입력이 없습니다.")
+
+	for path, _ in spec_list:
+		ensure_file_exists(path)
+
+	ensure_output_directory_exists(output_file)
+	assert_can_write(output_file, overwrite)
+
+	with ExitStack() as stack:
+		readers: Dict[Path, PdfReader] = {}
+		selections: List[Tuple[PdfReader, PageSelection]] = []
+		for path, selection_text in spec_list:
+			key = path.resolve()
+			reader = readers.get(key)
+			if reader is None:
+				reader = stack.enter_context(open_pdf_reader(path))
+				if getattr(reader, "is_encrypted", False):
+					raise PermissionError(f"암호화된 PDF는 합성할 수 없습니다: {path}")
+				readers[key] = reader
+			try:
+				indices = parse_page_selection(selection_text, len(reader.pages))
+			except ValueError as e:
+				raise ValueError(f"{path}: {e}")
+			selections.append((reader, indices))
+
+		with output_file.open("wb") as f_out:
+			return write_composed(f_out, selections, prune_resources=prune_resources)
+
+
+def write_composed(
+	stream: BinaryIO,
+	selections: Sequence[Tuple[PdfReader, Sequence[int]]],
+	prune_resources: bool = True,
+) -> int:
+	"""
+	(리더, 페이지 인덱스 목록) 선택들을 순서대로 stream에 씁니다. 반환값은 쓴 페이지 수입니다.
+
+	- 원본 객체를 그대로 복사하는 고속 경로를 먼저 쓰고, 특이한 입력이면 PdfWriter로 다시 씁니다.
+	- 같은 페이지를 여러 번 고르면 고른 횟수만큼 별도의 사본으로 씁니다.
+	"""
+	runs = [
+		(reader, run)
+		for reader, indices in selections
+		for run in _split_repeats(indices)
+	]
+	total = sum(len(run) for _, run in runs)
+	if total == 0:
+		raise ValueError("선택된 페이지가 없습니다.")
+
+	start = stream.tell()
+	try:
+		write_pages_passthrough(stream, runs, prune_resources=prune_resources)
+		return total
+	except PassthroughUnsupported:
+		stream.seek(start)
+		stream.truncate()
+
+	writer = PdfWriter()
+	for reader, run in runs:
+		for page_index in run:
+			with span("add_page", index=page_index):
+				if prune_resources:
+					add_page_pruned(writer, reader.pages[page_index])
+				else:
+					writer.add_page(reader.pages[page_index])
+	with span("write"):
+		writer.write(stream)
+	return total
+
+
+def _split_repeats(indices: Sequence[int]) -> List[PageSelection]:
+	"""
+	페이지가 다시 나오는 지점에서 선택을 나눕니다(구간 단위로 펼치지 않고 확인).
+
+	고속 경로는 한 번에 같은 페이지를 두 번 쓰지 못하므로, 나눈 구간마다 새 사본으로 쓰게 합니다.
+	"""
+	runs: List[PageSelection] = []
+	current = PageSelection()
+	for page_range in PageSelection.from_indices(indices).ranges:
+		part = PageSelection([page_range])
+		if current.overlaps(part):
+			runs.append(current)
+			current = part
+		else:
+			current = current.union(part)
+	if current:
+		runs.append(current)
+	return runs
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Callable, Dict, List, Set, Tuple
+
+from pypdf import PdfWriter
+from pypdf.generic import (
+	ArrayObject,
+	DictionaryObject,
+	IndirectObject,
+	NullObject,
+	PdfObject,
+)
+
+from .serialize import write_value
+
+
+# 여러 곳에서 참조되면 안 되는(구조상 고유해야 하는) 객체 유형은 합치지 않습니다.
+_UNIQUE_TYPES = {"/Page", "/Pages", "/Catalog", "/Annot"}
+
+
+@dataclass
+class DedupeStats:
+	"""중복 제거 결과."""
+
+	objects_removed: int = 0
+	bytes_saved: int = 0
+
+
+def dedupe_writer(writer: PdfWriter) -> DedupeStats:
+	"""
+	PdfWriter에 담긴 간접 객체(스트림 포함) 중 내용이 같은 것들을 하나로 합칩니다.
+
+	- 같은 템플릿에서 나온 입력을 병합하면 글꼴/로고/ICC 프로파일이 입력 수만큼 중복됩니다.
+	- 중복 객체의 참조는 대표 객체로 바꾸고, 빈 자리는 null 객체로 남겨 객체 번호를 유지합니다.
+	"""
+	objects: List[PdfObject] = writer._objects
+	protected = _protected_ids(writer)
+
+	candidates = {
+		index + 1: obj
+		for index, obj in enumerate(objects)
+		if obj is not None and index + 1 not in protected
+	}
+	canonical, sizes = find_identical(candidates, lambda ref: ref.idnum)
+	if not canonical:
+		return DedupeStats()
+
+	def resolve(idnum: int) -> int:
+		return canonical.get(idnum, idnum)
+
+	# 남은 객체들의 참조를 대표 객체로 바꿉니다.
+	for index, obj in enumerate(objects):
+		if obj is not None and index + 1 not in canonical:
+			_rewrite_references(obj, resolve, writer)
+
+	null_size = len(b"null")
+	stats = DedupeStats()
+	for idnum in canonical:
+		objects[idnum - 1] = NullObject()
+		stats.objects_removed += 1
+		stats.bytes_saved += max(0, sizes.get(idnum, 0) - null_size)
+	return stats
+
+
+def find_identical(
+	objects: Dict[int, PdfObject],
+	number_of: Callable[[IndirectObject], int],
+) -> Tuple[Dict[int, int], Dict[int, int]]:
+	"""
+	내용이 같은 간접 객체들을 찾아 (중복 번호 -> 대표 번호, 번호 -> 직렬화 크기)를 반환합니다.
+
+	- objects: 번호 -> 객체. 구조상 고유해야 하는 유형(페이지, 카탈로그, 주석 등)은 합치지 않습니다.
+	- number_of: 객체 안의 간접 참조를 objects의 번호로 바꾸는 함수.
+	- 객체를 직렬화한 내용(참조는 대표 객체 번호로 치환)의 해시로 비교하며,
+	  참조 대상이 합쳐지면 부모도 같아질 수 있으므로 더 합칠 것이 없을 때까지 반복합니다.
+	"""
+	# 대표 객체 번호 (번호 -> 번호)
+	canonical: Dict[int, int] = {}
+	sizes: Dict[int, int] = {}
+
+	def resolve(number: int) -> int:
+		root = number
+		while root in canonical:
+			root = canonical[root]
+		while number in canonical and canonical[number] != root:
+			canonical[number], number = root, canonical[number]
+		return root
+
+	def remap(ref: IndirectObject) -> int:
+		return resolve(number_of(ref))
+
+	candidates = [
+		(number, obj)
+		for number, obj in objects.items()
+		if not (isinstance(obj, DictionaryObject) and obj.get("/Type") in _UNIQUE_TYPES)
+	]
+	while True:
+		seen: Dict[bytes, int] = {}
+		merged = 0
+		for number, obj in candidates:
+			if number in canonical:
+				continue
+			buf = BytesIO()
+			write_value(buf, obj, remap)
+			data = buf.getvalue()
+			sizes[number] = len(data)
+			key = hashlib.sha256(data).digest()
+			first = seen.setdefault(key, number)
+			if first != number:
+				canonical[number] = first
+				merged += 1
+		if merged == 0:
+			break
+
+	return {number: resolve(number) for number in canonical}, sizes
+
+
+def _protected_ids(writer: PdfWriter) -> Set[int]:
+	protected: Set[int] = set()
+	info = getattr(writer, "_info", None)
+	if isinstance(info, IndirectObject):
+		protected.add(info.idnum)
+	for index, obj in enumerate(writer._objects):
+		if isinstance(obj, DictionaryObject) and obj.get("/Type") in _UNIQUE_TYPES:
+			protected.add(index + 1)
+	return protected
+
+
+def _rewrite_references(obj: PdfObject, resolve, writer: PdfWriter) -> None:
+	"""
+	직접 객체 트리를 따라가며 간접 참조를 대표 객체 번호로 바꿉니다(간접 객체 안으로는 들어가지 않음).
+	"""
+	stack: List[PdfObject] = [obj]
+	while stack:
+		current = stack.pop()
+		if isinstance(current, DictionaryObject):
+			items = list(current.items())
+			for key, value in items:
+				if isinstance(value, IndirectObject):
+					target = resolve(value.idnum)
+					if target != value.idnum:
+						current[key] = IndirectObject(target, 0, writer)
+				elif isinstance(value, (DictionaryObject, ArrayObject)):
+					stack.append(value)
+		elif isinstance(current, ArrayObject):
+			for i, value in enumerate(current):
+				if isinstance(value, IndirectObject):
+					target = resolve(value.idnum)
+					if target != value.idnum:
+						current[i] = IndirectObject(target, 0, writer)
+				elif isinstance(value, (DictionaryObject, ArrayObject)):
+					stack.append(value)
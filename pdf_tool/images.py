@@ -0,0 +1,479 @@
+from __future__ import annotations
+
+import math
+import os
+import time
+import zlib
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from io import BytesIO
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Tuple
+
+from PIL import Image
+from pypdf import PdfReader, PdfWriter
+from pypdf.errors import PdfReadError
+from pypdf.generic import (
+	ArrayObject,
+	ContentStream,
+	DictionaryObject,
+	IndirectObject,
+	NameObject,
+	NumberObject,
+)
+
+from .profiling import span
+from .serialize import stream_raw_data
+from .utils import open_pdf_reader
+
+
+# 목표 DPI보다 이만큼 넘게 높을 때만 다시 샘플링합니다(거의 같은 크기로 다시 인코딩하지 않도록).
+RESAMPLE_MARGIN = 1.1
+
+# 색이 이보다 적거나, 거의 모든 화소가 흰색/검은색에 가까운 이미지(문서 스캔/선화)는
+# JPEG 대신 Flate로 인코딩합니다(글자 주변이 번지지 않도록).
+FLATE_MAX_COLORS = 256
+LINE_ART_FRACTION = 0.9
+
+# 폼 XObject 중첩 한도
+_MAX_FORM_DEPTH = 12
+
+_IDENTITY = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+# 색 공간 이름 -> 성분 수
+_COMPONENTS = {"/DeviceGray": 1, "/DeviceRGB": 3, "/DeviceCMYK": 4}
+_MODES = {1: "L", 3: "RGB", 4: "CMYK"}
+
+Matrix = Tuple[float, float, float, float, float, float]
+# (객체 번호, 세대)
+ObjectKey = Tuple[int, int]
+
+
+@dataclass(frozen=True)
+class ImageOptions:
+	"""
+	이미지 다시 샘플링 설정.
+
+	- dpi: 목표 유효 DPI(페이지에 표시되는 크기 기준). 0이면 끔
+	- quality: JPEG 품질(1-95)
+	- workers: 이미지를 나눠 처리할 프로세스 수(1이면 현재 프로세스에서 처리)
+	"""
+
+	dpi: int = 0
+	quality: int = 75
+	workers: int = 1
+
+	def __post_init__(self) -> None:
+		if self.dpi < 0:
+			raise ValueError(f"목표 DPI는 0 이상이어야 합니다: {self.dpi}")
+		if not 1 <= self.quality <= 95:
+			raise ValueError(f"JPEG 품질은 1-95 사이여야 합니다: {self.quality}")
+
+	@property
+	def enabled(self) -> bool:
+		return self.dpi > 0
+
+	def __str__(self) -> str:
+		return "off" if not self.enabled else f"{self.dpi}dpi:q{self.quality}"
+
+
+@dataclass
+class ImageReport:
+	"""
+	이미지 하나의 처리 결과. encoding이 None이면 건너뛴 이미지이고, 이유는 note에 있습니다.
+
+	- page: 이미지가 처음 나온 페이지(1-기반), dpi: 가장 크게 표시된 곳 기준 유효 DPI
+	"""
+
+	page: int
+	name: str
+	width: int
+	height: int
+	dpi: float
+	new_width: int = 0
+	new_height: int = 0
+	encoding: Optional[str] = None
+	input_bytes: int = 0
+	output_bytes: int = 0
+	note: str = ""
+
+	def summary(self) -> str:
+		head = f"p.{self.page} {self.name} {self.width}x{self.height} ({self.dpi:.0f}dpi)"
+		if self.encoding is None:
+			return f"{head}: 건너뜀 ({self.note})"
+		return (
+			f"{head} → {self.new_width}x{self.new_height} {self.encoding}, "
+			f"{self.input_bytes} → {self.output_bytes} bytes"
+		)
+
+
+@dataclass
+class DownsampleReport:
+	"""다시 샘플링 결과. kept_original이 참이면 바꾼 이미지가 없거나 결과가 더 커서 원본을 그대로 두었습니다."""
+
+	options: str
+	input_bytes: int = 0
+	output_bytes: int = 0
+	seconds: float = 0.0
+	kept_original: bool = False
+	images: List[ImageReport] = field(default_factory=list)
+
+	@property
+	def images_resampled(self) -> int:
+		return sum(1 for image in self.images if image.encoding is not None)
+
+	def summary(self) -> str:
+		saved = self.input_bytes - self.output_bytes
+		ratio = 100.0 * saved / max(self.input_bytes, 1)
+		text = (
+			f"이미지({self.options}): {self.input_bytes} → {self.output_bytes} bytes ({-ratio:+.1f}%), "
+			f"다시 샘플링 {self.images_resampled}개 / 대상 {len(self.images)}개, {self.seconds:.2f}초"
+		)
+		if self.kept_original:
+			text += " (원본 유지)"
+		return text
+
+	def to_dict(self) -> Dict[str, Any]:
+		return asdict(self)
+
+
+def downsample_pdf(
+	reader: PdfReader,
+	output: BinaryIO,
+	options: ImageOptions,
+	input_bytes: int = 0,
+	pool: Optional[Executor] = None,
+) -> DownsampleReport:
+	"""
+	표시 크기에 비해 해상도가 높은 이미지 XObject를 목표 DPI로 줄여 output에 다시 씁니다.
+
+	- 페이지(와 폼 XObject) 콘텐츠의 변환 행렬을 따라가 이미지마다 가장 크게 표시된 곳의 유효 DPI를 구합니다.
+	- 목표 DPI보다 높은 8비트 회색/RGB/CMYK 이미지(Flate, JPEG)만 Pillow로 다시 샘플링합니다.
+	  색이 적은 이미지(스캔한 문서/선화)는 Flate, 나머지는 JPEG으로 인코딩하며, 원본보다 작을 때만 바꿉니다.
+	- pool이 있으면 이미지 디코딩/리샘플링/인코딩을 그 실행기에서 나눠 처리합니다.
+	- 바꾼 이미지가 없으면 output에 아무것도 쓰지 않고 kept_original을 참으로 둡니다.
+	"""
+	started = time.perf_counter()
+	if getattr(reader, "is_encrypted", False):
+		raise ValueError("암호화된 PDF의 이미지는 다시 샘플링할 수 없습니다.")
+	report = DownsampleReport(options=str(options), input_bytes=input_bytes, output_bytes=input_bytes)
+
+	writer = PdfWriter(clone_from=reader)
+	placements = _find_placements(writer)
+
+	tasks: List[Tuple[IndirectObject, ImageReport, Dict[str, Any]]] = []
+	for key, (page_number, name, dpi) in placements.items():
+		ref = IndirectObject(key[0], key[1], writer)
+		image = ref.get_object()
+		entry = ImageReport(
+			page=page_number,
+			name=name,
+			width=int(_value(image, "/Width", 0)),
+			height=int(_value(image, "/Height", 0)),
+			dpi=round(dpi, 1),
+		)
+		if dpi <= options.dpi * RESAMPLE_MARGIN:
+			continue
+		report.images.append(entry)
+		task, reason = _make_task(image, options, options.dpi / dpi)
+		if task is None:
+			entry.note = reason
+			continue
+		tasks.append((ref, entry, task))
+
+	if pool is not None and len(tasks) > 1:
+		results = list(pool.map(resample_image, [task for _, _, task in tasks]))
+	else:
+		results = [resample_image(task) for _, _, task in tasks]
+
+	changed = 0
+	for (ref, entry, task), result in zip(tasks, results):
+		entry.input_bytes = len(task["data"])
+		if result["data"] is None:
+			entry.note = result["note"]
+			continue
+		_replace_image(ref.get_object(), result)
+		entry.encoding = result["encoding"]
+		entry.new_width = result["width"]
+		entry.new_height = result["height"]
+		entry.output_bytes = len(result["data"])
+		changed += 1
+
+	if changed == 0:
+		report.kept_original = True
+	else:
+		buf = BytesIO()
+		writer.write(buf)
+		report.output_bytes = buf.tell()
+		if report.output_bytes >= input_bytes > 0:
+			report.kept_original = True
+			report.output_bytes = input_bytes
+		else:
+			output.write(buf.getvalue())
+	report.seconds = time.perf_counter() - started
+	return report
+
+
+def downsample_bytes(data: bytes, options: ImageOptions, pool: Optional[Executor] = None) -> Tuple[bytes, DownsampleReport]:
+	"""
+	PDF 바이트의 이미지를 다시 샘플링합니다. 바꾼 것이 없거나 결과가 더 크면 원본 바이트를 그대로 반환합니다.
+	"""
+	out = BytesIO()
+	with span("downsample", bytes=len(data)):
+		report = downsample_pdf(PdfReader(BytesIO(data)), out, options, input_bytes=len(data), pool=pool)
+	if report.kept_original:
+		return data, report
+	return out.getvalue(), report
+
+
+def downsample_file(path: Path, options: ImageOptions, pool: Optional[Executor] = None) -> DownsampleReport:
+	"""
+	PDF 파일의 이미지를 제자리에서 다시 샘플링합니다(같은 디렉터리의 임시 파일에 쓴 뒤 교체).
+	"""
+	temp_path = path.with_name(f".{path.name}.downsampling")
+	try:
+		with open_pdf_reader(path) as reader, temp_path.open("wb") as f_out:
+			with span("downsample", path=str(path)):
+				report = downsample_pdf(reader, f_out, options, input_bytes=path.stat().st_size, pool=pool)
+		if report.kept_original:
+			temp_path.unlink()
+		else:
+			os.replace(temp_path, path)
+	except BaseException:
+		if temp_path.exists():
+			temp_path.unlink()
+		raise
+	return report
+
+
+def downsample_files(paths: Iterable[Path], options: ImageOptions) -> List[DownsampleReport]:
+	"""
+	여러 PDF 파일의 이미지를 제자리에서 다시 샘플링합니다. 프로세스 풀 하나를 모든 파일이 함께 씁니다.
+	"""
+	path_list = [Path(p) for p in paths]
+	if options.workers <= 1:
+		return [downsample_file(path, options) for path in path_list]
+	with ProcessPoolExecutor(max_workers=options.workers) as pool:
+		return [downsample_file(path, options, pool=pool) for path in path_list]
+
+
+def resample_image(task: Dict[str, Any]) -> Dict[str, Any]:
+	"""
+	작업자 진입점: 이미지 하나를 디코딩해 줄이고 다시 인코딩합니다(인자/반환값은 pickle 가능한 dict).
+
+	반환값: {"data": 새 스트림 바이트 또는 None, "filter", "encoding", "width", "height", "note"}
+	"""
+	skipped = {"data": None, "filter": None, "encoding": None, "width": 0, "height": 0, "note": ""}
+	width, height = task["width"], task["height"]
+	size = (max(1, round(width * task["scale"])), max(1, round(height * task["scale"])))
+	mode = _MODES[task["components"]]
+	try:
+		if task["filter"] == "/DCTDecode":
+			image = Image.open(BytesIO(task["data"]))
+			# JPEG은 디코딩하면서 1/2, 1/4, 1/8로 줄일 수 있어 큰 스캔도 빠르게 읽습니다.
+			image.draft(mode, size)
+			image = image.convert(mode) if image.mode != mode else image
+		else:
+			samples = _flate_decode(task["data"], task["decode_parms"]) if task["filter"] else task["data"]
+			image = Image.frombytes(mode, (width, height), samples[: width * height * task["components"]])
+	except Exception as e:
+		skipped["note"] = f"디코딩 실패: {e}"
+		return skipped
+
+	image = image.resize(size, Image.LANCZOS, reducing_gap=3.0)
+
+	use_flate = mode == "CMYK" or (task["filter"] != "/DCTDecode" and _looks_like_line_art(image))
+	if use_flate:
+		data = zlib.compress(image.tobytes(), 6)
+		result = {"filter": "/FlateDecode", "encoding": "flate"}
+	else:
+		buf = BytesIO()
+		image.save(buf, "JPEG", quality=task["quality"], optimize=True)
+		data = buf.getvalue()
+		result = {"filter": "/DCTDecode", "encoding": "jpeg"}
+
+	if len(data) >= len(task["data"]):
+		skipped["note"] = "더 작아지지 않음"
+		return skipped
+	result.update({"data": data, "width": size[0], "height": size[1], "note": ""})
+	return result
+
+
+def _looks_like_line_art(image: Image.Image) -> bool:
+	if image.mode != "L" and image.getcolors(FLATE_MAX_COLORS) is not None:
+		return True
+	histogram = image.convert("L").histogram()
+	extremes = sum(histogram[:32]) + sum(histogram[224:])
+	return extremes >= LINE_ART_FRACTION * image.width * image.height
+
+
+def _flate_decode(data: bytes, decode_parms: Dict[str, int]) -> bytes:
+	from pypdf.filters import FlateDecode
+
+	params = DictionaryObject({NameObject(k): NumberObject(v) for k, v in decode_parms.items()})
+	return FlateDecode.decode(data, params or None)
+
+
+def _make_task(
+	image: DictionaryObject,
+	options: ImageOptions,
+	scale: float,
+) -> Tuple[Optional[Dict[str, Any]], str]:
+	"""이미지 스트림을 작업자에게 넘길 dict로 만듭니다. 다룰 수 없으면 (None, 이유)."""
+	if _value(image, "/ImageMask") or "/Mask" in image:
+		return None, "마스크 이미지"
+	bits = _value(image, "/BitsPerComponent")
+	if bits != 8:
+		return None, f"BitsPerComponent {bits}"
+	if "/Decode" in image:
+		return None, "/Decode 배열"
+
+	color_space = _value(image, "/ColorSpace")
+	components = _components(color_space)
+	if components is None:
+		return None, f"색 공간 {_describe(color_space)}"
+
+	filters = _value(image, "/Filter")
+	parms = _value(image, "/DecodeParms")
+	if isinstance(filters, ArrayObject):
+		if len(filters) != 1:
+			return None, f"필터 {_describe(filters)}"
+		filters = _resolve(filters[0])
+		parms = _resolve(parms[0]) if isinstance(parms, ArrayObject) and len(parms) == 1 else parms
+	if filters not in (None, "/FlateDecode", "/DCTDecode"):
+		return None, f"필터 {filters}"
+	if filters == "/DCTDecode" and components == 4:
+		# Adobe CMYK JPEG의 반전 규칙이 뷰어마다 달라 그대로 둡니다.
+		return None, "CMYK JPEG"
+
+	decode_parms: Dict[str, int] = {}
+	if isinstance(parms, DictionaryObject):
+		decode_parms = {str(k): int(_resolve(v)) for k, v in parms.items() if isinstance(_resolve(v), int)}
+
+	return {
+		"data": stream_raw_data(image),
+		"filter": str(filters) if filters is not None else None,
+		"decode_parms": decode_parms,
+		"width": int(image["/Width"]),
+		"height": int(image["/Height"]),
+		"components": components,
+		"scale": scale,
+		"quality": options.quality,
+	}, ""
+
+
+def _components(color_space: Any) -> Optional[int]:
+	if isinstance(color_space, str):
+		return _COMPONENTS.get(color_space)
+	if isinstance(color_space, ArrayObject) and len(color_space) == 2 and _resolve(color_space[0]) == "/ICCBased":
+		profile = _resolve(color_space[1])
+		count = _value(profile, "/N") if isinstance(profile, DictionaryObject) else None
+		return count if count in (1, 3, 4) else None
+	return None
+
+
+def _resolve(value: Any) -> Any:
+	# 간접 참조면 가리키는 객체를, 아니면 값 그대로 반환합니다.
+	return value.get_object() if isinstance(value, IndirectObject) else value
+
+
+def _value(obj: DictionaryObject, key: str, default: Any = None) -> Any:
+	# dict.get은 간접 참조(예: /Resources 7 0 R)를 해석하지 않으므로 해석해서 반환합니다.
+	return _resolve(obj.get(key, default))
+
+
+def _describe(value: Any) -> str:
+	if isinstance(value, ArrayObject) and len(value) > 0:
+		return str(value[0])
+	return str(value)
+
+
+def _replace_image(image: DictionaryObject, result: Dict[str, Any]) -> None:
+	image._data = result["data"]  # type: ignore[attr-defined]
+	if hasattr(image, "decoded_self"):
+		image.decoded_self = None  # type: ignore[attr-defined]
+	image[NameObject("/Width")] = NumberObject(result["width"])
+	image[NameObject("/Height")] = NumberObject(result["height"])
+	image[NameObject("/BitsPerComponent")] = NumberObject(8)
+	image[NameObject("/Filter")] = NameObject(result["filter"])
+	if "/DecodeParms" in image:
+		del image["/DecodeParms"]
+
+
+def _find_placements(writer: PdfWriter) -> Dict[ObjectKey, Tuple[int, str, float]]:
+	"""
+	이미지 XObject마다 (처음 나온 페이지, 리소스 이름, 가장 낮은 유효 DPI)를 모읍니다.
+
+	- 유효 DPI는 (픽셀 수) / (표시 크기, 인치)이며, 가로/세로 중 낮은 쪽을 씁니다.
+	- 같은 이미지가 여러 곳에 쓰이면 가장 크게 표시된 곳(가장 낮은 DPI)을 기준으로 합니다.
+	"""
+	found: Dict[ObjectKey, Tuple[int, str, float]] = {}
+
+	def visit(content: Any, resources: Any, ctm: Matrix, page_number: int, depth: int) -> None:
+		try:
+			operations = ContentStream(content, writer).operations
+		except (PdfReadError, ValueError, TypeError):
+			return
+		xobjects = _value(resources, "/XObject") if isinstance(resources, DictionaryObject) else None
+		stack: List[Matrix] = []
+		for operands, operator in operations:
+			if operator == b"q":
+				stack.append(ctm)
+			elif operator == b"Q":
+				if stack:
+					ctm = stack.pop()
+			elif operator == b"cm" and len(operands) == 6:
+				ctm = _multiply(tuple(float(v) for v in operands), ctm)  # type: ignore[arg-type]
+			elif operator == b"Do" and operands and isinstance(xobjects, DictionaryObject):
+				name = operands[0]
+				ref = xobjects.raw_get(name) if name in xobjects else None
+				if not isinstance(ref, IndirectObject):
+					continue
+				xobject = ref.get_object()
+				subtype = _value(xobject, "/Subtype")
+				if subtype == "/Image":
+					dpi = _effective_dpi(xobject, ctm)
+					if dpi is None:
+						continue
+					key = (ref.idnum, ref.generation)
+					previous = found.get(key)
+					if previous is None:
+						found[key] = (page_number, str(name), dpi)
+					elif dpi < previous[2]:
+						found[key] = (previous[0], previous[1], dpi)
+				elif subtype == "/Form" and depth < _MAX_FORM_DEPTH:
+					matrix = _value(xobject, "/Matrix")
+					form_ctm = _multiply(tuple(float(_resolve(v)) for v in matrix), ctm) if isinstance(matrix, ArrayObject) and len(matrix) == 6 else ctm  # type: ignore[arg-type]
+					visit(xobject, _value(xobject, "/Resources", resources), form_ctm, page_number, depth + 1)
+
+	for page_number, page in enumerate(writer.pages, start=1):
+		content = page.get_contents()
+		if content is None:
+			continue
+		visit(content, _value(page, "/Resources"), _IDENTITY, page_number, 0)
+	return found
+
+
+def _multiply(m: Matrix, n: Matrix) -> Matrix:
+	# PDF 행렬 곱 m × n (행 벡터 규약)
+	return (
+		m[0] * n[0] + m[1] * n[2],
+		m[0] * n[1] + m[1] * n[3],
+		m[2] * n[0] + m[3] * n[2],
+		m[2] * n[1] + m[3] * n[3],
+		m[4] * n[0] + m[5] * n[2] + n[4],
+		m[4] * n[1] + m[5] * n[3] + n[5],
+	)
+
+
+def _effective_dpi(image: DictionaryObject, ctm: Matrix) -> Optional[float]:
+	# 이미지는 단위 정사각형에 그려지므로 CTM의 두 열 벡터 길이가 곧 표시 크기(포인트)입니다.
+	shown_width = math.hypot(ctm[0], ctm[1]) / 72
+	shown_height = math.hypot(ctm[2], ctm[3]) / 72
+	if shown_width <= 0 or shown_height <= 0:
+		return None
+	try:
+		width, height = int(image["/Width"]), int(image["/Height"])
+	except (KeyError, TypeError, ValueError):
+		return None
+	return min(width / shown_width, height / shown_height)
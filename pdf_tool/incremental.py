@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import hashlib
+import re
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Dict, List
+
+from pypdf import PdfReader
+from pypdf.generic import (
+	ArrayObject,
+	ByteStringObject,
+	DictionaryObject,
+	IndirectObject,
+	NameObject,
+	NumberObject,
+	PdfObject,
+)
+
+from .linearize import INHERITABLE_PAGE_KEYS
+from .passthrough import PassthroughWriter, _CountingStream
+from .profiling import span
+
+
+# 증분 업데이트(PDF 1.7 7.5.6) 쓰기. 원본 바이트는 그대로 두고 파일 끝에
+#
+#   새 페이지와 그 객체들 | 갱신한 페이지 트리 루트 | 교차 참조 구간(/Prev로 원본 구간을 가리킴)
+#
+# 만 덧붙입니다. 원본에서 읽는 객체는 카탈로그와 페이지 트리 루트뿐이라, 드는 시간과 쓰는 양이
+# 원본 크기가 아니라 덧붙이는 페이지에 비례합니다.
+
+_STARTXREF = re.compile(rb"startxref\s+(\d+)")
+_OBJECT_HEADER = re.compile(rb"\s*(\d+)\s+\d+\s+obj")
+
+# startxref를 찾을 때 읽는 파일 끝부분 크기
+_TAIL_BYTES = 1024
+
+
+@dataclass
+class AppendStats:
+	"""덧붙이기 결과. pages는 덧붙인 페이지 수, total_pages는 덧붙인 뒤 전체 페이지 수입니다."""
+
+	pages: int = 0
+	total_pages: int = 0
+	objects: int = 0
+	bytes_appended: int = 0
+	xref_stream: bool = False
+
+
+@dataclass
+class AppendBase:
+	"""
+	덧붙일 원본 문서에서 증분 업데이트에 필요한 정보만 모은 것.
+
+	- pages는 페이지 트리 루트 사전의 얕은 사본이며, 간접 참조는 원본 번호를 그대로 가리킵니다.
+	- xref_stream은 원본의 마지막 교차 참조 구간이 교차 참조 스트림인지 여부입니다(같은 형식으로 덧붙임).
+	"""
+
+	size: int
+	startxref: int
+	xref_stream: bool
+	next_number: int
+	trailer: Dict[str, PdfObject]
+	pages_ref: IndirectObject
+	pages: DictionaryObject
+	kids: List[PdfObject]
+	page_count: int
+	ends_with_newline: bool
+
+
+def read_append_base(reader: PdfReader, size: int) -> AppendBase:
+	"""
+	이미 연 원본에서 트레일러, 마지막 교차 참조 위치, 페이지 트리 루트를 읽습니다.
+
+	- 페이지 트리는 평탄화하지 않고 루트의 /Kids와 /Count만 읽습니다.
+	- 암호화된 문서는 PermissionError, 덧붙일 수 없는 구조(깨진 startxref 등)는 ValueError입니다.
+	"""
+	if getattr(reader, "is_encrypted", False):
+		raise PermissionError("암호화된 PDF에는 덧붙일 수 없습니다.")
+
+	stream = reader.stream
+	stream.seek(max(0, size - _TAIL_BYTES))
+	tail = stream.read()
+	found = _STARTXREF.findall(tail)
+	if not found:
+		raise ValueError("startxref를 찾을 수 없는 PDF에는 덧붙일 수 없습니다.")
+	startxref = int(found[-1])
+	stream.seek(startxref)
+	head = stream.read(64)
+	header = _OBJECT_HEADER.match(head)
+	if head.startswith(b"xref"):
+		xref_stream = False
+	elif header is not None:
+		xref_stream = True
+	else:
+		raise ValueError(f"startxref({startxref})가 교차 참조 구간을 가리키지 않는 PDF에는 덧붙일 수 없습니다.")
+
+	trailer = reader.trailer
+	catalog = trailer["/Root"].get_object()
+	pages_ref = catalog.raw_get("/Pages") if isinstance(catalog, DictionaryObject) else None
+	if not isinstance(pages_ref, IndirectObject):
+		raise ValueError("페이지 트리 루트가 간접 객체가 아닌 PDF에는 덧붙일 수 없습니다.")
+	if pages_ref.generation != 0:
+		raise ValueError("세대 번호가 0이 아닌 페이지 트리 루트에는 덧붙일 수 없습니다.")
+	pages = pages_ref.get_object()
+	if not isinstance(pages, DictionaryObject):
+		raise ValueError("페이지 트리 루트를 읽을 수 없습니다.")
+
+	kids = pages.get("/Kids")
+	count = pages.get("/Count")
+	if not isinstance(kids, ArrayObject):
+		raise ValueError("페이지 트리 루트에 /Kids가 없습니다.")
+	if not isinstance(count, int) or count < 0:
+		# /Count가 없거나 잘못된 경우에만 페이지 트리를 평탄화해 셉니다.
+		count = len(reader.pages)
+
+	# 원본이 이미 쓴 가장 큰 번호 다음부터 새 번호를 씁니다. /Size가 작게 적힌 파일이나,
+	# 교차 참조 스트림 자신의 번호가 그 /Index 밖에 있는 파일도 있습니다.
+	highest = max((number for table in reader.xref.values() for number in table), default=0)
+	highest = max(highest, max(getattr(reader, "xref_objStm", {}) or [0]))
+	if header is not None:
+		highest = max(highest, int(header.group(1)))
+	next_number = max(int(trailer.get("/Size", 0)), highest + 1)
+
+	copied = DictionaryObject()
+	for name, value in pages.items():
+		copied[name] = value
+
+	return AppendBase(
+		size=size,
+		startxref=startxref,
+		xref_stream=xref_stream,
+		next_number=next_number,
+		trailer={name: trailer.raw_get(name) for name in ("/Root", "/Info", "/ID") if name in trailer},
+		pages_ref=pages_ref,
+		pages=copied,
+		kids=list(kids),
+		page_count=int(count),
+		ends_with_newline=tail.endswith((b"\n", b"\r")),
+	)
+
+
+class IncrementalWriter(PassthroughWriter):
+	"""
+	PassthroughWriter와 같은 방식으로 페이지를 복사하되, 원본 파일 끝에 증분 업데이트로 씁니다.
+
+	- stream은 원본 파일 끝에 위치해야 합니다(추가 모드로 연 파일 등).
+	- 새 페이지는 원본 페이지 트리 루트의 /Kids 끝에 붙고, 루트만 새 판으로 다시 씁니다.
+	  카탈로그와 나머지 페이지는 건드리지 않습니다.
+	"""
+
+	def __init__(self, stream: BinaryIO, base: AppendBase) -> None:
+		self._start(_CountingStream(stream, base.size), first_number=base.next_number)
+		self._base = base
+		self._pages_number = base.pages_ref.idnum
+		if not base.ends_with_newline:
+			self._out.write(b"\n")
+
+	def _page_dict(self, page: DictionaryObject, prune_resources: bool) -> DictionaryObject:
+		page_dict = super()._page_dict(page, prune_resources)
+		# 원본 루트가 상속시키는 속성이 새 페이지에 끼어들지 않도록, 페이지에 없는 값은 기본값을 직접 적습니다.
+		for name in INHERITABLE_PAGE_KEYS:
+			if name not in self._base.pages or name in page_dict:
+				continue
+			if name == "/Resources":
+				page_dict[NameObject(name)] = DictionaryObject()
+			elif name == "/Rotate":
+				page_dict[NameObject(name)] = NumberObject(0)
+			elif name == "/CropBox" and "/MediaBox" in page_dict:
+				page_dict[NameObject(name)] = page_dict["/MediaBox"]
+		return page_dict
+
+	def close(self) -> AppendStats:  # type: ignore[override]
+		"""
+		갱신한 페이지 트리 루트와 교차 참조 구간/트레일러를 씁니다.
+		"""
+		base = self._base
+		added = len(self._page_numbers)
+		with span("write", incremental=True) as active:
+			pages = DictionaryObject()
+			for name, value in base.pages.items():
+				pages[name] = value
+			pages[NameObject("/Kids")] = ArrayObject(
+				base.kids + [IndirectObject(number, 0, None) for number in self._page_numbers]  # type: ignore[arg-type]
+			)
+			pages[NameObject("/Count")] = NumberObject(base.page_count + added)
+			pages_offset = self._out.position
+			self._out.write(b"%d 0 obj\n" % self._pages_number)
+			pages.write_to_stream(self._out)
+			self._out.write(b"\nendobj\n")
+
+			if base.xref_stream:
+				self._write_xref_stream(pages_offset)
+			else:
+				self._write_xref_table(pages_offset)
+
+			active.set(bytes=self._out.position - base.size)
+		self._readers.clear()
+		return AppendStats(
+			pages=added,
+			total_pages=base.page_count + added,
+			objects=self.stats.objects + 1,
+			bytes_appended=self._out.position - base.size,
+			xref_stream=base.xref_stream,
+		)
+
+	def _trailer(self, size: int, xref_offset: int) -> DictionaryObject:
+		trailer = DictionaryObject()
+		trailer[NameObject("/Size")] = NumberObject(size)
+		for name, value in self._base.trailer.items():
+			trailer[NameObject(name)] = value
+		file_id = self._base.trailer.get("/ID")
+		if isinstance(file_id, ArrayObject) and len(file_id) == 2:
+			# 첫 번째 ID는 문서의 영구 식별자로 두고, 두 번째는 이 판의 식별자로 바꿉니다.
+			first = getattr(file_id[0], "original_bytes", b"")
+			digest = hashlib.md5(bytes(first) + b"%d %d" % (size, xref_offset)).digest()
+			trailer[NameObject("/ID")] = ArrayObject([file_id[0], ByteStringObject(digest)])
+		trailer[NameObject("/Prev")] = NumberObject(self._base.startxref)
+		return trailer
+
+	def _write_xref_table(self, pages_offset: int) -> None:
+		xref_offset = self._out.position
+		size = self._first_number + len(self._offsets)
+		lines = [b"xref\n", b"%d 1\n" % self._pages_number, b"%010d 00000 n \n" % pages_offset]
+		lines.append(b"%d %d\n" % (self._first_number, len(self._offsets)))
+		for offset in self._offsets:
+			lines.append(b"%010d 00000 n \n" % offset)
+		self._out.write(b"".join(lines))
+		self._out.write(b"trailer\n")
+		self._trailer(size, xref_offset).write_to_stream(self._out)
+		self._out.write(b"\nstartxref\n%d\n%%%%EOF\n" % xref_offset)
+
+	def _write_xref_stream(self, pages_offset: int) -> None:
+		# 교차 참조 스트림도 객체이므로 번호를 하나 받고, 자기 자신의 항목도 적습니다.
+		number = self._allocate()
+		xref_offset = self._out.position
+		self._offsets[-1] = xref_offset
+		size = number + 1
+		width = max(1, (xref_offset.bit_length() + 7) // 8)
+
+		rows = [b"\x01" + pages_offset.to_bytes(width, "big") + b"\x00\x00"]
+		for offset in self._offsets:
+			rows.append(b"\x01" + offset.to_bytes(width, "big") + b"\x00\x00")
+		data = zlib.compress(b"".join(rows))
+
+		dictionary = self._trailer(size, xref_offset)
+		dictionary[NameObject("/Type")] = NameObject("/XRef")
+		dictionary[NameObject("/Index")] = ArrayObject(
+			NumberObject(n) for n in (self._pages_number, 1, self._first_number, len(self._offsets))
+		)
+		dictionary[NameObject("/W")] = ArrayObject(NumberObject(n) for n in (1, width, 2))
+		dictionary[NameObject("/Filter")] = NameObject("/FlateDecode")
+		dictionary[NameObject("/Length")] = NumberObject(len(data))
+		self._out.write(b"%d 0 obj\n" % number)
+		dictionary.write_to_stream(self._out)
+		self._out.write(b"\nstream\n")
+		self._out.write(data)
+		self._out.write(b"\nendstream\nendobj\nstartxref\n%d\n%%%%EOF\n" % xref_offset)
+
+
+def append_pages_incremental(
+	stream: BinaryIO,
+	base: AppendBase,
+	readers: List[PdfReader],
+	strict: bool = False,
+) -> AppendStats:
+	"""
+	readers의 모든 페이지를 원본 끝(stream의 현재 위치)에 증분 업데이트로 씁니다.
+
+	- strict=False이면 선택 밖의 문서 구조를 가리키는 참조는 null로 끊습니다(스트리밍 병합과 같음).
+	"""
+	writer = IncrementalWriter(stream, base)
+	for reader in readers:
+		writer.add_pages(reader, range(len(reader.pages)), strict=strict)
+		writer.forget(reader)
+	return writer.close()
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from pypdf import PdfReader
+from pypdf.errors import PdfReadError
+
+from .utils import ensure_file_exists, open_pdf_reader
+
+
+# (x0, y0, x1, y1), PDF 포인트 단위
+Box = Tuple[float, float, float, float]
+
+
+@dataclass
+class PageRun:
+	"""MediaBox와 회전이 같은 연속 페이지 구간(1-기반, 양끝 포함)."""
+
+	first_page: int
+	last_page: int
+	media_box: Box
+	rotation: int
+
+
+@dataclass
+class OutlineEntry:
+	"""목차(북마크) 항목. level은 0부터 시작하는 깊이, page는 1-기반(알 수 없으면 None)."""
+
+	title: str
+	level: int
+	page: Optional[int]
+
+
+@dataclass
+class PdfInfo:
+	"""
+	PDF 메타데이터 요약.
+
+	- 페이지/목차 정보(pages, outline)를 읽지 않았거나 암호를 풀 수 없으면 None입니다.
+	- pages는 크기/회전이 같은 연속 페이지를 한 구간으로 묶은 목록입니다(페이지마다의 값과 같은 정보).
+	"""
+
+	size: int
+	version: str
+	encrypted: bool
+	page_count: Optional[int]
+	pages: Optional[List[PageRun]] = None
+	outline: Optional[List[OutlineEntry]] = None
+
+	def to_dict(self) -> Dict[str, Any]:
+		return asdict(self)
+
+
+def read_pdf_info(input_file: Path, detail: bool = True) -> PdfInfo:
+	"""
+	PDF 파일의 페이지 수, 페이지별 MediaBox/회전, 목차, 암호화 여부, 크기를 읽습니다(inspect_reader 참고).
+	"""
+	ensure_file_exists(input_file)
+	with open_pdf_reader(input_file) as reader:
+		return inspect_reader(reader, input_file.stat().st_size, detail=detail)
+
+
+def inspect_reader(reader: PdfReader, size: int, detail: bool = True) -> PdfInfo:
+	"""
+	이미 연 리더에서 메타데이터를 모읍니다.
+
+	- 트레일러/교차 참조와 페이지 트리(페이지 사전)만 읽고, 콘텐츠 스트림은 읽지 않습니다.
+	- detail=False이면 페이지 트리도 내려가지 않고 루트의 /Count만 읽습니다(문서 크기와 무관하게 즉시 끝남).
+	- 암호화된 문서는 빈 암호로 열어 보고, 열리지 않으면 암호화 여부와 크기만 채웁니다.
+	"""
+	version = reader.pdf_header.lstrip("%").replace("PDF-", "")
+	encrypted = bool(getattr(reader, "is_encrypted", False))
+	info = PdfInfo(size=size, version=version, encrypted=encrypted, page_count=None)
+	if encrypted and not _try_empty_password(reader):
+		return info
+
+	info.page_count = _page_count(reader)
+	if detail:
+		info.pages = _page_runs(reader)
+		info.page_count = sum(run.last_page - run.first_page + 1 for run in info.pages)
+		info.outline = _outline_entries(reader)
+	return info
+
+
+def _try_empty_password(reader: PdfReader) -> bool:
+	# 열람 암호 없이 권한 암호만 걸린 문서는 빈 암호로 열립니다.
+	try:
+		return bool(reader.decrypt(""))
+	except Exception:
+		return False
+
+
+def _page_count(reader: PdfReader) -> int:
+	# 루트 페이지 트리의 /Count를 먼저 쓰고, 없거나 잘못되었으면 페이지 트리를 평탄화해 셉니다.
+	try:
+		count = reader.trailer["/Root"]["/Pages"]["/Count"]
+		if isinstance(count, int) and count >= 0:
+			return int(count)
+	except (KeyError, TypeError, PdfReadError):
+		pass
+	return len(reader.pages)
+
+
+def _page_runs(reader: PdfReader) -> List[PageRun]:
+	runs: List[PageRun] = []
+	for number, page in enumerate(reader.pages, start=1):
+		media_box = tuple(_number(v) for v in page.mediabox)
+		rotation = int(page.rotation) % 360
+		last = runs[-1] if runs else None
+		if last is not None and last.media_box == media_box and last.rotation == rotation:
+			last.last_page = number
+		else:
+			runs.append(PageRun(number, number, media_box, rotation))
+	return runs
+
+
+def _outline_entries(reader: PdfReader) -> List[OutlineEntry]:
+	entries: List[OutlineEntry] = []
+
+	def walk(items: List[Any], level: int) -> None:
+		for item in items:
+			if isinstance(item, list):
+				walk(item, level + 1)
+				continue
+			try:
+				page_index = reader.get_destination_page_number(item)
+			except (KeyError, ValueError, PdfReadError):
+				page_index = None
+			entries.append(OutlineEntry(
+				title=str(item.title or ""),
+				level=level,
+				page=page_index + 1 if page_index is not None and page_index >= 0 else None,
+			))
+
+	try:
+		walk(reader.outline, 0)
+	except (KeyError, ValueError, PdfReadError):
+		# 깨진 목차는 읽은 데까지만 보고합니다.
+		pass
+	return entries
+
+
+def _number(value: Any) -> float:
+	number = float(value)
+	return int(number) if number.is_integer() else round(number, 3)
@@ -0,0 +1,785 @@
+from __future__ import annotations
+
+import os
+import re
+import time
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass
+from io import BytesIO
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, List, Optional, Set, Tuple
+
+from pypdf import PdfReader
+from pypdf.generic import (
+	ArrayObject,
+	DictionaryObject,
+	IndirectObject,
+	NameObject,
+	NullObject,
+	NumberObject,
+	PdfObject,
+	StreamObject,
+)
+
+from .profiling import span
+from .serialize import (
+	KIND_ARRAY,
+	KIND_DICT,
+	KIND_INDIRECT,
+	KIND_OTHER,
+	KIND_STREAM,
+	object_kind,
+	write_value,
+)
+from .utils import open_pdf_reader
+
+
+# 선형화(빠른 웹 보기) 출력기. 구성은 PDF 1.7 부록 F를 따릅니다.
+#
+#   헤더 | 선형화 사전 | 첫 페이지 교차 참조/트레일러 | 카탈로그와 문서 열기 객체(4부) | 힌트 스트림(5부)
+#   | 첫 페이지 객체(6부) | 나머지 페이지별 객체(7부) | 여러 페이지가 함께 쓰는 객체(8부) | 그 밖의 객체(9부)
+#   | 주 교차 참조/트레일러
+#
+# 객체 분류(어느 페이지가 쓰는가)는 qpdf의 검사(--check-linearization)와 같은 규칙을 씁니다.
+
+# (객체 번호, 세대)
+ObjectKey = Tuple[int, int]
+
+# 객체를 쓰는 쪽: ("page", 페이지 인덱스) / ("thumb", 페이지 인덱스) / ("trailer", 키) / ("root", 카탈로그 키) / ("catalog", "")
+User = Tuple[str, object]
+
+# 문서를 열 때 필요한 카탈로그 키. 여기서 닿는 객체는 카탈로그 바로 뒤(4부)에 씁니다.
+OPEN_DOCUMENT_KEYS = frozenset(("/ViewerPreferences", "/PageMode", "/Threads", "/OpenAction", "/AcroForm"))
+
+# 상속 가능한 페이지 속성. 출력에서는 페이지마다 직접 적고 페이지 트리 루트에서는 뺍니다.
+INHERITABLE_PAGE_KEYS = ("/Resources", "/MediaBox", "/CropBox", "/Rotate")
+
+# 이 크기 이상의 조각(주로 스트림 데이터)은 복사하지 않고 참조만 보관합니다.
+_PIECE_BYTES = 4096
+
+_FIRST_OBJECT = re.compile(rb"%PDF-\d\.\d[^\r\n]*[\r\n]+(?:%[^\r\n]*[\r\n]+)*\s*(\d+)\s+(\d+)\s+obj")
+_OBJECT_HEADER = re.compile(rb"(\d+)\s+(\d+)\s+obj")
+_STARTXREF = re.compile(rb"startxref\s+(\d+)\s+%%EOF\s*$")
+
+
+@dataclass
+class LinearizeReport:
+	"""선형화 결과. first_page_bytes는 첫 페이지를 그리는 데 필요한 앞부분 크기(/E)입니다."""
+
+	input_bytes: int = 0
+	output_bytes: int = 0
+	pages: int = 0
+	objects: int = 0
+	first_page_bytes: int = 0
+	hint_bytes: int = 0
+	seconds: float = 0.0
+
+	def summary(self) -> str:
+		return (
+			f"선형화: {self.input_bytes} → {self.output_bytes} bytes, 페이지 {self.pages}개, 객체 {self.objects}개, "
+			f"첫 페이지 구간 {self.first_page_bytes} bytes, 힌트 표 {self.hint_bytes} bytes, {self.seconds:.2f}초"
+		)
+
+
+def linearize_pdf(reader: PdfReader, output: BinaryIO, input_bytes: int = 0) -> LinearizeReport:
+	"""
+	reader의 문서를 선형화해 output에 씁니다.
+
+	- 첫 페이지를 그리는 데 필요한 객체와 힌트 표를 파일 앞쪽에 두어, 뷰어가 앞부분만 받고 첫 페이지를 그린 뒤
+	  나머지 페이지는 바이트 범위 요청으로 가져올 수 있게 합니다.
+	- 페이지 트리는 루트 하나로 평탄화하고 상속 속성은 페이지마다 직접 적습니다.
+	- 교차 참조 표를 쓰므로 객체 스트림은 풀어서 씁니다(최적화 뒤에 선형화하면 객체 스트림 이득은 사라짐).
+	- 트레일러의 /Root, /Info에서 닿지 않는 객체는 쓰지 않습니다.
+	"""
+	started = time.perf_counter()
+	if getattr(reader, "is_encrypted", False):
+		raise ValueError("암호화된 PDF는 선형화할 수 없습니다.")
+	document = _Document(reader)
+	layout = _Layout(document)
+	report = LinearizeReport(input_bytes=input_bytes, pages=len(document.pages), objects=layout.size - 1)
+	layout.write(output, report)
+	report.seconds = time.perf_counter() - started
+	return report
+
+
+def linearize_bytes(data: bytes) -> Tuple[bytes, LinearizeReport]:
+	"""PDF 바이트를 선형화합니다."""
+	out = BytesIO()
+	with span("linearize", bytes=len(data)):
+		report = linearize_pdf(PdfReader(BytesIO(data)), out, input_bytes=len(data))
+	return out.getvalue(), report
+
+
+def linearize_file(path: Path) -> LinearizeReport:
+	"""
+	PDF 파일을 제자리에서 선형화합니다(같은 디렉터리의 임시 파일에 쓴 뒤 교체).
+	"""
+	temp_path = path.with_name(f".{path.name}.linearizing")
+	input_bytes = path.stat().st_size
+	try:
+		with open_pdf_reader(path) as reader, temp_path.open("wb") as f_out:
+			with span("linearize", path=str(path)):
+				report = linearize_pdf(reader, f_out, input_bytes=input_bytes)
+		os.replace(temp_path, path)
+	except BaseException:
+		if temp_path.exists():
+			temp_path.unlink()
+		raise
+	return report
+
+
+def linearize_files(paths: Iterable[Path]) -> List[LinearizeReport]:
+	"""여러 PDF 파일을 제자리에서 선형화합니다. 반환 순서는 paths 순서와 같습니다."""
+	return [linearize_file(Path(path)) for path in paths]
+
+
+class _Document:
+	"""
+	출력할 객체 그래프와 객체마다의 사용처.
+
+	- 페이지 사전은 사본을 만들어 /Parent를 평탄화한 페이지 트리 루트로 바꿉니다(리더의 객체는 바꾸지 않음).
+	- 사용처는 페이지마다(다른 페이지 사전과 /Parent로는 넘어가지 않음), 트레일러 키, 카탈로그 키별로 모읍니다.
+	"""
+
+	def __init__(self, reader: PdfReader) -> None:
+		self.reader = reader
+		self._cache: Dict[ObjectKey, Optional[PdfObject]] = {}
+
+		trailer = reader.trailer
+		root_ref = trailer.raw_get("/Root")
+		if object_kind(root_ref) != KIND_INDIRECT:
+			raise ValueError("카탈로그가 간접 객체가 아닌 PDF는 선형화할 수 없습니다.")
+		self.root_key = _key(root_ref)
+		self.catalog: DictionaryObject = root_ref.get_object()
+		pages_ref = self.catalog.raw_get("/Pages")
+		if object_kind(pages_ref) != KIND_INDIRECT:
+			raise ValueError("페이지 트리 루트가 간접 객체가 아닌 PDF는 선형화할 수 없습니다.")
+		self.pages_key = _key(pages_ref)
+
+		self.pages: List[ObjectKey] = []
+		kids = ArrayObject()
+		for page in reader.pages:
+			ref = page.indirect_reference
+			key = _key(ref) if ref is not None else None
+			if key is None or key in self._cache or key == self.pages_key:
+				raise ValueError("같은 페이지 객체가 여러 번 나오는 PDF는 선형화할 수 없습니다.")
+			# pypdf는 페이지 트리를 평탄화할 때 상속 속성을 페이지 사전에 채워 둡니다.
+			copy = DictionaryObject(page)
+			copy[NameObject("/Type")] = NameObject("/Page")
+			copy[NameObject("/Parent")] = pages_ref
+			self._cache[key] = copy
+			self.pages.append(key)
+			kids.append(ref)
+		if not self.pages:
+			raise ValueError("페이지가 없는 PDF는 선형화할 수 없습니다.")
+
+		tree = DictionaryObject()
+		for name, value in pages_ref.get_object().items():
+			if name not in ("/Kids", "/Count", "/Parent") + INHERITABLE_PAGE_KEYS:
+				tree[name] = value
+		tree[NameObject("/Type")] = NameObject("/Pages")
+		tree[NameObject("/Kids")] = kids
+		tree[NameObject("/Count")] = NumberObject(len(self.pages))
+		self._cache[self.pages_key] = tree
+
+		# 첫 페이지 트레일러에 쓸 항목
+		self.trailer_items: List[Tuple[str, PdfObject]] = [
+			(name, trailer.raw_get(name)) for name in ("/Info", "/ID") if name in trailer
+		]
+
+		self.users: Dict[ObjectKey, Set[User]] = defaultdict(set)
+		self.objects_of: Dict[User, List[ObjectKey]] = defaultdict(list)
+		self.order: List[ObjectKey] = []
+		self._collect_users()
+
+	def get(self, key: ObjectKey) -> Optional[PdfObject]:
+		if key in self._cache:
+			return self._cache[key]
+		obj = self.reader.get_object(IndirectObject(key[0], key[1], self.reader))
+		if isinstance(obj, NullObject):
+			obj = None
+		self._cache[key] = obj
+		return obj
+
+	def _is_null(self, value: PdfObject) -> bool:
+		if object_kind(value) == KIND_INDIRECT:
+			return self.get(_key(value)) is None
+		return isinstance(value, NullObject)
+
+	def _collect_users(self) -> None:
+		for index, key in enumerate(self.pages):
+			self._visit(("page", index), IndirectObject(key[0], key[1], self.reader))
+		for name, value in self.trailer_items:
+			self._visit(("trailer", name), value)
+		for name, value in self.catalog.items():
+			if not self._is_null(value):
+				self._visit(("root", name), value)
+		self._record(("catalog", ""), self.root_key)
+
+	def _record(self, user: User, key: ObjectKey) -> None:
+		owners = self.users[key]
+		if not owners:
+			self.order.append(key)
+		owners.add(user)
+		self.objects_of[user].append(key)
+
+	def _visit(self, user: User, start: PdfObject) -> None:
+		seen: Set[ObjectKey] = set()
+		stack: List[Tuple[PdfObject, bool, User]] = [(start, True, user)]
+		while stack:
+			value, top, owner = stack.pop()
+			key = None
+			if object_kind(value) == KIND_INDIRECT:
+				key = _key(value)
+				value = self.get(key)
+				if value is None:
+					continue
+			kind = object_kind(value)
+			is_page = kind == KIND_DICT and value.get("/Type") == "/Page"
+			if is_page and not top:
+				# 다른 페이지(주석의 /P, 목차의 /Dest 등)로는 넘어가지 않습니다.
+				continue
+			if key is not None:
+				if key in seen:
+					continue
+				seen.add(key)
+				self._record(owner, key)
+
+			if kind == KIND_ARRAY:
+				stack.extend((item, False, owner) for item in reversed(value) if object_kind(item) != KIND_OTHER)
+			elif kind in (KIND_DICT, KIND_STREAM):
+				for name, item in reversed(list(value.items())):
+					if object_kind(item) == KIND_OTHER or self._is_null(item):
+						continue
+					if is_page and name == "/Thumb":
+						stack.append((item, False, ("thumb", owner[1])))
+					elif is_page and name == "/Parent":
+						continue
+					elif kind == KIND_STREAM and name == "/Length":
+						# /Length는 다시 계산해 직접 값으로 씁니다.
+						continue
+					else:
+						stack.append((item, False, owner))
+
+	def categories(self) -> Dict[ObjectKey, str]:
+		"""
+		객체마다 출력 위치 분류를 정합니다(부록 F의 4/6/7/8/9부에 대응).
+		"""
+		result: Dict[ObjectKey, str] = {}
+		for key in self.order:
+			open_document = in_first_page = in_outlines = is_root = False
+			other_pages = thumbs = others = 0
+			for kind, name in self.users[key]:
+				if kind == "catalog":
+					is_root = True
+				elif kind == "page":
+					if name == 0:
+						in_first_page = True
+					else:
+						other_pages += 1
+				elif kind == "thumb":
+					thumbs += 1
+				elif kind == "root" and name in OPEN_DOCUMENT_KEYS:
+					open_document = True
+				elif kind == "root" and name == "/Outlines":
+					in_outlines = True
+				else:
+					others += 1
+
+			if is_root:
+				category = "root"
+			elif in_outlines:
+				category = "outlines"
+			elif open_document:
+				category = "open"
+			elif in_first_page and others == 0 and other_pages == 0 and thumbs == 0:
+				category = "first_private"
+			elif in_first_page:
+				category = "first_shared"
+			elif other_pages == 1 and others == 0 and thumbs == 0:
+				category = "page_private"
+			elif other_pages > 1:
+				category = "page_shared"
+			elif thumbs == 1 and others == 0:
+				category = "thumb_private"
+			elif thumbs > 1:
+				category = "thumb_shared"
+			else:
+				category = "other"
+			result[key] = category
+		return result
+
+
+class _Layout:
+	"""
+	객체 배치와 번호, 힌트 표를 정하고 파일을 씁니다.
+
+	- 뒤쪽(7~9부) 객체가 1번부터, 앞쪽(선형화 사전, 4부, 힌트 스트림, 6부) 객체가 그 뒤 번호를 받습니다.
+	- 한 페이지의 객체는 페이지 객체부터 번호가 이어지도록 배치합니다(힌트 표가 개수만 적기 때문).
+	- 힌트 표의 위치 값은 힌트 스트림이 없다고 치고 셉니다. 그래서 힌트 스트림 길이를 몰라도 표를 만들 수 있습니다.
+	"""
+
+	def __init__(self, document: _Document) -> None:
+		self.document = document
+		category = document.categories()
+
+		def of(name: str) -> List[ObjectKey]:
+			return [key for key in document.order if category[key] == name]
+
+		first_page = document.pages[0]
+		self.outline_root = self._outline_root(category)
+		outlines = of("outlines")
+		if self.outline_root is not None:
+			outlines = [self.outline_root] + [key for key in outlines if key != self.outline_root]
+		self.outlines = outlines if self.outline_root is not None else []
+		use_outlines = document.catalog.get("/PageMode") == "/UseOutlines" and bool(self.outlines)
+
+		self.part4 = [document.root_key] + of("open")
+		self.part6 = [first_page] + [key for key in of("first_private") if key != first_page] + of("first_shared")
+		if use_outlines:
+			self.part6 += outlines
+		# 페이지별 구간: 첫 페이지는 6부 전체, 나머지는 페이지 객체와 그 페이지만 쓰는 객체(7부)
+		self.page_groups: List[List[ObjectKey]] = [self.part6]
+		part7: List[ObjectKey] = []
+		for index, page in enumerate(document.pages[1:], start=1):
+			group = [page] + [
+				key for key in document.objects_of[("page", index)]
+				if key != page and category[key] == "page_private"
+			]
+			self.page_groups.append(group)
+			part7 += group
+		self.part8 = of("page_shared")
+		tree = [key for key in document.objects_of[("root", "/Pages")] if category[key] == "other"]
+		part9 = tree + of("thumb_private") + of("thumb_shared")
+		if not use_outlines:
+			part9 += outlines
+		tree_keys = set(tree)
+		part9 += [key for key in of("other") if key not in tree_keys]
+
+		second = part7 + self.part8 + part9
+		placed = len(self.part4) + len(self.part6) + len(second)
+		if placed != len(category) or len(set(self.part4 + self.part6 + second)) != placed:
+			raise RuntimeError("선형화 객체 배치가 맞지 않습니다.")
+
+		# 번호: 뒤쪽 1..K, 앞쪽 K+1(선형화 사전)부터
+		self.numbers: Dict[ObjectKey, int] = {key: number for number, key in enumerate(second, start=1)}
+		self.first_section = len(second) + 1
+		number = self.first_section + 1
+		for key in self.part4:
+			self.numbers[key] = number
+			number += 1
+		self.hint_number = number
+		number += 1
+		for key in self.part6:
+			self.numbers[key] = number
+			number += 1
+		self.size = number
+		self.second = second
+
+	def _outline_root(self, category: Dict[ObjectKey, str]) -> Optional[ObjectKey]:
+		catalog = self.document.catalog
+		ref = catalog.raw_get("/Outlines") if "/Outlines" in catalog else None
+		if object_kind(ref) != KIND_INDIRECT or category.get(_key(ref)) != "outlines":
+			return None
+		return _key(ref)
+
+	def _remap(self, ref: IndirectObject) -> int:
+		return self.numbers.get((ref.idnum, ref.generation), 0)
+
+	def _pieces(self, key: ObjectKey) -> _Pieces:
+		pieces = _Pieces()
+		pieces.write(b"%d 0 obj\n" % self.numbers[key])
+		write_value(pieces, self.document.get(key), self._remap)
+		pieces.write(b"\nendobj\n")
+		pieces.close()
+		return pieces
+
+	def write(self, output: BinaryIO, report: LinearizeReport) -> None:
+		document = self.document
+		header = _header(document.reader)
+		trailer_extra = BytesIO()
+		for name, value in document.trailer_items:
+			trailer_extra.write(b" %s " % name.encode("ascii"))
+			write_value(trailer_extra, value, self._remap)
+		first_count = self.size - self.first_section
+
+		def linearization_dict(length: int, hint: Tuple[int, int], first_page_end: int, main_xref_item: int) -> bytes:
+			return b"%d 0 obj\n<< /Linearized 1 /L %10d /H [ %10d %10d ] /O %d /E %10d /N %d /T %10d >>\nendobj\n" % (
+				self.first_section, length, hint[0], hint[1], self.numbers[document.pages[0]],
+				first_page_end, len(document.pages), main_xref_item,
+			)
+
+		def first_trailer(main_xref: int) -> bytes:
+			return b"trailer\n<< /Size %d /Root %d 0 R%s /Prev %10d >>\nstartxref\n0\n%%%%EOF\n" % (
+				self.size, self.numbers[document.root_key], trailer_extra.getvalue(), main_xref,
+			)
+
+		first_xref_offset = len(header) + len(linearization_dict(0, (0, 0), 0, 0))
+		first_xref_head = b"xref\n%d %d\n" % (self.first_section, first_count)
+		position = first_xref_offset + len(first_xref_head) + 20 * first_count + len(first_trailer(0))
+
+		# 1) 객체 직렬화와 (힌트 스트림이 없다고 친) 위치 계산
+		bodies: Dict[ObjectKey, _Pieces] = {}
+		offsets: Dict[int, int] = {}
+		for key in self.part4:
+			bodies[key] = self._pieces(key)
+			offsets[self.numbers[key]] = position
+			position += bodies[key].length
+		hint_offset = position
+		for key in self.part6 + self.second:
+			bodies[key] = self._pieces(key)
+			offsets[self.numbers[key]] = position
+			position += bodies[key].length
+		main_xref_adjusted = position
+
+		# 2) 힌트 스트림
+		hint_data, shared_offset, outline_offset = self._hint_tables(bodies, offsets)
+		compressed = zlib.compress(hint_data, 9)
+		outline_entry = b" /O %d" % outline_offset if outline_offset is not None else b""
+		hint_object = b"%d 0 obj\n<< /S %d%s /Filter /FlateDecode /Length %d >>\nstream\n" % (
+			self.hint_number, shared_offset, outline_entry, len(compressed),
+		) + compressed + b"\nendstream\nendobj\n"
+		hint_length = len(hint_object)
+
+		# 3) 실제 위치: 힌트 스트림 뒤의 객체는 그 길이만큼 밀립니다.
+		for number, offset in offsets.items():
+			if offset >= hint_offset:
+				offsets[number] = offset + hint_length
+		offsets[self.hint_number] = hint_offset
+		first_page_end = hint_offset + hint_length + sum(bodies[key].length for key in self.part6)
+		main_xref = main_xref_adjusted + hint_length
+		main_xref_head = b"xref\n0 %d" % self.first_section
+		main_block = (
+			main_xref_head + b"\n0000000000 65535 f \n"
+			+ b"".join(b"%010d 00000 n \n" % offsets[number] for number in range(1, self.first_section))
+			+ b"trailer\n<< /Size %d >>\nstartxref\n%d\n%%%%EOF\n" % (self.first_section, first_xref_offset)
+		)
+		length = main_xref + len(main_block)
+		offsets[self.first_section] = len(header)
+
+		# 4) 기록
+		output.write(header)
+		output.write(linearization_dict(length, (hint_offset, hint_length), first_page_end, main_xref + len(main_xref_head)))
+		output.write(first_xref_head)
+		output.write(b"".join(b"%010d 00000 n \n" % offsets[number] for number in range(self.first_section, self.size)))
+		output.write(first_trailer(main_xref))
+		for key in self.part4:
+			bodies.pop(key).write_to(output)
+		output.write(hint_object)
+		for key in self.part6 + self.second:
+			bodies.pop(key).write_to(output)
+		output.write(main_block)
+
+		report.output_bytes = length
+		report.first_page_bytes = first_page_end
+		report.hint_bytes = hint_length
+
+	def _hint_tables(self, bodies: Dict[ObjectKey, _Pieces], offsets: Dict[int, int]) -> Tuple[bytes, int, Optional[int]]:
+		"""
+		페이지 오프셋 힌트 표, 공유 객체 힌트 표, (목차가 있으면) 목차 힌트 표를 만듭니다.
+
+		- 반환값: (표 데이터, 공유 객체 표 시작 위치 /S, 목차 표 시작 위치 /O 또는 None)
+		- 공유 객체 표는 6부 객체 전부(첫 페이지 몫) 뒤에 8부 객체를 한 객체씩 한 묶음으로 적습니다.
+		"""
+		document = self.document
+		shared = self.part6 + self.part8
+		shared_index = {key: index for index, key in enumerate(shared)}
+		counts = [len(group) for group in self.page_groups]
+		lengths = [sum(bodies[key].length for key in group) for group in self.page_groups]
+		identifiers: List[List[int]] = [[]]
+		for index in range(1, len(document.pages)):
+			identifiers.append([
+				shared_index[key] for key in document.objects_of[("page", index)]
+				if key in shared_index and len(document.users[key]) > 1
+			])
+
+		min_count, min_length = min(counts), min(lengths)
+		count_bits = _nbits(max(counts) - min_count)
+		length_bits = _nbits(max(lengths) - min_length)
+		shared_count_bits = _nbits(max(len(ids) for ids in identifiers))
+		identifier_bits = _nbits(len(shared))
+
+		bits = _BitWriter()
+		# 페이지 오프셋 힌트 표 머리(표 F.3). 콘텐츠 스트림 위치/길이는 Acrobat처럼 페이지 값으로 채웁니다.
+		bits.write(min_count, 32)
+		bits.write(offsets[self.numbers[document.pages[0]]], 32)
+		bits.write(count_bits, 16)
+		bits.write(min_length, 32)
+		bits.write(length_bits, 16)
+		bits.write(0, 32)
+		bits.write(0, 16)
+		bits.write(min_length, 32)
+		bits.write(length_bits, 16)
+		bits.write(shared_count_bits, 16)
+		bits.write(identifier_bits, 16)
+		bits.write(0, 16)
+		bits.write(1, 16)
+		# 페이지별 항목(표 F.4). 항목마다 모든 페이지 값을 잇달아 쓰고 바이트 경계에 맞춥니다.
+		bits.write_all([count - min_count for count in counts], count_bits)
+		bits.write_all([length - min_length for length in lengths], length_bits)
+		bits.write_all([len(ids) for ids in identifiers], shared_count_bits)
+		bits.write_all([index for ids in identifiers for index in ids], identifier_bits)
+		bits.flush()
+		bits.write_all([length - min_length for length in lengths], length_bits)
+
+		# 공유 객체 힌트 표(표 F.5, F.6)
+		shared_offset = bits.tell()
+		group_lengths = [bodies[key].length for key in shared]
+		min_group = min(group_lengths)
+		group_bits = _nbits(max(group_lengths) - min_group)
+		first_shared = self.part8[0] if self.part8 else None
+		bits.write(self.numbers[first_shared] if first_shared else 0, 32)
+		bits.write(offsets[self.numbers[first_shared]] if first_shared else 0, 32)
+		bits.write(len(self.part6), 32)
+		bits.write(len(shared), 32)
+		bits.write(0, 16)
+		bits.write(min_group, 32)
+		bits.write(group_bits, 16)
+		bits.write_all([length - min_group for length in group_lengths], group_bits)
+		bits.write_all([0] * len(shared), 1)
+
+		# 목차 힌트 표(일반 힌트 표, 표 F.11)
+		outline_offset = None
+		if self.outlines:
+			outline_offset = bits.tell()
+			first = self.numbers[self.outlines[0]]
+			outline_users = document.objects_of[("root", "/Outlines")]
+			end = max(offsets[self.numbers[key]] + bodies[key].length for key in outline_users)
+			bits.write(first, 32)
+			bits.write(offsets[first], 32)
+			bits.write(len(self.outlines), 32)
+			bits.write(end - offsets[first], 32)
+		return bits.getvalue(), shared_offset, outline_offset
+
+
+class _Pieces:
+	"""
+	직렬화한 객체 조각 목록. 작은 조각은 이어 붙이고 큰 조각(스트림 데이터)은 복사하지 않고 참조합니다.
+	"""
+
+	def __init__(self) -> None:
+		self._parts: List[bytes] = []
+		self._buffer = bytearray()
+		self.length = 0
+
+	def write(self, data: bytes) -> None:
+		self.length += len(data)
+		if len(data) >= _PIECE_BYTES:
+			self.close()
+			self._parts.append(data)
+		else:
+			self._buffer += data
+
+	def close(self) -> None:
+		if self._buffer:
+			self._parts.append(bytes(self._buffer))
+			self._buffer = bytearray()
+
+	def write_to(self, output: BinaryIO) -> None:
+		for part in self._parts:
+			output.write(part)
+
+
+class _BitWriter:
+	"""힌트 표용 비트 단위 출력(상위 비트부터)."""
+
+	def __init__(self) -> None:
+		self._data = bytearray()
+		self._value = 0
+		self._bits = 0
+
+	def write(self, value: int, bits: int) -> None:
+		if bits == 0:
+			return
+		self._value = (self._value << bits) | value
+		self._bits += bits
+		while self._bits >= 8:
+			self._bits -= 8
+			self._data.append((self._value >> self._bits) & 0xFF)
+		self._value &= (1 << self._bits) - 1
+
+	def write_all(self, values: Iterable[int], bits: int) -> None:
+		for value in values:
+			self.write(value, bits)
+		self.flush()
+
+	def flush(self) -> None:
+		if self._bits:
+			self._data.append((self._value << (8 - self._bits)) & 0xFF)
+			self._value = 0
+			self._bits = 0
+
+	def tell(self) -> int:
+		self.flush()
+		return len(self._data)
+
+	def getvalue(self) -> bytes:
+		self.flush()
+		return bytes(self._data)
+
+
+class _BitReader:
+	def __init__(self, data: bytes, offset: int = 0) -> None:
+		self._data = data
+		self._bit = offset * 8
+
+	def read(self, bits: int) -> int:
+		value = 0
+		for _ in range(bits):
+			byte = self._data[self._bit >> 3] if (self._bit >> 3) < len(self._data) else 0
+			value = (value << 1) | ((byte >> (7 - (self._bit & 7))) & 1)
+			self._bit += 1
+		return value
+
+	def read_all(self, count: int, bits: int) -> List[int]:
+		values = [self.read(bits) for _ in range(count)]
+		self.align()
+		return values
+
+	def align(self) -> None:
+		self._bit = (self._bit + 7) & ~7
+
+
+def check_linearized(data: bytes) -> List[str]:
+	"""
+	data가 올바르게 선형화되었는지 검사하고 문제 목록을 반환합니다(빈 목록이면 통과).
+
+	- 선형화 사전의 /L(파일 크기), /N(페이지 수), /O(첫 페이지 객체), /T(주 교차 참조 첫 항목), /H(힌트 스트림), /E(첫 페이지 구간 끝)
+	- 힌트 표가 적은 페이지별 객체 수/길이, 공유 객체 길이, 목차 위치가 실제 객체 위치와 맞는지
+	"""
+	match = _FIRST_OBJECT.match(data[:1024])
+	if match is None:
+		return ["파일 앞 1024바이트 안에 첫 객체가 없습니다."]
+	reader = PdfReader(BytesIO(data))
+	params = reader.get_object(int(match.group(1)))
+	if not isinstance(params, DictionaryObject) or "/Linearized" not in params:
+		return ["첫 객체가 선형화 사전이 아닙니다."]
+
+	problems: List[str] = []
+	pages = reader.pages
+	first_page = pages[0].indirect_reference.idnum
+	if params.get("/L") != len(data):
+		problems.append(f"/L({params.get('/L')})이 파일 크기({len(data)})와 다릅니다.")
+	if params.get("/N") != len(pages):
+		problems.append(f"/N({params.get('/N')})이 페이지 수({len(pages)})와 다릅니다.")
+	if params.get("/O") != first_page:
+		problems.append(f"/O({params.get('/O')})가 첫 페이지 객체({first_page})와 다릅니다.")
+
+	main_item = int(params.get("/T", 0))
+	while main_item < len(data) and data[main_item:main_item + 1] in b" \r\n":
+		main_item += 1
+	if not data.startswith(b"0000000000 65535 f", main_item):
+		problems.append("/T가 주 교차 참조 표의 첫 항목 앞을 가리키지 않습니다.")
+
+	# 객체 길이: 다음 객체(또는 교차 참조 표) 시작까지
+	offsets = dict(reader.xref.get(0, {}))
+	boundaries = set(offsets.values()) | {len(data), data.rfind(b"xref", 0, main_item + 1)}
+	tail = _STARTXREF.search(data[-64:])
+	if tail is not None:
+		boundaries.add(int(tail.group(1)))
+	ordered = sorted(boundaries)
+
+	def length_of(number: int) -> int:
+		if number not in offsets:
+			problems.append(f"{number}번 객체가 교차 참조에 없습니다.")
+			return 0
+		start = offsets[number]
+		return next(b for b in ordered if b > start) - start
+
+	hint = params.get("/H")
+	if not isinstance(hint, ArrayObject) or len(hint) < 2:
+		return problems + ["/H가 없습니다."]
+	hint_offset, hint_length = int(hint[0]), int(hint[1])
+	header = _OBJECT_HEADER.match(data, hint_offset)
+	if header is None:
+		return problems + ["/H가 힌트 스트림 객체를 가리키지 않습니다."]
+	hint_number = int(header.group(1))
+	if length_of(hint_number) != hint_length:
+		problems.append(f"힌트 스트림 길이가 /H({hint_length})와 다릅니다({length_of(hint_number)}).")
+	hint_stream = reader.get_object(hint_number)
+	if not isinstance(hint_stream, StreamObject):
+		return problems + ["힌트 스트림이 스트림이 아닙니다."]
+	tables = hint_stream.get_data()
+
+	def actual(offset: int) -> int:
+		return offset + hint_length if offset >= hint_offset else offset
+
+	# 페이지 오프셋 힌트 표
+	bits = _BitReader(tables)
+	min_count, first_offset, count_bits, min_length, length_bits = (
+		bits.read(32), bits.read(32), bits.read(16), bits.read(32), bits.read(16)
+	)
+	bits.read(32), bits.read(16), bits.read(32), bits.read(16)
+	shared_count_bits, identifier_bits, numerator_bits = bits.read(16), bits.read(16), bits.read(16)
+	bits.read(16)
+	counts = [min_count + value for value in bits.read_all(len(pages), count_bits)]
+	lengths = [min_length + value for value in bits.read_all(len(pages), length_bits)]
+	shared_counts = bits.read_all(len(pages), shared_count_bits)
+	identifiers = bits.read_all(sum(shared_counts), identifier_bits)
+
+	if actual(first_offset) != offsets.get(first_page):
+		problems.append("페이지 힌트 표의 첫 페이지 위치가 실제와 다릅니다.")
+	for index, page in enumerate(pages):
+		number = page.indirect_reference.idnum
+		length = sum(length_of(number + i) for i in range(counts[index]))
+		if length != lengths[index]:
+			problems.append(f"{index + 1}페이지 길이가 힌트 표({lengths[index]})와 다릅니다({length}).")
+	if shared_counts and shared_counts[0]:
+		problems.append("첫 페이지에 공유 객체 항목이 있습니다.")
+
+	first_page_end = offsets.get(first_page, 0) + lengths[0]
+	trimmed = first_page_end
+	while trimmed > 0 and data[trimmed - 1:trimmed] in b" \r\n":
+		trimmed -= 1
+	if not trimmed <= int(params.get("/E", -1)) <= first_page_end:
+		problems.append(f"/E({params.get('/E')})가 첫 페이지 구간 끝({first_page_end})과 다릅니다.")
+
+	# 공유 객체 힌트 표
+	bits = _BitReader(tables, int(hint_stream.get("/S", 0)))
+	first_shared, first_shared_offset, shared_first_page, shared_total = (
+		bits.read(32), bits.read(32), bits.read(32), bits.read(32)
+	)
+	group_count_bits, min_group, group_bits = bits.read(16), bits.read(32), bits.read(16)
+	group_lengths = [min_group + value for value in bits.read_all(shared_total, group_bits)]
+	if shared_first_page != counts[0]:
+		problems.append("공유 객체 힌트 표의 첫 페이지 객체 수가 페이지 힌트 표와 다릅니다.")
+	if group_count_bits != 0:
+		problems.append("공유 객체 묶음이 객체 하나가 아닙니다.")
+	if shared_total > shared_first_page and actual(first_shared_offset) != offsets.get(first_shared):
+		problems.append("공유 객체 힌트 표의 첫 공유 객체 위치가 실제와 다릅니다.")
+	for index, group_length in enumerate(group_lengths):
+		if index < shared_first_page:
+			number = first_page + index
+		else:
+			number = first_shared + index - shared_first_page
+		if length_of(number) != group_length:
+			problems.append(f"공유 객체 {index}의 길이가 힌트 표와 다릅니다.")
+	if any(index >= shared_total for index in identifiers):
+		problems.append("페이지 힌트 표가 없는 공유 객체를 가리킵니다.")
+
+	# 목차 힌트 표
+	catalog = reader.trailer["/Root"]
+	outlines = catalog.raw_get("/Outlines") if "/Outlines" in catalog else None
+	if isinstance(outlines, IndirectObject):
+		if "/O" not in hint_stream:
+			problems.append("목차가 있는데 목차 힌트 표가 없습니다.")
+		else:
+			bits = _BitReader(tables, int(hint_stream["/O"]))
+			first, first_offset = bits.read(32), bits.read(32)
+			if first != outlines.idnum or actual(first_offset) != offsets.get(first):
+				problems.append("목차 힌트 표의 첫 객체가 목차 루트와 다릅니다.")
+	return problems
+
+
+def _key(ref: IndirectObject) -> ObjectKey:
+	return (ref.idnum, ref.generation)
+
+
+def _nbits(value: int) -> int:
+	return value.bit_length()
+
+
+def _header(reader: PdfReader) -> bytes:
+	version = reader.pdf_header if re.fullmatch(r"%PDF-\d\.\d", reader.pdf_header or "") else "%PDF-1.7"
+	return version.encode("ascii") + b"\n%\xe2\xe3\xcf\xd3\n"
@@ -1,19 +1,38 @@
 from __future__ import annotations
 
+import os
+from contextlib import ExitStack
 from pathlib import Path
-from typing import Iterable, List
+from typing import Iterable, List, Optional
 
-from pypdf import PdfReader, PdfWriter
+from pypdf import PdfWriter
 
-from .utils import ensure_file_exists, ensure_output_directory_exists, assert_can_write
+from .dedupe import DedupeStats, dedupe_writer
+from .incremental import AppendStats, append_pages_incremental, read_append_base
+from .passthrough import (
+	PassthroughStats,
+	PassthroughUnsupported,
+	PassthroughWriter,
+	write_pages_passthrough,
+)
+from .profiling import span
+from .utils import ensure_file_exists, ensure_output_directory_exists, assert_can_write, open_pdf_reader
 
 
-def merge_pdfs(input_files: Iterable[Path], output_file: Path, overwrite: bool = False) -> None:
+def merge_pdfs(
+	input_files: Iterable[Path],
+	output_file: Path,
+	overwrite: bool = False,
+	dedupe: bool = False,
+) -> Optional[DedupeStats]:
 	"""
 	여러 PDF 파일을 순서대로 병합합니다.
 
 	- 입력 파일은 2개 이상이어야 합니다.
 	- 이미 존재하는 출력 파일은 --overwrite 옵션이 없으면 덮어쓰지 않습니다.
+	- dedupe=True이면 입력 간에 내용이 같은 객체(글꼴, 이미지 등)를 하나로 합치고 그 결과를 반환합니다.
+	- 변환이 없는 단순 병합은 원본 객체를 번호만 바꿔 복사하는 고속 경로를 사용하며,
+	  특이한 입력이면 pypdf PdfWriter 경로로 대체합니다.
 	"""
 	# 입력 목록 전처리 및 검증
 	input_paths: List[Path] = [Path(p) for p in input_files]
@@ -26,17 +45,134 @@ def merge_pdfs(input_files: Iterable[Path], output_file: Path, overwrite: bool =
 	ensure_output_directory_exists(output_file)
 	assert_can_write(output_file, overwrite)
 
-	writer = PdfWriter()
+	with ExitStack() as stack:
+		readers = []
+		for path in input_paths:
+			reader = stack.enter_context(open_pdf_reader(path))
 
+			# 암호화된 파일은 처리하지 않음
+			if getattr(reader, "is_encrypted", False):
+				raise PermissionError(f"암호화된 PDF는 병합할 수 없습니다: {path}")
+			readers.append(reader)
+
+		if not dedupe:
+			try:
+				with output_file.open("wb") as f_out:
+					write_pages_passthrough(f_out, [(reader, range(len(reader.pages))) for reader in readers])
+				return None
+			except PassthroughUnsupported:
+				# 아래 PdfWriter 경로가 출력 파일을 처음부터 다시 씁니다.
+				pass
+
+		writer = PdfWriter()
+		for reader in readers:
+			for page in reader.pages:
+				with span("add_page"):
+					writer.add_page(page)
+
+		stats = None
+		if dedupe:
+			with span("dedupe"):
+				stats = dedupe_writer(writer)
+
+		with output_file.open("wb") as f_out, span("write", path=str(output_file)):
+			writer.write(f_out)
+
+	return stats
+
+
+def append_pdfs(
+	base_file: Path,
+	input_files: Iterable[Path],
+) -> AppendStats:
+	"""
+	기존 PDF 끝에 다른 PDF들의 페이지를 증분 업데이트로 덧붙입니다(base_file을 제자리에서 수정).
+
+	- 원본 바이트는 그대로 두고 새 객체, 갱신한 페이지 트리 루트, 새 교차 참조 구간만 파일 끝에 씁니다.
+	  원본이 교차 참조 스트림을 쓰면 같은 형식으로 씁니다.
+	- 원본은 페이지 트리 루트만 읽으므로 시간이 원본 크기가 아니라 덧붙이는 페이지에 비례합니다.
+	- 쓰는 도중 실패하면 파일을 원래 길이로 잘라 되돌립니다.
+	"""
+	base_path = Path(base_file)
+	input_paths: List[Path] = [Path(p) for p in input_files]
+	if not input_paths:
+		raise ValueError("덧붙일 입력 파일이 최소 1개 필요합니다.")
+
+	ensure_file_exists(base_path)
 	for path in input_paths:
-		reader = PdfReader(str(path))
+		ensure_file_exists(path)
+		if path.resolve() == base_path.resolve():
+			raise ValueError(f"원본 파일을 자기 자신에 덧붙일 수 없습니다: {path}")
+
+	# 원본 매핑은 쓰기 전에 닫습니다(매핑된 파일은 플랫폼에 따라 자르기/늘리기가 막힘).
+	with open_pdf_reader(base_path) as reader:
+		base = read_append_base(reader, base_path.stat().st_size)
+
+	with ExitStack() as stack:
+		readers = []
+		for path in input_paths:
+			reader = stack.enter_context(open_pdf_reader(path))
+			if getattr(reader, "is_encrypted", False):
+				raise PermissionError(f"암호화된 PDF는 덧붙일 수 없습니다: {path}")
+			readers.append(reader)
 
-		# 암호화된 파일은 처리하지 않음
-		if getattr(reader, "is_encrypted", False):
-			raise PermissionError(f"암호화된 PDF는 병합할 수 없습니다: {path}")
+		with base_path.open("r+b") as f_out:
+			f_out.seek(base.size)
+			try:
+				return append_pages_incremental(f_out, base, readers)
+			except PassthroughUnsupported as e:
+				f_out.truncate(base.size)
+				raise ValueError(f"덧붙일 수 없는 PDF입니다: {e}")
+			except BaseException:
+				f_out.truncate(base.size)
+				raise
+
+
+def merge_pdfs_streaming(
+	input_files: Iterable[Path],
+	output_file: Path,
+	overwrite: bool = False,
+	strict: bool = True,
+) -> PassthroughStats:
+	"""
+	수천 개의 입력도 일정한 메모리로 병합하는 스트리밍 병합입니다.
+
+	- 입력을 하나씩 열어 그 객체들을 곧바로 출력에 쓰고, 다 쓴 리더(파일 핸들 포함)는 바로 닫습니다.
+	- 메모리에는 객체 오프셋과 페이지 번호 목록만 남으며, 교차 참조 표/트레일러는 마지막에 씁니다.
+	- 출력은 같은 디렉터리의 임시 파일에 쓰고 성공하면 교체하므로, 실패해도 잘린 출력이 남지 않습니다.
+	- 입력 전체를 메모리에 모으지 않으므로 PdfWriter로 대체할 수 없습니다. 선택 밖 문서 구조를 가리키는
+	  참조(페이지 트리 밖의 페이지로 가는 링크 등)가 있으면 기본(strict=True)은 ValueError로 실패하고,
+	  strict=False이면 null로 끊고 계속 씁니다(끊은 수는 반환값의 nulled_refs).
+	"""
+	input_paths: List[Path] = [Path(p) for p in input_files]
+	if len(input_paths) < 2:
+		raise ValueError("병합에는 최소 2개의 입력 파일이 필요합니다.")
+
+	for path in input_paths:
+		ensure_file_exists(path)
+
+	ensure_output_directory_exists(output_file)
+	assert_can_write(output_file, overwrite)
 
-		for page in reader.pages:
-			writer.add_page(page)
+	temp_path = output_file.with_name(f".{output_file.name}.merging")
+	try:
+		with temp_path.open("wb") as f_out:
+			writer = PassthroughWriter(f_out)
+			for path in input_paths:
+				with open_pdf_reader(path) as reader:
+					if getattr(reader, "is_encrypted", False):
+						raise PermissionError(f"암호화된 PDF는 병합할 수 없습니다: {path}")
+					try:
+						writer.add_pages(reader, range(len(reader.pages)), strict=strict)
+					except PassthroughUnsupported as e:
+						raise ValueError(f"스트리밍 병합으로 처리할 수 없는 PDF입니다: {path} ({e})")
+					finally:
+						writer.forget(reader)
+			stats = writer.close()
+		os.replace(temp_path, output_file)
+	except BaseException:
+		if temp_path.exists():
+			temp_path.unlink()
+		raise
+	return stats
 
-	with output_file.open("wb") as f_out:
-		writer.write(f_out)
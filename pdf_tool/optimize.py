@@ -0,0 +1,416 @@
+from __future__ import annotations
+
+import os
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from io import BytesIO
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, List, Optional, Tuple
+
+from pypdf import PdfReader
+from pypdf.generic import (
+	ArrayObject,
+	DictionaryObject,
+	IndirectObject,
+	NameObject,
+	NumberObject,
+	PdfObject,
+	StreamObject,
+)
+
+from .dedupe import find_identical
+from .profiling import span
+from .serialize import (
+	KIND_ARRAY,
+	KIND_DICT,
+	KIND_INDIRECT,
+	KIND_OTHER,
+	KIND_STREAM,
+	object_kind,
+	stream_raw_data,
+	write_stream,
+	write_value,
+)
+from .utils import open_pdf_reader
+
+
+OPTIMIZE_LEVELS = ("off", "basic", "max")
+DEFAULT_COMPRESS_LEVELS = {"off": 0, "basic": 6, "max": 9}
+
+# 객체 스트림 하나에 넣을 최대 객체 수
+OBJECT_STREAM_SIZE = 100
+
+# (객체 번호, 세대)
+ObjectKey = Tuple[int, int]
+
+
+@dataclass(frozen=True)
+class OptimizeOptions:
+	"""
+	출력 크기 최적화 수준.
+
+	- "off": 최적화하지 않음
+	- "basic" / "basic:N": 쓰지 않는 객체 제거, 내용이 같은 객체 합치기, 객체 스트림과 교차 참조 스트림 사용,
+	  압축되지 않은 스트림을 Flate 레벨 N(기본 6)으로 압축
+	- "max" / "max:N": basic에 더해 이미 Flate로 압축된 스트림도 레벨 N(기본 9)으로 다시 압축해 작아지면 교체
+	"""
+
+	level: str = "off"
+	compress_level: int = 0
+
+	@classmethod
+	def parse(cls, text: Optional[str]) -> "OptimizeOptions":
+		value = (text or "off").strip().lower()
+		name, _, level_text = value.partition(":")
+		if name == "off" and level_text == "":
+			return cls()
+		if name in ("basic", "max"):
+			if level_text == "":
+				return cls(name, DEFAULT_COMPRESS_LEVELS[name])
+			try:
+				level = int(level_text)
+			except ValueError:
+				level = -1
+			if 0 <= level <= 9:
+				return cls(name, level)
+		raise ValueError(f"잘못된 최적화 수준입니다: '{text}' (off | basic[:0-9] | max[:0-9])")
+
+	def __str__(self) -> str:
+		return "off" if self.level == "off" else f"{self.level}:{self.compress_level}"
+
+	@property
+	def enabled(self) -> bool:
+		return self.level != "off"
+
+
+@dataclass
+class OptimizeReport:
+	"""최적화 결과. kept_original이 참이면 최적화 결과가 더 커서 원본을 그대로 두었습니다."""
+
+	options: str
+	input_bytes: int = 0
+	output_bytes: int = 0
+	objects_dropped: int = 0
+	objects_merged: int = 0
+	streams_compressed: int = 0
+	object_streams: int = 0
+	seconds: float = 0.0
+	kept_original: bool = False
+
+	def summary(self) -> str:
+		saved = self.input_bytes - self.output_bytes
+		ratio = 100.0 * saved / max(self.input_bytes, 1)
+		text = (
+			f"최적화({self.options}): {self.input_bytes} → {self.output_bytes} bytes ({-ratio:+.1f}%), "
+			f"미사용 객체 {self.objects_dropped}개 제거, 같은 객체 {self.objects_merged}개 합침, "
+			f"스트림 {self.streams_compressed}개 압축, 객체 스트림 {self.object_streams}개, {self.seconds:.2f}초"
+		)
+		if self.kept_original:
+			text += " (더 작아지지 않아 원본 유지)"
+		return text
+
+
+def optimize_pdf(reader: PdfReader, output: BinaryIO, options: OptimizeOptions, input_bytes: int = 0) -> OptimizeReport:
+	"""
+	reader의 문서를 크기를 줄여 output에 다시 씁니다(항상 새로 쓰며 원본 유지 여부는 호출자가 판단).
+
+	- 트레일러의 /Root, /Info에서 닿는 객체만 씁니다(쓰지 않는 객체 제거).
+	- 내용이 같은 객체는 하나로 합칩니다(dedupe.find_identical).
+	- 스트림이 아닌 객체는 압축한 객체 스트림에 모으고, 교차 참조 표 대신 교차 참조 스트림을 씁니다(PDF 1.5+).
+	- 압축되지 않은 스트림(XMP 메타데이터 제외)은 Flate로 압축하고, max면 Flate 스트림도 다시 압축합니다.
+	"""
+	started = time.perf_counter()
+	if getattr(reader, "is_encrypted", False):
+		raise ValueError("암호화된 PDF는 최적화할 수 없습니다.")
+	report = OptimizeReport(options=str(options), input_bytes=input_bytes)
+
+	trailer = reader.trailer
+	roots = [trailer.raw_get("/Root")]
+	info_ref = trailer.raw_get("/Info") if "/Info" in trailer else None
+	if isinstance(info_ref, IndirectObject):
+		roots.append(info_ref)
+
+	# 1) 닿는 객체 수집 (발견 순서가 곧 출력 순서)
+	order, objects = _reachable(roots)
+	report.objects_dropped = _dropped_count(reader, objects)
+	ordinal: Dict[ObjectKey, int] = {key: index + 1 for index, key in enumerate(order)}
+
+	def number_of(ref: IndirectObject) -> int:
+		return ordinal.get((ref.idnum, ref.generation), 0)
+
+	# 2) 같은 객체 합치기 (문서 정보 사전은 제외)
+	protected = {number_of(ref) for ref in roots}
+	candidates = {
+		ordinal[key]: obj
+		for key, obj in objects.items()
+		if obj is not None and ordinal[key] not in protected
+	}
+	canonical, _ = find_identical(candidates, number_of)
+	report.objects_merged = len(canonical)
+
+	# 3) 남은 객체에 빈틈없는 번호 배정
+	writer = _CompactWriter(output, options, report)
+	out_numbers: Dict[int, int] = {}
+	for index in range(1, len(order) + 1):
+		if index not in canonical:
+			out_numbers[index] = writer.allocate()
+	for index, target in canonical.items():
+		out_numbers[index] = out_numbers[target]
+
+	def remap(ref: IndirectObject) -> int:
+		number = out_numbers.get(number_of(ref))
+		return number if number is not None else writer.null_number()
+
+	# 4) 기록
+	for index, key in enumerate(order, start=1):
+		if index in canonical:
+			continue
+		writer.write_object(out_numbers[index], objects[key], remap)
+
+	extra = DictionaryObject()
+	if isinstance(info_ref, IndirectObject):
+		extra[NameObject("/Info")] = info_ref
+	if isinstance(trailer.get("/ID"), ArrayObject):
+		extra[NameObject("/ID")] = trailer["/ID"]
+	writer.close(remap(roots[0]), extra, remap)
+
+	report.output_bytes = writer.position
+	report.seconds = time.perf_counter() - started
+	return report
+
+
+def optimize_bytes(data: bytes, options: OptimizeOptions) -> Tuple[bytes, OptimizeReport]:
+	"""
+	PDF 바이트를 최적화합니다. 결과가 더 크면 원본 바이트를 그대로 반환합니다.
+	"""
+	out = BytesIO()
+	with span("optimize", bytes=len(data)):
+		report = optimize_pdf(PdfReader(BytesIO(data)), out, options, input_bytes=len(data))
+	if report.output_bytes >= len(data):
+		report.kept_original = True
+		report.output_bytes = len(data)
+		return data, report
+	return out.getvalue(), report
+
+
+def optimize_file(path: Path, options: OptimizeOptions) -> OptimizeReport:
+	"""
+	PDF 파일을 제자리에서 최적화합니다(같은 디렉터리의 임시 파일에 쓴 뒤 교체, 더 크면 원본 유지).
+	"""
+	temp_path = path.with_name(f".{path.name}.optimizing")
+	input_bytes = path.stat().st_size
+	try:
+		with open_pdf_reader(path) as reader, temp_path.open("wb") as f_out:
+			with span("optimize", path=str(path)):
+				report = optimize_pdf(reader, f_out, options, input_bytes=input_bytes)
+		if report.output_bytes >= input_bytes:
+			report.kept_original = True
+			report.output_bytes = input_bytes
+			temp_path.unlink()
+		else:
+			os.replace(temp_path, path)
+	except BaseException:
+		if temp_path.exists():
+			temp_path.unlink()
+		raise
+	return report
+
+
+def optimize_files(paths: Iterable[Path], options: OptimizeOptions, workers: int = 1) -> List[OptimizeReport]:
+	"""
+	여러 PDF 파일을 제자리에서 최적화합니다(optimize_file 참고). 반환 순서는 paths 순서와 같습니다.
+
+	- workers가 2 이상이면 파일들을 여러 프로세스에 나눠 최적화합니다(분할 출력처럼 파일이 많을 때).
+	"""
+	path_list = [Path(p) for p in paths]
+	if workers <= 1 or len(path_list) <= 1:
+		return [optimize_file(path, options) for path in path_list]
+	with ProcessPoolExecutor(max_workers=min(workers, len(path_list))) as pool:
+		return list(pool.map(optimize_file, path_list, [options] * len(path_list)))
+
+
+def _dropped_count(reader: PdfReader, reachable: Dict[ObjectKey, Optional[PdfObject]]) -> int:
+	# 교차 참조에 올라 있지만 쓰지 않은 객체 수(원본의 객체 스트림/교차 참조 스트림 자체는 빼고 셉니다).
+	listed = [(idnum, generation) for generation, entries in reader.xref.items() for idnum in entries]
+	listed.extend((idnum, 0) for idnum in reader.xref_objStm)
+	count = 0
+	for key in listed:
+		if key in reachable:
+			continue
+		obj = reader.get_object(IndirectObject(key[0], key[1], reader))
+		if object_kind(obj) == KIND_STREAM and obj.get("/Type") in ("/XRef", "/ObjStm"):
+			continue
+		count += 1
+	return count
+
+
+def _reachable(roots: List[PdfObject]) -> Tuple[List[ObjectKey], Dict[ObjectKey, Optional[PdfObject]]]:
+	order: List[ObjectKey] = []
+	objects: Dict[ObjectKey, Optional[PdfObject]] = {}
+	stack: List[PdfObject] = list(reversed(roots))
+	while stack:
+		value = stack.pop()
+		kind = object_kind(value)
+		if kind == KIND_INDIRECT:
+			key = (value.idnum, value.generation)
+			if key in objects:
+				continue
+			obj = value.get_object()
+			objects[key] = obj
+			order.append(key)
+			if object_kind(obj) != KIND_OTHER:
+				stack.append(obj)
+		elif kind == KIND_STREAM:
+			# /Length는 다시 계산해 쓰므로 간접 길이 객체는 따라가지 않습니다.
+			stack.extend(reversed([v for k, v in value.items() if k != "/Length" and object_kind(v) != KIND_OTHER]))
+		elif kind == KIND_DICT:
+			stack.extend(reversed([v for v in value.values() if object_kind(v) != KIND_OTHER]))
+		elif kind == KIND_ARRAY:
+			stack.extend(reversed([v for v in value if object_kind(v) != KIND_OTHER]))
+	return order, objects
+
+
+class _CompactWriter:
+	"""
+	객체 스트림과 교차 참조 스트림으로 PDF를 쓰는 출력기.
+
+	- 스트림 객체는 곧바로 쓰고, 나머지 객체는 OBJECT_STREAM_SIZE개씩 모아 압축한 객체 스트림으로 씁니다.
+	"""
+
+	def __init__(self, stream: BinaryIO, options: OptimizeOptions, report: OptimizeReport) -> None:
+		self._stream = stream
+		self._options = options
+		self._report = report
+		self._count = 0
+		self._null: Optional[int] = None
+		# 번호 -> (종류, 필드2, 필드3): 1 = (오프셋, 0), 2 = (객체 스트림 번호, 순번)
+		self._entries: Dict[int, Tuple[int, int, int]] = {}
+		self._pending: List[Tuple[int, bytes]] = []
+		self.position = 0
+		self._write(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+
+	def _write(self, data: bytes) -> None:
+		self._stream.write(data)
+		self.position += len(data)
+
+	def allocate(self) -> int:
+		self._count += 1
+		return self._count
+
+	def null_number(self) -> int:
+		# 깨진 참조는 공용 null 객체를 가리키게 합니다.
+		if self._null is None:
+			self._null = self.allocate()
+			self._pending.append((self._null, b"null"))
+		return self._null
+
+	def write_object(self, number: int, obj: Optional[PdfObject], remap) -> None:
+		if object_kind(obj) == KIND_STREAM:
+			dictionary, data = self._stream_payload(obj)  # type: ignore[arg-type]
+			buf = BytesIO()
+			write_stream(buf, dictionary, data, remap)
+			self._write_direct(number, buf.getvalue())
+			return
+		if obj is None:
+			body = b"null"
+		else:
+			buf = BytesIO()
+			write_value(buf, obj, remap)
+			body = buf.getvalue()
+		self._pending.append((number, body))
+		if len(self._pending) >= OBJECT_STREAM_SIZE:
+			self._flush_object_stream()
+
+	def _write_direct(self, number: int, body: bytes) -> None:
+		self._entries[number] = (1, self.position, 0)
+		self._write(b"%d 0 obj\n" % number)
+		self._write(body)
+		self._write(b"\nendobj\n")
+
+	def _stream_payload(self, obj: StreamObject) -> Tuple[DictionaryObject, bytes]:
+		data = stream_raw_data(obj)
+		filters = obj.get("/Filter")
+		if isinstance(filters, ArrayObject) and len(filters) == 1:
+			filters = filters[0]
+		level = self._options.compress_level
+
+		if filters is None and obj.get("/Type") != "/Metadata":
+			# XMP 메타데이터는 다른 도구가 바로 읽을 수 있도록 압축하지 않고 둡니다.
+			compressed = zlib.compress(data, level)
+			if len(compressed) < len(data):
+				return self._with_filter(obj, drop_params=True), compressed
+		elif self._options.level == "max" and filters == "/FlateDecode" and "/DecodeParms" not in obj:
+			try:
+				compressed = zlib.compress(zlib.decompress(data), level)
+			except zlib.error:
+				compressed = data
+			if len(compressed) < len(data):
+				return self._with_filter(obj, drop_params=False), compressed
+		return obj, data
+
+	def _with_filter(self, obj: StreamObject, drop_params: bool) -> DictionaryObject:
+		self._report.streams_compressed += 1
+		dictionary = DictionaryObject()
+		for key, value in obj.items():
+			if drop_params and key == "/DecodeParms":
+				continue
+			dictionary[key] = value
+		dictionary[NameObject("/Filter")] = NameObject("/FlateDecode")
+		return dictionary
+
+	def _flush_object_stream(self) -> None:
+		if not self._pending:
+			return
+		number = self.allocate()
+		offsets = []
+		bodies = BytesIO()
+		for index, (member, body) in enumerate(self._pending):
+			offsets.append(b"%d %d" % (member, bodies.tell()))
+			bodies.write(body)
+			bodies.write(b"\n")
+			self._entries[member] = (2, number, index)
+		header = b" ".join(offsets) + b"\n"
+		data = zlib.compress(header + bodies.getvalue(), max(self._options.compress_level, 1))
+		dictionary = b"<<\n/Type /ObjStm\n/N %d\n/First %d\n/Filter /FlateDecode\n/Length %d\n>>" % (
+			len(self._pending), len(header), len(data),
+		)
+		self._write_direct(number, dictionary + b"\nstream\n" + data + b"\nendstream")
+		self._report.object_streams += 1
+		self._pending = []
+
+	def close(self, root_number: int, extra: DictionaryObject, remap) -> None:
+		"""남은 객체 스트림과 교차 참조 스트림(트레일러 포함)을 씁니다."""
+		self._flush_object_stream()
+		xref_number = self.allocate()
+		xref_offset = self.position
+		self._entries[xref_number] = (1, xref_offset, 0)
+
+		size = self._count + 1
+		largest = max(max(field for _, field, _ in self._entries.values()), 1)
+		width = (largest.bit_length() + 7) // 8
+		rows = [b"\x00" + (0).to_bytes(width, "big") + (65535).to_bytes(2, "big")]
+		for number in range(1, size):
+			kind, field2, field3 = self._entries[number]
+			rows.append(bytes([kind]) + field2.to_bytes(width, "big") + field3.to_bytes(2, "big"))
+		data = zlib.compress(b"".join(rows), max(self._options.compress_level, 1))
+
+		trailer = DictionaryObject()
+		trailer[NameObject("/Type")] = NameObject("/XRef")
+		trailer[NameObject("/Size")] = NumberObject(size)
+		trailer[NameObject("/W")] = ArrayObject([NumberObject(1), NumberObject(width), NumberObject(2)])
+		trailer[NameObject("/Root")] = IndirectObject(root_number, 0, None)  # type: ignore[arg-type]
+		for key, value in extra.items():
+			trailer[key] = value
+		trailer[NameObject("/Filter")] = NameObject("/FlateDecode")
+
+		def trailer_remap(ref: IndirectObject) -> int:
+			# /Root는 이미 출력 번호입니다.
+			return ref.idnum if ref.pdf is None else remap(ref)
+
+		buf = BytesIO()
+		write_stream(buf, trailer, data, trailer_remap)
+		self._write(b"%d 0 obj\n" % xref_number)
+		self._write(buf.getvalue())
+		self._write(b"\nendobj\nstartxref\n%d\n%%%%EOF\n" % xref_offset)
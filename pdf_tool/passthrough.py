@@ -0,0 +1,326 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from io import BytesIO
+from typing import BinaryIO, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from pypdf import PdfReader
+from pypdf.generic import (
+	DictionaryObject,
+	IndirectObject,
+	NameObject,
+	PdfObject,
+)
+
+from .profiling import span
+from .prune import pruned_resources
+from .serialize import (
+	KIND_ARRAY,
+	KIND_DICT,
+	KIND_INDIRECT,
+	KIND_OTHER,
+	KIND_STREAM,
+	object_kind,
+	write_value,
+)
+from .utils import PageSelection
+
+
+# 이 크기 이상의 스트림은 쓰고 난 뒤 리더 캐시에서 내려 메모리를 바로 돌려줍니다.
+_EVICT_STREAM_BYTES = 256 * 1024
+
+# 원본 문서 구조에 속한 객체 유형. 선택한 페이지 밖의 이런 객체에 닿으면 고속 경로를 쓰지 않습니다.
+_STRUCTURE_TYPES = {"/Page", "/Pages", "/Catalog"}
+
+# (객체 번호, 세대)
+ObjectKey = Tuple[int, int]
+
+
+class PassthroughUnsupported(Exception):
+	"""
+	고속 복사 경로로 처리할 수 없는 입력입니다. 호출자는 pypdf PdfWriter 경로로 대체해야 합니다.
+	"""
+
+
+@dataclass
+class PassthroughStats:
+	"""
+	고속 복사 결과.
+
+	- copy_seconds는 페이지 선택과 닿는 객체 수집, serialize_seconds는 객체/교차 참조 표를 쓰는 데 든 시간입니다.
+	- nulled_refs는 strict=False로 null로 끊은 선택 밖 문서 구조 객체 수입니다.
+	"""
+
+	pages: int = 0
+	objects: int = 0
+	bytes_written: int = 0
+	copy_seconds: float = 0.0
+	serialize_seconds: float = 0.0
+	nulled_refs: int = 0
+
+
+class _CountingStream:
+	"""쓰기 위치(tell)를 직접 세는 얇은 래퍼. 비탐색 스트림에도 쓸 수 있습니다."""
+
+	def __init__(self, stream: BinaryIO, position: int = 0) -> None:
+		self._stream = stream
+		self.position = position
+
+	def write(self, data: bytes) -> int:
+		self._stream.write(data)
+		self.position += len(data)
+		return len(data)
+
+
+class PassthroughWriter:
+	"""
+	원본 객체를 pypdf 객체 모델로 복제하지 않고, 객체 번호만 바꿔 곧바로 출력에 쓰는 엔진입니다.
+
+	- 선택한 페이지에서 닿는 객체만(/Parent 제외) 순회하여 한 번씩 씁니다.
+	- 스트림은 필터가 적용된 원본 바이트를 그대로 복사합니다(디코딩/재압축 없음).
+	- 객체는 add_pages 호출마다 즉시 출력되므로, 메모리에는 객체 번호 대응표와 오프셋만 남습니다.
+	- 암호화, 선택 밖의 페이지/페이지 트리를 참조하는 주석/양식 등 특이한 입력은
+	  PassthroughUnsupported를 발생시킵니다. 이 경우 해당 add_pages 호출은 아무것도 쓰지 않습니다.
+	"""
+
+	def __init__(self, stream: BinaryIO) -> None:
+		self._start(_CountingStream(stream), first_number=1)
+		self._pages_number = self._allocate()
+		self._root_number = self._allocate()
+		self._out.write(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+
+	def _start(self, out: _CountingStream, first_number: int) -> None:
+		# 새로 쓰는 객체는 first_number부터 연속 번호를 받습니다(_offsets[i]는 first_number + i의 오프셋).
+		self._out = out
+		self._first_number = first_number
+		self._offsets: List[int] = []
+		self._page_numbers: List[int] = []
+		self._numbers: Dict[int, Dict[ObjectKey, int]] = {}
+		self._readers: Dict[int, PdfReader] = {}
+		self._null_number: Optional[int] = None
+		self.stats = PassthroughStats()
+
+	def _allocate(self) -> int:
+		self._offsets.append(-1)
+		return self._first_number + len(self._offsets) - 1
+
+	def _write_object(self, number: int, body: bytes) -> None:
+		self._offsets[number - self._first_number] = self._out.position
+		self._out.write(b"%d 0 obj\n" % number)
+		self._out.write(body)
+		self._out.write(b"\nendobj\n")
+		self.stats.objects += 1
+
+	def _serialize(self, obj: PdfObject, remap) -> bytes:
+		buf = BytesIO()
+		write_value(buf, obj, remap)
+		return buf.getvalue()
+
+	def add_pages(
+		self,
+		reader: PdfReader,
+		page_indices: Iterable[int],
+		prune_resources: bool = False,
+		strict: bool = True,
+	) -> None:
+		"""
+		reader의 페이지들을 순서대로 출력에 추가합니다.
+
+		- strict=False이면 선택 밖의 페이지/페이지 트리/카탈로그를 가리키는 참조(예: 다른 문서
+		  위치로의 링크)를 예외 대신 null로 끊고 계속 씁니다.
+		"""
+		with span("add_pages") as active:
+			pages, objects = self.stats.pages, self.stats.objects
+			self._add_pages(reader, page_indices, prune_resources, strict)
+			active.set(pages=self.stats.pages - pages, objects=self.stats.objects - objects)
+
+	def _add_pages(
+		self,
+		reader: PdfReader,
+		page_indices: Iterable[int],
+		prune_resources: bool,
+		strict: bool,
+	) -> None:
+		if getattr(reader, "is_encrypted", False):
+			raise PassthroughUnsupported("암호화된 PDF")
+
+		started = time.perf_counter()
+		numbers = self._numbers.setdefault(id(reader), {})
+		self._readers[id(reader)] = reader
+
+		# 1) 페이지 선택과 페이지 사전 준비 (같은 페이지가 두 번 나오면 지원하지 않음)
+		pages: List[Tuple[ObjectKey, DictionaryObject]] = []
+		selected: Dict[ObjectKey, int] = {}
+		for index in page_indices:
+			page = reader.pages[index]
+			ref = page.indirect_reference
+			if ref is None:
+				raise PassthroughUnsupported("간접 객체가 아닌 페이지")
+			key = (ref.idnum, ref.generation)
+			if key in selected or key in numbers:
+				raise PassthroughUnsupported("같은 페이지가 여러 번 선택됨")
+			selected[key] = -1
+			pages.append((key, self._page_dict(page, prune_resources)))
+
+		# 2) 페이지에서 닿는 객체 수집 (아직 아무것도 쓰지 않음)
+		order = self._collect(reader, numbers, selected, [d for _, d in pages], strict)
+
+		# 3) 번호 배정 후 기록
+		collected = time.perf_counter()
+		self.stats.copy_seconds += collected - started
+		for key, _ in pages:
+			numbers[key] = self._allocate()
+		for key in order:
+			numbers[key] = self._allocate()
+
+		def remap(ref: IndirectObject) -> int:
+			if ref.pdf is None:
+				# 이미 출력 번호인 참조 (예: /Parent)
+				return ref.idnum
+			number = numbers.get((ref.idnum, ref.generation))
+			return number if number is not None else self._null_ref()
+
+		parent = IndirectObject(self._pages_number, 0, None)  # type: ignore[arg-type]
+		for key, page_dict in pages:
+			page_dict[NameObject("/Parent")] = parent
+			number = numbers[key]
+			self._write_object(number, self._serialize(page_dict, remap))
+			self._page_numbers.append(number)
+			self.stats.pages += 1
+
+		for key in order:
+			obj = reader.get_object(IndirectObject(key[0], key[1], reader))
+			body = b"null" if obj is None else self._serialize(obj, remap)
+			self._write_object(numbers[key], body)
+			del body
+			if object_kind(obj) == KIND_STREAM and len(obj._data) >= _EVICT_STREAM_BYTES:
+				# 큰 스트림(이미지/글꼴 프로그램)은 다시 쓸 일이 없으므로 캐시에서 내립니다.
+				reader.resolved_objects.pop((key[1], key[0]), None)
+		self.stats.serialize_seconds += time.perf_counter() - collected
+
+	def _page_dict(self, page: DictionaryObject, prune_resources: bool) -> DictionaryObject:
+		# 출력할 페이지 사전(/Parent 제외한 얕은 사본). /Parent는 기록 직전에 채웁니다.
+		page_dict = DictionaryObject()
+		for name, value in page.items():
+			if name != "/Parent":
+				page_dict[name] = value
+		if prune_resources:
+			resources = pruned_resources(page)
+			if resources is not None:
+				page_dict[NameObject("/Resources")] = resources
+		return page_dict
+
+	def _collect(
+		self,
+		reader: PdfReader,
+		numbers: Dict[ObjectKey, int],
+		selected: Dict[ObjectKey, int],
+		roots: Sequence[PdfObject],
+		strict: bool,
+	) -> List[ObjectKey]:
+		order: List[ObjectKey] = []
+		seen = set()
+		stack: List[PdfObject] = list(reversed(roots))
+		while stack:
+			value = stack.pop()
+			kind = object_kind(value)
+			if kind == KIND_INDIRECT:
+				key = (value.idnum, value.generation)
+				if key in selected or key in numbers or key in seen:
+					continue
+				seen.add(key)
+				obj = value.get_object()
+				obj_kind = object_kind(obj)
+				if obj_kind in (KIND_DICT, KIND_STREAM) and obj.get("/Type") in _STRUCTURE_TYPES:
+					if strict:
+						raise PassthroughUnsupported(f"선택 밖의 문서 구조 객체를 참조함: {key}")
+					# 번호를 배정하지 않으면 remap이 공용 null 객체로 연결합니다.
+					self.stats.nulled_refs += 1
+					continue
+				order.append(key)
+				if obj_kind != KIND_OTHER:
+					stack.append(obj)
+			elif kind == KIND_STREAM:
+				stack.extend(v for k, v in value.items() if k != "/Length" and object_kind(v) != KIND_OTHER)
+			elif kind == KIND_DICT:
+				stack.extend(v for v in value.values() if object_kind(v) != KIND_OTHER)
+			elif kind == KIND_ARRAY:
+				stack.extend(v for v in value if object_kind(v) != KIND_OTHER)
+		return order
+
+	def _null_ref(self) -> int:
+		# 깨진 참조는 공용 null 객체를 가리키게 합니다.
+		if self._null_number is None:
+			self._null_number = self._allocate()
+			self._write_object(self._null_number, b"null")
+		return self._null_number
+
+	def forget(self, reader: PdfReader) -> None:
+		"""
+		reader에 대한 번호 대응표를 버립니다(이후 같은 reader의 객체는 새로 씁니다).
+		"""
+		self._numbers.pop(id(reader), None)
+		self._readers.pop(id(reader), None)
+
+	def close(self) -> PassthroughStats:
+		"""
+		페이지 트리, 카탈로그, 교차 참조 표와 트레일러를 기록합니다.
+		"""
+		with span("write") as active:
+			started = time.perf_counter()
+			kids = b" ".join(b"%d 0 R" % n for n in self._page_numbers)
+			self._write_object(
+				self._pages_number,
+				b"<<\n/Type /Pages\n/Kids [ " + kids + b" ]\n/Count %d\n>>" % len(self._page_numbers),
+			)
+			self._write_object(
+				self._root_number,
+				b"<<\n/Type /Catalog\n/Pages %d 0 R\n>>" % self._pages_number,
+			)
+
+			xref_offset = self._out.position
+			size = len(self._offsets) + 1
+			lines = [b"xref\n0 %d\n" % size, b"0000000000 65535 f \n"]
+			for offset in self._offsets:
+				lines.append(b"%010d 00000 n \n" % offset)
+			self._out.write(b"".join(lines))
+			self._out.write(
+				b"trailer\n<<\n/Size %d\n/Root %d 0 R\n>>\nstartxref\n%d\n%%%%EOF\n"
+				% (size, self._root_number, xref_offset)
+			)
+			self._readers.clear()
+			self.stats.bytes_written = self._out.position
+			self.stats.serialize_seconds += time.perf_counter() - started
+			active.set(bytes=self.stats.bytes_written)
+		return self.stats
+
+
+def write_pages_passthrough(
+	stream: BinaryIO,
+	selections: Iterable[Tuple[PdfReader, Iterable[int]]],
+	prune_resources: bool = False,
+	progress: Optional[Callable[[int], None]] = None,
+) -> PassthroughStats:
+	"""
+	(리더, 페이지 인덱스들) 목록을 한 PDF로 씁니다.
+
+	- PassthroughUnsupported가 발생하면 stream에는 일부만 쓰여 있을 수 있으므로,
+	  호출자가 버리고(truncate 등) PdfWriter 경로로 다시 써야 합니다.
+	- progress가 있으면 선택 하나를 쓸 때마다 지금까지 쓴 페이지 수로 호출합니다.
+	"""
+	writer = PassthroughWriter(stream)
+	written: Dict[int, PageSelection] = {}
+	for reader, indices in selections:
+		selection = PageSelection.from_indices(indices)
+		done = written.get(id(reader))
+		if done is not None and done.overlaps(selection):
+			# 이미 쓴 페이지가 다시 나오면(같은 문서를 두 번 병합하는 경우 등) 새 사본으로 씁니다.
+			# 겹치지 않으면 대응표를 유지해 글꼴/이미지 등 공유 객체를 다시 쓰지 않습니다.
+			writer.forget(reader)
+			done = None
+		writer.add_pages(reader, selection, prune_resources=prune_resources)
+		written[id(reader)] = selection if done is None else done.union(selection)
+		if progress is not None:
+			progress(writer.stats.pages)
+	return writer.close()
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+
+# 라이브러리 안쪽 구간(리더 열기, 페이지 추가, 쓰기 등)의 시간을 재는 가벼운 계측 계층.
+#
+#   with observing(recorder):      # 관찰자를 붙인 동안만 구간을 잽니다.
+#       merge_pdfs(...)
+#
+# 관찰자가 하나도 없으면 span()은 미리 만든 빈 컨텍스트를 돌려주므로, 계측 지점마다 드는 비용은
+# 함수 호출 한 번 정도입니다.
+
+
+@dataclass
+class Span:
+	"""
+	끝난 구간 하나.
+
+	- start는 time.perf_counter() 기준(초), thread는 구간을 잰 스레드 id입니다.
+	- attrs는 계측 지점이 붙인 값(경로, 페이지 수, 바이트 수 등)이며, 예외로 끝났으면 "error"에 예외 이름이 들어갑니다.
+	"""
+
+	name: str
+	start: float
+	duration: float
+	thread: int
+	attrs: Dict[str, Any] = field(default_factory=dict)
+
+
+Observer = Callable[[Span], None]
+
+# 읽기는 잠금 없이 하도록 관찰자 목록은 통째로 바꿔 끼웁니다.
+_observers: Tuple[Observer, ...] = ()
+_observers_lock = threading.Lock()
+
+
+def add_observer(observer: Observer) -> None:
+	"""
+	구간이 끝날 때마다 호출할 관찰자를 붙입니다.
+
+	- 관찰자는 구간을 잰 스레드에서 바로 호출되므로 빨리 끝나야 하며, 예외는 계측 지점으로 그대로 올라갑니다.
+	- 프로세스 풀 작업자(split workers 등)에서 잰 구간은 그 프로세스의 관찰자에게만 전달됩니다.
+	"""
+	global _observers
+	with _observers_lock:
+		_observers = _observers + (observer,)
+
+
+def remove_observer(observer: Observer) -> None:
+	"""add_observer로 붙인 관찰자를 뗍니다(없으면 무시)."""
+	global _observers
+	with _observers_lock:
+		observers = list(_observers)
+		if observer in observers:
+			observers.remove(observer)
+		_observers = tuple(observers)
+
+
+@contextmanager
+def observing(observer: Observer) -> Iterator[Observer]:
+	"""블록 안에서만 observer를 붙입니다."""
+	add_observer(observer)
+	try:
+		yield observer
+	finally:
+		remove_observer(observer)
+
+
+def enabled() -> bool:
+	"""관찰자가 붙어 있는지 여부. 구간 속성을 만드는 데 비용이 드는 지점에서 미리 확인할 때 씁니다."""
+	return bool(_observers)
+
+
+class _ActiveSpan:
+	__slots__ = ("name", "attrs", "start")
+
+	def __init__(self, name: str, attrs: Dict[str, Any]) -> None:
+		self.name = name
+		self.attrs = attrs
+		self.start = 0.0
+
+	def set(self, **attrs: Any) -> None:
+		"""구간이 끝나기 전에 알게 된 값(쓴 바이트 수 등)을 붙입니다."""
+		self.attrs.update(attrs)
+
+	def __enter__(self) -> "_ActiveSpan":
+		self.start = time.perf_counter()
+		return self
+
+	def __exit__(self, exc_type, exc, tb) -> None:
+		duration = time.perf_counter() - self.start
+		if exc_type is not None:
+			self.attrs["error"] = exc_type.__name__
+		finished = Span(self.name, self.start, duration, threading.get_ident(), self.attrs)
+		for observer in _observers:
+			observer(finished)
+
+
+class _NullSpan:
+	__slots__ = ()
+
+	def set(self, **attrs: Any) -> None:
+		pass
+
+	def __enter__(self) -> "_NullSpan":
+		return self
+
+	def __exit__(self, exc_type, exc, tb) -> None:
+		return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name: str, **attrs: Any):
+	"""
+	with 블록의 시간을 구간 name으로 잽니다. 관찰자가 없으면 아무것도 하지 않습니다.
+
+	- 블록 안에서 as로 받은 객체의 set(...)으로 속성을 더 붙일 수 있습니다.
+	"""
+	if not _observers:
+		return _NULL_SPAN
+	return _ActiveSpan(name, attrs)
+
+
+def _json_value(value: Any) -> Any:
+	if value is None or isinstance(value, (bool, int, float, str)):
+		return value
+	return str(value)
+
+
+class SpanRecorder:
+	"""
+	구간을 모두 모아 두는 관찰자. 타임라인(JSON)과 구간 이름별 합계를 만듭니다.
+
+	- write_json은 Chrome Trace Event 형식으로 씁니다(chrome://tracing, https://ui.perfetto.dev 에서 열림).
+	"""
+
+	def __init__(self) -> None:
+		self.origin = time.perf_counter()
+		self.spans: List[Span] = []
+		self._lock = threading.Lock()
+
+	def __call__(self, finished: Span) -> None:
+		with self._lock:
+			self.spans.append(finished)
+
+	def summary(self) -> List[Tuple[str, int, float]]:
+		"""(구간 이름, 횟수, 합계 초) 목록. 합계가 큰 순서입니다."""
+		totals: Dict[str, List[float]] = {}
+		with self._lock:
+			spans = list(self.spans)
+		for item in spans:
+			entry = totals.setdefault(item.name, [0, 0.0])
+			entry[0] += 1
+			entry[1] += item.duration
+		return sorted(
+			((name, int(count), seconds) for name, (count, seconds) in totals.items()),
+			key=lambda row: row[2],
+			reverse=True,
+		)
+
+	def trace_events(self) -> Dict[str, Any]:
+		"""Chrome Trace Event 형식의 사전(완료 이벤트 "X", 시간 단위 마이크로초)."""
+		pid = os.getpid()
+		with self._lock:
+			spans = sorted(self.spans, key=lambda item: item.start)
+		events = [
+			{
+				"name": item.name,
+				"cat": "pdf_tool",
+				"ph": "X",
+				"ts": round((item.start - self.origin) * 1e6, 3),
+				"dur": round(item.duration * 1e6, 3),
+				"pid": pid,
+				"tid": item.thread,
+				"args": {key: _json_value(value) for key, value in item.attrs.items()},
+			}
+			for item in spans
+		]
+		return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+	def write_json(self, path: Path) -> None:
+		"""타임라인을 path에 JSON으로 씁니다."""
+		with Path(path).open("w", encoding="utf-8") as f_out:
+			json.dump(self.trace_events(), f_out, ensure_ascii=False)
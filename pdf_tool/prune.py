@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import re
+from typing import Optional, Set
+
+from pypdf import PageObject, PdfWriter
+from pypdf.generic import ArrayObject, DictionaryObject, NameObject, StreamObject
+
+
+# 이름으로 참조되는 리소스 분류. 그 외(/ProcSet 등)는 그대로 유지합니다.
+_NAMED_CATEGORIES = {
+	"/Font",
+	"/XObject",
+	"/ExtGState",
+	"/ColorSpace",
+	"/Pattern",
+	"/Shading",
+	"/Properties",
+}
+
+# 콘텐츠 스트림 안의 이름 토큰 (/F1, /Im0 ...)
+_NAME_TOKEN = re.compile(rb"/([^\s/\[\]<>(){}%]*)")
+_NAME_ESCAPE = re.compile(rb"#([0-9A-Fa-f]{2})")
+
+
+def _content_bytes(page: PageObject) -> Optional[bytes]:
+	contents = page.get("/Contents")
+	if contents is None:
+		return b""
+	contents = contents.get_object()
+	if isinstance(contents, StreamObject):
+		return contents.get_data()
+	if isinstance(contents, ArrayObject):
+		chunks = []
+		for item in contents:
+			stream = item.get_object()
+			if not isinstance(stream, StreamObject):
+				return None
+			chunks.append(stream.get_data())
+		return b"\n".join(chunks)
+	return None
+
+
+def used_resource_names(page: PageObject) -> Optional[Set[str]]:
+	"""
+	페이지 콘텐츠 스트림에 등장하는 모든 이름 토큰을 모읍니다. 분석할 수 없으면 None.
+
+	- 연산자별로 해석하지 않고 이름 토큰 전체를 모으므로 과하게 남길 수는 있어도
+	  실제로 쓰이는 리소스를 빠뜨리지는 않습니다.
+	"""
+	try:
+		data = _content_bytes(page)
+	except Exception:
+		return None
+	if data is None:
+		return None
+
+	names: Set[str] = set()
+	for match in _NAME_TOKEN.finditer(data):
+		raw = _NAME_ESCAPE.sub(lambda m: bytes([int(m.group(1), 16)]), match.group(1))
+		names.add("/" + raw.decode("latin-1"))
+		try:
+			names.add("/" + raw.decode("utf-8"))
+		except UnicodeDecodeError:
+			pass
+	return names
+
+
+def pruned_resources(page: PageObject) -> Optional[DictionaryObject]:
+	"""
+	콘텐츠가 실제로 참조하는 항목만 남긴 /Resources 사전을 만듭니다. 원본 페이지는 바꾸지 않습니다.
+
+	- 분석할 수 없는 페이지는 None을 반환합니다(호출자는 원래 리소스를 그대로 사용).
+	- 남긴 폼 XObject/패턴 내부의 리소스는 건드리지 않습니다.
+	"""
+	resources = page.get("/Resources")
+	if resources is None:
+		return None
+	resources = resources.get_object()
+	if not isinstance(resources, DictionaryObject):
+		return None
+
+	names = used_resource_names(page)
+	if names is None:
+		return None
+
+	pruned = DictionaryObject()
+	for category, entries in resources.items():
+		entries_obj = entries.get_object()
+		if category in _NAMED_CATEGORIES and isinstance(entries_obj, DictionaryObject):
+			kept = DictionaryObject()
+			for key, value in entries_obj.items():
+				if key in names:
+					kept[NameObject(key)] = value
+			if len(kept) > 0:
+				pruned[NameObject(category)] = kept
+		else:
+			pruned[NameObject(category)] = entries
+	return pruned
+
+
+def add_page_pruned(writer: PdfWriter, page: PageObject) -> PageObject:
+	"""
+	페이지를 writer에 추가하되, 사용하지 않는 리소스는 복사하지 않습니다.
+	"""
+	resources = pruned_resources(page)
+	if resources is None:
+		return writer.add_page(page)
+	new_page = writer.add_page(page, excluded_keys=["/Resources"])
+	new_page[NameObject("/Resources")] = resources.clone(writer)
+	return new_page
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from typing import Callable, Dict, Union
+
+from pypdf.generic import (
+	ArrayObject,
+	DictionaryObject,
+	IndirectObject,
+	PdfObject,
+	StreamObject,
+)
+
+
+# 간접 참조를 새 객체 번호로 바꿔 쓰기 위한 함수: IndirectObject -> 출력 객체 번호(0이면 null로 씀)
+Remap = Callable[[IndirectObject], int]
+
+# 객체 종류. pypdf 객체의 isinstance 검사는 Protocol 메타클래스를 거쳐 느리므로 타입별로 한 번만 판별합니다.
+KIND_OTHER = 0
+KIND_INDIRECT = 1
+KIND_DICT = 2
+KIND_STREAM = 3
+KIND_ARRAY = 4
+
+_kinds: Dict[type, int] = {}
+
+
+def object_kind(obj: object) -> int:
+	"""
+	객체 종류(KIND_*)를 반환합니다. 타입별 결과를 캐시합니다.
+	"""
+	cls = type(obj)
+	kind = _kinds.get(cls)
+	if kind is None:
+		if issubclass(cls, IndirectObject):
+			kind = KIND_INDIRECT
+		elif issubclass(cls, StreamObject):
+			kind = KIND_STREAM
+		elif issubclass(cls, DictionaryObject):
+			kind = KIND_DICT
+		elif issubclass(cls, ArrayObject):
+			kind = KIND_ARRAY
+		else:
+			kind = KIND_OTHER
+		_kinds[cls] = kind
+	return kind
+
+
+def stream_raw_data(obj: StreamObject) -> bytes:
+	"""
+	스트림의 (필터가 적용된) 원본 바이트를 반환합니다. 디코딩하지 않습니다.
+	"""
+	data: Union[bytes, str] = obj._data
+	if not data and getattr(obj, "_operations", None):
+		# ContentStream은 연산 목록에서 바이트를 다시 만들어야 합니다.
+		obj.get_data()
+		data = obj._data
+	return data.encode("latin-1") if isinstance(data, str) else data
+
+
+def write_value(stream, obj: PdfObject, remap: Remap) -> None:
+	"""
+	pypdf 객체를 PDF 구문으로 씁니다. 간접 참조는 remap으로 번호를 바꿉니다.
+
+	- 객체를 복제(clone)하지 않고 원본 객체 그래프를 그대로 순회합니다.
+	- 스트림은 필터가 적용된 바이트를 그대로 복사하며 /Length만 다시 계산합니다.
+	- remap이 0을 반환한 참조(쓰지 않는 객체)는 직접 null로 씁니다.
+	"""
+	kind = object_kind(obj)
+
+	if kind == KIND_INDIRECT:
+		number = remap(obj)  # type: ignore[arg-type]
+		stream.write(b"%d 0 R" % number if number else b"null")
+		return
+
+	if kind == KIND_STREAM:
+		write_stream(stream, obj, stream_raw_data(obj), remap)  # type: ignore[arg-type]
+		return
+
+	if kind == KIND_DICT:
+		_write_dictionary(stream, obj, remap)  # type: ignore[arg-type]
+		return
+
+	if kind == KIND_ARRAY:
+		stream.write(b"[")
+		for item in obj:  # type: ignore[attr-defined]
+			stream.write(b" ")
+			if object_kind(item) == KIND_OTHER:
+				item.write_to_stream(stream)
+			else:
+				write_value(stream, item, remap)
+		stream.write(b" ]")
+		return
+
+	obj.write_to_stream(stream)
+
+
+def write_stream(stream, dictionary: DictionaryObject, data: bytes, remap: Remap) -> None:
+	"""
+	스트림 사전과 (필터가 적용된) 데이터를 씁니다. /Length는 data 길이로 다시 씁니다.
+	"""
+	_write_dictionary(stream, dictionary, remap, length=len(data))
+	stream.write(b"\nstream\n")
+	stream.write(data)
+	stream.write(b"\nendstream")
+
+
+def _write_dictionary(stream, obj: DictionaryObject, remap: Remap, length: int = -1) -> None:
+	stream.write(b"<<\n")
+	for key, value in obj.items():
+		if length >= 0 and key == "/Length":
+			continue
+		key.write_to_stream(stream)
+		stream.write(b" ")
+		if object_kind(value) == KIND_OTHER:
+			value.write_to_stream(stream)
+		else:
+			write_value(stream, value, remap)
+		stream.write(b"\n")
+	if length >= 0:
+		stream.write(b"/Length %d\n" % length)
+	stream.write(b">>")
@@ -1,73 +1,141 @@
 from __future__ import annotations
 
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Sequence, Tuple
 
 from pypdf import PdfReader, PdfWriter
 
+from .passthrough import PassthroughUnsupported, write_pages_passthrough
+from .profiling import span
+from .prune import add_page_pruned
 from .utils import (
 	ensure_file_exists,
 	ensure_output_directory_exists,
 	assert_can_write,
+	open_pdf_reader,
 	parse_ranges_to_groups,
 )
 
 
+# (출력 경로, 0-기반 페이지 인덱스 구간)
+SplitPart = Tuple[Path, Sequence[int]]
+
+
 def split_pdf_by_ranges(
 	input_file: Path,
 	output_dir: Path,
 	ranges_text: Optional[str],
 	overwrite: bool = False,
+	workers: int = 1,
+	prune_resources: bool = True,
 ) -> List[Path]:
 	"""
 	PDF를 분할합니다.
 
 	- ranges_text가 없으면 각 페이지를 개별 파일로 분할합니다.
 	- ranges_text가 있으면 각 범위를 하나의 파일로 저장합니다.
+	- workers가 2 이상이면 출력 파일들을 여러 프로세스에 나눠 생성합니다.
+	  각 프로세스는 원본을 경로로 직접 열며, 출력 파일명과 내용은 순차 처리와 같습니다.
+	- prune_resources가 참이면 각 출력에는 페이지 콘텐츠가 실제로 참조하는 리소스만 복사합니다.
+	  (문서 전체 글꼴/이미지 사전을 파일마다 다시 쓰지 않음)
 	- 반환값: 생성된 출력 파일 경로 목록
 	"""
 	ensure_file_exists(input_file)
 
-	reader = PdfReader(str(input_file))
-	if getattr(reader, "is_encrypted", False):
-		raise PermissionError(f"암호화된 PDF는 분할할 수 없습니다: {input_file}")
+	with open_pdf_reader(input_file) as reader:
+		if getattr(reader, "is_encrypted", False):
+			raise PermissionError(f"암호화된 PDF는 분할할 수 없습니다: {input_file}")
 
-	total_pages = len(reader.pages)
+		total_pages = len(reader.pages)
 
-	ensure_output_directory_exists(output_dir)
+		ensure_output_directory_exists(output_dir)
 
-	basename = input_file.stem
+		basename = input_file.stem
 
-	output_files: List[Path] = []
+		parts: List[SplitPart] = []
 
-	if ranges_text is None:
-		# 페이지별 파일 생성
-		for page_index in range(total_pages):
-			output_path = output_dir / f"{basename}_page_{page_index + 1}.pdf"
+		if ranges_text is None:
+			# 페이지별 파일 생성
+			for page_index in range(total_pages):
+				parts.append((output_dir / f"{basename}_page_{page_index + 1}.pdf", range(page_index, page_index + 1)))
+		else:
+			# 범위별 파일 생성
+			groups = parse_ranges_to_groups(ranges_text, total_pages)
+			for group_index, page_group in enumerate(groups, start=1):
+				parts.append((output_dir / f"{basename}_part_{group_index}.pdf", page_group))
+
+		# 쓰기 전에 모든 출력 경로를 검사합니다(일부만 쓰고 실패하지 않도록).
+		for output_path, _ in parts:
 			assert_can_write(output_path, overwrite)
 
+		if workers <= 1 or len(parts) <= 1:
+			_write_parts(reader, parts, prune_resources)
+			return [output_path for output_path, _ in parts]
+
+	shards = _make_shards(parts, workers)
+	with ProcessPoolExecutor(max_workers=len(shards)) as pool:
+		futures = [
+			pool.submit(_write_shard, str(input_file), shard, prune_resources)
+			for shard in shards
+		]
+		for future in futures:
+			future.result()
+
+	return [output_path for output_path, _ in parts]
+
+
+def _write_parts(reader: PdfReader, parts: Sequence[SplitPart], prune_resources: bool) -> None:
+	"""
+	분할 파트들을 순서대로 파일로 씁니다.
+	"""
+	for output_path, page_group in parts:
+		with output_path.open("wb") as f_out, span("split_part", path=str(output_path), pages=len(page_group)):
+			# 원본 객체를 그대로 복사하는 고속 경로, 특이한 입력이면 PdfWriter로 다시 씁니다.
+			try:
+				write_pages_passthrough(f_out, [(reader, page_group)], prune_resources=prune_resources)
+				continue
+			except PassthroughUnsupported:
+				f_out.seek(0)
+				f_out.truncate()
+
 			writer = PdfWriter()
-			writer.add_page(reader.pages[page_index])
-			with output_path.open("wb") as f_out:
+			for page_index in page_group:
+				with span("add_page", index=page_index):
+					if prune_resources:
+						add_page_pruned(writer, reader.pages[page_index])
+					else:
+						writer.add_page(reader.pages[page_index])
+			with span("write"):
 				writer.write(f_out)
 
-			output_files.append(output_path)
-		return output_files
 
-	# 범위별 파일 생성
-	groups = parse_ranges_to_groups(ranges_text, total_pages)
-	if len(groups) == 0:
-		return []
-
-	for group_index, page_group in enumerate(groups, start=1):
-		output_path = output_dir / f"{basename}_part_{group_index}.pdf"
-		assert_can_write(output_path, overwrite)
+def _write_shard(input_path: str, shard: List[SplitPart], prune_resources: bool) -> None:
+	"""
+	작업자 프로세스 진입점: 원본을 직접 열어 자신에게 할당된 파트들을 씁니다.
+	"""
+	with open_pdf_reader(Path(input_path)) as reader:
+		_write_parts(reader, shard, prune_resources)
 
-		writer = PdfWriter()
-		for page_index in page_group:
-			writer.add_page(reader.pages[page_index])
-		with output_path.open("wb") as f_out:
-			writer.write(f_out)
-		output_files.append(output_path)
 
-	return output_files
+def _make_shards(parts: List[SplitPart], workers: int) -> List[List[SplitPart]]:
+	"""
+	파트 목록을 페이지 수 기준으로 균등한 연속 구간(최대 workers개)으로 나눕니다.
+	"""
+	shard_count = min(workers, len(parts))
+	total = sum(len(group) for _, group in parts)
+	target = total / shard_count
+
+	shards: List[List[SplitPart]] = [[]]
+	filled = 0
+	for index, part in enumerate(parts):
+		remaining_parts = len(parts) - index
+		remaining_shards = shard_count - len(shards)
+		# 현재 샤드가 목표량을 채웠거나, 남은 파트로 남은 샤드를 채워야 하면 다음 샤드로
+		if shards[-1] and remaining_shards > 0 and (
+			filled >= target * len(shards) or remaining_parts <= remaining_shards
+		):
+			shards.append([])
+		shards[-1].append(part)
+		filled += len(part[1])
+	return shards
@@ -1,7 +1,18 @@
 from __future__ import annotations
 
+import glob
+import math
+import mmap
+import re
+import sys
+from contextlib import contextmanager
+from itertools import chain
 from pathlib import Path
-from typing import List
+from typing import Iterable, Iterator, List, Optional
+
+from pypdf import PdfReader
+
+from .profiling import span
 
 
 def ensure_file_exists(file_path: Path) -> None:
@@ -31,16 +42,159 @@ def assert_can_write(output_path: Path, overwrite: bool) -> None:
 		)
 
 
-def parse_ranges_to_groups(ranges_text: str, total_pages: int) -> List[List[int]]:
+def _natural_key(path: Path) -> list:
+	# "invoice2.pdf"가 "invoice10.pdf"보다 앞에 오도록 숫자 부분은 수로 비교합니다.
+	return [int(part) if part.isdigit() else part.lower() for part in re.split(r"(\d+)", path.name)]
+
+
+def iter_input_pdfs(inputs: Iterable[str]) -> Iterator[Path]:
+	"""
+	입력 목록을 PDF 경로로 펼칩니다.
+
+	- 디렉터리: 그 안의 *.pdf 파일(하위 디렉터리 제외)을 이름순(숫자는 수 크기순)으로
+	- 글롭 패턴(*, ?, [): 일치하는 파일을 같은 순서로
+	- 그 외: 경로 그대로
+	"""
+	for item in inputs:
+		path = Path(item)
+		if path.is_dir():
+			yield from sorted(
+				(p for p in path.iterdir() if p.is_file() and p.suffix.lower() == ".pdf"),
+				key=_natural_key,
+			)
+		elif glob.has_magic(item):
+			matches = [Path(m) for m in glob.glob(item) if Path(m).is_file()]
+			if len(matches) == 0:
+				raise FileNotFoundError(f"패턴과 일치하는 파일이 없습니다: {item}")
+			yield from sorted(matches, key=_natural_key)
+		else:
+			yield path
+
+
+@contextmanager
+def open_pdf_reader(file_path: Path) -> Iterator[PdfReader]:
+	"""
+	PDF를 mmap으로 매핑해 PdfReader로 엽니다. 블록을 벗어나면 매핑을 닫습니다.
+
+	- PdfReader(경로)는 파일 전체를 메모리로 읽어 들이지만, mmap은 필요한 부분만 OS가 페이지 인 합니다.
+	"""
+	with open(file_path, "rb") as f_in:
+		mapped = mmap.mmap(f_in.fileno(), 0, access=mmap.ACCESS_READ)
+		try:
+			with span("open", path=str(file_path), bytes=len(mapped)):
+				reader = PdfReader(mapped)
+			yield reader
+		finally:
+			mapped.close()
+
+
+class PageSelection:
+	"""
+	0-기반 페이지 인덱스 구간(range)들을 순서대로 이어 붙인 지연 선택입니다.
+
+	- 페이지 목록을 펼치지 않으므로 10만 페이지 문서의 "1-"도 구간 하나 크기만 차지하며,
+	  반복할 때 인덱스를 하나씩 만들어 냅니다(역순/홀짝은 step으로 표현).
+	- 같은 페이지를 여러 번 포함할 수 있습니다(예: 합성의 "1,1"). overlaps/has_repeats로 펼치지 않고 확인합니다.
+	- 구간은 파이썬 range이므로 프로세스 간에 전달(피클)해도 작습니다.
+	"""
+
+	__slots__ = ("ranges",)
+
+	def __init__(self, ranges: Iterable[range] = ()) -> None:
+		self.ranges = tuple(r for r in ranges if len(r) > 0)
+
+	@classmethod
+	def from_indices(cls, indices: Iterable[int]) -> "PageSelection":
+		"""
+		인덱스 목록을 선택으로 바꿉니다. 이미 선택/range이면 그대로 쓰고, 목록은 연속 구간으로 묶습니다.
+		"""
+		if isinstance(indices, PageSelection):
+			return indices
+		if isinstance(indices, range):
+			return cls([indices])
+		ranges: List[range] = []
+		start = stop = None
+		for index in indices:
+			if stop is not None and index == stop:
+				stop += 1
+				continue
+			if start is not None:
+				ranges.append(range(start, stop))
+			start, stop = index, index + 1
+		if start is not None:
+			ranges.append(range(start, stop))
+		return cls(ranges)
+
+	def __len__(self) -> int:
+		return sum(len(r) for r in self.ranges)
+
+	def __bool__(self) -> bool:
+		return len(self.ranges) > 0
+
+	def __iter__(self) -> Iterator[int]:
+		return chain.from_iterable(self.ranges)
+
+	def __contains__(self, index: object) -> bool:
+		return any(index in r for r in self.ranges)
+
+	def __eq__(self, other: object) -> bool:
+		if not isinstance(other, PageSelection):
+			return NotImplemented
+		return self.ranges == other.ranges
+
+	def __repr__(self) -> str:
+		return f"PageSelection({list(self.ranges)!r})"
+
+	def union(self, other: "PageSelection") -> "PageSelection":
+		"""두 선택을 순서대로 이어 붙인 선택(포함/겹침 검사에서는 합집합)을 반환합니다."""
+		return PageSelection(self.ranges + other.ranges)
+
+	def overlaps(self, other: "PageSelection") -> bool:
+		"""두 선택에 함께 들어 있는 페이지가 있는지 펼치지 않고 확인합니다."""
+		return any(_ranges_overlap(a, b) for a in self.ranges for b in other.ranges)
+
+	def has_repeats(self) -> bool:
+		"""같은 페이지가 두 번 이상 들어 있는지 확인합니다."""
+		return any(
+			_ranges_overlap(a, b)
+			for i, a in enumerate(self.ranges)
+			for b in self.ranges[i + 1:]
+		)
+
+
+def _ranges_overlap(a: range, b: range) -> bool:
+	"""
+	두 range에 공통 원소가 있는지 원소를 펼치지 않고 확인합니다.
+	"""
+	if not a or not b:
+		return False
+	if a.step < 0:
+		a = a[::-1]
+	if b.step < 0:
+		b = b[::-1]
+	low = max(a[0], b[0])
+	high = min(a[-1], b[-1])
+	if low > high:
+		return False
+	if a.step < b.step:
+		a, b = b, a
+	# 겹치는 구간 안의 a 원소를 b.step 기준 나머지가 한 바퀴 도는 만큼만 보면 충분합니다.
+	first = a.start + -(-(low - a.start) // a.step) * a.step
+	period = b.step // math.gcd(a.step, b.step)
+	return any(index in b for index in range(first, high + 1, a.step)[:period])
+
+
+def parse_ranges_to_groups(ranges_text: str, total_pages: int) -> List[range]:
 	"""
-	"1-3,5,7-" 같은 범위 문자열을 0-기반 인덱스의 그룹 목록으로 변환합니다.
+	"1-3,5,7-" 같은 범위 문자열을 0-기반 인덱스 구간(range)의 그룹 목록으로 변환합니다.
 
 	- 입력은 1-기반 페이지 번호 기준입니다.
 	- 각 쉼표 구분 토큰은 하나의 그룹이 되며, 그룹별로 별도 파일을 생성할 때 사용됩니다.
 	- 열린 구간 "A-"는 A부터 끝까지를 의미합니다.
+	- 그룹은 range이므로 페이지 수와 무관하게 작고, 필요할 때 인덱스를 하나씩 만들어 냅니다.
 
 	예)
-	"1-3,5,7-" -> [[0,1,2], [4], [6,7,8,...]]
+	"1-3,5,7-" -> [range(0, 3), range(4, 5), range(6, total_pages)]
 	"""
 	# 입력 검증 및 전처리
 	if not ranges_text or ranges_text.strip() == "":
@@ -50,7 +204,7 @@ def parse_ranges_to_groups(ranges_text: str, total_pages: int) -> List[List[int]
 	if len(tokens) == 0:
 		raise ValueError("유효한 범위 토큰이 없습니다.")
 
-	groups: List[List[int]] = []
+	groups: List[range] = []
 
 	for token in tokens:
 		start_end = token.split("-")
@@ -59,7 +213,7 @@ def parse_ranges_to_groups(ranges_text: str, total_pages: int) -> List[List[int]
 		if len(start_end) == 1:
 			page_1_based = _parse_positive_int(start_end[0])
 			_assert_in_range(page_1_based, 1, total_pages)
-			groups.append([page_1_based - 1])
+			groups.append(range(page_1_based - 1, page_1_based))
 			continue
 
 		# 구간 토큰 (예: "1-3", "7-")
@@ -74,9 +228,7 @@ def parse_ranges_to_groups(ranges_text: str, total_pages: int) -> List[List[int]
 
 			# 열린 구간: "A-"
 			if end_text == "":
-				start_index = start_1_based - 1
-				end_index = total_pages - 1
-				groups.append(list(range(start_index, end_index + 1)))
+				groups.append(range(start_1_based - 1, total_pages))
 				continue
 
 			# 닫힌 구간: "A-B"
@@ -86,9 +238,7 @@ def parse_ranges_to_groups(ranges_text: str, total_pages: int) -> List[List[int]
 			if end_1_based < start_1_based:
 				raise ValueError(f"잘못된 범위입니다(끝 < 시작): '{token}'")
 
-			start_index = start_1_based - 1
-			end_index = end_1_based - 1
-			groups.append(list(range(start_index, end_index + 1)))
+			groups.append(range(start_1_based - 1, end_1_based))
 			continue
 
 		raise ValueError(f"잘못된 범위 토큰입니다: '{token}'")
@@ -96,6 +246,96 @@ def parse_ranges_to_groups(ranges_text: str, total_pages: int) -> List[List[int]
 	return groups
 
 
+def validate_ranges(ranges_text: str) -> int:
+	"""
+	문서를 열기 전에(페이지 수를 모른 채) 범위 문자열의 문법만 검사하고 그룹 수를 반환합니다.
+
+	- 아무것도 펼치지 않으므로 토큰 수에 비례하는 시간만 듭니다. 페이지 수 초과는 실제 분할 때 확인합니다.
+	"""
+	return len(parse_ranges_to_groups(ranges_text, _UNBOUNDED_PAGES))
+
+
+_SELECTION_FILTERS = {"odd": 1, "even": 0}
+
+# 문법 검사용 페이지 수 상한(사실상 무제한)
+_UNBOUNDED_PAGES = sys.maxsize
+
+
+def parse_page_selection(selection_text: Optional[str], total_pages: int) -> PageSelection:
+	"""
+	페이지 선택 문자열을 순서가 있는 0-기반 페이지 선택으로 변환합니다(합성/compose용).
+
+	- parse_ranges_to_groups의 토큰("N", "A-B", "A-")을 그대로 쓰되, 모든 토큰을 이어 붙여 한 선택을 만듭니다.
+	- "A-B"에서 A > B이면 역순입니다. 예) "10-1" -> 10, 9, ..., 1
+	- "end"는 마지막 페이지입니다. 예) "end-1" -> 전체 역순
+	- "all", "odd", "even": 전체/홀수/짝수 페이지. 구간 뒤에 ":odd", ":even"을 붙여 거를 수도 있습니다(예: "1-10:odd").
+	- 비어 있으면 전체 페이지입니다. 같은 페이지를 여러 번 고를 수 있습니다.
+
+	예)
+	"3-7,1" -> 2,3,4,5,6,0
+	"""
+	if selection_text is None or selection_text.strip() == "":
+		return PageSelection([range(total_pages)])
+
+	tokens = [t.strip() for t in selection_text.split(",") if t.strip() != ""]
+	if len(tokens) == 0:
+		raise ValueError("유효한 선택 토큰이 없습니다.")
+
+	ranges: List[range] = []
+	for token in tokens:
+		range_text, _, filter_text = token.lower().partition(":")
+		range_text = range_text.strip()
+		filter_text = filter_text.strip()
+
+		if range_text in ("all", "odd", "even"):
+			if filter_text:
+				raise ValueError(f"잘못된 선택 토큰입니다: '{token}'")
+			indices = range(total_pages)
+			filter_text = "" if range_text == "all" else range_text
+		else:
+			start_end = range_text.split("-")
+			if len(start_end) == 1:
+				page = _parse_page_number(start_end[0], total_pages)
+				indices = range(page - 1, page)
+			elif len(start_end) == 2:
+				start_text, end_text = start_end[0].strip(), start_end[1].strip()
+				if start_text == "":
+					raise ValueError(f"잘못된 범위입니다: '{token}' (시작 페이지 필요)")
+				start = _parse_page_number(start_text, total_pages)
+				end = total_pages if end_text == "" else _parse_page_number(end_text, total_pages)
+				# A > B이면 역순
+				indices = range(start - 1, end) if start <= end else range(start - 1, end - 2, -1)
+			else:
+				raise ValueError(f"잘못된 선택 토큰입니다: '{token}'")
+
+		if filter_text:
+			if filter_text not in _SELECTION_FILTERS:
+				raise ValueError(f"알 수 없는 필터입니다: '{filter_text}' (odd 또는 even)")
+			# 홀수/짝수는 1-기반 페이지 번호 기준이며, 펼치지 않고 step을 두 배로 한 range로 만듭니다.
+			offset = 0 if indices and (indices[0] + 1) % 2 == _SELECTION_FILTERS[filter_text] else 1
+			indices = indices[offset::2]
+		ranges.append(indices)
+
+	return PageSelection(ranges)
+
+
+def validate_page_selection(selection_text: Optional[str]) -> None:
+	"""
+	문서를 열기 전에 페이지 선택 문자열의 문법만 검사합니다(validate_ranges 참고).
+	"""
+	parse_page_selection(selection_text, _UNBOUNDED_PAGES)
+
+
+def _parse_page_number(text: str, total_pages: int) -> int:
+	"""
+	1-기반 페이지 번호("end"는 마지막 페이지)를 파싱하고 범위를 확인합니다.
+	"""
+	text = text.strip()
+	value = total_pages if text == "end" else _parse_positive_int(text)
+	_assert_in_range(value, 1, total_pages)
+	return value
+
+
 def _parse_positive_int(text: str) -> int:
 	"""
 	양의 정수를 파싱합니다. 실패 시 예외를 발생시킵니다.
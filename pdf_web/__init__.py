@@ -0,0 +1,11 @@
+__all__ = [
+	"admission",
+	"executor",
+	"jobs",
+	"metrics",
+	"operations",
+	"results",
+	"spool",
+	"uploads",
+	"zipstream",
+]
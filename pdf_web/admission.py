@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, Optional
+
+from .executor import _env_int
+from .metrics import REGISTRY, current_request
+from .spool import RequestBodyLimitMiddleware
+
+
+# 입장 제어(admission control)와 요청별 자원 한도.
+#
+# - 동시 요청 수와 요청 본문 바이트는 본문을 받기 전/받는 동안, 입력 파일 수는 폼을 받은 뒤 스풀/파싱 전,
+#   페이지 수는 루트 페이지 트리의 /Count로 평탄화 전에 확인해, 넘치면 413/429로 바로 거절합니다.
+# - 요청별 CPU 시간 예산은 실행기 작업(operations.py)이 단계 경계마다 check_cpu_budget()으로 확인합니다.
+#   pypdf 호출을 중간에 끊을 수는 없으므로 예산을 넘긴 뒤 처음 만나는 경계에서 멈춥니다.
+#   pdf_tool 계측 구간(profiling)에 관찰자를 붙이지 않으므로, 예산을 써도 계측이 꺼진 경로의 비용은 그대로입니다.
+
+
+@dataclass(frozen=True)
+class AdmissionLimits:
+	"""
+	요청별 자원 한도. 0은 제한하지 않음입니다.
+
+	- max_files: 요청 하나의 입력 파일 수(files + upload_ids)
+	- max_input_bytes: 요청 하나의 입력 바이트 합계(청크 업로드 포함). 서버의 유일한 바이트 한도로, 모든 요청 본문
+	  (청크 업로드 PUT 포함)을 받는 동안 강제하고, 청크 업로드 세션은 만들 때 전체 크기로 확인합니다
+	- max_pages: 입력 문서 하나, 그리고 출력 하나의 페이지 수
+	- max_heavy: 동시에 처리하는 무거운 요청(HEAVY_PATHS) 수. 0이면 앱이 실행기 작업자 수 + 대기열 한도로 정합니다
+	- cpu_seconds: 요청 하나가 실행기에서 쓸 수 있는 CPU 시간(초, 비동기 작업에는 적용하지 않음)
+	- retry_after: 429 응답의 Retry-After(초)
+	"""
+
+	max_files: int = 0
+	max_input_bytes: int = 0
+	max_pages: int = 0
+	max_heavy: int = 0
+	cpu_seconds: int = 0
+	retry_after: int = 5
+
+	@classmethod
+	def from_env(cls) -> "AdmissionLimits":
+		"""
+		환경 변수로 한도를 구성합니다.
+
+		- PDF_WEB_MAX_FILES, PDF_WEB_MAX_INPUT_BYTES, PDF_WEB_MAX_PAGES, PDF_WEB_MAX_HEAVY,
+		  PDF_WEB_CPU_SECONDS (모두 기본 0), PDF_WEB_RETRY_AFTER (기본 5)
+		- PDF_WEB_MAX_REQUEST_BYTES는 PDF_WEB_MAX_INPUT_BYTES의 이전 이름으로, PDF_WEB_MAX_INPUT_BYTES가 없을 때만 씁니다.
+		"""
+		return cls(
+			max_files=_env_int("PDF_WEB_MAX_FILES", 0),
+			max_input_bytes=_env_int("PDF_WEB_MAX_INPUT_BYTES", 0) or _env_int("PDF_WEB_MAX_REQUEST_BYTES", 0),
+			max_pages=_env_int("PDF_WEB_MAX_PAGES", 0),
+			max_heavy=_env_int("PDF_WEB_MAX_HEAVY", 0),
+			cpu_seconds=_env_int("PDF_WEB_CPU_SECONDS", 0),
+			retry_after=_env_int("PDF_WEB_RETRY_AFTER", 5),
+		)
+
+
+# 프로세스 실행기의 작업자도 같은 환경 변수를 물려받으므로 같은 한도를 봅니다.
+LIMITS = AdmissionLimits.from_env()
+
+# 페이지를 복사/분석하는 동기 엔드포인트. 비동기 작업(/jobs)은 작업 큐가 동시 실행 수를 제한합니다.
+HEAVY_PATHS: FrozenSet[str] = frozenset({"/merge", "/split", "/compose", "/inspect"})
+# 멀티파트 본문에서 파일 내용 외의 몫(파트 헤더, 경계, 폼 필드)으로 더 허용하는 바이트
+MULTIPART_OVERHEAD = 1024 * 1024
+
+REJECTED = REGISTRY.counter(
+	"pdf_web_admission_rejected_total",
+	"입장 제어/자원 한도로 거절한 요청 수 (reason: busy|files|bytes|pages|cpu)",
+	("reason",),
+)
+
+
+class LimitExceededError(Exception):
+	"""
+	요청이 자원 한도를 넘었을 때 발생합니다(status로 응답하며, 429면 Retry-After를 붙임).
+
+	- reason은 거절 사유(busy/files/bytes/pages/cpu)로, 지표 레이블에 씁니다.
+	- 프로세스 풀 작업자에서도 그대로 돌아오도록 생성자 인자를 모두 args에 둡니다.
+	"""
+
+	def __init__(self, message: str, reason: str, status: int = 413) -> None:
+		super().__init__(message, reason, status)
+		self.reason = reason
+		self.status = status
+
+	def __str__(self) -> str:
+		return str(self.args[0])
+
+
+def check_inputs(count: int, total_bytes: int) -> None:
+	"""
+	입력 파일 수와 바이트 합계가 한도 안인지 확인합니다(폼을 받은 뒤, 업로드를 스풀/파싱하기 전에 호출).
+
+	- 업로드 본문 자체는 AdmissionMiddleware가 받는 동안 먼저 제한하므로, 여기서는 청크 업로드(upload_ids)를
+	  더한 합계와 파일 수를 봅니다.
+	"""
+	if LIMITS.max_files and count > LIMITS.max_files:
+		raise LimitExceededError(f"입력 파일 수({count}개)가 한도({LIMITS.max_files}개)를 넘습니다.", "files")
+	if LIMITS.max_input_bytes and total_bytes > LIMITS.max_input_bytes:
+		raise LimitExceededError(
+			f"입력 크기 합계({total_bytes} bytes)가 한도({LIMITS.max_input_bytes} bytes)를 넘습니다.", "bytes"
+		)
+
+
+def check_pages(count: int, what: str) -> None:
+	"""페이지 수가 한도 안인지 확인합니다. what은 오류 메시지에 넣을 대상(파일명 등)입니다."""
+	if LIMITS.max_pages and count > LIMITS.max_pages:
+		raise LimitExceededError(f"페이지 수가 한도({LIMITS.max_pages}쪽)를 넘습니다: {what} ({count}쪽)", "pages")
+
+
+# ---- 동시 처리 수 ----
+
+
+class HeavySlots:
+	"""
+	무거운 요청의 동시 처리 슬롯. 이벤트 루프에서만 쓰므로 잠금이 없습니다.
+	"""
+
+	def __init__(self, limit: int) -> None:
+		self.limit = limit
+		self.active = 0
+
+	def try_acquire(self) -> bool:
+		if self.limit > 0 and self.active >= self.limit:
+			return False
+		self.active += 1
+		return True
+
+	def release(self) -> None:
+		self.active -= 1
+
+
+async def send_error(send, status: int, detail: str, headers: Optional[Dict[str, str]] = None) -> None:
+	"""본문을 읽지 않고 JSON 오류 응답을 보냅니다(연결은 닫음)."""
+	body = json.dumps({"detail": detail}, ensure_ascii=False).encode("utf-8")
+	raw_headers = [
+		(b"content-type", b"application/json"),
+		(b"content-length", str(len(body)).encode()),
+		(b"connection", b"close"),
+	]
+	raw_headers.extend((key.lower().encode("latin-1"), value.encode("latin-1")) for key, value in (headers or {}).items())
+	await send({"type": "http.response.start", "status": status, "headers": raw_headers})
+	await send({"type": "http.response.body", "body": body})
+
+
+class AdmissionMiddleware:
+	"""
+	무거운 요청(POST HEAVY_PATHS)의 동시 처리 수와 모든 요청의 본문 크기를 제한하는 ASGI 미들웨어입니다.
+
+	- 슬롯이 없으면 요청 본문을 받기 전에 429 + Retry-After로 거절합니다.
+	- 슬롯은 응답 본문(분할 ZIP 스트리밍 포함)을 다 보낼 때까지 잡고 있습니다.
+	- max_input_bytes가 있으면 본문(멀티파트 업로드, 청크 업로드 PUT 등 경로와 관계없이)을
+	  max_input_bytes + MULTIPART_OVERHEAD로 제한합니다. Content-Length가 넘으면 받기 전에, 모르면 누적 수신량이
+	  넘는 즉시 413으로 거절하므로 큰 본문을 디스크에 쓰지 않습니다.
+	"""
+
+	def __init__(
+		self,
+		app,
+		slots: HeavySlots,
+		retry_after: int = LIMITS.retry_after,
+		paths: FrozenSet[str] = HEAVY_PATHS,
+		max_input_bytes: int = LIMITS.max_input_bytes,
+	) -> None:
+		self.app = app
+		self.slots = slots
+		self.retry_after = retry_after
+		self.paths = paths
+		self.limited = (
+			RequestBodyLimitMiddleware(app, max_input_bytes + MULTIPART_OVERHEAD, on_reject=lambda: REJECTED.inc(reason="bytes"))
+			if max_input_bytes > 0
+			else app
+		)
+
+	async def __call__(self, scope, receive, send) -> None:
+		if scope["type"] != "http":
+			await self.app(scope, receive, send)
+			return
+		app = self.limited
+		if scope.get("method") != "POST" or scope.get("path") not in self.paths:
+			await app(scope, receive, send)
+			return
+
+		if not self.slots.try_acquire():
+			REJECTED.inc(reason="busy")
+			await send_error(
+				send,
+				429,
+				f"동시에 처리할 수 있는 요청 수({self.slots.limit}개)를 넘었습니다. 잠시 후 다시 시도하세요.",
+				{"Retry-After": str(self.retry_after)},
+			)
+			return
+		try:
+			await app(scope, receive, send)
+		finally:
+			self.slots.release()
+
+
+# ---- CPU 시간 예산 ----
+
+_budget = threading.local()
+
+
+def check_cpu_budget() -> None:
+	"""현재 실행기 작업이 CPU 시간 예산을 넘었으면 LimitExceededError를 발생시킵니다(예산 밖에서는 무시)."""
+	deadline = getattr(_budget, "deadline", None)
+	if deadline is not None and time.thread_time() > deadline:
+		# 예외가 올라가는 동안 끝나는 바깥 구간에서 다시 발생시키지 않도록 한 번만 알립니다.
+		_budget.deadline = None
+		raise LimitExceededError(f"요청의 CPU 시간이 한도({LIMITS.cpu_seconds}초)를 넘었습니다.", "cpu")
+
+
+def run_with_budget(seconds: float, fn: Callable[..., Any], *args: Any) -> Any:
+	"""
+	fn(*args)을 이 스레드의 CPU 시간 seconds 안에서 실행합니다. 실행기 작업자에서 호출됩니다.
+
+	- 예산은 작업이 check_cpu_budget()을 부르는 단계 경계(파싱 뒤, 입력/페이지 복사 사이, 쓰기 뒤,
+	  다시 샘플링/최적화/선형화 사이)에서 확인합니다.
+	"""
+	if seconds <= 0:
+		raise LimitExceededError(f"요청의 CPU 시간이 한도({LIMITS.cpu_seconds}초)를 넘었습니다.", "cpu")
+	previous = getattr(_budget, "deadline", None)
+	_budget.deadline = time.thread_time() + seconds
+	try:
+		return fn(*args)
+	finally:
+		_budget.deadline = previous
+
+
+def request_cpu_budget() -> Optional[float]:
+	"""현재 요청에 남은 CPU 시간(초). 한도가 없으면 None입니다(메인 프로세스에서 호출)."""
+	if not LIMITS.cpu_seconds:
+		return None
+	request = current_request()
+	used = request.cpu_seconds if request is not None else 0.0
+	return LIMITS.cpu_seconds - used
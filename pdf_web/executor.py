@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from .metrics import collect_stages, record_timings
+
+
+class ExecutorBusyError(RuntimeError):
+	"""
+	대기열이 가득 차서 새 작업을 받을 수 없을 때 발생합니다.
+	"""
+
+
+def _env_int(name: str, default: int) -> int:
+	"""
+	환경 변수에서 양의 정수를 읽습니다. 값이 없거나 잘못되면 기본값을 사용합니다.
+	"""
+	text = os.environ.get(name, "").strip()
+	if text == "":
+		return default
+	try:
+		value = int(text)
+	except ValueError:
+		return default
+	return value if value > 0 else default
+
+
+class BoundedExecutor:
+	"""
+	CPU 중심의 PDF 작업을 이벤트 루프 밖(스레드/프로세스 풀)에서 실행합니다.
+
+	- kind: "thread" 또는 "process"
+	- max_workers: 동시에 실행되는 작업 수
+	- max_queue: 실행 대기 중인 작업의 최대 개수. 초과하면 ExecutorBusyError
+	"""
+
+	def __init__(self, kind: str = "thread", max_workers: int = 2, max_queue: int = 8) -> None:
+		if kind not in ("thread", "process"):
+			raise ValueError(f"지원하지 않는 실행기 종류입니다: '{kind}' (thread|process)")
+		self.kind = kind
+		self.max_workers = max_workers
+		self.max_queue = max_queue
+		self._pool: Optional[Executor] = None
+		self._lock = threading.Lock()
+		self._pending = 0
+
+	@classmethod
+	def from_env(cls) -> "BoundedExecutor":
+		"""
+		환경 변수로 실행기를 구성합니다.
+
+		- PDF_WEB_EXECUTOR: thread(기본) | process
+		- PDF_WEB_WORKERS: 작업자 수 (기본: min(4, CPU 수))
+		- PDF_WEB_MAX_QUEUE: 대기열 한도 (기본: 작업자 수 x 4)
+		"""
+		kind = os.environ.get("PDF_WEB_EXECUTOR", "thread").strip().lower() or "thread"
+		workers = _env_int("PDF_WEB_WORKERS", min(4, os.cpu_count() or 1))
+		max_queue = _env_int("PDF_WEB_MAX_QUEUE", workers * 4)
+		return cls(kind=kind, max_workers=workers, max_queue=max_queue)
+
+	@property
+	def pending(self) -> int:
+		"""실행 중이거나 대기 중인 작업 수."""
+		return self._pending
+
+	@property
+	def queue_depth(self) -> int:
+		"""실행을 기다리는 작업 수."""
+		return max(0, self._pending - self.max_workers)
+
+	def _get_pool(self) -> Executor:
+		# 풀은 첫 작업 때 생성합니다(임포트 시 프로세스 생성 방지).
+		if self._pool is None:
+			if self.kind == "process":
+				self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+			else:
+				self._pool = ThreadPoolExecutor(
+					max_workers=self.max_workers,
+					thread_name_prefix="pdf-worker",
+				)
+		return self._pool
+
+	def _release(self, _future: Future) -> None:
+		with self._lock:
+			self._pending -= 1
+
+	def submit(self, fn: Callable[..., Any], *args: Any, check_queue: bool = True) -> Future:
+		"""
+		작업을 제출합니다. 대기열 한도를 넘으면 ExecutorBusyError를 발생시킵니다.
+
+		- 프로세스 풀에서는 fn과 인자가 pickle 가능해야 합니다(모듈 최상위 함수).
+		- 클라이언트가 연결을 끊어도 실행 중인 작업은 끝까지 수행되며, 완료 시점에 슬롯을 반환합니다.
+		- check_queue=False: 이미 받아들인 요청의 후속 작업(예: 스트리밍 중인 분할의 다음 파트)은
+		  한도 검사 없이 대기열에 넣습니다.
+		"""
+		with self._lock:
+			if check_queue and self._pending >= self.max_workers + self.max_queue:
+				raise ExecutorBusyError("서버가 바쁩니다. 잠시 후 다시 시도하세요.")
+			self._pending += 1
+			pool = self._get_pool()
+		try:
+			future = pool.submit(functools.partial(fn, *args))
+		except BaseException:
+			with self._lock:
+				self._pending -= 1
+			raise
+		future.add_done_callback(self._release)
+		return future
+
+	async def run(self, fn: Callable[..., Any], *args: Any, check_queue: bool = True) -> Any:
+		"""
+		작업을 제출하고 이벤트 루프를 막지 않고 결과를 기다립니다.
+
+		- 작업자에서 잰 단계 시간(metrics.stage)은 결과와 함께 돌려받아 이 프로세스의 지표에 기록합니다.
+		"""
+		result, timings = await asyncio.wrap_future(self.submit(collect_stages, fn, *args, check_queue=check_queue))
+		record_timings(timings)
+		return result
+
+	def shutdown(self) -> None:
+		"""풀을 종료합니다(진행 중 작업은 마무리)."""
+		with self._lock:
+			pool, self._pool = self._pool, None
+		if pool is not None:
+			pool.shutdown(wait=True)
@@ -0,0 +1,623 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import shutil
+import socket
+import sqlite3
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from pdf_tool.images import ImageOptions, downsample_file
+from pdf_tool.linearize import linearize_file
+from pdf_tool.optimize import OptimizeOptions, optimize_file
+
+from .admission import LimitExceededError
+from .executor import BoundedExecutor, _env_int
+from .metrics import add_stage, stage
+from .operations import (
+	IMAGE_WORKERS,
+	PdfInputError,
+	build_split_part,
+	downsample_headers,
+	linearize_headers,
+	optimize_headers,
+	plan_split,
+	write_merged,
+)
+from .spool import SpooledUpload
+from .zipstream import ZipCompressionPolicy, ZipReport, write_zip
+
+
+logger = logging.getLogger(__name__)
+
+# 비동기 작업(큐/입력/결과)을 보관할 디렉터리. 작업 목록은 SQLite에 기록되어 재시작 후에도 이어집니다.
+JOBS_DIR = os.environ.get("PDF_WEB_JOBS_DIR") or os.path.join(tempfile.gettempdir(), "pdf-web-jobs")
+JOB_WORKERS = max(1, _env_int("PDF_WEB_JOB_WORKERS", 1))
+# 끝난 작업(결과 포함)을 보관하는 시간(초)
+JOB_TTL = _env_int("PDF_WEB_JOB_TTL", 3600)
+JOB_CLEANUP_INTERVAL = 60
+# 실행 중인 작업의 소유자는 이 간격(초)마다 생존 신호를 기록합니다. 신호가 JOB_STALE_AFTER초 넘게 끊긴 작업만
+# (소유 프로세스가 죽었다고 보고) 다시 대기열에 넣으므로, 같은 JOBS_DIR을 여러 프로세스가 써도 두 번 실행하지 않습니다.
+JOB_HEARTBEAT_INTERVAL = _env_int("PDF_WEB_JOB_HEARTBEAT", 10)
+JOB_STALE_AFTER = max(_env_int("PDF_WEB_JOB_STALE_AFTER", 60), JOB_HEARTBEAT_INTERVAL * 3)
+# 진행 상황은 이 간격(초)보다 자주 기록하지 않습니다(마지막 갱신은 항상 기록).
+PROGRESS_INTERVAL = 0.2
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+TERMINAL_STATUSES = (DONE, FAILED, CANCELLED)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+	id TEXT PRIMARY KEY,
+	kind TEXT NOT NULL,
+	status TEXT NOT NULL,
+	params TEXT NOT NULL,
+	inputs TEXT NOT NULL,
+	progress TEXT NOT NULL DEFAULT '{}',
+	result TEXT,
+	error TEXT,
+	cancel_requested INTEGER NOT NULL DEFAULT 0,
+	created_at REAL NOT NULL,
+	updated_at REAL NOT NULL,
+	finished_at REAL,
+	owner TEXT,
+	heartbeat_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+"""
+
+# 이전 버전에서 만든 큐에 없는 열
+_ADDED_COLUMNS = (("owner", "TEXT"), ("heartbeat_at", "REAL"))
+
+
+class JobCancelled(Exception):
+	"""실행 중인 작업이 취소 요청을 확인했을 때 발생합니다."""
+
+
+@dataclass
+class Job:
+	"""작업 하나의 상태(SQLite 한 행)."""
+
+	id: str
+	kind: str
+	status: str
+	params: Dict
+	inputs: List[Dict]
+	progress: Dict = field(default_factory=dict)
+	result: Optional[Dict] = None
+	error: Optional[str] = None
+	cancel_requested: bool = False
+	created_at: float = 0.0
+	updated_at: float = 0.0
+	finished_at: Optional[float] = None
+	# 실행 중인 작업을 가져간 작업 관리자(new_owner_id)
+	owner: Optional[str] = None
+
+	@classmethod
+	def from_row(cls, row: sqlite3.Row) -> "Job":
+		return cls(
+			id=row["id"],
+			kind=row["kind"],
+			status=row["status"],
+			params=json.loads(row["params"]),
+			inputs=json.loads(row["inputs"]),
+			progress=json.loads(row["progress"]),
+			result=json.loads(row["result"]) if row["result"] else None,
+			error=row["error"],
+			cancel_requested=bool(row["cancel_requested"]),
+			created_at=row["created_at"],
+			updated_at=row["updated_at"],
+			finished_at=row["finished_at"],
+			owner=row["owner"],
+		)
+
+	def public(self) -> Dict:
+		"""API 응답용 표현(내부 경로는 제외)."""
+		data = {
+			"id": self.id,
+			"kind": self.kind,
+			"status": self.status,
+			"progress": self.progress,
+			"created_at": self.created_at,
+			"finished_at": self.finished_at,
+			"events": f"/jobs/{self.id}/events",
+		}
+		if self.cancel_requested and self.status == RUNNING:
+			data["cancel_requested"] = True
+		if self.error:
+			data["error"] = self.error
+		if self.status == DONE and self.result:
+			data["result"] = {
+				"url": f"/jobs/{self.id}/result",
+				"filename": self.result["filename"],
+				"media_type": self.result["media_type"],
+				"size": self.result["size"],
+			}
+		return data
+
+
+class JobStore:
+	"""
+	작업 큐/상태를 담는 SQLite 저장소. 작업마다 `<directory>/<id>/`에 입력과 결과 파일을 둡니다.
+
+	프로세스 풀 작업자에서도 같은 파일을 열어 진행 상황을 기록할 수 있도록, 호출마다 연결을 새로 엽니다.
+	"""
+
+	def __init__(self, directory: str) -> None:
+		self.directory = directory
+		self.db_path = os.path.join(directory, "jobs.sqlite")
+		os.makedirs(directory, exist_ok=True)
+		with self._connect() as conn:
+			conn.execute("PRAGMA journal_mode=WAL")
+			conn.executescript(_SCHEMA)
+			columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+			for name, kind in _ADDED_COLUMNS:
+				if name not in columns:
+					conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {kind}")
+
+	@classmethod
+	def from_env(cls) -> "JobStore":
+		return cls(JOBS_DIR)
+
+	@contextmanager
+	def _connect(self) -> Iterator[sqlite3.Connection]:
+		# 블록이 끝나면 커밋(예외 시 롤백)하고 연결을 닫습니다.
+		conn = sqlite3.connect(self.db_path, timeout=30)
+		conn.row_factory = sqlite3.Row
+		try:
+			with conn:
+				yield conn
+		finally:
+			conn.close()
+
+	def job_dir(self, job_id: str) -> str:
+		return os.path.join(self.directory, job_id)
+
+	def create(self, kind: str, params: Dict, sources: List[SpooledUpload]) -> Job:
+		"""
+		스풀된 입력을 작업 디렉터리로 옮기고 작업을 큐에 넣습니다(입력 스풀 파일은 옮겨지므로 정리할 필요 없음).
+
+		- 소유하지 않은 입력(완료된 업로드 세션)은 링크/복사하므로 세션을 다른 요청에서 계속 쓸 수 있습니다.
+		"""
+		job_id = uuid.uuid4().hex
+		job_dir = self.job_dir(job_id)
+		os.makedirs(job_dir)
+		inputs = []
+		try:
+			for index, source in enumerate(sources):
+				path = os.path.join(job_dir, f"input-{index}.pdf")
+				if source.path is not None and source.owned:
+					shutil.move(source.path, path)
+					source.path = None
+				elif source.path is not None:
+					# 업로드 세션 파일은 그대로 두고 하드 링크(안 되면 복사)로 가져옵니다.
+					try:
+						os.link(source.path, path)
+					except OSError:
+						shutil.copyfile(source.path, path)
+				else:
+					with open(path, "wb") as f:
+						f.write(source.data or b"")
+				inputs.append({"filename": source.filename, "size": source.size, "path": path, "digest": source.digest})
+			now = time.time()
+			job = Job(id=job_id, kind=kind, status=QUEUED, params=params, inputs=inputs, created_at=now, updated_at=now)
+			with self._connect() as conn:
+				conn.execute(
+					"INSERT INTO jobs (id, kind, status, params, inputs, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+					(job_id, kind, QUEUED, json.dumps(params), json.dumps(inputs), now, now),
+				)
+		except BaseException:
+			shutil.rmtree(job_dir, ignore_errors=True)
+			raise
+		return job
+
+	def get(self, job_id: str) -> Optional[Job]:
+		with self._connect() as conn:
+			row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+		return Job.from_row(row) if row is not None else None
+
+	def claim_next(self, owner: Optional[str] = None) -> Optional[Job]:
+		"""가장 오래된 대기 작업 하나를 owner 소유의 실행 중 작업으로 바꿔 가져옵니다."""
+		with self._connect() as conn:
+			conn.execute("BEGIN IMMEDIATE")
+			row = conn.execute(
+				"SELECT * FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+			).fetchone()
+			if row is None:
+				return None
+			now = time.time()
+			conn.execute(
+				"UPDATE jobs SET status = ?, owner = ?, heartbeat_at = ?, updated_at = ? WHERE id = ?",
+				(RUNNING, owner, now, now, row["id"]),
+			)
+		job = Job.from_row(row)
+		job.status = RUNNING
+		job.owner = owner
+		job.updated_at = now
+		return job
+
+	def heartbeat(self, owner: str) -> int:
+		"""owner가 실행 중인 작업들의 생존 신호를 기록합니다."""
+		with self._connect() as conn:
+			cur = conn.execute(
+				"UPDATE jobs SET heartbeat_at = ? WHERE status = ? AND owner = ?",
+				(time.time(), RUNNING, owner),
+			)
+			return cur.rowcount
+
+	def requeue_stale(self, stale_after: float = JOB_STALE_AFTER) -> int:
+		"""
+		생존 신호가 stale_after초 넘게 끊긴 실행 중 작업(소유 프로세스가 죽은 작업)을 다시 대기 상태로 돌립니다.
+
+		- 처음부터 다시 실행합니다. 신호를 보내고 있는 다른 프로세스의 작업은 건드리지 않습니다.
+		- 생존 신호 열이 생기기 전의 작업은 마지막 갱신 시각으로 판단합니다.
+		"""
+		now = time.time()
+		with self._connect() as conn:
+			cur = conn.execute(
+				"UPDATE jobs SET status = ?, owner = NULL, heartbeat_at = NULL, progress = '{}', updated_at = ? "
+				"WHERE status = ? AND COALESCE(heartbeat_at, updated_at) < ?",
+				(QUEUED, now, RUNNING, now - stale_after),
+			)
+			return cur.rowcount
+
+	def update_progress(self, job_id: str, progress: Dict, owner: Optional[str] = None) -> bool:
+		"""
+		진행 상황을 기록하고 작업을 멈춰야 하는지(취소 요청, 또는 owner가 더는 소유하지 않음) 반환합니다.
+		"""
+		with self._connect() as conn:
+			conn.execute(
+				"UPDATE jobs SET progress = ?, updated_at = ? WHERE id = ? AND (? IS NULL OR owner = ?)",
+				(json.dumps(progress), time.time(), job_id, owner, owner),
+			)
+			row = conn.execute("SELECT cancel_requested, owner FROM jobs WHERE id = ?", (job_id,)).fetchone()
+		if row is None or bool(row["cancel_requested"]):
+			return True
+		return owner is not None and row["owner"] != owner
+
+	def finish(
+		self,
+		job_id: str,
+		status: str,
+		result: Optional[Dict] = None,
+		error: Optional[str] = None,
+		owner: Optional[str] = None,
+	) -> bool:
+		"""
+		작업을 끝난 상태로 기록하고, 더 필요 없는 입력 파일을 지웁니다.
+
+		- owner가 있으면 그 소유자가 아직 실행 중인 작업일 때만 기록하고, 기록했는지 반환합니다
+		  (다른 프로세스가 다시 가져간 작업의 파일은 건드리지 않음).
+		"""
+		job = self.get(job_id)
+		now = time.time()
+		with self._connect() as conn:
+			cur = conn.execute(
+				"UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ?, finished_at = ?, owner = NULL "
+				"WHERE id = ? AND (? IS NULL OR (status = ? AND owner = ?))",
+				(status, json.dumps(result) if result else None, error, now, now, job_id, owner, RUNNING, owner),
+			)
+		if cur.rowcount == 0:
+			return False
+		if job is not None:
+			for item in job.inputs:
+				try:
+					os.remove(item["path"])
+				except OSError:
+					pass
+		return True
+
+	def request_cancel(self, job_id: str) -> Optional[Job]:
+		"""
+		작업 취소를 요청합니다. 대기 중이면 즉시 취소되고, 실행 중이면 다음 진행 보고 시점에 멈춥니다.
+		"""
+		now = time.time()
+		with self._connect() as conn:
+			cur = conn.execute(
+				"UPDATE jobs SET status = ?, updated_at = ?, finished_at = ? WHERE id = ? AND status = ?",
+				(CANCELLED, now, now, job_id, QUEUED),
+			)
+			if cur.rowcount == 0:
+				conn.execute(
+					"UPDATE jobs SET cancel_requested = 1, updated_at = ? WHERE id = ? AND status = ?",
+					(now, job_id, RUNNING),
+				)
+		job = self.get(job_id)
+		if job is not None and job.status == CANCELLED:
+			shutil.rmtree(self.job_dir(job_id), ignore_errors=True)
+		return job
+
+	def delete_expired(self, ttl: int) -> int:
+		"""끝난 지 ttl초가 지난 작업과 그 파일을 지웁니다."""
+		cutoff = time.time() - ttl
+		with self._connect() as conn:
+			rows = conn.execute(
+				"SELECT id FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?", (cutoff,)
+			).fetchall()
+			conn.executemany("DELETE FROM jobs WHERE id = ?", [(row["id"],) for row in rows])
+		for row in rows:
+			shutil.rmtree(self.job_dir(row["id"]), ignore_errors=True)
+		return len(rows)
+
+
+class _ProgressReporter:
+	"""작업자 쪽 진행 보고. 너무 잦은 기록은 건너뛰고, 기록할 때마다 취소 요청을 확인합니다."""
+
+	def __init__(self, store: JobStore, job_id: str, owner: Optional[str] = None) -> None:
+		self._store = store
+		self._job_id = job_id
+		self._owner = owner
+		self._progress: Dict = {"stage": "starting", "pages_done": 0, "pages_total": 0, "bytes_written": 0}
+		self._last = 0.0
+
+	def update(self, force: bool = False, **values) -> None:
+		self._progress.update(values)
+		now = time.monotonic()
+		if not force and now - self._last < PROGRESS_INTERVAL:
+			return
+		self._last = now
+		if self._store.update_progress(self._job_id, self._progress, self._owner):
+			raise JobCancelled()
+
+
+def execute_job(directory: str, job_id: str, owner: Optional[str] = None) -> Dict:
+	"""
+	작업 하나를 실행하고 결과 파일 정보를 반환합니다(실행기의 작업자에서 호출).
+
+	- 스레드/프로세스 어느 쪽에서도 동작하도록 인자는 경로/문자열만 받습니다.
+	- owner가 더는 작업을 소유하지 않으면(다른 프로세스가 다시 가져감) 다음 진행 보고 때 멈춥니다.
+	"""
+	store = JobStore(directory)
+	job = store.get(job_id)
+	if job is None:
+		raise JobCancelled()
+	sources = [
+		SpooledUpload(filename=item["filename"], size=item["size"], path=item["path"], digest=item["digest"])
+		for item in job.inputs
+	]
+	reporter = _ProgressReporter(store, job_id, owner)
+	job_dir = store.job_dir(job_id)
+	if job.kind == "merge":
+		return _run_merge(job, sources, job_dir, reporter)
+	if job.kind == "split":
+		return _run_split(job, sources[0], job_dir, reporter)
+	raise PdfInputError(f"알 수 없는 작업 종류입니다: {job.kind}")
+
+
+def _image_options(job: Job) -> ImageOptions:
+	# 이전 버전에서 만든 작업에는 이미지 설정이 없습니다.
+	return ImageOptions(
+		dpi=job.params.get("downsample", 0),
+		quality=job.params.get("jpeg_quality", 75),
+		workers=IMAGE_WORKERS,
+	)
+
+
+def _run_merge(job: Job, sources: List[SpooledUpload], job_dir: str, reporter: _ProgressReporter) -> Dict:
+	path = os.path.join(job_dir, "result.pdf")
+	with open(path, "wb") as f_out:
+		reporter.update(force=True, stage="merging")
+
+		def progress(done: int, total: int) -> None:
+			reporter.update(pages_done=done, pages_total=total, bytes_written=f_out.tell())
+
+		stats = write_merged(f_out, sources, job.params.get("dedupe", False), progress)
+		size = f_out.tell()
+	headers = {}
+	if stats is not None:
+		headers["X-Dedupe-Objects"] = str(stats.objects_removed)
+		headers["X-Dedupe-Saved-Bytes"] = str(stats.bytes_saved)
+	images = _image_options(job)
+	if images.enabled:
+		reporter.update(force=True, stage="downsampling")
+		with stage("downsample"):
+			image_report = downsample_file(Path(path), images)
+		size = image_report.output_bytes
+		headers.update(downsample_headers(image_report))
+	options = OptimizeOptions.parse(job.params.get("optimize"))
+	if options.enabled:
+		reporter.update(force=True, stage="optimizing")
+		with stage("optimize"):
+			report = optimize_file(Path(path), options)
+		size = report.output_bytes
+		headers.update(optimize_headers(report))
+	if job.params.get("linearize", False):
+		reporter.update(force=True, stage="linearizing")
+		with stage("linearize"):
+			linearize_report = linearize_file(Path(path))
+		size = linearize_report.output_bytes
+		headers.update(linearize_headers(linearize_report))
+	reporter.update(force=True, stage="finished", bytes_written=size)
+	return {
+		"path": path,
+		"filename": job.params["output_name"],
+		"media_type": "application/pdf",
+		"size": size,
+		"headers": headers,
+	}
+
+
+def _run_split(job: Job, source: SpooledUpload, job_dir: str, reporter: _ProgressReporter) -> Dict:
+	reporter.update(force=True, stage="planning")
+	base_name, parts = plan_split(source, job.params.get("ranges"))
+	total = sum(len(pages) for _, pages in parts)
+	optimize = job.params.get("optimize", "off")
+	images = _image_options(job)
+	linearize = job.params.get("linearize", False)
+	reporter.update(force=True, stage="splitting", pages_total=total)
+
+	if len(parts) == 1:
+		name, pages = parts[0]
+		data, headers = build_split_part(source, pages, optimize, images, linearize)
+		path = os.path.join(job_dir, "result.pdf")
+		with open(path, "wb") as f_out:
+			f_out.write(data)
+		reporter.update(force=True, stage="finished", pages_done=total, bytes_written=len(data))
+		return {"path": path, "filename": name, "media_type": "application/pdf", "size": len(data), "headers": headers}
+
+	policy = ZipCompressionPolicy.parse(job.params["compression"])
+	path = os.path.join(job_dir, "result.zip")
+	with open(path, "wb") as f_out:
+
+		def entries():
+			done = 0
+			for name, pages in parts:
+				reporter.update(pages_done=done, bytes_written=f_out.tell())
+				yield name, build_split_part(source, pages, optimize, images, linearize)[0]
+				done += len(pages)
+
+		report = write_zip(f_out, entries(), policy, ZipReport(policy=str(policy), source_bytes=source.size))
+		add_stage("zip", report.seconds)
+		size = f_out.tell()
+	reporter.update(force=True, stage="finished", pages_done=total, bytes_written=size)
+	return {
+		"path": path,
+		"filename": f"{base_name}_split.zip",
+		"media_type": "application/zip",
+		"size": size,
+		"headers": {"X-Zip-Compression": str(policy)},
+	}
+
+
+class JobManager:
+	"""
+	SQLite 큐에서 작업을 꺼내 실행기로 넘기는 작업자 태스크들과 만료 정리 태스크를 관리합니다.
+
+	- 작업은 실행기 대기열 한도를 거치지 않습니다(대기는 SQLite 큐에서 합니다).
+	- 가져간 작업에는 관리자마다 고유한 owner를 기록하고 heartbeat_interval초마다 생존 신호를 남깁니다.
+	- 생존 신호가 stale_after초 넘게 끊긴 작업(중단된 이전 실행이나 죽은 다른 프로세스의 작업)만 다시 대기열에 넣습니다.
+	- 서버 시작(lifespan) 때 시작하며, lifespan이 꺼져 있으면 첫 /jobs 요청 때 시작합니다.
+	"""
+
+	def __init__(
+		self,
+		store: JobStore,
+		executor: BoundedExecutor,
+		workers: int = JOB_WORKERS,
+		ttl: int = JOB_TTL,
+		heartbeat_interval: float = JOB_HEARTBEAT_INTERVAL,
+		stale_after: float = JOB_STALE_AFTER,
+	) -> None:
+		self.store = store
+		self.executor = executor
+		self.workers = workers
+		self.ttl = ttl
+		self.heartbeat_interval = heartbeat_interval
+		self.stale_after = stale_after
+		self.owner = new_owner_id()
+		self._wakeup: Optional[asyncio.Event] = None
+		self._tasks: List[asyncio.Task] = []
+		self.running = 0
+
+	async def start(self) -> None:
+		"""작업자를 시작합니다. 이미 시작했으면 아무것도 하지 않습니다(lifespan을 끈 서버에서도 호출 가능)."""
+		if self._tasks:
+			return
+		self._wakeup = asyncio.Event()
+		await self._requeue_stale()
+		self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+		self._tasks.append(asyncio.create_task(self._cleanup()))
+		self._tasks.append(asyncio.create_task(self._heartbeat()))
+
+	async def stop(self) -> None:
+		for task in self._tasks:
+			task.cancel()
+		await asyncio.gather(*self._tasks, return_exceptions=True)
+		self._tasks = []
+
+	def notify(self) -> None:
+		"""새 작업이 들어왔음을 작업자에게 알립니다."""
+		if self._wakeup is not None:
+			self._wakeup.set()
+
+	async def submit(self, kind: str, params: Dict, sources: List[SpooledUpload]) -> Job:
+		"""입력을 작업 디렉터리로 옮기고 작업을 대기열에 넣습니다."""
+		await self.start()
+		job = await run_in_threadpool(self.store.create, kind, params, sources)
+		self.notify()
+		return job
+
+	async def _worker(self) -> None:
+		assert self._wakeup is not None
+		while True:
+			job = await run_in_threadpool(self.store.claim_next, self.owner)
+			if job is None:
+				# 다른 프로세스가 넣은 작업도 집도록 주기적으로 다시 확인합니다.
+				try:
+					await asyncio.wait_for(self._wakeup.wait(), timeout=1.0)
+				except asyncio.TimeoutError:
+					pass
+				self._wakeup.clear()
+				continue
+			await self._execute(job)
+
+	async def _execute(self, job: Job) -> None:
+		self.running += 1
+		try:
+			result = await self.executor.run(execute_job, self.store.directory, job.id, self.owner, check_queue=False)
+		except JobCancelled:
+			if await run_in_threadpool(self.store.finish, job.id, CANCELLED, None, None, self.owner):
+				await run_in_threadpool(shutil.rmtree, self.store.job_dir(job.id), True)
+		except (PdfInputError, LimitExceededError) as e:
+			await run_in_threadpool(self.store.finish, job.id, FAILED, None, str(e), self.owner)
+		except asyncio.CancelledError:
+			# 서버 종료: 작업은 실행 중 상태로 남고, 생존 신호가 끊긴 뒤(stale_after) 다시 실행됩니다.
+			raise
+		except Exception as e:
+			logger.exception("작업 %s 실패", job.id)
+			await run_in_threadpool(
+				self.store.finish, job.id, FAILED, None, f"작업 중 오류가 발생했습니다: {e}", self.owner
+			)
+		else:
+			await run_in_threadpool(self.store.finish, job.id, DONE, result, None, self.owner)
+		finally:
+			self.running -= 1
+
+	async def _requeue_stale(self) -> None:
+		requeued = await run_in_threadpool(self.store.requeue_stale, self.stale_after)
+		if requeued:
+			logger.info("중단된 작업 %d개를 다시 대기열에 넣었습니다.", requeued)
+			self.notify()
+
+	async def _heartbeat(self) -> None:
+		while True:
+			await asyncio.sleep(self.heartbeat_interval)
+			try:
+				await run_in_threadpool(self.store.heartbeat, self.owner)
+				await self._requeue_stale()
+			except Exception:
+				logger.exception("작업 생존 신호 기록 실패")
+
+	async def _cleanup(self) -> None:
+		while True:
+			try:
+				removed = await run_in_threadpool(self.store.delete_expired, self.ttl)
+				if removed:
+					logger.info("만료된 작업 %d개를 정리했습니다.", removed)
+			except Exception:
+				logger.exception("작업 정리 실패")
+			await asyncio.sleep(JOB_CLEANUP_INTERVAL)
+
+
+def new_owner_id() -> str:
+	"""작업 관리자 하나를 가리키는 소유자 ID(호스트:PID:임의값)."""
+	return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def format_sse(event: str, data: Dict) -> str:
+	"""Server-Sent Events 메시지 하나를 만듭니다."""
+	return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
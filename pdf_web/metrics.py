@@ -0,0 +1,502 @@
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from starlette.routing import Match
+
+
+# Prometheus 텍스트 형식(0.0.4)으로 내보내는 작은 지표 저장소와, 요청/작업 단계별 시간 측정.
+#
+# - 외부 라이브러리(prometheus_client) 없이 카운터/게이지/히스토그램만 구현합니다.
+# - 실행기 작업(operations.py)은 stage()로 단계 시간을 재고, 실행기가 collect_stages로 감싸
+#   결과와 함께 메인 프로세스로 돌려받습니다(프로세스 풀에서도 동작). 메인 프로세스가 받은
+#   시간을 히스토그램과 현재 요청의 Server-Timing에 기록합니다.
+
+# 요청/단계 시간 히스토그램 경계(초). 큰 PDF 작업을 위해 기본값보다 길게 잡습니다.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+	return value.replace("\\", "\\\\").replace("\n", "\\n").replace("\"", "\\\"")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+	parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+	if extra:
+		parts.append(extra)
+	return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+	if math.isinf(value):
+		return "+Inf" if value > 0 else "-Inf"
+	if float(value).is_integer():
+		return str(int(value))
+	return repr(float(value))
+
+
+class _Metric:
+	kind = ""
+
+	def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()) -> None:
+		self.name = name
+		self.documentation = documentation
+		self.labels = tuple(labels)
+		self._lock = threading.Lock()
+
+	def _key(self, labels: Dict[str, str]) -> LabelValues:
+		if set(labels) != set(self.labels):
+			raise ValueError(f"{self.name}: 레이블은 {self.labels}이어야 합니다: {tuple(labels)}")
+		return tuple(str(labels[name]) for name in self.labels)
+
+	def samples(self) -> List[str]:
+		raise NotImplementedError
+
+	def render(self) -> str:
+		lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+		lines.extend(self.samples())
+		return "\n".join(lines)
+
+
+class Counter(_Metric):
+	"""늘어나기만 하는 값(요청 수, 바이트 수 등)."""
+
+	kind = "counter"
+
+	def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()) -> None:
+		super().__init__(name, documentation, labels)
+		self._values: Dict[LabelValues, float] = {}
+
+	def inc(self, amount: float = 1.0, **labels: str) -> None:
+		if amount < 0:
+			raise ValueError("카운터는 줄일 수 없습니다.")
+		key = self._key(labels)
+		with self._lock:
+			self._values[key] = self._values.get(key, 0.0) + amount
+
+	def value(self, **labels: str) -> float:
+		with self._lock:
+			return self._values.get(self._key(labels), 0.0)
+
+	def samples(self) -> List[str]:
+		with self._lock:
+			items = sorted(self._values.items())
+		return [f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(_Metric):
+	"""
+	오르내리는 값. function을 주면 내보낼 때마다 호출해 값을 읽습니다(레이블 없는 게이지만).
+
+	- function이 None을 반환하면 그 값은 내보내지 않습니다(예: RSS를 읽을 수 없는 플랫폼).
+	"""
+
+	kind = "gauge"
+
+	def __init__(
+		self,
+		name: str,
+		documentation: str,
+		labels: Sequence[str] = (),
+		function: Optional[Callable[[], Optional[float]]] = None,
+	) -> None:
+		super().__init__(name, documentation, labels)
+		if function is not None and self.labels:
+			raise ValueError("함수로 읽는 게이지에는 레이블을 둘 수 없습니다.")
+		self._values: Dict[LabelValues, float] = {}
+		self._function = function
+
+	def set(self, value: float, **labels: str) -> None:
+		key = self._key(labels)
+		with self._lock:
+			self._values[key] = value
+
+	def inc(self, amount: float = 1.0, **labels: str) -> None:
+		key = self._key(labels)
+		with self._lock:
+			self._values[key] = self._values.get(key, 0.0) + amount
+
+	def dec(self, amount: float = 1.0, **labels: str) -> None:
+		self.inc(-amount, **labels)
+
+	def value(self, **labels: str) -> Optional[float]:
+		if self._function is not None:
+			return self._function()
+		with self._lock:
+			return self._values.get(self._key(labels), 0.0)
+
+	def samples(self) -> List[str]:
+		if self._function is not None:
+			value = self._function()
+			return [] if value is None else [f"{self.name} {_format_value(value)}"]
+		with self._lock:
+			items = sorted(self._values.items())
+		return [f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}" for key, value in items]
+
+
+class Histogram(_Metric):
+	"""관측값 분포(누적 버킷, 합계, 개수)."""
+
+	kind = "histogram"
+
+	def __init__(
+		self,
+		name: str,
+		documentation: str,
+		labels: Sequence[str] = (),
+		buckets: Sequence[float] = DEFAULT_BUCKETS,
+	) -> None:
+		super().__init__(name, documentation, labels)
+		if "le" in self.labels:
+			raise ValueError("히스토그램 레이블에 le를 쓸 수 없습니다.")
+		self.buckets = tuple(sorted(buckets))
+		# 레이블 값 -> [버킷별 개수..., +Inf 개수], 합계
+		self._counts: Dict[LabelValues, List[int]] = {}
+		self._sums: Dict[LabelValues, float] = {}
+
+	def observe(self, value: float, **labels: str) -> None:
+		key = self._key(labels)
+		index = bisect.bisect_left(self.buckets, value)
+		with self._lock:
+			counts = self._counts.get(key)
+			if counts is None:
+				counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+				self._sums[key] = 0.0
+			counts[index] += 1
+			self._sums[key] += value
+
+	def count(self, **labels: str) -> int:
+		with self._lock:
+			return sum(self._counts.get(self._key(labels), ()))
+
+	def samples(self) -> List[str]:
+		with self._lock:
+			items = sorted((key, list(counts), self._sums[key]) for key, counts in self._counts.items())
+		lines = []
+		for key, counts, total in items:
+			cumulative = 0
+			for bound, count in zip(self.buckets + (math.inf,), counts):
+				cumulative += count
+				le = f'le="{_format_value(bound)}"'
+				lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}")
+			lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(total)}")
+			lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {cumulative}")
+		return lines
+
+
+class MetricsRegistry:
+	"""지표 모음. render()가 등록 순서대로 Prometheus 텍스트 형식을 만듭니다."""
+
+	def __init__(self) -> None:
+		self._metrics: Dict[str, _Metric] = {}
+		self._lock = threading.Lock()
+
+	def register(self, metric: _Metric) -> _Metric:
+		with self._lock:
+			if metric.name in self._metrics:
+				raise ValueError(f"이미 등록된 지표입니다: {metric.name}")
+			self._metrics[metric.name] = metric
+		return metric
+
+	def counter(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Counter:
+		return self.register(Counter(name, documentation, labels))  # type: ignore[return-value]
+
+	def gauge(
+		self,
+		name: str,
+		documentation: str,
+		labels: Sequence[str] = (),
+		function: Optional[Callable[[], Optional[float]]] = None,
+	) -> Gauge:
+		return self.register(Gauge(name, documentation, labels, function))  # type: ignore[return-value]
+
+	def histogram(
+		self,
+		name: str,
+		documentation: str,
+		labels: Sequence[str] = (),
+		buckets: Sequence[float] = DEFAULT_BUCKETS,
+	) -> Histogram:
+		return self.register(Histogram(name, documentation, labels, buckets))  # type: ignore[return-value]
+
+	def render(self) -> str:
+		with self._lock:
+			metrics = list(self._metrics.values())
+		return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+REQUESTS = REGISTRY.counter("pdf_web_requests_total", "처리한 HTTP 요청 수", ("endpoint", "method", "status"))
+REQUEST_SECONDS = REGISTRY.histogram(
+	"pdf_web_request_duration_seconds", "HTTP 요청 처리 시간(응답 본문 끝까지)", ("endpoint",)
+)
+REQUESTS_IN_PROGRESS = REGISTRY.gauge("pdf_web_requests_in_progress", "처리 중인 HTTP 요청 수")
+STAGE_SECONDS = REGISTRY.histogram(
+	"pdf_web_stage_duration_seconds",
+	"작업 단계별 시간(upload, spool, parse, copy, serialize, downsample, optimize, linearize, zip)",
+	("endpoint", "stage"),
+)
+INPUT_BYTES = REGISTRY.counter("pdf_web_input_bytes_total", "받은 요청 본문 바이트", ("endpoint",))
+OUTPUT_BYTES = REGISTRY.counter("pdf_web_output_bytes_total", "보낸 응답 본문 바이트", ("endpoint",))
+PAGES = REGISTRY.counter("pdf_web_pages_processed_total", "출력에 쓴 페이지 수", ("endpoint",))
+CPU_SECONDS = REGISTRY.counter("pdf_web_cpu_seconds_total", "실행기 작업이 쓴 CPU 시간(초)", ("endpoint",))
+
+# 요청 밖(비동기 작업 등)에서 기록한 단계 시간의 endpoint 레이블
+BACKGROUND = "background"
+
+
+def process_rss() -> Optional[int]:
+	"""이 프로세스의 현재 상주 메모리(RSS, 바이트). 읽을 수 없으면 None입니다."""
+	try:
+		with open("/proc/self/status", "r", encoding="ascii") as f_in:
+			for line in f_in:
+				if line.startswith("VmRSS:"):
+					return int(line.split()[1]) * 1024
+	except OSError:
+		pass
+	return _windows_rss()
+
+
+def _windows_rss() -> Optional[int]:
+	try:
+		import ctypes
+		from ctypes import wintypes
+	except ImportError:
+		return None
+
+	class ProcessMemoryCounters(ctypes.Structure):
+		_fields_ = [
+			("cb", wintypes.DWORD),
+			("PageFaultCount", wintypes.DWORD),
+			("PeakWorkingSetSize", ctypes.c_size_t),
+			("WorkingSetSize", ctypes.c_size_t),
+			("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+			("QuotaPagedPoolUsage", ctypes.c_size_t),
+			("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+			("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+			("PagefileUsage", ctypes.c_size_t),
+			("PeakPagefileUsage", ctypes.c_size_t),
+		]
+
+	try:
+		counters = ProcessMemoryCounters()
+		counters.cb = ctypes.sizeof(counters)
+		handle = ctypes.windll.kernel32.GetCurrentProcess()  # type: ignore[attr-defined]
+		if not ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):  # type: ignore[attr-defined]
+			return None
+		return int(counters.WorkingSetSize)
+	except (AttributeError, OSError):
+		return None
+
+
+REGISTRY.gauge("process_resident_memory_bytes", "서버 프로세스의 상주 메모리(RSS)", function=process_rss)
+
+
+# ---- 실행기 작업 쪽: 단계 시간 수집 ----
+
+
+@dataclass
+class StageTimings:
+	"""실행기 작업 하나가 잰 단계별 시간(초), 출력에 쓴 페이지 수, 쓴 CPU 시간(초). 프로세스 사이로 pickle됩니다."""
+
+	seconds: Dict[str, float] = field(default_factory=dict)
+	pages: int = 0
+	cpu_seconds: float = 0.0
+
+	def add(self, stage: str, seconds: float) -> None:
+		self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+
+
+_collector = threading.local()
+
+
+def _current_timings() -> Optional[StageTimings]:
+	return getattr(_collector, "timings", None)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+	"""
+	블록 실행 시간을 단계 name으로 기록합니다. collect_stages 밖(CLI 등)에서는 아무것도 하지 않습니다.
+	"""
+	timings = _current_timings()
+	if timings is None:
+		yield
+		return
+	started = time.perf_counter()
+	try:
+		yield
+	finally:
+		timings.add(name, time.perf_counter() - started)
+
+
+def add_stage(name: str, seconds: float) -> None:
+	"""이미 잰 시간을 단계 name에 더합니다(collect_stages 밖에서는 무시)."""
+	timings = _current_timings()
+	if timings is not None:
+		timings.add(name, seconds)
+
+
+def add_pages(count: int) -> None:
+	"""출력에 쓴 페이지 수를 더합니다(collect_stages 밖에서는 무시)."""
+	timings = _current_timings()
+	if timings is not None:
+		timings.pages += count
+
+
+def collect_stages(fn: Callable[..., Any], *args: Any) -> Tuple[Any, StageTimings]:
+	"""
+	fn(*args)을 실행하며 잰 단계 시간을 결과와 함께 반환합니다. 실행기 작업자(스레드/프로세스)에서 호출됩니다.
+
+	- CPU 시간은 작업을 실행한 스레드의 것만 잽니다(이미지 처리용 보조 프로세스는 포함하지 않음).
+	"""
+	previous = _current_timings()
+	timings = _collector.timings = StageTimings()
+	started = time.thread_time()
+	try:
+		return fn(*args), timings
+	finally:
+		timings.cpu_seconds = time.thread_time() - started
+		_collector.timings = previous
+
+
+# ---- 메인 프로세스 쪽: 요청별 기록 ----
+
+
+class RequestTimings:
+	"""요청 하나의 단계별 시간과 실행기에서 쓴 CPU 시간. 단계 시간은 Server-Timing 헤더로 내보냅니다."""
+
+	def __init__(self, endpoint: str) -> None:
+		self.endpoint = endpoint
+		self.seconds: Dict[str, float] = {}
+		self.cpu_seconds = 0.0
+
+	def add(self, stage: str, seconds: float) -> None:
+		self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+
+	def server_timing(self, total: float) -> str:
+		entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.seconds.items()]
+		entries.append(f"total;dur={total * 1000:.1f}")
+		return ", ".join(entries)
+
+
+_request: ContextVar[Optional[RequestTimings]] = ContextVar("pdf_web_request_timings", default=None)
+
+
+def current_request() -> Optional[RequestTimings]:
+	"""MetricsMiddleware가 처리 중인 현재 요청의 기록(요청 밖이면 None)."""
+	return _request.get()
+
+
+def observe_stage(name: str, seconds: float) -> None:
+	"""메인 프로세스에서 잰 단계 시간을 히스토그램과 현재 요청(있으면)에 기록합니다."""
+	request = _request.get()
+	STAGE_SECONDS.observe(seconds, endpoint=request.endpoint if request else BACKGROUND, stage=name)
+	if request is not None:
+		request.add(name, seconds)
+
+
+def record_timings(timings: StageTimings) -> None:
+	"""실행기 작업이 돌려준 단계 시간, 페이지 수, CPU 시간을 기록합니다."""
+	for name, seconds in timings.seconds.items():
+		observe_stage(name, seconds)
+	request = _request.get()
+	endpoint = request.endpoint if request else BACKGROUND
+	if timings.pages:
+		PAGES.inc(timings.pages, endpoint=endpoint)
+	if timings.cpu_seconds > 0:
+		CPU_SECONDS.inc(timings.cpu_seconds, endpoint=endpoint)
+		if request is not None:
+			request.cpu_seconds += timings.cpu_seconds
+
+
+@contextmanager
+def timed_stage(name: str) -> Iterator[None]:
+	"""메인 프로세스(이벤트 루프)의 블록 실행 시간을 단계 name으로 기록합니다."""
+	started = time.perf_counter()
+	try:
+		yield
+	finally:
+		observe_stage(name, time.perf_counter() - started)
+
+
+def route_label(scope) -> str:
+	"""요청이 맞는 라우트의 경로 템플릿(예: /jobs/{job_id})을 레이블로 씁니다. 없는 경로는 모두 "other"입니다."""
+	router = getattr(scope.get("app"), "router", None)
+	partial = None
+	for route in getattr(router, "routes", ()):
+		match, _ = route.matches(scope)
+		if match == Match.FULL:
+			return getattr(route, "path", "other")
+		if match == Match.PARTIAL and partial is None:
+			partial = getattr(route, "path", None)
+	return partial or "other"
+
+
+class MetricsMiddleware:
+	"""
+	요청 수/시간/바이트를 기록하고, 응답 헤더를 보낼 때까지 잰 단계 시간을 `Server-Timing` 헤더로 붙이는 ASGI 미들웨어입니다.
+
+	- upload 단계는 요청 시작부터 본문 마지막 조각을 받을 때까지입니다(본문이 있는 요청만).
+	- 스트리밍 응답(분할 ZIP 등)은 헤더가 먼저 나가므로, 그 뒤의 단계는 히스토그램에만 남습니다.
+	"""
+
+	def __init__(self, app) -> None:
+		self.app = app
+
+	async def __call__(self, scope, receive, send) -> None:
+		if scope["type"] != "http":
+			await self.app(scope, receive, send)
+			return
+
+		endpoint = route_label(scope)
+		timings = RequestTimings(endpoint)
+		token = _request.set(timings)
+		started = time.perf_counter()
+		status = 500
+		received = 0
+		REQUESTS_IN_PROGRESS.inc()
+
+		async def counting_receive():
+			nonlocal received
+			message = await receive()
+			if message["type"] == "http.request":
+				size = len(message.get("body", b""))
+				if size:
+					received += size
+					INPUT_BYTES.inc(size, endpoint=endpoint)
+				if received and not message.get("more_body", False):
+					observe_stage("upload", time.perf_counter() - started)
+			return message
+
+		async def timed_send(message):
+			nonlocal status
+			if message["type"] == "http.response.start":
+				status = message["status"]
+				header = timings.server_timing(time.perf_counter() - started)
+				message = {**message, "headers": [*message.get("headers", []), (b"server-timing", header.encode("latin-1"))]}
+			elif message["type"] == "http.response.body":
+				size = len(message.get("body", b""))
+				if size:
+					OUTPUT_BYTES.inc(size, endpoint=endpoint)
+			await send(message)
+
+		try:
+			await self.app(scope, counting_receive, timed_send)
+		finally:
+			REQUESTS.inc(endpoint=endpoint, method=scope.get("method", ""), status=str(status))
+			REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint)
+			REQUESTS_IN_PROGRESS.dec()
+			_request.reset(token)
@@ -0,0 +1,569 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
+from dataclasses import replace
+from io import BytesIO
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from pypdf import PdfReader, PdfWriter
+
+from pdf_tool.compose import write_composed
+from pdf_tool.dedupe import DedupeStats, dedupe_writer
+from pdf_tool.images import DownsampleReport, ImageOptions, downsample_bytes
+from pdf_tool.info import inspect_reader
+from pdf_tool.linearize import LinearizeReport, linearize_bytes
+from pdf_tool.optimize import OptimizeOptions, OptimizeReport, optimize_bytes
+from pdf_tool.passthrough import PassthroughUnsupported, write_pages_passthrough
+from pdf_tool.prune import add_page_pruned
+from pdf_tool.utils import parse_page_selection, parse_ranges_to_groups
+
+from .admission import LimitExceededError, check_cpu_budget, check_pages
+from .executor import _env_int
+from .metrics import add_pages, add_stage, stage
+from .spool import SPOOL_DIR, SpooledUpload, open_pdf_stream
+
+
+logger = logging.getLogger(__name__)
+
+
+# 이 모듈의 함수들은 실행기(스레드/프로세스 풀)에서 호출됩니다.
+# 프로세스 풀에서도 동작하도록 인자/반환값은 pickle 가능한 기본 타입만 사용합니다.
+
+
+class PdfInputError(ValueError):
+	"""
+	업로드된 입력으로 작업을 수행할 수 없을 때 발생합니다(HTTP 400으로 응답).
+	"""
+
+
+class _CachedReader:
+	"""
+	파싱 캐시에 보관되는 열린 리더(스트림 포함).
+
+	- lock은 리더의 동시 사용을 막습니다.
+	- users는 사용 중인 호출 수로, 사용 중에 캐시에서 밀려난 항목은 마지막 사용이 끝날 때 닫습니다.
+	- flattened는 페이지 트리를 평탄화해 실제 페이지 수로 한도를 확인했는지입니다(요약만 보는 검사는 건너뜀).
+	"""
+
+	def __init__(self, key: str, reader: PdfReader, stack: ExitStack, size: int) -> None:
+		self.key = key
+		self.reader = reader
+		self.stack = stack
+		self.size = size
+		self.lock = threading.Lock()
+		self.users = 0
+		self.evicted = False
+		self.flattened = False
+
+	def close(self) -> None:
+		self.stack.close()
+
+
+# 같은 내용(sha256)의 입력을 반복해서 다룰 때 파싱(교차 참조 표/페이지 트리)을 건너뛰도록
+# 최근에 연 리더를 보관합니다. 항목 수와 입력 바이트 합계 두 기준으로 LRU 축출합니다.
+PARSE_CACHE_ENTRIES = max(1, _env_int("PDF_WEB_PARSE_CACHE_ENTRIES", 8))
+PARSE_CACHE_BYTES = _env_int("PDF_WEB_PARSE_CACHE_BYTES", 256 * 1024 * 1024)
+
+# 요청 하나의 이미지들을 나눠 처리할 프로세스 수. 요청 사이의 병렬 처리는 실행기가 맡으므로 기본은 1입니다.
+IMAGE_WORKERS = max(1, _env_int("PDF_WEB_IMAGE_WORKERS", 1))
+
+_reader_cache: "OrderedDict[str, _CachedReader]" = OrderedDict()
+_reader_cache_lock = threading.Lock()
+_reader_cache_bytes = 0
+_reader_cache_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+def _cache_owned_path(source: SpooledUpload, stack: ExitStack) -> Optional[str]:
+	# POSIX에서는 매핑한 파일을 요청 쪽에서 지워도 매핑이 유효하므로 스풀 파일을 그대로 씁니다.
+	# Windows에서는 매핑된 파일을 지울 수 없어 요청 정리가 실패하므로 캐시 전용 사본을 만듭니다.
+	if source.path is None or os.name != "nt":
+		return None
+	fd, path = tempfile.mkstemp(prefix="pdf-cache-", suffix=".pdf", dir=SPOOL_DIR)
+	os.close(fd)
+	stack.callback(_remove_quietly, path)
+	shutil.copyfile(source.path, path)
+	return path
+
+
+def _remove_quietly(path: str) -> None:
+	try:
+		os.remove(path)
+	except OSError:
+		pass
+
+
+def _declared_page_count(reader: PdfReader) -> int:
+	# 루트 페이지 트리의 /Count. 페이지 트리를 평탄화하지 않고 읽으며, 없거나 잘못되었으면 0입니다.
+	try:
+		count = reader.trailer["/Root"]["/Pages"]["/Count"]
+	except Exception:
+		return 0
+	return int(count) if isinstance(count, int) and count > 0 else 0
+
+
+# 작업별 메시지가 없을 때 암호화된 입력에 쓰는 메시지({filename}은 파일명으로 바뀜)
+ENCRYPTED_MESSAGE = "암호화된 PDF는 처리할 수 없습니다: {filename}"
+
+
+def _open_reader(source: SpooledUpload, encrypted: str = ENCRYPTED_MESSAGE) -> _CachedReader:
+	stack = ExitStack()
+	try:
+		owned = _cache_owned_path(source, stack)
+		target = replace(source, path=owned) if owned is not None else source
+		stream = stack.enter_context(open_pdf_stream(target))
+		with stage("parse"):
+			reader = PdfReader(stream)
+			# 열람 암호가 걸린 문서는 페이지 트리를 읽을 수 없으므로 페이지 수를 보기 전에 거절합니다.
+			if reader.is_encrypted:
+				raise PdfInputError(encrypted.format(filename=source.filename))
+			# 페이지 수 한도는 선언된 /Count로 먼저 확인해, 큰 페이지 트리를 평탄화하기 전에 거절합니다.
+			# 페이지 트리 평탄화는 페이지가 필요한 호출자가 리더를 빌릴 때(_flatten_pages) 합니다.
+			check_pages(_declared_page_count(reader), source.filename)
+		check_cpu_budget()
+	except (LimitExceededError, PdfInputError):
+		stack.close()
+		raise
+	except Exception:
+		stack.close()
+		raise PdfInputError(f"유효하지 않은 PDF입니다: {source.filename}")
+	return _CachedReader(source.cache_key, reader, stack, source.size)
+
+
+def _flatten_pages(entry: _CachedReader, filename: str) -> None:
+	# entry.lock을 잡은 상태에서 호출합니다. 페이지 트리는 리더마다 한 번만 평탄화해 둡니다.
+	# /Count가 실제보다 작게 적힌 문서도 여기서 실제 페이지 수로 걸러집니다.
+	if entry.flattened:
+		return
+	try:
+		with stage("parse"):
+			count = len(entry.reader.pages)
+	except Exception:
+		raise PdfInputError(f"유효하지 않은 PDF입니다: {filename}")
+	check_pages(count, filename)
+	entry.flattened = True
+
+
+def _evict_locked() -> List[_CachedReader]:
+	# _reader_cache_lock을 잡은 상태에서 호출합니다. 바로 닫을 수 있는 항목을 반환합니다.
+	global _reader_cache_bytes
+	closable: List[_CachedReader] = []
+	while len(_reader_cache) > 1 and (
+		len(_reader_cache) > PARSE_CACHE_ENTRIES or _reader_cache_bytes > PARSE_CACHE_BYTES
+	):
+		_, entry = _reader_cache.popitem(last=False)
+		_reader_cache_bytes -= entry.size
+		_reader_cache_stats["evictions"] += 1
+		entry.evicted = True
+		if entry.users == 0:
+			closable.append(entry)
+	return closable
+
+
+def _acquire_entry(source: SpooledUpload, encrypted: str = ENCRYPTED_MESSAGE) -> _CachedReader:
+	global _reader_cache_bytes
+	key = source.cache_key
+	with _reader_cache_lock:
+		entry = _reader_cache.get(key)
+		if entry is not None:
+			_reader_cache.move_to_end(key)
+			_reader_cache_stats["hits"] += 1
+			entry.users += 1
+			return entry
+
+	opened = _open_reader(source, encrypted)
+	closable: List[_CachedReader] = []
+	with _reader_cache_lock:
+		_reader_cache_stats["misses"] += 1
+		entry = _reader_cache.get(key)
+		if entry is None:
+			entry = _reader_cache[key] = opened
+			_reader_cache_bytes += opened.size
+		else:
+			# 다른 스레드가 먼저 열어 두었다면 그 리더를 사용합니다.
+			closable.append(opened)
+		entry.users += 1
+		closable.extend(_evict_locked())
+	for old in closable:
+		old.close()
+	return entry
+
+
+def _release_entry(entry: _CachedReader) -> None:
+	with _reader_cache_lock:
+		entry.users -= 1
+		closable = entry.evicted and entry.users == 0
+	if closable:
+		entry.close()
+
+
+@contextmanager
+def _cached_readers(
+	sources: Sequence[SpooledUpload],
+	encrypted: str = ENCRYPTED_MESSAGE,
+	pages: bool = True,
+) -> Iterator[List[PdfReader]]:
+	"""
+	입력마다 캐시된 리더를 빌려 옵니다. 내용이 같은 입력들은 같은 리더를 받습니다.
+
+	- 암호화된 입력은 캐시에 넣지 않고 encrypted 메시지({filename})의 PdfInputError로 거절합니다.
+	- pages=True이면 페이지 트리를 평탄화해 실제 페이지 수로 한도를 확인한 뒤 넘깁니다. 루트 /Count만 보는
+	  호출자(요약 검사)는 pages=False로 평탄화를 건너뜁니다.
+	"""
+	entries: "OrderedDict[str, _CachedReader]" = OrderedDict()
+	try:
+		for source in sources:
+			if source.cache_key not in entries:
+				entries[source.cache_key] = _acquire_entry(source, encrypted)
+		with ExitStack() as locks:
+			# 여러 리더를 잡을 때는 키 순서로 잠가 교착을 피합니다.
+			for key in sorted(entries):
+				locks.enter_context(entries[key].lock)
+			if pages:
+				for source in sources:
+					_flatten_pages(entries[source.cache_key], source.filename)
+			yield [entries[source.cache_key].reader for source in sources]
+	finally:
+		for entry in entries.values():
+			_release_entry(entry)
+
+
+@contextmanager
+def _cached_reader(source: SpooledUpload, encrypted: str = ENCRYPTED_MESSAGE, pages: bool = True) -> Iterator[PdfReader]:
+	with _cached_readers([source], encrypted, pages) as readers:
+		yield readers[0]
+
+
+def parse_cache_stats() -> Dict[str, int]:
+	"""
+	이 프로세스의 파싱 캐시 상태(적중/실패/축출 횟수, 항목 수, 입력 바이트 합계)를 반환합니다.
+	"""
+	with _reader_cache_lock:
+		stats = dict(_reader_cache_stats)
+		stats["entries"] = len(_reader_cache)
+		stats["bytes"] = _reader_cache_bytes
+	return stats
+
+
+def clear_parse_cache() -> None:
+	"""
+	이 프로세스의 파싱 캐시를 비웁니다(사용 중인 항목은 사용이 끝난 뒤 닫힙니다).
+	"""
+	global _reader_cache_bytes
+	with _reader_cache_lock:
+		entries = list(_reader_cache.values())
+		_reader_cache.clear()
+		_reader_cache_bytes = 0
+		closable = []
+		for entry in entries:
+			entry.evicted = True
+			if entry.users == 0:
+				closable.append(entry)
+	for entry in closable:
+		entry.close()
+
+
+def default_optimize() -> OptimizeOptions:
+	"""서버 기본 최적화 수준(PDF_WEB_OPTIMIZE, 기본 off)."""
+	return OptimizeOptions.parse(os.environ.get("PDF_WEB_OPTIMIZE", "off"))
+
+
+def default_images() -> ImageOptions:
+	"""서버 기본 이미지 다시 샘플링 설정(PDF_WEB_DOWNSAMPLE_DPI 기본 0 = 끔, PDF_WEB_JPEG_QUALITY 기본 75)."""
+	return ImageOptions(
+		dpi=_env_int("PDF_WEB_DOWNSAMPLE_DPI", 0),
+		quality=_env_int("PDF_WEB_JPEG_QUALITY", 75),
+		workers=IMAGE_WORKERS,
+	)
+
+def default_linearize() -> bool:
+	"""서버 기본 선형화 여부(PDF_WEB_LINEARIZE, 기본 0 = 끔)."""
+	return _env_int("PDF_WEB_LINEARIZE", 0) > 0
+
+
+def finish_output(
+	data: bytes,
+	name: str,
+	optimize: str = "off",
+	images: Optional[ImageOptions] = None,
+	linearize: bool = False,
+) -> Tuple[bytes, Dict[str, str]]:
+	"""
+	출력 PDF 바이트를 후처리합니다: 이미지 다시 샘플링(images), 크기 최적화(optimize), 선형화(linearize) 순.
+
+	- 반환값: (PDF 바이트, 보고 응답 헤더). 모두 꺼져 있으면 data와 빈 사전을 그대로 반환합니다.
+	- 결과가 더 크면 다시 샘플링/최적화 단계는 입력을 그대로 둡니다. 보고(이미지별 결과 포함)는 로그로 남깁니다.
+	- 선형화는 파일 배치를 바꾸는 마지막 단계이므로 항상 적용합니다.
+	"""
+	headers: Dict[str, str] = {}
+	options = OptimizeOptions.parse(optimize)
+	try:
+		if images is not None and images.enabled:
+			with ExitStack() as stack:
+				pool = stack.enter_context(ProcessPoolExecutor(images.workers)) if images.workers > 1 else None
+				with stage("downsample"):
+					data, image_report = downsample_bytes(data, images, pool=pool)
+			check_cpu_budget()
+			logger.info("%s %s %s", name, image_report.summary(), json.dumps(image_report.to_dict()["images"], ensure_ascii=False))
+			headers.update(downsample_headers(image_report))
+		if options.enabled:
+			with stage("optimize"):
+				data, report = optimize_bytes(data, options)
+			check_cpu_budget()
+			logger.info("%s %s", name, report.summary())
+			headers.update(optimize_headers(report))
+		if linearize:
+			with stage("linearize"):
+				data, linearize_report = linearize_bytes(data)
+			logger.info("%s %s", name, linearize_report.summary())
+			headers.update(linearize_headers(linearize_report))
+	except ValueError as e:
+		raise PdfInputError(str(e))
+	return data, headers
+
+
+def downsample_headers(report: Optional[DownsampleReport]) -> Dict[str, str]:
+	"""이미지 다시 샘플링 보고를 응답 헤더로 옮깁니다(하지 않았으면 빈 사전)."""
+	if report is None:
+		return {}
+	return {
+		"X-Downsample": report.options,
+		"X-Downsample-Images": f"{report.images_resampled}/{len(report.images)}",
+		"X-Downsample-Input-Bytes": str(report.input_bytes),
+		"X-Downsample-Output-Bytes": str(report.output_bytes),
+		"X-Downsample-Seconds": f"{report.seconds:.3f}",
+	}
+
+
+def optimize_headers(report: Optional[OptimizeReport]) -> Dict[str, str]:
+	"""최적화 보고를 응답 헤더로 옮깁니다(최적화하지 않았으면 빈 사전)."""
+	if report is None:
+		return {}
+	return {
+		"X-Optimize": report.options,
+		"X-Optimize-Input-Bytes": str(report.input_bytes),
+		"X-Optimize-Output-Bytes": str(report.output_bytes),
+		"X-Optimize-Seconds": f"{report.seconds:.3f}",
+	}
+
+
+def linearize_headers(report: Optional[LinearizeReport]) -> Dict[str, str]:
+	"""선형화 보고를 응답 헤더로 옮깁니다(선형화하지 않았으면 빈 사전)."""
+	if report is None:
+		return {}
+	return {
+		"X-Linearized": "1",
+		"X-Linearize-First-Page-Bytes": str(report.first_page_bytes),
+		"X-Linearize-Seconds": f"{report.seconds:.3f}",
+	}
+
+
+def write_merged(
+	stream: BinaryIO,
+	items: List[SpooledUpload],
+	dedupe: bool = False,
+	progress: Optional[Callable[[int, int], None]] = None,
+) -> Optional[DedupeStats]:
+	"""
+	스풀된 업로드 목록을 순서대로 병합하여 stream에 쓰고, 중복 제거 결과(dedupe=False면 None)를 반환합니다.
+
+	- 디스크에 스풀된 입력은 mmap으로 열어 원본 전체를 메모리에 복사하지 않습니다.
+	- 파싱한 리더는 내용 해시로 캐시되어, 같은 입력에 대한 이후 요청이 재사용합니다.
+	- dedupe=True이면 입력 간에 내용이 같은 객체를 하나로 합칩니다.
+	- progress가 있으면 (처리한 페이지 수, 전체 페이지 수)로 호출합니다.
+	"""
+	# 내용이 같은 입력(같은 파일을 두 번 올린 경우 등)은 한 번만 파싱합니다.
+	with _cached_readers(items, "암호화된 PDF는 병합할 수 없습니다: {filename}") as readers:
+		total_pages = sum(len(reader.pages) for reader in readers)
+		check_pages(total_pages, "병합 결과")
+		add_pages(total_pages)
+
+		if not dedupe:
+			def copied(done: int) -> None:
+				# 입력 하나를 복사할 때마다 CPU 시간 예산을 확인합니다.
+				check_cpu_budget()
+				if progress is not None:
+					progress(done, total_pages)
+
+			# 변환이 없으면 원본 객체를 번호만 바꿔 복사하는 고속 경로를 먼저 시도합니다.
+			start = stream.tell()
+			try:
+				passthrough = write_pages_passthrough(
+					stream,
+					[(reader, range(len(reader.pages))) for reader in readers],
+					progress=copied,
+				)
+				add_stage("copy", passthrough.copy_seconds)
+				add_stage("serialize", passthrough.serialize_seconds)
+				check_cpu_budget()
+				return None
+			except PassthroughUnsupported:
+				stream.seek(start)
+				stream.truncate()
+
+		writer = PdfWriter()
+		done = 0
+		with stage("copy"):
+			for reader in readers:
+				for page in reader.pages:
+					# 대체 경로는 페이지마다 CPU 시간 예산을 확인합니다.
+					check_cpu_budget()
+					writer.add_page(page)
+				done += len(reader.pages)
+				if progress is not None:
+					progress(done, total_pages)
+
+		stats = None
+		if dedupe:
+			with stage("dedupe"):
+				stats = dedupe_writer(writer)
+			check_cpu_budget()
+		with stage("serialize"):
+			writer.write(stream)
+	return stats
+
+
+def merge_documents(
+	items: List[SpooledUpload],
+	dedupe: bool = False,
+	optimize: str = "off",
+	images: Optional[ImageOptions] = None,
+	linearize: bool = False,
+) -> Tuple[bytes, Optional[DedupeStats], Dict[str, str]]:
+	"""
+	스풀된 업로드 목록을 순서대로 병합하여 (PDF 바이트, 중복 제거 결과, 후처리 보고 헤더)를 반환합니다.
+
+	- write_merged로 병합한 뒤 finish_output으로 이미지 다시 샘플링/최적화/선형화를 합니다.
+	"""
+	out_buf = BytesIO()
+	stats = write_merged(out_buf, items, dedupe)
+	data, headers = finish_output(out_buf.getvalue(), "merge", optimize, images, linearize)
+	return data, stats, headers
+
+
+def compose_documents(
+	items: List[SpooledUpload],
+	specs: Sequence[Tuple[int, Optional[str]]],
+	optimize: str = "off",
+	images: Optional[ImageOptions] = None,
+	linearize: bool = False,
+) -> Tuple[bytes, Dict[str, str]]:
+	"""
+	입력들에서 페이지를 골라 한 번에 하나의 PDF로 합성해 (PDF 바이트, 후처리 보고 헤더)를 반환합니다.
+
+	- specs: (items 안의 입력 번호, 페이지 선택 문자열) 목록. 선택 문법은 parse_page_selection을 따릅니다.
+	- 같은 입력을 여러 번 골라도 한 번만 파싱하며, 선택 사이에 공유 리소스를 다시 쓰지 않습니다.
+	"""
+	with _cached_readers(items, "암호화된 PDF는 합성할 수 없습니다: {filename}") as readers:
+		selections = []
+		for index, selection_text in specs:
+			reader = readers[index]
+			try:
+				selections.append((reader, parse_page_selection(selection_text, len(reader.pages))))
+			except ValueError as e:
+				raise PdfInputError(f"{items[index].filename}: {e}")
+		check_pages(sum(len(pages) for _, pages in selections), "합성 결과")
+
+		buf = BytesIO()
+		try:
+			# 합성은 고속 경로와 대체 경로를 write_composed 안에서 고르므로 복사와 쓰기를 한 단계로 잽니다.
+			with stage("copy"):
+				add_pages(write_composed(buf, selections))
+		except ValueError as e:
+			raise PdfInputError(str(e))
+		check_cpu_budget()
+	return finish_output(buf.getvalue(), "compose", optimize, images, linearize)
+
+
+def inspect_document(source: SpooledUpload, detail: bool = True) -> Dict:
+	"""
+	업로드의 페이지 수, 페이지별 MediaBox/회전, 목차, 암호화 여부, 크기를 반환합니다(콘텐츠 스트림은 읽지 않음).
+
+	- 파싱한 리더는 캐시에 남으므로, 같은 파일로 이어지는 분할/병합 요청은 다시 파싱하지 않습니다.
+	- detail=False이면 페이지 트리를 평탄화하지 않고 루트 /Count만 읽습니다(페이지 수 한도도 /Count로 확인).
+	- 암호화된 문서는 캐시에 넣을 수 없어 따로 열어 봅니다.
+	"""
+	try:
+		with _cached_reader(source, pages=detail) as reader:
+			return inspect_reader(reader, source.size, detail=detail).to_dict()
+	except PdfInputError as error:
+		with open_pdf_stream(source) as stream:
+			try:
+				reader = PdfReader(stream)
+			except Exception:
+				raise PdfInputError(f"유효하지 않은 PDF입니다: {source.filename}")
+			if not getattr(reader, "is_encrypted", False):
+				raise error
+			return inspect_reader(reader, source.size, detail=detail).to_dict()
+
+
+def plan_split(source: SpooledUpload, ranges: Optional[str]) -> Tuple[str, List[Tuple[str, Sequence[int]]]]:
+	"""
+	분할 계획을 세웁니다. 반환값: (기본 파일명, [(출력 파일명, 0-기반 페이지 구간), ...])
+
+	- `ranges`가 비어 있으면 각 페이지를 개별 파일로, 지정되면 토큰별 그룹으로 나눕니다.
+	- 파싱한 리더는 이후 build_split_part 호출(과 같은 내용의 다음 요청)을 위해 캐시에 남겨 둡니다.
+	"""
+	with _cached_reader(source, "암호화된 PDF는 분할할 수 없습니다.") as reader:
+		total_pages = len(reader.pages)
+
+	base_name = (Path(source.filename).stem or "document").replace("\"", "_")
+
+	if ranges is None or ranges.strip() == "":
+		# ranges가 없으면 각 페이지별 파일 생성
+		parts = [(f"{base_name}_page_{i + 1}.pdf", range(i, i + 1)) for i in range(total_pages)]
+	else:
+		# 범위 파싱 (1-기반 입력을 0-기반 인덱스로 변환)
+		try:
+			groups = parse_ranges_to_groups(ranges.strip(), total_pages)
+		except Exception as e:
+			raise PdfInputError(str(e))
+		parts = [(f"{base_name}_part_{gi}.pdf", group) for gi, group in enumerate(groups, start=1)]
+
+	if len(parts) == 0:
+		# 요청이 유효하나 결과가 비어있는 경우
+		raise PdfInputError("생성된 파일이 없습니다. 범위를 확인하세요.")
+
+	return base_name, parts
+
+
+def build_split_part(
+	source: SpooledUpload,
+	pages: Sequence[int],
+	optimize: str = "off",
+	images: Optional[ImageOptions] = None,
+	linearize: bool = False,
+) -> Tuple[bytes, Dict[str, str]]:
+	"""
+	분할 결과 파일 하나를 만듭니다. 반환값: (PDF 바이트, 보고 응답 헤더)
+
+	- 각 파트에는 페이지가 실제로 참조하는 리소스만 복사합니다.
+	- 파트마다 finish_output으로 이미지 다시 샘플링/최적화/선형화를 합니다. 보고는 로그로 남기고,
+	  파트가 하나뿐인 응답은 헤더(X-Downsample-*, X-Optimize-*, X-Linearize-*)로도 붙입니다.
+	"""
+	with _cached_reader(source) as reader:
+		buf = BytesIO()
+		try:
+			passthrough = write_pages_passthrough(buf, [(reader, pages)], prune_resources=True)
+			add_stage("copy", passthrough.copy_seconds)
+			add_stage("serialize", passthrough.serialize_seconds)
+			check_cpu_budget()
+		except PassthroughUnsupported:
+			buf = BytesIO()
+			writer = PdfWriter()
+			with stage("copy"):
+				for idx in pages:
+					check_cpu_budget()
+					add_page_pruned(writer, reader.pages[idx])
+			with stage("serialize"):
+				writer.write(buf)
+		add_pages(len(pages))
+	return finish_output(buf.getvalue(), source.filename, optimize, images, linearize)
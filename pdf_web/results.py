@@ -0,0 +1,342 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Sequence
+
+from .executor import _env_int
+
+
+logger = logging.getLogger(__name__)
+
+# 같은 입력(내용 해시)과 같은 옵션이면 결과도 같으므로, 결과 파일을 디스크에 보관했다가 다시 내보냅니다.
+RESULT_CACHE_BYTES = _env_int("PDF_WEB_RESULT_CACHE_BYTES", 512 * 1024 * 1024)
+RESULT_CACHE_DIR = os.environ.get("PDF_WEB_RESULT_CACHE_DIR") or os.path.join(
+	tempfile.gettempdir(), "pdf-web-results"
+)
+
+# 출력 형식이 바뀌면 올려서 이전 캐시 항목을 무효화합니다.
+_FORMAT_VERSION = 1
+
+
+def result_key(operation: str, digests: Sequence[str], **params) -> str:
+	"""
+	작업 이름, 입력 내용 해시(순서 포함), 옵션으로 결과 캐시 키(16진수)를 만듭니다.
+	"""
+	payload = json.dumps(
+		{"v": _FORMAT_VERSION, "op": operation, "inputs": list(digests), "params": params},
+		sort_keys=True,
+		ensure_ascii=False,
+	)
+	return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+	"""
+	If-None-Match 헤더가 etag와 일치하는지 확인합니다(약한 비교, `*` 지원).
+	"""
+	if not if_none_match:
+		return False
+	target = etag[2:] if etag.startswith("W/") else etag
+	for candidate in if_none_match.split(","):
+		candidate = candidate.strip()
+		if candidate == "*":
+			return True
+		if candidate.startswith("W/"):
+			candidate = candidate[2:]
+		if candidate == target:
+			return True
+	return False
+
+
+@dataclass(frozen=True)
+class CachedResult:
+	"""
+	캐시에 보관된 결과 하나. etag는 파일 내용의 SHA-256에서 만든 강한 검증자입니다.
+	"""
+
+	key: str
+	path: str
+	size: int
+	etag: str
+	media_type: str
+	filename: str
+	headers: Dict[str, str] = field(default_factory=dict)
+
+
+class ResultWriter:
+	"""
+	결과를 만들면서 캐시 파일에 함께 기록합니다(스트리밍 응답을 그대로 복사해 두는 용도).
+
+	- commit()을 호출해야 캐시에 등록되며, 중간에 끊기면 discard()로 임시 파일을 지웁니다.
+	"""
+
+	def __init__(self, cache: "ResultCache", key: str, media_type: str, filename: str, headers: Dict[str, str]) -> None:
+		self._cache = cache
+		self._key = key
+		self._media_type = media_type
+		self._filename = filename
+		self._headers = dict(headers)
+		self._hasher = hashlib.sha256()
+		self._size = 0
+		self._path = os.path.join(cache.directory, f"{key}.{uuid.uuid4().hex}.part")
+		self._file = open(self._path, "wb")
+		self._done = False
+
+	def write(self, data: bytes) -> None:
+		self._hasher.update(data)
+		self._size += len(data)
+		self._file.write(data)
+
+	def commit(self, pin: bool = False) -> Optional[CachedResult]:
+		"""
+		기록을 마치고 캐시에 등록합니다. 캐시 한도보다 크면 등록하지 않고 None을 반환합니다.
+
+		- pin=True면 등록한 항목을 고정해 반환합니다(내보낸 뒤 ResultCache.release로 풂).
+		"""
+		self._file.close()
+		self._done = True
+		etag = f"\"{self._hasher.hexdigest()[:32]}\""
+		return self._cache._register(
+			self._path,
+			CachedResult(
+				key=self._key,
+				path=self._cache._data_path(self._key),
+				size=self._size,
+				etag=etag,
+				media_type=self._media_type,
+				filename=self._filename,
+				headers=self._headers,
+			),
+			pin,
+		)
+
+	def discard(self) -> None:
+		"""기록 중이던 임시 파일을 버립니다(commit 이후에는 아무것도 하지 않음)."""
+		if self._done:
+			return
+		self._done = True
+		self._file.close()
+		_remove_quietly(self._path)
+
+
+class ResultCache:
+	"""
+	결과 파일을 디스크에 보관하는 캐시. 총 바이트 한도를 넘으면 가장 오래 쓰지 않은 항목부터 지웁니다.
+
+	- 각 항목은 `<key>.bin`(결과)과 `<key>.json`(메타데이터)으로 저장되어 재시작 후에도 재사용됩니다.
+	- max_bytes가 0이면 캐시를 사용하지 않습니다.
+	- 응답으로 내보내는 항목은 acquire/put(pin=True)로 고정합니다. 고정된 항목은 release할 때까지
+	  축출하거나 덮어쓰지 않으므로, 응답이 파일을 열기 전에 다른 요청이 지워 버리지 않습니다.
+	"""
+
+	def __init__(self, directory: str, max_bytes: int) -> None:
+		self.directory = directory
+		self.max_bytes = max_bytes
+		self._entries: "OrderedDict[str, CachedResult]" = OrderedDict()
+		self._total = 0
+		self._pins: Dict[str, int] = {}
+		self._hits = 0
+		self._misses = 0
+		self._lock = threading.Lock()
+		if self.enabled:
+			os.makedirs(directory, exist_ok=True)
+			self._load()
+
+	@classmethod
+	def from_env(cls) -> "ResultCache":
+		return cls(RESULT_CACHE_DIR, RESULT_CACHE_BYTES)
+
+	@property
+	def enabled(self) -> bool:
+		return self.max_bytes > 0
+
+	def _data_path(self, key: str) -> str:
+		return os.path.join(self.directory, f"{key}.bin")
+
+	def _meta_path(self, key: str) -> str:
+		return os.path.join(self.directory, f"{key}.json")
+
+	def _load(self) -> None:
+		# 이전 실행에서 남은 항목을 수정 시각 순으로 다시 등록하고, 짝이 맞지 않는 파일은 지웁니다.
+		found = []
+		for name in os.listdir(self.directory):
+			path = os.path.join(self.directory, name)
+			if name.endswith(".part"):
+				_remove_quietly(path)
+				continue
+			if not name.endswith(".json"):
+				continue
+			key = name[: -len(".json")]
+			try:
+				with open(path, "r", encoding="utf-8") as f:
+					meta = json.load(f)
+				stat = os.stat(self._data_path(key))
+			except (OSError, ValueError):
+				_remove_quietly(path)
+				continue
+			if stat.st_size != meta.get("size"):
+				_remove_quietly(path)
+				continue
+			entry = CachedResult(
+				key=key,
+				path=self._data_path(key),
+				size=stat.st_size,
+				etag=meta["etag"],
+				media_type=meta["media_type"],
+				filename=meta["filename"],
+				headers=meta.get("headers", {}),
+			)
+			found.append((stat.st_mtime, entry))
+		for _, entry in sorted(found, key=lambda item: item[0]):
+			self._entries[entry.key] = entry
+			self._total += entry.size
+		for name in os.listdir(self.directory):
+			if name.endswith(".bin") and name[: -len(".bin")] not in self._entries:
+				_remove_quietly(os.path.join(self.directory, name))
+		self._evict_locked()
+
+	def get(self, key: str) -> Optional[CachedResult]:
+		"""키에 해당하는 결과를 찾고, 있으면 최근 사용으로 표시합니다."""
+		if not self.enabled:
+			return None
+		with self._lock:
+			entry = self._entries.get(key)
+			if entry is None:
+				self._misses += 1
+			else:
+				self._hits += 1
+				self._entries.move_to_end(key)
+			return entry
+
+	def acquire(self, key: str) -> Optional[CachedResult]:
+		"""get과 같지만 찾은 항목을 고정합니다. 내보낸 뒤 release를 호출해야 합니다."""
+		if not self.enabled:
+			return None
+		with self._lock:
+			entry = self._entries.get(key)
+			if entry is None:
+				self._misses += 1
+				return None
+			self._hits += 1
+			self._entries.move_to_end(key)
+			self._pins[key] = self._pins.get(key, 0) + 1
+			return entry
+
+	def release(self, entry: CachedResult) -> None:
+		"""acquire/put(pin=True)로 고정한 항목을 풉니다. 한도를 넘은 상태였다면 이제 축출합니다."""
+		with self._lock:
+			count = self._pins.get(entry.key, 0) - 1
+			if count > 0:
+				self._pins[entry.key] = count
+				return
+			self._pins.pop(entry.key, None)
+			self._evict_locked()
+
+	def open_writer(self, key: str, media_type: str, filename: str, headers: Optional[Dict[str, str]] = None) -> Optional[ResultWriter]:
+		"""결과를 기록할 ResultWriter를 엽니다. 캐시를 쓰지 않으면 None을 반환합니다."""
+		if not self.enabled:
+			return None
+		return ResultWriter(self, key, media_type, filename, headers or {})
+
+	def put(
+		self,
+		key: str,
+		data: bytes,
+		media_type: str,
+		filename: str,
+		headers: Optional[Dict[str, str]] = None,
+		pin: bool = False,
+	) -> Optional[CachedResult]:
+		"""바이트 결과를 캐시에 저장합니다. 저장하지 않았으면 None을 반환합니다(pin은 commit과 같음)."""
+		writer = self.open_writer(key, media_type, filename, headers)
+		if writer is None or len(data) > self.max_bytes:
+			if writer is not None:
+				writer.discard()
+			return None
+		try:
+			writer.write(data)
+		except BaseException:
+			writer.discard()
+			raise
+		return writer.commit(pin)
+
+	def _register(self, part_path: str, entry: CachedResult, pin: bool = False) -> Optional[CachedResult]:
+		if entry.size > self.max_bytes:
+			_remove_quietly(part_path)
+			return None
+		meta = {
+			"etag": entry.etag,
+			"media_type": entry.media_type,
+			"filename": entry.filename,
+			"headers": entry.headers,
+			"size": entry.size,
+		}
+		meta_part = f"{part_path}.json"
+		try:
+			with open(meta_part, "w", encoding="utf-8") as f:
+				json.dump(meta, f, ensure_ascii=False)
+		except OSError:
+			_remove_quietly(part_path)
+			_remove_quietly(meta_part)
+			return None
+		with self._lock:
+			current = self._entries.get(entry.key)
+			if current is not None and entry.key in self._pins:
+				# 같은 키의 결과를 내보내는 중이면 파일을 바꾸지 않고 그 항목을 그대로 씁니다(같은 입력/옵션의 결과).
+				_remove_quietly(part_path)
+				_remove_quietly(meta_part)
+				self._entries.move_to_end(entry.key)
+				if pin:
+					self._pins[entry.key] += 1
+				return current
+			old = self._entries.pop(entry.key, None)
+			if old is not None:
+				self._total -= old.size
+			# 결과 파일을 먼저 바꾸고 메타데이터를 나중에 둬야 재시작 시 짝이 맞지 않는 항목을 걸러낼 수 있습니다.
+			os.replace(part_path, entry.path)
+			os.replace(meta_part, self._meta_path(entry.key))
+			self._entries[entry.key] = entry
+			self._total += entry.size
+			if pin:
+				self._pins[entry.key] = 1
+			self._evict_locked()
+		return entry
+
+	def _evict_locked(self) -> None:
+		# 고정된 항목은 건너뛰므로 잠시 한도를 넘을 수 있으며, 마지막 release 때 다시 축출합니다.
+		for key in list(self._entries):
+			if self._total <= self.max_bytes:
+				break
+			if key in self._pins:
+				continue
+			entry = self._entries.pop(key)
+			self._total -= entry.size
+			_remove_quietly(self._meta_path(key))
+			_remove_quietly(entry.path)
+			logger.info("결과 캐시 축출: %s (%d bytes)", key, entry.size)
+
+	def stats(self) -> Dict[str, int]:
+		"""적중/실패 횟수, 항목 수, 총 바이트를 반환합니다."""
+		with self._lock:
+			return {
+				"hits": self._hits,
+				"misses": self._misses,
+				"entries": len(self._entries),
+				"bytes": self._total,
+				"max_bytes": self.max_bytes,
+			}
+
+
+def _remove_quietly(path: str) -> None:
+	try:
+		os.remove(path)
+	except OSError:
+		pass
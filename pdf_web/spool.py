@@ -0,0 +1,341 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import tempfile
+import uuid
+from contextlib import aclosing, contextmanager
+from dataclasses import dataclass, field
+from io import BytesIO
+from typing import BinaryIO, Callable, Iterator, Optional
+
+from fastapi import HTTPException, Request, UploadFile
+from fastapi.routing import APIRoute
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import FormData
+from starlette.formparsers import MultiPartException, MultiPartParser
+
+from .executor import _env_int
+
+
+# 업로드 본문은 메모리에 통째로 올리지 않고, 임계값을 넘으면 디스크 임시 파일로 내려 둡니다.
+SPOOL_THRESHOLD = _env_int("PDF_WEB_SPOOL_THRESHOLD", 1024 * 1024)
+SPOOL_CHUNK_SIZE = 1024 * 1024
+SPOOL_DIR: Optional[str] = os.environ.get("PDF_WEB_SPOOL_DIR") or None
+
+
+@dataclass
+class SpooledUpload:
+	"""
+	업로드된 파일 하나. 작은 파일은 data(바이트), 큰 파일은 path(임시 파일)에 보관합니다.
+
+	프로세스 풀로 넘길 수 있도록 파일 핸들 없이 경로/바이트만 가집니다.
+	"""
+
+	filename: str
+	size: int
+	path: Optional[str] = None
+	data: Optional[bytes] = None
+	# 내용의 sha256(16진수). 스풀하면서 계산하며, 같은 바이트의 업로드는 파싱 결과를 공유합니다.
+	digest: Optional[str] = None
+	# digest가 없을 때 쓰는 업로드별 키
+	token: str = field(default_factory=lambda: uuid.uuid4().hex)
+	# False면 파일을 다른 곳(재개 가능한 업로드 세션 등)이 소유하므로 cleanup이 지우지 않습니다.
+	owned: bool = True
+
+	@property
+	def cache_key(self) -> str:
+		"""작업자 쪽 파싱 캐시의 키."""
+		return f"sha256:{self.digest}" if self.digest else f"upload:{self.token}"
+
+	def cleanup(self) -> None:
+		"""임시 파일을 삭제합니다(이미 없거나 소유하지 않은 파일이면 무시)."""
+		if self.path is not None and self.owned:
+			try:
+				os.remove(self.path)
+			except OSError:
+				pass
+
+
+@contextmanager
+def open_pdf_stream(source: SpooledUpload) -> Iterator[BinaryIO]:
+	"""
+	PdfReader에 넘길 스트림을 엽니다. 디스크에 있는 파일은 mmap으로 매핑합니다.
+	"""
+	if source.path is None:
+		yield BytesIO(source.data or b"")
+		return
+
+	with open(source.path, "rb") as f_in:
+		if source.size == 0:
+			yield BytesIO(b"")
+			return
+		mapped = mmap.mmap(f_in.fileno(), 0, access=mmap.ACCESS_READ)
+		try:
+			yield mapped  # type: ignore[misc]
+		finally:
+			mapped.close()
+
+
+def _copy_to_spool(file_obj: BinaryIO, filename: str) -> SpooledUpload:
+	# SpoolingRoute 밖에서 받은 업로드(다른 파서가 만든 임시 파일)만 이 경로로 복사합니다.
+	# 임계값까지는 메모리에 모으고, 넘어서면 임시 파일로 전환합니다. 복사하는 김에 내용 해시를 계산합니다.
+	file_obj.seek(0)
+	head = file_obj.read(SPOOL_THRESHOLD + 1)
+	hasher = hashlib.sha256(head)
+	if len(head) <= SPOOL_THRESHOLD:
+		return SpooledUpload(filename=filename, size=len(head), data=head, digest=hasher.hexdigest())
+
+	fd, path = tempfile.mkstemp(prefix="pdf-spool-", suffix=".pdf", dir=SPOOL_DIR)
+	try:
+		with os.fdopen(fd, "wb") as f_out:
+			f_out.write(head)
+			del head
+			while True:
+				chunk = file_obj.read(SPOOL_CHUNK_SIZE)
+				if not chunk:
+					break
+				hasher.update(chunk)
+				f_out.write(chunk)
+			size = f_out.tell()
+	except BaseException:
+		try:
+			os.remove(path)
+		except OSError:
+			pass
+		raise
+	return SpooledUpload(filename=filename, size=size, path=path, digest=hasher.hexdigest())
+
+
+class SpoolFile:
+	"""
+	멀티파트 파서가 파일 파트를 받는 동안 쓰는 스풀 파일입니다.
+
+	- 받는 동안 sha256을 계산하고, SPOOL_THRESHOLD를 넘으면 SPOOL_DIR의 임시 파일로 전환합니다.
+	- detach()는 받은 파일을 그대로 SpooledUpload로 넘기므로 업로드를 다시 복사하지 않습니다.
+	- detach()하지 않고 닫으면(폼 정리, 파싱 실패) 임시 파일을 지웁니다.
+	"""
+
+	def __init__(self, threshold: int = SPOOL_THRESHOLD) -> None:
+		# UploadFile이 SpooledTemporaryFile처럼 보고 메모리 쓰기는 이벤트 루프에서, 디스크 쓰기는 스레드에서 합니다.
+		self._max_size = threshold
+		self._rolled = False
+		self._file: BinaryIO = BytesIO()
+		self._hasher = hashlib.sha256()
+		self._detached = False
+		self.path: Optional[str] = None
+		self.size = 0
+
+	def _rollover(self) -> None:
+		fd, path = tempfile.mkstemp(prefix="pdf-spool-", suffix=".pdf", dir=SPOOL_DIR)
+		f_out = os.fdopen(fd, "w+b")
+		try:
+			f_out.write(self._file.getvalue())  # type: ignore[attr-defined]
+		except BaseException:
+			f_out.close()
+			os.remove(path)
+			raise
+		self._file = f_out
+		self.path = path
+		self._rolled = True
+
+	def write(self, data: bytes) -> int:
+		self._hasher.update(data)
+		self.size += len(data)
+		if not self._rolled and self.size > self._max_size:
+			self._rollover()
+		return self._file.write(data)
+
+	def read(self, size: int = -1) -> bytes:
+		return self._file.read(size)
+
+	def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+		return self._file.seek(offset, whence)
+
+	def tell(self) -> int:
+		return self._file.tell()
+
+	def detach(self, filename: str) -> SpooledUpload:
+		"""받은 내용을 SpooledUpload로 넘깁니다. 이후 임시 파일은 SpooledUpload가 소유합니다."""
+		digest = self._hasher.hexdigest()
+		if not self._rolled:
+			return SpooledUpload(filename=filename, size=self.size, data=self._file.getvalue(), digest=digest)  # type: ignore[attr-defined]
+		self._file.close()
+		self._detached = True
+		return SpooledUpload(filename=filename, size=self.size, path=self.path, digest=digest)
+
+	def close(self) -> None:
+		self._file.close()
+		if self.path is not None and not self._detached:
+			self._detached = True
+			try:
+				os.remove(self.path)
+			except OSError:
+				pass
+
+
+class SpoolingMultiPartParser(MultiPartParser):
+	"""파일 파트를 SpoolFile로 받는 멀티파트 파서입니다(Starlette 파서의 전역 설정은 바꾸지 않음)."""
+
+	spool_max_size = SPOOL_THRESHOLD
+
+	def on_headers_finished(self) -> None:
+		super().on_headers_finished()
+		upload = self._current_part.file
+		if upload is None:
+			return
+		# 부모가 만든 빈 SpooledTemporaryFile 대신 SpoolFile에 받습니다.
+		self._files_to_close_on_error.pop().close()
+		spool = SpoolFile(self.spool_max_size)
+		self._files_to_close_on_error.append(spool)  # type: ignore[arg-type]
+		self._current_part.file = UploadFile(
+			file=spool,  # type: ignore[arg-type]
+			size=0,
+			filename=upload.filename,
+			headers=upload.headers,
+		)
+
+
+class SpoolingRequest(Request):
+	"""멀티파트 폼을 SpoolingMultiPartParser로 파싱하는 요청입니다."""
+
+	async def _get_form(
+		self,
+		*,
+		max_files: int | float = 1000,
+		max_fields: int | float = 1000,
+		max_part_size: int = 1024 * 1024,
+	) -> FormData:
+		content_type = self.headers.get("content-type", "")
+		if self._form is not None or not content_type.lower().startswith("multipart/form-data"):
+			return await super()._get_form(max_files=max_files, max_fields=max_fields, max_part_size=max_part_size)
+		try:
+			async with aclosing(self.stream()) as stream:
+				parser = SpoolingMultiPartParser(
+					self.headers,
+					stream,
+					max_files=max_files,
+					max_fields=max_fields,
+					max_part_size=max_part_size,
+				)
+				self._form = await parser.parse()
+		except MultiPartException as exc:
+			raise HTTPException(status_code=400, detail=exc.message)
+		return self._form
+
+
+class SpoolingRoute(APIRoute):
+	"""
+	업로드를 SpoolFile로 받는 라우트입니다. app.router.route_class로 지정합니다.
+
+	- 업로드는 스풀 파일에 한 번만 쓰고, spool_upload()가 그 파일을 그대로 작업에 넘깁니다.
+	"""
+
+	def get_route_handler(self):
+		handler = super().get_route_handler()
+
+		async def spooling_handler(request: Request):
+			return await handler(SpoolingRequest(request.scope, request.receive))
+
+		return spooling_handler
+
+
+async def spool_upload(upload: UploadFile) -> SpooledUpload:
+	"""
+	업로드 파일을 SpooledUpload로 넘깁니다.
+
+	- SpoolingRoute로 받은 업로드는 받으면서 쓴 스풀 파일과 해시를 그대로 씁니다.
+	- 그 밖의 업로드는 청크 단위로 스풀 파일에 복사합니다(이벤트 루프를 막지 않도록 스레드에서 수행).
+	"""
+	if isinstance(upload.file, SpoolFile):
+		return upload.file.detach(upload.filename or "")
+	return await run_in_threadpool(_copy_to_spool, upload.file, upload.filename or "")
+
+
+class RequestTooLargeError(Exception):
+	"""요청 본문이 바이트 예산을 넘었을 때 내부적으로 사용합니다."""
+
+
+class RequestBodyLimitMiddleware:
+	"""
+	요청 본문 바이트 예산을 수신 도중에 강제하는 ASGI 미들웨어입니다.
+
+	- Content-Length가 예산을 넘으면 본문을 읽기 전에 413으로 거절합니다.
+	- 청크 전송 등 길이를 모르는 경우에도 누적 수신량이 예산을 넘는 즉시 수신을 중단합니다.
+	- max_bytes가 0이면 제한하지 않습니다. 서버에서는 AdmissionMiddleware가 PDF_WEB_MAX_INPUT_BYTES로 씁니다.
+	- on_reject가 있으면 413으로 거절할 때마다 호출합니다(지표 기록 등).
+	"""
+
+	def __init__(self, app, max_bytes: int, on_reject: Optional[Callable[[], None]] = None) -> None:
+		self.app = app
+		self.max_bytes = max_bytes
+		self.on_reject = on_reject
+
+	async def _reject(self, send) -> None:
+		if self.on_reject is not None:
+			self.on_reject()
+		body = json.dumps(
+			{"detail": f"요청 크기가 한도({self.max_bytes} bytes)를 초과했습니다."},
+			ensure_ascii=False,
+		).encode("utf-8")
+		await send({
+			"type": "http.response.start",
+			"status": 413,
+			"headers": [
+				(b"content-type", b"application/json"),
+				(b"content-length", str(len(body)).encode()),
+				(b"connection", b"close"),
+			],
+		})
+		await send({"type": "http.response.body", "body": body})
+
+	async def __call__(self, scope, receive, send) -> None:
+		if scope["type"] != "http" or self.max_bytes <= 0:
+			await self.app(scope, receive, send)
+			return
+
+		for key, value in scope.get("headers", []):
+			if key == b"content-length":
+				try:
+					declared = int(value)
+				except ValueError:
+					declared = 0
+				if declared > self.max_bytes:
+					await self._reject(send)
+					return
+
+		received = 0
+		exceeded = False
+		started = False
+		replaced = False
+
+		async def limited_receive():
+			nonlocal received, exceeded
+			message = await receive()
+			if message["type"] == "http.request":
+				received += len(message.get("body", b""))
+				if received > self.max_bytes:
+					exceeded = True
+					raise RequestTooLargeError()
+			return message
+
+		async def guarded_send(message):
+			nonlocal started, replaced
+			# 예산 초과 후 앱이 만든 응답(예: 파싱 실패 400)은 413으로 바꿔 보냅니다.
+			if replaced:
+				return
+			if message["type"] == "http.response.start":
+				if exceeded and not started:
+					started = replaced = True
+					await self._reject(send)
+					return
+				started = True
+			await send(message)
+
+		try:
+			await self.app(scope, limited_receive, guarded_send)
+		except RequestTooLargeError:
+			if not started:
+				await self._reject(send)
@@ -0,0 +1,317 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+import weakref
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterator, List, Optional
+
+from .admission import LIMITS
+from .executor import _env_int
+from .spool import SpooledUpload
+
+
+# 재개 가능한 청크 업로드 세션을 둘 디렉터리. 세션마다 `<dir>/<id>/`에 data.pdf와 청크 표시 파일을 둡니다.
+UPLOADS_DIR = os.environ.get("PDF_WEB_UPLOADS_DIR") or os.path.join(tempfile.gettempdir(), "pdf-web-uploads")
+DEFAULT_CHUNK_SIZE = _env_int("PDF_WEB_UPLOAD_CHUNK_BYTES", 8 * 1024 * 1024)
+MIN_CHUNK_SIZE = 256 * 1024
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+MAX_CHUNKS = 100000
+# 업로드 한 건의 최대 크기(0이면 제한 없음)
+MAX_UPLOAD_BYTES = _env_int("PDF_WEB_MAX_UPLOAD_BYTES", 0)
+# 마지막 활동 뒤 이 시간(초)이 지난 세션은 지웁니다.
+UPLOAD_TTL = _env_int("PDF_WEB_UPLOAD_TTL", 24 * 3600)
+_CLEANUP_INTERVAL = 60
+
+_ID_PATTERN = re.compile(r"[0-9a-f]{32}")
+
+
+class UploadError(ValueError):
+	"""
+	업로드 세션 요청이 잘못되었을 때 발생합니다. status는 대응하는 HTTP 상태 코드입니다.
+	"""
+
+	def __init__(self, message: str, status: int = 400) -> None:
+		super().__init__(message)
+		self.status = status
+
+
+class _SessionLock:
+	"""
+	세션 하나의 잠금. 청크 쓰기끼리는 동시에 들어가고, 완료(finalize)는 진행 중인 쓰기가 끝난 뒤 단독으로 들어갑니다.
+	"""
+
+	def __init__(self) -> None:
+		self._cond = threading.Condition()
+		self._writers = 0
+		self._finalizing = False
+
+	@contextmanager
+	def chunk(self) -> Iterator[None]:
+		with self._cond:
+			while self._finalizing:
+				self._cond.wait()
+			self._writers += 1
+		try:
+			yield
+		finally:
+			with self._cond:
+				self._writers -= 1
+				self._cond.notify_all()
+
+	@contextmanager
+	def finalize(self) -> Iterator[None]:
+		with self._cond:
+			while self._finalizing or self._writers:
+				self._cond.wait()
+			self._finalizing = True
+		try:
+			yield
+		finally:
+			with self._cond:
+				self._finalizing = False
+				self._cond.notify_all()
+
+
+@dataclass
+class UploadSession:
+	"""업로드 세션 메타데이터(session.json)."""
+
+	id: str
+	filename: str
+	size: int
+	chunk_size: int
+	created_at: float
+	digest: Optional[str] = None
+
+	@property
+	def total_chunks(self) -> int:
+		return max(1, -(-self.size // self.chunk_size))
+
+	@property
+	def finalized(self) -> bool:
+		return self.digest is not None
+
+	def chunk_length(self, index: int) -> int:
+		"""index번째 청크가 가져야 할 바이트 수."""
+		if index == self.total_chunks - 1:
+			return self.size - self.chunk_size * index
+		return self.chunk_size
+
+
+class UploadStore:
+	"""
+	재개 가능한 청크 업로드 저장소.
+
+	- 세션을 만들 때 전체 크기의 파일(data.pdf)을 미리 만들고, 각 청크는 제자리(오프셋)에 씁니다.
+	  따라서 완료 시 조립 복사가 없으며, 완료된 파일을 그대로 병합/분할/작업 입력으로 씁니다.
+	- 받은 청크는 `chunks/<n>` 표시 파일(내용: 청크 SHA-256)로 기록되므로, 청크끼리는 병렬로 써도 됩니다.
+	- 완료는 세션 잠금으로 청크 쓰기와 직렬화하므로, 완료 확인과 해시 계산 사이에 청크가 바뀌지 않습니다
+	  (한 프로세스 안에서. 세션 하나는 한 서버 프로세스로 보내세요).
+	"""
+
+	def __init__(self, directory: str, ttl: int = UPLOAD_TTL) -> None:
+		self.directory = directory
+		self.ttl = ttl
+		self._last_cleanup = 0.0
+		self._cleanup_lock = threading.Lock()
+		# 쓰는 동안만 살아 있는 세션별 잠금
+		self._locks: "weakref.WeakValueDictionary[str, _SessionLock]" = weakref.WeakValueDictionary()
+		self._locks_guard = threading.Lock()
+		os.makedirs(directory, exist_ok=True)
+
+	@classmethod
+	def from_env(cls) -> "UploadStore":
+		return cls(UPLOADS_DIR)
+
+	def _session_dir(self, upload_id: str) -> str:
+		if not _ID_PATTERN.fullmatch(upload_id):
+			raise UploadError(f"업로드 세션이 없습니다: {upload_id}", 404)
+		return os.path.join(self.directory, upload_id)
+
+	def _lock(self, upload_id: str) -> _SessionLock:
+		with self._locks_guard:
+			lock = self._locks.get(upload_id)
+			if lock is None:
+				lock = self._locks[upload_id] = _SessionLock()
+			return lock
+
+	def _data_path(self, upload_id: str) -> str:
+		return os.path.join(self._session_dir(upload_id), "data.pdf")
+
+	def _write_meta(self, session: UploadSession) -> None:
+		path = os.path.join(self._session_dir(session.id), "session.json")
+		with open(path + ".tmp", "w", encoding="utf-8") as f:
+			json.dump(asdict(session), f, ensure_ascii=False)
+		os.replace(path + ".tmp", path)
+
+	def create(self, filename: str, size: int, chunk_size: Optional[int] = None) -> UploadSession:
+		"""새 업로드 세션을 만듭니다."""
+		self._cleanup_expired()
+		if not filename or not filename.lower().endswith(".pdf"):
+			raise UploadError(f"PDF 파일만 업로드하세요: {filename}")
+		if size <= 0:
+			raise UploadError("빈 파일입니다.")
+		# 업로드 한 건의 한도와 요청 하나의 입력 바이트 한도(PDF_WEB_MAX_INPUT_BYTES) 중 작은 쪽을 넘으면 거절합니다.
+		limits = [limit for limit in (MAX_UPLOAD_BYTES, LIMITS.max_input_bytes) if limit > 0]
+		if limits and size > min(limits):
+			raise UploadError(f"업로드 크기가 한도({min(limits)} bytes)를 초과했습니다.", 413)
+		chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+		if not MIN_CHUNK_SIZE <= chunk_size <= MAX_CHUNK_SIZE:
+			raise UploadError(f"청크 크기는 {MIN_CHUNK_SIZE}~{MAX_CHUNK_SIZE} bytes여야 합니다.")
+		session = UploadSession(
+			id=uuid.uuid4().hex,
+			filename=filename,
+			size=size,
+			chunk_size=chunk_size,
+			created_at=time.time(),
+		)
+		if session.total_chunks > MAX_CHUNKS:
+			raise UploadError(f"청크 수가 너무 많습니다(최대 {MAX_CHUNKS}). 청크 크기를 키우세요.")
+		session_dir = self._session_dir(session.id)
+		os.makedirs(os.path.join(session_dir, "chunks"))
+		try:
+			# 전체 크기의 (희소) 파일을 미리 만들어 두고 청크를 제자리에 씁니다.
+			with open(self._data_path(session.id), "wb") as f:
+				f.truncate(size)
+			self._write_meta(session)
+		except BaseException:
+			shutil.rmtree(session_dir, ignore_errors=True)
+			raise
+		return session
+
+	def get(self, upload_id: str) -> UploadSession:
+		path = os.path.join(self._session_dir(upload_id), "session.json")
+		try:
+			with open(path, "r", encoding="utf-8") as f:
+				return UploadSession(**json.load(f))
+		except (OSError, ValueError, TypeError):
+			raise UploadError(f"업로드 세션이 없거나 만료되었습니다: {upload_id}", 404)
+
+	def received(self, upload_id: str) -> List[int]:
+		"""받은 청크 번호 목록(오름차순)."""
+		names = os.listdir(os.path.join(self._session_dir(upload_id), "chunks"))
+		return sorted(int(name) for name in names if name.isdigit())
+
+	def missing(self, session: UploadSession) -> List[int]:
+		"""아직 받지 못한 청크 번호 목록."""
+		have = set(self.received(session.id))
+		return [index for index in range(session.total_chunks) if index not in have]
+
+	def write_chunk(self, upload_id: str, index: int, data: bytes, sha256: Optional[str] = None) -> None:
+		"""
+		청크 하나를 제자리에 씁니다. 길이와(주어졌으면) SHA-256이 맞아야 하며, 같은 청크를 다시 보내도 됩니다.
+		"""
+		actual = hashlib.sha256(data).hexdigest()
+		with self._lock(upload_id).chunk():
+			session = self.get(upload_id)
+			if session.finalized:
+				raise UploadError("이미 완료된 업로드입니다.", 409)
+			if not 0 <= index < session.total_chunks:
+				raise UploadError(f"청크 번호가 범위를 벗어났습니다: {index} (0~{session.total_chunks - 1})")
+			expected = session.chunk_length(index)
+			if len(data) != expected:
+				raise UploadError(f"청크 {index}의 크기가 맞지 않습니다: {len(data)} (기대값 {expected})")
+			if sha256 is not None and sha256.strip().lower() != actual:
+				raise UploadError(f"청크 {index}의 체크섬이 맞지 않습니다.", 422)
+			with open(self._data_path(upload_id), "r+b") as f:
+				f.seek(index * session.chunk_size)
+				f.write(data)
+			# 데이터를 쓴 뒤에 표시 파일을 만들어야, 중간에 끊겨도 받은 것으로 잘못 기록되지 않습니다.
+			marker = os.path.join(self._session_dir(upload_id), "chunks", str(index))
+			with open(marker + ".tmp", "w", encoding="ascii") as f:
+				f.write(actual)
+			os.replace(marker + ".tmp", marker)
+
+	def finalize(self, upload_id: str, sha256: Optional[str] = None) -> UploadSession:
+		"""
+		모든 청크가 도착했는지 확인하고 전체 SHA-256을 계산해 업로드를 완료합니다(이미 완료됐으면 그대로 반환).
+
+		- 진행 중인 청크 쓰기가 끝나기를 기다리고, 완료하는 동안에는 새 청크 쓰기를 막습니다.
+		"""
+		with self._lock(upload_id).finalize():
+			session = self.get(upload_id)
+			if session.finalized:
+				return session
+			missing = self.missing(session)
+			if missing:
+				raise UploadError(f"받지 못한 청크가 {len(missing)}개 있습니다: {missing[:20]}", 409)
+			hasher = hashlib.sha256()
+			with open(self._data_path(upload_id), "rb") as f:
+				while True:
+					block = f.read(1024 * 1024)
+					if not block:
+						break
+					hasher.update(block)
+			digest = hasher.hexdigest()
+			if sha256 is not None and sha256.strip().lower() != digest:
+				raise UploadError("전체 파일의 체크섬이 맞지 않습니다.", 422)
+			session.digest = digest
+			self._write_meta(session)
+			return session
+
+	def open_source(self, upload_id: str) -> SpooledUpload:
+		"""
+		완료된 업로드를 병합/분할 입력으로 씁니다. 세션 파일은 요청이 끝나도 지우지 않습니다(owned=False).
+		"""
+		session = self.get(upload_id)
+		if not session.finalized:
+			raise UploadError(f"완료되지 않은 업로드입니다: {upload_id}", 409)
+		return SpooledUpload(
+			filename=session.filename,
+			size=session.size,
+			path=self._data_path(upload_id),
+			digest=session.digest,
+			owned=False,
+		)
+
+	def delete(self, upload_id: str) -> None:
+		session_dir = self._session_dir(upload_id)
+		if not os.path.isdir(session_dir):
+			raise UploadError(f"업로드 세션이 없습니다: {upload_id}", 404)
+		shutil.rmtree(session_dir, ignore_errors=True)
+
+	def status(self, session: UploadSession) -> Dict:
+		"""API 응답용 세션 상태."""
+		missing = self.missing(session)
+		return {
+			"id": session.id,
+			"filename": session.filename,
+			"size": session.size,
+			"chunk_size": session.chunk_size,
+			"total_chunks": session.total_chunks,
+			"received": session.total_chunks - len(missing),
+			"missing": missing,
+			"finalized": session.finalized,
+			"sha256": session.digest,
+		}
+
+	def _cleanup_expired(self) -> None:
+		# 세션 생성 때 가끔씩(최대 1분에 한 번) 오래된 세션을 지웁니다.
+		now = time.time()
+		with self._cleanup_lock:
+			if now - self._last_cleanup < _CLEANUP_INTERVAL:
+				return
+			self._last_cleanup = now
+		for name in os.listdir(self.directory):
+			if not _ID_PATTERN.fullmatch(name):
+				continue
+			session_dir = os.path.join(self.directory, name)
+			try:
+				last_activity = max(
+					os.stat(session_dir).st_mtime,
+					os.stat(os.path.join(session_dir, "chunks")).st_mtime,
+					os.stat(os.path.join(session_dir, "session.json")).st_mtime,
+				)
+			except OSError:
+				last_activity = 0.0
+			if now - last_activity > self.ttl:
+				shutil.rmtree(session_dir, ignore_errors=True)
@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import AsyncIterator, BinaryIO, Iterable, List, Optional, Tuple
+from zipfile import ZipFile, ZipInfo, ZIP_DEFLATED, ZIP_STORED
+
+from starlette.concurrency import run_in_threadpool
+
+from .metrics import observe_stage
+
+
+logger = logging.getLogger(__name__)
+
+# auto 정책: 표본을 압축해 이득(1 - 압축률)이 이 값보다 작으면 저장(STORED)합니다.
+AUTO_MIN_GAIN = float(os.environ.get("PDF_WEB_ZIP_AUTO_MIN_GAIN", "0.05"))
+AUTO_SAMPLE_SIZE = 64 * 1024
+DEFAULT_DEFLATE_LEVEL = 6
+
+
+@dataclass(frozen=True)
+class ZipCompressionPolicy:
+	"""
+	분할 ZIP 항목의 압축 정책.
+
+	- "stored": 압축하지 않음
+	- "deflate" / "deflate:N": 지정 레벨(0~9)로 압축
+	- "auto" / "auto:N": 항목마다 표본 압축률을 보고 저장 또는 레벨 N 압축을 선택
+	"""
+
+	mode: str
+	level: int = DEFAULT_DEFLATE_LEVEL
+
+	@classmethod
+	def parse(cls, text: str) -> "ZipCompressionPolicy":
+		value = text.strip().lower()
+		name, _, level_text = value.partition(":")
+		if name in ("stored", "store") and level_text == "":
+			return cls("stored", 0)
+		if name in ("deflate", "auto"):
+			if level_text == "":
+				return cls(name, DEFAULT_DEFLATE_LEVEL)
+			try:
+				level = int(level_text)
+			except ValueError:
+				level = -1
+			if 0 <= level <= 9:
+				return cls(name, level)
+		raise ValueError(f"잘못된 압축 정책입니다: '{text}' (stored | deflate[:0-9] | auto[:0-9])")
+
+	def __str__(self) -> str:
+		return "stored" if self.mode == "stored" else f"{self.mode}:{self.level}"
+
+	def choose(self, data: bytes) -> Tuple[int, Optional[int]]:
+		"""항목 하나에 쓸 (압축 방식, 레벨)을 결정합니다."""
+		if self.mode == "stored":
+			return ZIP_STORED, None
+		if self.mode == "deflate":
+			return ZIP_DEFLATED, self.level
+		if estimate_deflate_gain(data) < AUTO_MIN_GAIN:
+			return ZIP_STORED, None
+		return ZIP_DEFLATED, self.level
+
+
+def default_policy() -> ZipCompressionPolicy:
+	"""서버 기본 정책(PDF_WEB_ZIP_COMPRESSION, 기본 auto)."""
+	return ZipCompressionPolicy.parse(os.environ.get("PDF_WEB_ZIP_COMPRESSION", "auto"))
+
+
+def estimate_deflate_gain(data: bytes) -> float:
+	"""
+	앞/가운데/끝의 표본을 빠른 레벨(1)로 압축해 예상 이득(0~1)을 추정합니다.
+	"""
+	if len(data) <= AUTO_SAMPLE_SIZE * 3:
+		samples = [data]
+	else:
+		middle = (len(data) - AUTO_SAMPLE_SIZE) // 2
+		samples = [
+			data[:AUTO_SAMPLE_SIZE],
+			data[middle:middle + AUTO_SAMPLE_SIZE],
+			data[-AUTO_SAMPLE_SIZE:],
+		]
+	raw = sum(len(s) for s in samples)
+	if raw == 0:
+		return 0.0
+	packed = sum(len(zlib.compress(s, 1)) for s in samples)
+	return 1.0 - packed / raw
+
+
+@dataclass
+class ZipReport:
+	"""ZIP 스트림에 대한 압축 결과 요약."""
+
+	policy: str
+	# 분할 원본 크기(알 수 있으면). 파트 합계와 비교해 리소스 중복 정도를 봅니다.
+	source_bytes: int = 0
+	entries: int = 0
+	stored: int = 0
+	deflated: int = 0
+	input_bytes: int = 0
+	output_bytes: int = 0
+	# 항목 압축/기록에 든 시간 합계(초)
+	seconds: float = 0.0
+	details: List[dict] = field(default_factory=list)
+
+	@property
+	def ratio(self) -> float:
+		return self.output_bytes / self.input_bytes if self.input_bytes else 1.0
+
+	def summary(self) -> dict:
+		summary = {
+			"policy": self.policy,
+			"entries": self.entries,
+			"stored": self.stored,
+			"deflated": self.deflated,
+			"input_bytes": self.input_bytes,
+			"output_bytes": self.output_bytes,
+			"ratio": round(self.ratio, 4),
+		}
+		if self.source_bytes:
+			summary["source_bytes"] = self.source_bytes
+			summary["parts_to_source"] = round(self.input_bytes / self.source_bytes, 4)
+		return summary
+
+
+class ZipChunkSink:
+	"""
+	ZipFile이 쓰는 바이트를 모아 두었다가 drain()으로 꺼내 주는 쓰기 전용 버퍼입니다.
+
+	seek/tell을 제공하지 않으므로 ZipFile은 각 항목 뒤에 데이터 디스크립터를 기록하며,
+	이미 쓴 바이트를 되돌아가 고치지 않습니다(곧바로 클라이언트로 보낼 수 있음).
+	"""
+
+	def __init__(self) -> None:
+		self._chunks: List[bytes] = []
+
+	def write(self, data: bytes) -> int:
+		self._chunks.append(bytes(data))
+		return len(data)
+
+	def flush(self) -> None:
+		pass
+
+	def drain(self) -> bytes:
+		data = b"".join(self._chunks)
+		self._chunks.clear()
+		return data
+
+
+def _write_entry(zf: ZipFile, name: str, data: bytes, policy: ZipCompressionPolicy, report: ZipReport) -> None:
+	started = time.perf_counter()
+	compress_type, level = policy.choose(data)
+	zinfo = ZipInfo(name, date_time=time.localtime(time.time())[:6])
+	zinfo.external_attr = 0o600 << 16
+	zinfo.compress_type = compress_type
+	zf.writestr(zinfo, data, compress_type=compress_type, compresslevel=level)
+
+	method = "stored" if compress_type == ZIP_STORED else f"deflate:{level}"
+	ratio = zinfo.compress_size / zinfo.file_size if zinfo.file_size else 1.0
+	# 항목별 선택 결과는 중앙 디렉터리의 항목 주석에 남깁니다.
+	zinfo.comment = f"{method} ratio={ratio:.3f}".encode("ascii")
+
+	report.entries += 1
+	report.input_bytes += zinfo.file_size
+	report.output_bytes += zinfo.compress_size
+	if compress_type == ZIP_STORED:
+		report.stored += 1
+	else:
+		report.deflated += 1
+	report.details.append({"name": name, "method": method, "ratio": round(ratio, 4)})
+	report.seconds += time.perf_counter() - started
+
+
+def write_zip(
+	stream: BinaryIO,
+	entries: Iterable[Tuple[str, bytes]],
+	policy: Optional[ZipCompressionPolicy] = None,
+	report: Optional[ZipReport] = None,
+) -> ZipReport:
+	"""
+	(파일명, 바이트) 항목을 stream(파일)에 ZIP으로 씁니다. stream_zip의 동기 버전으로, 작업자에서 사용합니다.
+	"""
+	policy = policy or default_policy()
+	report = report if report is not None else ZipReport(policy=str(policy))
+	with ZipFile(stream, mode="w") as zf:
+		for name, data in entries:
+			_write_entry(zf, name, data, policy, report)
+			del data
+		zf.comment = json.dumps(report.summary()).encode("ascii")[:65535]
+	logger.info("split zip %s", json.dumps(report.summary()))
+	return report
+
+
+async def stream_zip(
+	entries: AsyncIterator[Tuple[str, bytes]],
+	policy: Optional[ZipCompressionPolicy] = None,
+	report: Optional[ZipReport] = None,
+) -> AsyncIterator[bytes]:
+	"""
+	(파일명, 바이트) 항목을 하나씩 받아 ZIP 항목으로 압축한 뒤 즉시 내보냅니다.
+
+	- 메모리에는 현재 처리 중인 항목 하나와 그 압축 결과만 유지됩니다.
+	- 압축(zlib)은 스레드에서 수행하여 이벤트 루프를 막지 않습니다.
+	- 응답 헤더는 이미 나간 뒤이므로, 압축 결과 요약은 ZIP 주석(JSON)과 로그로 남깁니다.
+	"""
+	policy = policy or default_policy()
+	report = report if report is not None else ZipReport(policy=str(policy))
+	sink = ZipChunkSink()
+	zf = ZipFile(sink, mode="w")
+	try:
+		async for name, data in entries:
+			await run_in_threadpool(_write_entry, zf, name, data, policy, report)
+			del data
+			chunk = sink.drain()
+			if chunk:
+				yield chunk
+		zf.comment = json.dumps(report.summary()).encode("ascii")[:65535]
+	finally:
+		# 중앙 디렉터리 기록 (중단된 경우에도 ZipFile 상태를 정리)
+		zf.close()
+	logger.info("split zip %s", json.dumps(report.summary()))
+	observe_stage("zip", report.seconds)
+	tail = sink.drain()
+	if tail:
+		yield tail
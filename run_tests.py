@@ -1,14 +1,24 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import sys
+import tempfile
+import uuid
+from io import BytesIO
 from pathlib import Path
 from typing import Optional
 
-from pypdf import PdfReader
+from pypdf import PdfReader, PdfWriter
+from pypdf.generic import ArrayObject, DictionaryObject, NameObject, NumberObject
 from starlette.testclient import TestClient
 
 # 한글 주석: FastAPI 앱을 직접 임포트하여 실제 HTTP 요청 시뮬레이션
-from app import app
+from app import app, heavy_slots
+from make_test_pdf import create_scanned_pdf, create_text_pdf
+from pdf_tool.linearize import check_linearized
+from pdf_tool.merge import append_pdfs
+from pdf_tool.passthrough import PassthroughUnsupported, write_pages_passthrough
 
 
 def get_page_count(pdf_path: Path) -> int:
@@ -65,6 +75,467 @@ def http_merge_test(client: TestClient, pdf_path: Path) -> Path:
 	return out_path
 
 
+def encrypted_copy(pdf_path: Path) -> bytes:
+	"""열람 암호("user")를 건 사본을 메모리에 만듭니다."""
+	writer = PdfWriter(clone_from=PdfReader(str(pdf_path)))
+	writer.encrypt("user", "owner")
+	buf = BytesIO()
+	writer.write(buf)
+	return buf.getvalue()
+
+
+def http_encrypted_test(client: TestClient, pdf_path: Path) -> str:
+	"""
+	열람 암호가 걸린 PDF를 /split, /merge에 보내면 "유효하지 않은 PDF"가 아니라 암호화 안내와 함께 400으로 거절되는지 확인합니다.
+	"""
+	data = encrypted_copy(pdf_path)
+	resp = client.post("/split", files={"file": ("encrypted.pdf", data, "application/pdf")})
+	detail = resp.json().get("detail", "") if resp.status_code == 400 else ""
+	if "암호화된 PDF는 분할할 수 없습니다" not in detail:
+		raise RuntimeError(f"/split 암호화 입력 처리 실패: status={resp.status_code}, body={resp.text}")
+
+	files = [
+		("files", (pdf_path.name, pdf_path.read_bytes(), "application/pdf")),
+		("files", ("encrypted.pdf", data, "application/pdf")),
+	]
+	resp = client.post("/merge", files=files)
+	merge_detail = resp.json().get("detail", "") if resp.status_code == 400 else ""
+	if merge_detail != "암호화된 PDF는 병합할 수 없습니다: encrypted.pdf":
+		raise RuntimeError(f"/merge 암호화 입력 처리 실패: status={resp.status_code}, body={resp.text}")
+	return detail
+
+
+def http_dedupe_test(client: TestClient) -> str:
+	"""
+	페이지마다 같은 이미지 사본을 둔 PDF 두 개를 /merge(dedupe=true)로 병합해
+	중복 객체가 실제로 합쳐지고(X-Dedupe-Objects > 0) 중복 제거 없는 병합보다 작아지는지 확인합니다.
+	"""
+	with tempfile.TemporaryDirectory() as tmp:
+		copies_path = Path(tmp) / "image_copies.pdf"
+		create_text_pdf(copies_path, 4, image_pixels=64, shared=False)
+		data = copies_path.read_bytes()
+	files = [("files", ("image_copies.pdf", data, "application/pdf")) for _ in range(2)]
+	plain = client.post("/merge", files=files)
+	resp = client.post("/merge", files=files, data={"dedupe": "true"})
+	if plain.status_code != 200 or resp.status_code != 200:
+		raise RuntimeError(f"/merge(dedupe) 실패: status={plain.status_code}/{resp.status_code}, body={resp.text[:200]}")
+	objects = int(resp.headers.get("x-dedupe-objects", "0"))
+	if objects <= 0 or len(resp.content) >= len(plain.content):
+		raise RuntimeError(f"중복 제거 실패: objects={objects}, {len(plain.content)} -> {len(resp.content)} bytes")
+	pages = len(PdfReader(BytesIO(resp.content)).pages)
+	if pages != 8:
+		raise RuntimeError(f"중복 제거 병합 결과 페이지 수가 다릅니다: {pages} != 8")
+	return f"objects={objects} bytes={len(plain.content)}->{len(resp.content)}"
+
+
+def unused_resources_copy(pages: int) -> bytes:
+	"""
+	페이지마다 자기 이미지(/Im1)만 그리지만 /XObject에는 다른 페이지의 이미지(/Im2~)까지 모두 올려 둔 PDF를 만듭니다.
+	"""
+	with tempfile.TemporaryDirectory() as tmp:
+		source_path = Path(tmp) / "image_copies.pdf"
+		create_text_pdf(source_path, pages, image_pixels=64, shared=False)
+		writer = PdfWriter(clone_from=PdfReader(str(source_path)))
+	images = [page["/Resources"]["/XObject"].raw_get("/Im1") for page in writer.pages]
+	for index, page in enumerate(writer.pages):
+		xobjects = page["/Resources"]["/XObject"]
+		others = [image for position, image in enumerate(images) if position != index]
+		for number, image in enumerate(others, start=2):
+			xobjects[NameObject(f"/Im{number}")] = image
+	buf = BytesIO()
+	writer.write(buf)
+	return buf.getvalue()
+
+
+def http_prune_test(client: TestClient) -> str:
+	"""
+	/split 결과 페이지에 콘텐츠가 쓰는 리소스만 남는지(쓰지 않는 이미지 /Im2~ 제거) 확인합니다.
+	"""
+	data = unused_resources_copy(4)
+	resp = client.post("/split", files={"file": ("unused_resources.pdf", data, "application/pdf")}, data={"ranges": "2"})
+	if resp.status_code != 200:
+		raise RuntimeError(f"/split(prune) 실패: status={resp.status_code}, body={resp.text[:200]}")
+	reader = PdfReader(BytesIO(resp.content))
+	names = sorted(reader.pages[0]["/Resources"]["/XObject"].keys())
+	if len(reader.pages) != 1 or names != ["/Im1"]:
+		raise RuntimeError(f"리소스 정리 실패: pages={len(reader.pages)}, XObject={names}")
+	if len(resp.content) * 2 >= len(data):
+		raise RuntimeError(f"정리한 분할 결과가 충분히 작지 않습니다: {len(data)} -> {len(resp.content)} bytes")
+	return f"{len(data)}->{len(resp.content)}"
+
+
+def linked_pages_copy(pages: int) -> bytes:
+	"""첫 페이지에 마지막 페이지로 가는 링크 주석(/Dest)을 둔 PDF를 만듭니다."""
+	writer = PdfWriter()
+	for _ in range(pages):
+		writer.add_blank_page(width=200, height=200)
+	link = DictionaryObject({
+		NameObject("/Type"): NameObject("/Annot"),
+		NameObject("/Subtype"): NameObject("/Link"),
+		NameObject("/Rect"): ArrayObject([NumberObject(0), NumberObject(0), NumberObject(50), NumberObject(50)]),
+		NameObject("/Dest"): ArrayObject([writer.pages[-1].indirect_reference, NameObject("/Fit")]),
+	})
+	writer.pages[0][NameObject("/Annots")] = ArrayObject([writer._add_object(link)])
+	buf = BytesIO()
+	writer.write(buf)
+	return buf.getvalue()
+
+
+def http_passthrough_fallback_test(client: TestClient) -> int:
+	"""
+	고속 복사 경로가 거절하는 입력(선택 밖의 페이지를 가리키는 링크)이 /split에서
+	PdfWriter 대체 경로로 올바르게 분할되는지 확인합니다. 분할 결과 바이트 수를 반환합니다.
+	"""
+	data = linked_pages_copy(3)
+	try:
+		write_pages_passthrough(BytesIO(), [(PdfReader(BytesIO(data)), [0])])
+	except PassthroughUnsupported:
+		pass
+	else:
+		raise RuntimeError("링크가 선택 밖 페이지를 가리키는데 고속 복사 경로가 거절하지 않았습니다.")
+
+	resp = client.post("/split", files={"file": ("linked.pdf", data, "application/pdf")}, data={"ranges": "1"})
+	if resp.status_code != 200:
+		raise RuntimeError(f"/split 대체 경로 실패: status={resp.status_code}, body={resp.text[:200]}")
+	pages = len(PdfReader(BytesIO(resp.content)).pages)
+	if pages != 1:
+		raise RuntimeError(f"대체 경로 분할 결과 페이지 수가 다릅니다: {pages} != 1")
+	return len(resp.content)
+
+
+def http_parse_cache_test(client: TestClient) -> Optional[str]:
+	"""
+	같은 바이트를 다른 파일 이름으로 다시 올리면 작업자 파싱 캐시(내용 해시 키)를 재사용하는지 /health로 확인합니다.
+	- 파싱 캐시 통계는 스레드 실행기에서만 /health에 나오므로, 프로세스 실행기면 None을 반환합니다.
+	"""
+	if "parse_cache" not in client.get("/health").json():
+		return None
+	with tempfile.TemporaryDirectory() as tmp:
+		source_path = Path(tmp) / "parse_cache.pdf"
+		create_text_pdf(source_path, 3, lines=7)
+		# 결과 캐시는 디스크에 남으므로, 실행마다 내용을 달리해 결과 캐시 적중 없이 실제로 파싱하게 합니다.
+		writer = PdfWriter(clone_from=PdfReader(str(source_path)))
+	writer.add_metadata({"/Subject": uuid.uuid4().hex})
+	buf = BytesIO()
+	writer.write(buf)
+	data = buf.getvalue()
+
+	before = client.get("/health").json()["parse_cache"]
+	for name, ranges in (("first.pdf", "1"), ("second.pdf", "2-3")):
+		resp = client.post("/split", files={"file": (name, data, "application/pdf")}, data={"ranges": ranges})
+		if resp.status_code != 200:
+			raise RuntimeError(f"/split(parse cache) 실패: status={resp.status_code}, body={resp.text[:200]}")
+	after = client.get("/health").json()["parse_cache"]
+	hits = after["hits"] - before["hits"]
+	misses = after["misses"] - before["misses"]
+	if misses != 1 or hits < 1:
+		raise RuntimeError(f"파싱 캐시 재사용 실패: hits +{hits}, misses +{misses}")
+	return f"hits=+{hits} misses=+{misses}"
+
+
+def http_result_cache_test(client: TestClient, merged: bytes, pdf_path: Path) -> str:
+	"""
+	/merge 결과를 /results/{key}로 다시 받을 때 ETag/If-None-Match(304)와 Range(206)가 동작하는지 확인합니다.
+	- merged는 같은 입력으로 앞서 받은 병합 결과 바이트입니다.
+	"""
+	files = [
+		("files", (pdf_path.name, pdf_path.read_bytes(), "application/pdf")),
+		("files", (pdf_path.name, pdf_path.read_bytes(), "application/pdf")),
+	]
+	resp = client.post("/merge", files=files, data={"output_name": "merged_test.pdf"})
+	etag = resp.headers.get("etag")
+	location = resp.headers.get("content-location", "")
+	if resp.status_code != 200 or not location.startswith("/results/") or resp.content != merged:
+		raise RuntimeError(f"/merge 결과 캐시 헤더 실패: status={resp.status_code}, Content-Location={location}")
+	# ETag는 결과 바이트의 SHA-256에서 만든 강한 검증자입니다.
+	if etag != f"\"{hashlib.sha256(merged).hexdigest()[:32]}\"":
+		raise RuntimeError(f"ETag가 결과 내용과 맞지 않습니다: {etag}")
+
+	resp = client.get(location, headers={"If-None-Match": etag})
+	if resp.status_code != 304 or resp.content:
+		raise RuntimeError(f"If-None-Match가 304로 응답하지 않았습니다: status={resp.status_code}")
+
+	resp = client.get(location, headers={"Range": "bytes=100-1099", "If-Range": etag})
+	if resp.status_code != 206 or resp.content != merged[100:1100]:
+		raise RuntimeError(f"Range 요청 실패: status={resp.status_code}, {len(resp.content)} bytes")
+	content_range = resp.headers.get("content-range")
+	if content_range != f"bytes 100-1099/{len(merged)}":
+		raise RuntimeError(f"Content-Range가 다릅니다: {content_range}")
+	return etag
+
+
+def http_jobs_test(pdf_path: Path) -> str:
+	"""
+	/jobs/split로 작업을 넣고 /jobs/{id}/events(SSE)로 끝날 때까지 따라간 뒤 결과를 내려받아 페이지 수를 확인합니다.
+	- 작업자는 이벤트 루프에서 도는 백그라운드 작업이므로, lifespan을 실행하는 별도 클라이언트로 요청합니다.
+	"""
+	with TestClient(app) as client:
+		files = {"file": (pdf_path.name, pdf_path.read_bytes(), "application/pdf")}
+		resp = client.post("/jobs/split", files=files, data={"ranges": "2-4"})
+		if resp.status_code != 202:
+			raise RuntimeError(f"/jobs/split 실패: status={resp.status_code}, body={resp.text[:200]}")
+		job_id = resp.json()["id"]
+		if resp.headers.get("location") != f"/jobs/{job_id}":
+			raise RuntimeError(f"작업 Location 헤더가 다릅니다: {resp.headers.get('location')}")
+
+		events = []
+		with client.stream("GET", f"/jobs/{job_id}/events") as stream:
+			if not stream.headers.get("content-type", "").startswith("text/event-stream"):
+				raise RuntimeError(f"SSE 응답이 아닙니다: {stream.headers.get('content-type')}")
+			for line in stream.iter_lines():
+				if line.startswith("event: "):
+					events.append(line[len("event: "):])
+		if not events or events[-1] != "done":
+			raise RuntimeError(f"작업이 done 이벤트로 끝나지 않았습니다: {events}")
+
+		status = client.get(f"/jobs/{job_id}").json()
+		resp = client.get(f"/jobs/{job_id}/result")
+		if status.get("status") != "done" or resp.status_code != 200:
+			raise RuntimeError(f"작업 결과 받기 실패: status={status.get('status')}, http={resp.status_code}")
+		pages = len(PdfReader(BytesIO(resp.content)).pages)
+		if pages != 3:
+			raise RuntimeError(f"작업 분할 결과 페이지 수가 다릅니다: {pages} != 3")
+	return ",".join(events)
+
+
+def http_chunked_upload_test(client: TestClient, pdf_path: Path) -> int:
+	"""
+	/uploads로 PDF를 청크 단위로 올리고(역순, 빠진 청크 이어 보내기, 체크섬 검증) upload_id로 /split 합니다.
+	- 분할 결과 페이지 수를 반환합니다.
+	"""
+	data = pdf_path.read_bytes()
+	chunk_size = 256 * 1024
+	resp = client.post("/uploads", data={"filename": pdf_path.name, "size": str(len(data)), "chunk_size": str(chunk_size)})
+	if resp.status_code != 201:
+		raise RuntimeError(f"/uploads 생성 실패: status={resp.status_code}, body={resp.text[:200]}")
+	session = resp.json()
+	upload_id = session["id"]
+	chunks = [data[start:start + chunk_size] for start in range(0, len(data), chunk_size)]
+	if session["total_chunks"] != len(chunks) or len(chunks) < 2:
+		raise RuntimeError(f"청크 수가 다릅니다: {session['total_chunks']} != {len(chunks)}")
+
+	def put(index: int, chunk: bytes, digest: str):
+		return client.put(f"/uploads/{upload_id}/chunks/{index}", content=chunk, headers={"X-Chunk-Sha256": digest})
+
+	# 첫 청크를 빼고 역순으로 보내면 완료가 409로 거절되고, 상태에 빠진 청크로 나옵니다.
+	for index in reversed(range(1, len(chunks))):
+		resp = put(index, chunks[index], hashlib.sha256(chunks[index]).hexdigest())
+		if resp.status_code != 200:
+			raise RuntimeError(f"청크 {index} 업로드 실패: status={resp.status_code}, body={resp.text[:200]}")
+	resp = client.post(f"/uploads/{upload_id}/finalize")
+	missing = client.get(f"/uploads/{upload_id}").json()["missing"]
+	if resp.status_code != 409 or missing != [0]:
+		raise RuntimeError(f"빠진 청크 처리 실패: status={resp.status_code}, missing={missing}")
+
+	resp = put(0, chunks[0], hashlib.sha256(b"corrupted").hexdigest())
+	if resp.status_code != 422:
+		raise RuntimeError(f"청크 체크섬 불일치가 422로 거절되지 않았습니다: status={resp.status_code}")
+	resp = put(0, chunks[0], hashlib.sha256(chunks[0]).hexdigest())
+	if resp.status_code != 200:
+		raise RuntimeError(f"청크 0 업로드 실패: status={resp.status_code}, body={resp.text[:200]}")
+
+	digest = hashlib.sha256(data).hexdigest()
+	resp = client.post(f"/uploads/{upload_id}/finalize", data={"sha256": digest})
+	if resp.status_code != 200 or not resp.json()["finalized"] or resp.json()["sha256"] != digest:
+		raise RuntimeError(f"업로드 완료 실패: status={resp.status_code}, body={resp.text[:200]}")
+
+	try:
+		resp = client.post("/split", data={"upload_id": upload_id, "ranges": "1-3"})
+		if resp.status_code != 200:
+			raise RuntimeError(f"/split(upload_id) 실패: status={resp.status_code}, body={resp.text[:200]}")
+		pages = len(PdfReader(BytesIO(resp.content)).pages)
+		if pages != 3:
+			raise RuntimeError(f"청크 업로드 분할 결과 페이지 수가 다릅니다: {pages} != 3")
+	finally:
+		client.delete(f"/uploads/{upload_id}")
+	if client.get(f"/uploads/{upload_id}").status_code != 404:
+		raise RuntimeError("삭제한 업로드 세션이 남아 있습니다.")
+	return pages
+
+
+def http_compose_test(client: TestClient, pdf_path: Path) -> int:
+	"""
+	/compose로 두 파일의 페이지를 섞어(역순 구간 포함) 한 PDF로 만들고, 페이지 수와 순서를 확인합니다.
+	"""
+	with tempfile.TemporaryDirectory() as tmp:
+		text_path = Path(tmp) / "numbered.pdf"
+		create_text_pdf(text_path, 3, lines=1)
+		text_data = text_path.read_bytes()
+	files = [
+		("files", (pdf_path.name, pdf_path.read_bytes(), "application/pdf")),
+		("files", ("numbered.pdf", text_data, "application/pdf")),
+	]
+	specs = json.dumps([
+		{"source": 1, "pages": "3-1"},
+		{"source": 0, "pages": "2-3"},
+		{"source": 1, "pages": "2"},
+	])
+	resp = client.post("/compose", files=files, data={"specs": specs})
+	if resp.status_code != 200:
+		raise RuntimeError(f"/compose 실패: status={resp.status_code}, body={resp.text[:200]}")
+	reader = PdfReader(BytesIO(resp.content))
+	if len(reader.pages) != 6:
+		raise RuntimeError(f"합성 결과 페이지 수가 다릅니다: {len(reader.pages)} != 6")
+	order = [reader.pages[index].extract_text().split("\n")[0] for index in (0, 1, 2, 5)]
+	if order != ["Page 3", "Page 2", "Page 1", "Page 2"]:
+		raise RuntimeError(f"합성 결과 페이지 순서가 다릅니다: {order}")
+
+	resp = client.post("/compose", files=files, data={"specs": json.dumps([{"source": 2}])})
+	if resp.status_code != 400:
+		raise RuntimeError(f"잘못된 source가 400으로 거절되지 않았습니다: status={resp.status_code}")
+	return len(reader.pages)
+
+
+def http_optimize_test(client: TestClient, pdf_path: Path, page_count: int) -> str:
+	"""
+	/merge(optimize=basic) 결과가 최적화하지 않은 병합보다 크지 않고, X-Optimize-* 헤더가 실제 크기와 맞는지 확인합니다.
+	"""
+	files = [
+		("files", (pdf_path.name, pdf_path.read_bytes(), "application/pdf")),
+		("files", (pdf_path.name, pdf_path.read_bytes(), "application/pdf")),
+	]
+	plain = client.post("/merge", files=files, data={"optimize": "off"})
+	resp = client.post("/merge", files=files, data={"optimize": "basic"})
+	if plain.status_code != 200 or resp.status_code != 200:
+		raise RuntimeError(f"/merge(optimize) 실패: status={plain.status_code}/{resp.status_code}, body={resp.text[:200]}")
+	if not resp.headers.get("x-optimize", "").startswith("basic"):
+		raise RuntimeError(f"X-Optimize 헤더가 다릅니다: {resp.headers.get('x-optimize')}")
+	input_bytes = int(resp.headers["x-optimize-input-bytes"])
+	output_bytes = int(resp.headers["x-optimize-output-bytes"])
+	if output_bytes != len(resp.content) or output_bytes > input_bytes or len(resp.content) > len(plain.content):
+		raise RuntimeError(
+			f"최적화 결과가 더 큽니다: input={input_bytes}, output={output_bytes}, "
+			f"off={len(plain.content)}, basic={len(resp.content)}"
+		)
+	pages = len(PdfReader(BytesIO(resp.content)).pages)
+	if pages != page_count * 2:
+		raise RuntimeError(f"최적화 병합 결과 페이지 수가 다릅니다: {pages} != {page_count * 2}")
+	return f"{len(plain.content)}->{len(resp.content)}"
+
+
+def append_test(pdf_path: Path, page_count: int) -> int:
+	"""
+	append_pdfs로 원본 사본 끝에 페이지를 두 번 증분 덧붙여, 원본 바이트가 그대로 앞에 남고 페이지가 순서대로 늘어나는지 확인합니다.
+	- 덧붙인 뒤 전체 페이지 수를 반환합니다.
+	"""
+	original = pdf_path.read_bytes()
+	with tempfile.TemporaryDirectory() as tmp:
+		base_path = Path(tmp) / "base.pdf"
+		base_path.write_bytes(original)
+		text_path = Path(tmp) / "numbered.pdf"
+		create_text_pdf(text_path, 3, lines=1)
+
+		first = append_pdfs(base_path, [text_path])
+		after_first = base_path.read_bytes()
+		second = append_pdfs(base_path, [text_path])
+		result = base_path.read_bytes()
+		if not after_first.startswith(original) or not result.startswith(after_first):
+			raise RuntimeError("증분 덧붙이기가 기존 바이트를 바꿨습니다.")
+
+		reader = PdfReader(str(base_path))
+		pages = len(reader.pages)
+		if (first.pages, second.pages, second.total_pages, pages) != (3, 3, page_count + 6, page_count + 6):
+			raise RuntimeError(
+				f"덧붙인 페이지 수가 다릅니다: {first.pages}+{second.pages}, total={second.total_pages}, read={pages}"
+			)
+		tail = [page.extract_text().split("\n")[0] for page in reader.pages[page_count:]]
+		if tail != ["Page 1", "Page 2", "Page 3"] * 2:
+			raise RuntimeError(f"덧붙인 페이지 순서가 다릅니다: {tail}")
+	return pages
+
+
+def http_linearize_test(client: TestClient, pdf_path: Path, page_count: int) -> int:
+	"""
+	/merge(linearize=true) 결과가 올바르게 선형화되었는지 검사하고 첫 페이지 구간 크기(/E)를 반환합니다.
+	- check_linearized로 선형화 사전/첫 페이지 교차 참조/힌트 표를 실제 객체 위치와 맞춰 봅니다.
+	- pikepdf(qpdf)가 설치되어 있으면 qpdf의 선형화 검사도 함께 돌립니다.
+	"""
+	files = [
+		("files", (pdf_path.name, pdf_path.read_bytes(), "application/pdf")),
+		("files", (pdf_path.name, pdf_path.read_bytes(), "application/pdf")),
+	]
+	resp = client.post("/merge", files=files, data={"linearize": "true"})
+	if resp.status_code != 200 or resp.headers.get("x-linearized") != "1":
+		raise RuntimeError(f"/merge(linearize) 실패: status={resp.status_code}, body={resp.text[:200]}")
+
+	problems = check_linearized(resp.content)
+	if problems:
+		raise RuntimeError("선형화 검사 실패: " + "; ".join(problems))
+	pages = len(PdfReader(BytesIO(resp.content)).pages)
+	if pages != page_count * 2:
+		raise RuntimeError(f"선형화 병합 결과 페이지 수가 다릅니다: {pages} != {page_count * 2}")
+
+	try:
+		import pikepdf
+	except ImportError:
+		pikepdf = None
+	if pikepdf is not None:
+		with pikepdf.open(BytesIO(resp.content)) as pdf:
+			if not pdf.check_linearization():
+				raise RuntimeError("qpdf 선형화 검사 실패")
+	return int(resp.headers["x-linearize-first-page-bytes"])
+
+
+def http_downsample_test(client: TestClient) -> str:
+	"""
+	간접 /Resources·/XObject와 간접 ICC 색 공간을 쓰는 300 DPI 스캔을 /split(downsample=100)에 보내
+	이미지가 실제로 다시 샘플링되어(X-Downsample-Images 1/1) 결과가 작아지는지 확인합니다.
+	"""
+	with tempfile.TemporaryDirectory() as tmp:
+		scan_path = Path(tmp) / "scan_indirect.pdf"
+		create_scanned_pdf(scan_path, 1, dpi=300, indirect=True)
+		data = scan_path.read_bytes()
+	resp = client.post(
+		"/split",
+		files={"file": ("scan_indirect.pdf", data, "application/pdf")},
+		data={"downsample": "100"},
+	)
+	if resp.status_code != 200:
+		raise RuntimeError(f"/split(downsample) 실패: status={resp.status_code}, body={resp.text[:200]}")
+	resampled = resp.headers.get("x-downsample-images")
+	if resampled != "1/1" or len(resp.content) >= len(data):
+		raise RuntimeError(f"간접 객체 이미지 다시 샘플링 실패: images={resampled}, {len(data)} -> {len(resp.content)} bytes")
+	return f"{len(data)}->{len(resp.content)}"
+
+
+def http_admission_test(client: TestClient, pdf_path: Path) -> str:
+	"""
+	동시 처리 슬롯이 모두 찬 상태에서 /merge가 본문을 처리하기 전에 429 + Retry-After로 거절되는지 확인합니다.
+	"""
+	data = pdf_path.read_bytes()
+	files = [("files", (pdf_path.name, data, "application/pdf")) for _ in range(2)]
+	active = heavy_slots.active
+	heavy_slots.active = heavy_slots.limit
+	try:
+		resp = client.post("/merge", files=files)
+	finally:
+		heavy_slots.active = active
+	retry_after = resp.headers.get("retry-after")
+	if resp.status_code != 429 or not retry_after:
+		raise RuntimeError(f"입장 제어 실패: status={resp.status_code}, Retry-After={retry_after}")
+	return retry_after
+
+
+def http_metrics_test(client: TestClient) -> int:
+	"""
+	/metrics가 Prometheus 텍스트 형식으로 앞선 요청들의 수와 단계별 시간을 내보내는지 확인하고, 표본 줄 수를 반환합니다.
+	"""
+	resp = client.get("/metrics")
+	if resp.status_code != 200 or not resp.headers.get("content-type", "").startswith("text/plain"):
+		raise RuntimeError(f"/metrics 실패: status={resp.status_code}")
+	for expected in (
+		'pdf_web_requests_total{endpoint="/merge",method="POST",status="200"}',
+		'pdf_web_stage_duration_seconds_count{endpoint="/merge",stage="upload"}',
+		'pdf_web_admission_rejected_total{reason="busy"}',
+		"process_resident_memory_bytes",
+	):
+		if expected not in resp.text:
+			raise RuntimeError(f"/metrics에 {expected}가 없습니다.")
+	if "server-timing" not in resp.headers:
+		raise RuntimeError("Server-Timing 헤더가 없습니다.")
+	return sum(1 for line in resp.text.splitlines() if line and not line.startswith("#"))
+
+
 def main() -> None:
 	if len(sys.argv) < 2:
 		print("사용법: python run_tests.py <PDF 경로>")
@@ -93,6 +564,66 @@ def main() -> None:
 	merge_out = http_merge_test(client, pdf_path)
 	print(f"MERGE_SAVED {merge_out}")
 
+	# 4-1) 암호화된 입력 거절
+	detail = http_encrypted_test(client, pdf_path)
+	print(f"ENCRYPTED_OK {detail}")
+
+	# 4-2) 중복 객체 제거 병합
+	deduped = http_dedupe_test(client)
+	print(f"DEDUPE_OK {deduped}")
+
+	# 4-3) 분할 결과의 쓰지 않는 리소스 정리
+	pruned = http_prune_test(client)
+	print(f"PRUNE_OK bytes={pruned}")
+
+	# 4-4) 고속 복사 경로가 거절하는 입력의 대체 경로
+	fallback_bytes = http_passthrough_fallback_test(client)
+	print(f"PASSTHROUGH_FALLBACK_OK bytes={fallback_bytes}")
+
+	# 4-5) 같은 내용의 업로드는 파싱 결과를 재사용
+	parse_cache = http_parse_cache_test(client)
+	print(f"PARSE_CACHE_OK {parse_cache}" if parse_cache else "PARSE_CACHE_SKIPPED (process executor)")
+
+	# 4-6) 결과 캐시: ETag/304/Range
+	etag = http_result_cache_test(client, merge_out.read_bytes(), pdf_path)
+	print(f"RESULT_CACHE_OK etag={etag}")
+
+	# 4-7) 비동기 작업과 SSE 진행 이벤트
+	events = http_jobs_test(pdf_path)
+	print(f"JOBS_OK events={events}")
+
+	# 4-8) 재개 가능한 청크 업로드
+	chunked_pages = http_chunked_upload_test(client, pdf_path)
+	print(f"CHUNKED_UPLOAD_OK pages={chunked_pages}")
+
+	# 4-9) 여러 파일의 페이지 선택 합성
+	composed_pages = http_compose_test(client, pdf_path)
+	print(f"COMPOSE_OK pages={composed_pages}")
+
+	# 4-10) 출력 크기 최적화
+	optimized = http_optimize_test(client, pdf_path, page_count)
+	print(f"OPTIMIZE_OK bytes={optimized}")
+
+	# 4-11) 증분 업데이트 덧붙이기 (main.py append)
+	appended_pages = append_test(pdf_path, page_count)
+	print(f"APPEND_OK pages={appended_pages}")
+
+	# 5) 선형화 병합 테스트: 결과를 저장하지 않고 구조만 검사
+	first_page_bytes = http_linearize_test(client, pdf_path, page_count)
+	print(f"LINEARIZE_OK first_page_bytes={first_page_bytes}")
+
+	# 5-1) 간접 객체로 된 리소스/ICC 색 공간의 이미지 다시 샘플링
+	downsampled = http_downsample_test(client)
+	print(f"DOWNSAMPLE_OK bytes={downsampled}")
+
+	# 6) 입장 제어: 동시 처리 수를 넘으면 429
+	retry_after = http_admission_test(client, pdf_path)
+	print(f"ADMISSION_OK retry_after={retry_after}")
+
+	# 7) 지표 확인
+	samples = http_metrics_test(client)
+	print(f"METRICS_OK samples={samples}")
+
 
 if __name__ == "__main__":
 	main()